@@ -6,7 +6,7 @@ CREATE TABLE IF NOT EXISTS utilisateurs (
   id              SERIAL PRIMARY KEY,
   pseudo          TEXT UNIQUE NOT NULL,
   mot_de_passe    TEXT NOT NULL,
-  temps_utilisation TIME,
+  temps_utilisation INTERVAL,     -- cumul des sessions fermées (NULL = aucune)
   cree_le         TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
@@ -21,6 +21,19 @@ CREATE TABLE IF NOT EXISTS prompts (
   version   INT NOT NULL DEFAULT 1
 );
 
+-- Notifie l'application à chaque modification (invalidation du cache de PromptDAO)
+CREATE OR REPLACE FUNCTION notifier_prompts_modifies() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_notify('prompts_modifies', TG_OP);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_prompts_modifies ON prompts;
+CREATE TRIGGER trg_prompts_modifies
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON prompts
+  FOR EACH STATEMENT EXECUTE FUNCTION notifier_prompts_modifies();
+
 -----------------------------------------------------
 -- conversations
 -----------------------------------------------------
@@ -31,6 +44,7 @@ CREATE TABLE IF NOT EXISTS conversations (
   proprietaire_id INT NULL,
   prompt_id       INT NULL,  -- optionnel : la conversation peut être sans pré-prompt
   cree_le         TIMESTAMPTZ NOT NULL DEFAULT now(),
+  derniere_activite TIMESTAMPTZ NULL,  -- date du dernier message (NULL = aucun message)
   
   CONSTRAINT titre_non_vide CHECK (length(trim(titre)) > 0),
 
@@ -48,11 +62,27 @@ CREATE TABLE IF NOT EXISTS conversations (
 CREATE TABLE IF NOT EXISTS conversations_participants (
   conversation_id  INT NOT NULL,
   utilisateur_id   INT NOT NULL,
+  derniere_activite TIMESTAMPTZ NULL,  -- copie de conversations.derniere_activite
   PRIMARY KEY (conversation_id, utilisateur_id),
   FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE CASCADE,
   FOREIGN KEY (utilisateur_id) REFERENCES utilisateurs(id) ON DELETE CASCADE
 );
 
+-- Un nouveau participant reprend la dernière activité de la conversation
+CREATE OR REPLACE FUNCTION copier_derniere_activite() RETURNS trigger AS $$
+BEGIN
+  SELECT derniere_activite INTO NEW.derniere_activite
+  FROM conversations
+  WHERE id = NEW.conversation_id;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_participants_activite ON conversations_participants;
+CREATE TRIGGER trg_participants_activite
+  BEFORE INSERT ON conversations_participants
+  FOR EACH ROW EXECUTE FUNCTION copier_derniere_activite();
+
 -----------------------------------------------------
 -- Messages
 -----------------------------------------------------
@@ -84,15 +114,82 @@ CREATE TABLE IF NOT EXISTS messages (
     DEFERRABLE INITIALLY DEFERRED
 );
 
+-- Tient à jour la dernière activité de la conversation et de ses
+-- participants (dénormalisée pour lister les conversations sans lire les
+-- messages). Le trigger est recréé par PartitionsMessages.partitionner().
+CREATE OR REPLACE FUNCTION maj_derniere_activite() RETURNS trigger AS $$
+BEGIN
+  UPDATE conversations
+  SET derniere_activite = NEW.cree_le
+  WHERE id = NEW.conversation_id
+    AND (derniere_activite IS NULL OR derniere_activite < NEW.cree_le);
+  IF FOUND THEN
+    UPDATE conversations_participants
+    SET derniere_activite = NEW.cree_le
+    WHERE conversation_id = NEW.conversation_id;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_messages_activite ON messages;
+CREATE TRIGGER trg_messages_activite
+  AFTER INSERT ON messages
+  FOR EACH ROW EXECUTE FUNCTION maj_derniere_activite();
+
 -----------------------------------------------------
 -- Sessions
 -----------------------------------------------------
 
 CREATE TABLE IF NOT EXISTS sessions (
-  id           SERIAL PRIMARY KEY,
-  user_id      INT NOT NULL REFERENCES utilisateurs(id) ON DELETE CASCADE,
-  connexion    TIMESTAMPTZ NOT NULL,
-  deconnexion  TIMESTAMPTZ              -- NULL si la session est encore ouverte
+  id              SERIAL PRIMARY KEY,
+  user_id         INT NOT NULL REFERENCES utilisateurs(id) ON DELETE CASCADE,
+  connexion       TIMESTAMPTZ NOT NULL,
+  deconnexion     TIMESTAMPTZ,             -- NULL si la session est encore ouverte
+  dernier_signal  TIMESTAMPTZ NOT NULL DEFAULT now(),  -- dernier signe de vie du client
+  duree_cumulee   BOOLEAN NOT NULL DEFAULT false       -- durée comptée dans temps_utilisation
+);
+
+-----------------------------------------------------
+-- Sujets (mots-clés des titres, comptés par utilisateur)
+-- Tenue à jour par ConversationDAO à chaque création,
+-- renommage ou suppression de conversation.
+-----------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS sujets_utilisateurs (
+  utilisateur_id  INT NOT NULL REFERENCES utilisateurs(id) ON DELETE CASCADE,
+  mot             TEXT NOT NULL,
+  nb              INT NOT NULL,
+  PRIMARY KEY (utilisateur_id, mot)
+);
+
+-----------------------------------------------------
+-- Appels au LLM (latence et mesures du client, pour les statistiques globales).
+-- Mesures NULL : inconnues (appel enregistré sans elles).
+-----------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS appels_llm (
+  id               SERIAL PRIMARY KEY,
+  conversation_id  INT NULL REFERENCES conversations(id) ON DELETE SET NULL,
+  latence_ms       INT NOT NULL CHECK (latence_ms >= 0),
+  cree_le          TIMESTAMPTZ NOT NULL DEFAULT now(),
+  octets_requete   INT NULL,
+  nb_messages      INT NULL,
+  statut_http      SMALLINT NULL,     -- NULL aussi si le service n'a pas répondu
+  succes           BOOLEAN NULL,
+  nb_retentatives  SMALLINT NOT NULL DEFAULT 0,
+  tokens_prompt    INT NULL,
+  tokens_reponse   INT NULL
+);
+
+-----------------------------------------------------
+-- Tokens révoqués (déconnexion), partagés entre processus.
+-- Une ligne peut être purgée dès que le token a expiré.
+-----------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS tokens_revoques (
+  jti        TEXT PRIMARY KEY,
+  expire_le  TIMESTAMPTZ NOT NULL
 );
 
 
@@ -105,11 +202,32 @@ CREATE TABLE IF NOT EXISTS sessions (
 CREATE INDEX IF NOT EXISTS idx_messages_conv_cree
   ON messages (conversation_id, cree_le);
 
-CREATE INDEX IF NOT EXISTS idx_participants_utilisateur
-  ON conversations_participants (utilisateur_id);
+-- messages d'un utilisateur (comptages, statistiques), éventuellement par période
+CREATE INDEX IF NOT EXISTS idx_messages_utilisateur_cree
+  ON messages (utilisateur_id, cree_le);
+
+-- Sert aussi les recherches par utilisateur seul (préfixe de l'index)
+CREATE INDEX IF NOT EXISTS idx_participants_activite
+  ON conversations_participants (utilisateur_id, derniere_activite DESC NULLS LAST);
 
 CREATE UNIQUE INDEX IF NOT EXISTS idx_utilisateurs_pseudo_lower
   ON utilisateurs (lower(pseudo));
 
 CREATE INDEX IF NOT EXISTS idx_sessions_user_time
   ON sessions (user_id, connexion);
+
+-- Index partiels : seules les sessions ouvertes (une petite fraction de la table)
+CREATE INDEX IF NOT EXISTS idx_sessions_ouvertes_user
+  ON sessions (user_id, connexion DESC) WHERE deconnexion IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_sessions_ouvertes_signal
+  ON sessions (dernier_signal) WHERE deconnexion IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_sujets_utilisateur_nb
+  ON sujets_utilisateurs (utilisateur_id, nb DESC);
+
+CREATE INDEX IF NOT EXISTS idx_appels_llm_cree
+  ON appels_llm (cree_le);
+
+CREATE INDEX IF NOT EXISTS idx_tokens_revoques_expire
+  ON tokens_revoques (expire_le);
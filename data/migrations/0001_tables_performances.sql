@@ -0,0 +1,57 @@
+-- Tables et colonnes ajoutées depuis la version initiale du schéma.
+-- Rapide : aucune réécriture de table volumineuse (une colonne avec une
+-- valeur par défaut stable est ajoutée sans réécriture).
+-- sujets_utilisateurs est remplie par lots par la migration 0008.
+
+CREATE TABLE IF NOT EXISTS sujets_utilisateurs (
+  utilisateur_id  INT NOT NULL REFERENCES utilisateurs(id) ON DELETE CASCADE,
+  mot             TEXT NOT NULL,
+  nb              INT NOT NULL,
+  PRIMARY KEY (utilisateur_id, mot)
+);
+
+CREATE TABLE IF NOT EXISTS appels_llm (
+  id               SERIAL PRIMARY KEY,
+  conversation_id  INT NULL REFERENCES conversations(id) ON DELETE SET NULL,
+  latence_ms       INT NOT NULL CHECK (latence_ms >= 0),
+  cree_le          TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS tokens_revoques (
+  jti        TEXT PRIMARY KEY,
+  expire_le  TIMESTAMPTZ NOT NULL
+);
+
+ALTER TABLE sessions
+  ADD COLUMN IF NOT EXISTS dernier_signal TIMESTAMPTZ NOT NULL DEFAULT now();
+
+-- true quand la durée de la session est comptée dans utilisateurs.temps_utilisation
+-- (à la fermeture, par SessionDAO) ; les sessions fermées avant restent à false
+-- jusqu'à la migration 0006
+ALTER TABLE sessions
+  ADD COLUMN IF NOT EXISTS duree_cumulee BOOLEAN NOT NULL DEFAULT false;
+
+-- L'ancienne colonne TIME n'était pas alimentée : elle devient le cumul
+-- (rempli par la migration 0006)
+DO $$
+BEGIN
+  IF (SELECT data_type FROM information_schema.columns
+      WHERE table_schema = current_schema()
+        AND table_name = 'utilisateurs'
+        AND column_name = 'temps_utilisation') = 'time without time zone' THEN
+    ALTER TABLE utilisateurs ALTER COLUMN temps_utilisation TYPE INTERVAL USING NULL;
+  END IF;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION notifier_prompts_modifies() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_notify('prompts_modifies', TG_OP);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_prompts_modifies ON prompts;
+CREATE TRIGGER trg_prompts_modifies
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON prompts
+  FOR EACH STATEMENT EXECUTE FUNCTION notifier_prompts_modifies();
@@ -0,0 +1,40 @@
+-- Dernière activité des conversations, tenue à jour par trigger.
+-- Les colonnes sont ajoutées vides (sans réécriture) ; l'historique est
+-- rempli par lots par les migrations 0004 et 0005.
+
+ALTER TABLE conversations ADD COLUMN IF NOT EXISTS derniere_activite TIMESTAMPTZ NULL;
+ALTER TABLE conversations_participants ADD COLUMN IF NOT EXISTS derniere_activite TIMESTAMPTZ NULL;
+
+CREATE OR REPLACE FUNCTION copier_derniere_activite() RETURNS trigger AS $$
+BEGIN
+  SELECT derniere_activite INTO NEW.derniere_activite
+  FROM conversations
+  WHERE id = NEW.conversation_id;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_participants_activite ON conversations_participants;
+CREATE TRIGGER trg_participants_activite
+  BEFORE INSERT ON conversations_participants
+  FOR EACH ROW EXECUTE FUNCTION copier_derniere_activite();
+
+CREATE OR REPLACE FUNCTION maj_derniere_activite() RETURNS trigger AS $$
+BEGIN
+  UPDATE conversations
+  SET derniere_activite = NEW.cree_le
+  WHERE id = NEW.conversation_id
+    AND (derniere_activite IS NULL OR derniere_activite < NEW.cree_le);
+  IF FOUND THEN
+    UPDATE conversations_participants
+    SET derniere_activite = NEW.cree_le
+    WHERE conversation_id = NEW.conversation_id;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_messages_activite ON messages;
+CREATE TRIGGER trg_messages_activite
+  AFTER INSERT ON messages
+  FOR EACH ROW EXECUTE FUNCTION maj_derniere_activite();
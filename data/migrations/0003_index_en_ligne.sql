@@ -0,0 +1,32 @@
+-- migration: sans-transaction
+-- Index construits sans bloquer les écritures (CREATE INDEX CONCURRENTLY).
+-- Ignorés par src/utils/migrations.py sur une table partitionnée : messages
+-- partitionnée a déjà ses index (créés par PartitionsMessages.partitionner).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_messages_utilisateur_cree
+  ON messages (utilisateur_id, cree_le);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_participants_activite
+  ON conversations_participants (utilisateur_id, derniere_activite DESC NULLS LAST);
+
+-- Remplacé par idx_participants_activite (même préfixe)
+DROP INDEX CONCURRENTLY IF EXISTS idx_participants_utilisateur;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_ouvertes_user
+  ON sessions (user_id, connexion DESC) WHERE deconnexion IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_ouvertes_signal
+  ON sessions (dernier_signal) WHERE deconnexion IS NULL;
+
+-- Sessions fermées restant à cumuler (migration 0006) : vide ensuite
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_a_cumuler
+  ON sessions (id) WHERE deconnexion IS NOT NULL AND NOT duree_cumulee;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sujets_utilisateur_nb
+  ON sujets_utilisateurs (utilisateur_id, nb DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_appels_llm_cree
+  ON appels_llm (cree_le);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tokens_revoques_expire
+  ON tokens_revoques (expire_le);
@@ -0,0 +1,19 @@
+-- migration: par-lots
+-- Dernière activité des conversations existantes. Une conversation qui
+-- reçoit un message pendant le remplissage est déjà à jour (trigger) et
+-- n'est plus sélectionnée.
+
+WITH lot AS (
+  SELECT c.id
+  FROM conversations c
+  WHERE c.derniere_activite IS NULL
+    AND EXISTS (SELECT 1 FROM messages m WHERE m.conversation_id = c.id)
+  LIMIT %(taille_lot)s
+  FOR UPDATE SKIP LOCKED
+)
+UPDATE conversations c
+SET derniere_activite = (
+  SELECT max(m.cree_le) FROM messages m WHERE m.conversation_id = c.id
+)
+FROM lot
+WHERE c.id = lot.id;
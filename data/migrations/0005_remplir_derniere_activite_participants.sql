@@ -0,0 +1,17 @@
+-- migration: par-lots
+-- Copie de la dernière activité sur les participants.
+
+WITH lot AS (
+  SELECT cp.conversation_id, cp.utilisateur_id
+  FROM conversations_participants cp
+  JOIN conversations c ON c.id = cp.conversation_id
+  WHERE cp.derniere_activite IS DISTINCT FROM c.derniere_activite
+  LIMIT %(taille_lot)s
+  FOR UPDATE OF cp SKIP LOCKED
+)
+UPDATE conversations_participants cp
+SET derniere_activite = c.derniere_activite
+FROM lot, conversations c
+WHERE cp.conversation_id = lot.conversation_id
+  AND cp.utilisateur_id = lot.utilisateur_id
+  AND c.id = cp.conversation_id;
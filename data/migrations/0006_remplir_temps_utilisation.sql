@@ -0,0 +1,25 @@
+-- migration: par-lots
+-- Ajoute au cumul des temps d'utilisation les sessions fermées avant que la
+-- fermeture ne les cumule (duree_cumulee = false), et les marque. Chaque
+-- session n'est comptée qu'une fois : les fermetures faites pendant le
+-- remplissage s'ajoutent au cumul de leur côté, déjà marquées.
+
+WITH lot AS (
+  SELECT s.id
+  FROM sessions s
+  WHERE s.deconnexion IS NOT NULL
+    AND NOT s.duree_cumulee
+  LIMIT %(taille_lot)s
+  FOR UPDATE SKIP LOCKED
+),
+marquees AS (
+  UPDATE sessions s
+  SET duree_cumulee = true
+  FROM lot
+  WHERE s.id = lot.id
+  RETURNING s.user_id, GREATEST(s.deconnexion - s.connexion, interval '0') AS duree
+)
+UPDATE utilisateurs u
+SET temps_utilisation = COALESCE(u.temps_utilisation, interval '0') + m.duree
+FROM (SELECT user_id, SUM(duree) AS duree FROM marquees GROUP BY user_id) AS m
+WHERE u.id = m.user_id;
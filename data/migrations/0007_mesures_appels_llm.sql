@@ -0,0 +1,12 @@
+-- Mesures des appels au LLM (voir src/client/metriques_llm.py).
+-- Colonnes sans valeur par défaut, ou avec une constante : pas de réécriture
+-- de la table.
+
+ALTER TABLE appels_llm
+  ADD COLUMN IF NOT EXISTS octets_requete   INT NULL,
+  ADD COLUMN IF NOT EXISTS nb_messages      INT NULL,
+  ADD COLUMN IF NOT EXISTS statut_http      SMALLINT NULL,
+  ADD COLUMN IF NOT EXISTS succes           BOOLEAN NULL,
+  ADD COLUMN IF NOT EXISTS nb_retentatives  SMALLINT NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS tokens_prompt    INT NULL,
+  ADD COLUMN IF NOT EXISTS tokens_reponse   INT NULL;
@@ -0,0 +1,16 @@
+"""
+Index des sujets (sujets_utilisateurs) des conversations existantes.
+
+La table est créée vide par la migration 0001, puis tenue à jour à chaque
+création, renommage ou suppression de conversation. Les comptes sont
+recalculés ici par lots d'utilisateurs, avec les règles d'extraction de
+l'application (src/utils/extraction_sujets.py), ce qui corrige aussi les
+comptes partiels des utilisateurs modifiés depuis le déploiement.
+"""
+
+from src.dao.conversation_dao import ConversationDAO
+
+
+def lot(cursor, taille_lot, position):
+    ids = ConversationDAO.reconstruire_sujets_lot(cursor, position or 0, taille_lot)
+    return len(ids), ids[-1] if ids else position
@@ -0,0 +1,118 @@
+"""
+Calibrage du coût de hachage des mots de passe.
+
+Mesure la latence de vérification d'un mot de passe pour des coûts croissants
+et retient le coût le plus élevé dont la latence (percentile choisi) reste
+sous l'objectif de latence de connexion.
+
+Usage :
+    python -m src.benchmarks.calibrer_hachage --slo-ms 250
+    python -m src.benchmarks.calibrer_hachage --algorithme argon2id --concurrence 8
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.securite import HacheurArgon2, HacheurScrypt
+
+
+def _candidats(algorithme: str):
+    """Hacheurs à tester, du moins coûteux au plus coûteux."""
+    if algorithme == HacheurScrypt.ALGORITHME:
+        return [HacheurScrypt(ln=ln) for ln in range(12, 21)]
+    if algorithme == HacheurArgon2.ALGORITHME:
+        return [
+            HacheurArgon2(cout_temps=t, cout_memoire_kio=m)
+            for m in (19456, 65536, 131072)
+            for t in (1, 2, 3, 4)
+        ]
+    raise ValueError(f"Algorithme inconnu : {algorithme!r}")
+
+
+def mesurer(hacheur, nb_essais: int, concurrence: int) -> list[float]:
+    """
+    Mesure la latence (ms) de `nb_essais` vérifications, lancées par
+    `concurrence` threads simultanés (simulation d'une rafale de connexions).
+    """
+    hash_stocke = hacheur.hacher("mot de passe de calibrage")
+
+    def une_verification(_):
+        debut = time.perf_counter()
+        hacheur.verifier("mot de passe de calibrage", hash_stocke)
+        return (time.perf_counter() - debut) * 1000
+
+    with ThreadPoolExecutor(max_workers=concurrence) as pool:
+        return list(pool.map(une_verification, range(nb_essais)))
+
+
+def percentile(valeurs: list[float], p: float) -> float:
+    """Percentile `p` (entre 0 et 1) par la méthode du rang le plus proche."""
+    ordonnees = sorted(valeurs)
+    rang = max(0, min(len(ordonnees) - 1, round(p * len(ordonnees)) - 1))
+    return ordonnees[rang]
+
+
+def calibrer(
+    algorithme: str, slo_ms: float, p: float, nb_essais: int, concurrence: int
+) -> tuple[object | None, list[tuple[object, float, float]]]:
+    """
+    Teste les coûts candidats et retourne le plus élevé respectant l'objectif.
+
+    Le parcours s'arrête au premier coût qui dépasse l'objectif (les suivants
+    sont plus coûteux).
+
+    Returns
+    -------
+    tuple
+        (hacheur retenu ou None, [(hacheur, médiane ms, percentile ms), ...])
+    """
+    retenu = None
+    resultats = []
+    for hacheur in _candidats(algorithme):
+        try:
+            latences = mesurer(hacheur, nb_essais, concurrence)
+        except (MemoryError, ValueError) as e:
+            print(f"{hacheur!r} : ignoré ({e})")
+            break
+        mediane, pxx = statistics.median(latences), percentile(latences, p)
+        resultats.append((hacheur, mediane, pxx))
+        print(f"{hacheur!r:<70} médiane={mediane:8.1f} ms  p{p * 100:g}={pxx:8.1f} ms")
+        if pxx > slo_ms:
+            break
+        retenu = hacheur
+    return retenu, resultats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--algorithme", default="scrypt", choices=["scrypt", "argon2id"])
+    parser.add_argument("--slo-ms", type=float, default=250.0, help="latence maximale visée")
+    parser.add_argument("--percentile", type=float, default=0.95)
+    parser.add_argument("--essais", type=int, default=20)
+    parser.add_argument(
+        "--concurrence", type=int, default=1, help="vérifications simultanées"
+    )
+    args = parser.parse_args(argv)
+
+    retenu, _ = calibrer(
+        args.algorithme, args.slo_ms, args.percentile, args.essais, args.concurrence
+    )
+    if retenu is None:
+        print(f"Aucun coût ne respecte l'objectif de {args.slo_ms:g} ms.")
+        return 1
+    print(f"\nCoût retenu : {retenu!r}")
+    if isinstance(retenu, HacheurScrypt):
+        print(f"À reporter dans le .env : MDP_ALGORITHME=scrypt, MDP_SCRYPT_LN={retenu.ln}")
+    else:
+        print(
+            "À reporter dans le .env : MDP_ALGORITHME=argon2id, "
+            f"MDP_ARGON2_TEMPS={retenu.cout_temps}, "
+            f"MDP_ARGON2_MEMOIRE_KIO={retenu.cout_memoire_kio}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+"""
+Latence de la connexion : ancien parcours contre `Auth_Service.connecter`.
+
+Ancien parcours (ConnexionVue avant regroupement) :
+    Auth_Service.se_connecter -> UtilisateurService.trouver_par_pseudo -> SessionDAO.ouvrir
+Nouveau parcours :
+    Auth_Service.connecter (lecture de l'utilisateur + une requête d'ouverture de session)
+
+Un compte temporaire est créé puis supprimé (ses sessions sont supprimées en cascade).
+Nécessite une base PostgreSQL configurée dans le .env.
+
+Usage :
+    python -m src.benchmarks.mesurer_connexion --essais 50 --scrypt-ln 4
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+
+from src.dao.session_dao import SessionDAO
+from src.dao.utilisateur_dao import UtilisateurDao
+from src.service.auth_service import Auth_Service
+from src.service.revocation_tokens import RevocationMemoire
+from src.service.utilisateur_service import UtilisateurService
+from src.utils.securite import HacheurScrypt, configurer_hacheur
+
+
+def _ancien_parcours(auth: Auth_Service, pseudo: str, mdp: str) -> None:
+    auth.se_connecter(pseudo, mdp)
+    utilisateur = UtilisateurService().trouver_par_pseudo(pseudo)
+    SessionDAO().ouvrir(utilisateur.id)
+
+
+def _nouveau_parcours(auth: Auth_Service, pseudo: str, mdp: str) -> None:
+    auth.connecter(pseudo, mdp)
+
+
+def mesurer(parcours, auth: Auth_Service, pseudo: str, mdp: str, nb_essais: int) -> list[float]:
+    """Latences (ms) de `nb_essais` connexions, après un appel de chauffe."""
+    parcours(auth, pseudo, mdp)
+    latences = []
+    for _ in range(nb_essais):
+        debut = time.perf_counter()
+        parcours(auth, pseudo, mdp)
+        latences.append((time.perf_counter() - debut) * 1000)
+    return latences
+
+
+def _resume(nom: str, latences: list[float]) -> str:
+    ordonnees = sorted(latences)
+    p95 = ordonnees[max(0, round(0.95 * len(ordonnees)) - 1)]
+    return f"{nom:<18} médiane={statistics.median(latences):8.2f} ms  p95={p95:8.2f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--essais", type=int, default=50)
+    parser.add_argument(
+        "--scrypt-ln",
+        type=int,
+        default=None,
+        help="coût scrypt du compte de test (petit pour isoler le coût base de données)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.scrypt_ln is not None:
+        configurer_hacheur(HacheurScrypt(ln=args.scrypt_ln))
+
+    pseudo, mdp = f"bench_{uuid.uuid4().hex[:12]}", "mot de passe de test"
+    utilisateur = UtilisateurService().creer_compte(pseudo, mdp)
+    if utilisateur is None:
+        print("Création du compte de test impossible.")
+        return 1
+    auth = Auth_Service(UtilisateurDao(), RevocationMemoire())
+    try:
+        for nom, parcours in (("ancien parcours", _ancien_parcours), ("connecter", _nouveau_parcours)):
+            print(_resume(nom, mesurer(parcours, auth, pseudo, mdp, args.essais)))
+    finally:
+        UtilisateurService().supprimer(utilisateur)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
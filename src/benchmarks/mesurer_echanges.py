@@ -0,0 +1,140 @@
+"""
+Mémoire et temps de construction des échanges lus en base.
+
+Reproduit la boucle de `ConversationDAO.lire_echanges` sur des lignes déjà
+chargées (sans base) : un objet par ligne, conservé dans une liste. Compare
+l'ancien `Echange` (``__dict__`` puis ``setattr`` des champs ``emetteur`` et
+``utilisateur_id``) à l'`Echange` actuel, à attributs déclarés
+(``__slots__``), et au lot en colonnes (`LotMessages`) utilisé pour les
+statistiques et les exports. Les chaînes et dates des lignes existent avant la mesure :
+seule la place des objets est comptée.
+
+Usage :
+    python -m src.benchmarks.mesurer_echanges --messages 1000000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from src.business_object.echange import Echange
+from src.business_object.lot_messages import LotMessages
+
+
+class _EchangeDict:
+    """Ancien Echange : attributs dans un ``__dict__``, champs ajoutés après coup."""
+
+    def __init__(self, message, agent="utilisateur", agent_name="", id_=None, date_msg=None):
+        self.id = id_
+        self.agent = agent
+        self.message = message
+        self.agent_name = agent_name
+        self.date_msg = date_msg if date_msg else datetime.now()
+
+
+def _construire_dict(lignes: list) -> list:
+    echanges = []
+    for id_, emetteur, contenu, cree_le, _, utilisateur_id, agent_name in lignes:
+        e = _EchangeDict(
+            id_=id_, agent=emetteur, message=contenu, date_msg=cree_le, agent_name=agent_name
+        )
+        setattr(e, "emetteur", emetteur)
+        setattr(e, "utilisateur_id", utilisateur_id)
+        echanges.append(e)
+    return echanges
+
+
+def _construire_slots(lignes: list) -> list:
+    echanges = []
+    for id_, emetteur, contenu, cree_le, _, utilisateur_id, agent_name in lignes:
+        echanges.append(
+            Echange(
+                id=id_,
+                agent=emetteur,
+                message=contenu,
+                date_msg=cree_le,
+                agent_name=agent_name,
+                emetteur=emetteur,
+                utilisateur_id=utilisateur_id,
+            )
+        )
+    return echanges
+
+
+def _construire_lot(lignes: list) -> LotMessages:
+    lot = LotMessages()
+    for id_, emetteur, contenu, _, horodatage_us, utilisateur_id, agent_name in lignes:
+        lot.ajouter(id_, 2, horodatage_us, emetteur, contenu, utilisateur_id, agent_name)
+    lot.texte(0)  # regroupe les contenus dans le texte commun
+    return lot
+
+
+def generer_lignes(nb: int) -> list[tuple]:
+    """
+    Lignes au format des requêtes de `lire_echanges` et `lire_lot_messages`
+    (date en datetime et en microsecondes), messages alternés.
+    """
+    debut = datetime(2025, 7, 21, 9, 0)
+    contenus = [f"Message de test numéro {i}, d'une longueur ordinaire." for i in range(100)]
+    return [
+        (
+            i,
+            "utilisateur" if i % 2 == 0 else "ia",
+            contenus[i % 100],
+            debut + timedelta(seconds=i),
+            1_753_081_200_000_000 + i * 1_000_000,
+            7 if i % 2 == 0 else None,
+            "alice" if i % 2 == 0 else "Assistant",
+        )
+        for i in range(nb)
+    ]
+
+
+def mesurer(construire, lignes: list) -> tuple[float, float]:
+    """
+    Returns
+    -------
+    tuple[float, float]
+        Octets alloués par message, puis durée de construction par message (ns).
+    """
+    gc.collect()
+    debut = time.perf_counter_ns()
+    echanges = construire(lignes)
+    duree_ns = time.perf_counter_ns() - debut
+    del echanges
+    gc.collect()
+
+    tracemalloc.start()
+    avant, _ = tracemalloc.get_traced_memory()
+    echanges = construire(lignes)
+    apres, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del echanges
+    return (apres - avant) / len(lignes), duree_ns / len(lignes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+    if args.messages <= 0:
+        parser.error("--messages doit être strictement positif")
+
+    lignes = generer_lignes(args.messages)
+    print(f"{args.messages} messages")
+    print(f"  {'représentation':<24} {'octets/message':>15} {'ns/message':>12} {'total':>10}")
+    for nom, construire in (
+        ("__dict__ + setattr", _construire_dict),
+        ("__slots__", _construire_slots),
+        ("colonnes (LotMessages)", _construire_lot),
+    ):
+        octets, ns = mesurer(construire, lignes)
+        total_mo = octets * args.messages / 1e6
+        print(f"  {nom:<24} {octets:15.0f} {ns:12.0f} {total_mo:8.0f} Mo")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
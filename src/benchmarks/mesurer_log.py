@@ -0,0 +1,78 @@
+"""
+Surcoût du décorateur @log sur des méthodes de UtilisateurService.
+
+Les appels mesurés n'atteignent pas la base (pseudo vide) : seul le coût du
+décorateur s'ajoute à celui de la méthode. Scénarios : méthode non décorée,
+niveau INFO désactivé, décorateur coupé, échantillonnage à 1 %, traces
+écrites (handler qui formate sans écrire sur disque).
+
+Usage :
+    python -m src.benchmarks.mesurer_log --appels 100000
+"""
+
+import argparse
+import logging
+import time
+
+from src.service.utilisateur_service import UtilisateurService
+from src.utils.log_decorator import configurer_log
+
+
+class _HandlerFormatant(logging.Handler):
+    """Formate chaque enregistrement comme un vrai handler, sans l'écrire."""
+
+    def emit(self, record):
+        self.format(record)
+
+
+def mesurer(appel, nb_appels: int) -> float:
+    """Durée moyenne d'un appel, en nanosecondes."""
+    appel()
+    debut = time.perf_counter_ns()
+    for _ in range(nb_appels):
+        appel()
+    return (time.perf_counter_ns() - debut) / nb_appels
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--appels", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    service = UtilisateurService()
+    methodes = {
+        "trouver_par_pseudo": lambda f: f(service, "   "),
+        "pseudo_deja_utilise": lambda f: f(service, ""),
+    }
+    racine = logging.getLogger()
+    handler = _HandlerFormatant()
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)-8s - %(message)s"))
+
+    scenarios = [
+        ("non décorée", logging.WARNING, True, 1.0, True),
+        ("INFO désactivé", logging.WARNING, True, 1.0, False),
+        ("décorateur coupé", logging.INFO, False, 1.0, False),
+        ("échantillonné 1 %", logging.INFO, True, 0.01, False),
+        ("traces écrites", logging.INFO, True, 1.0, False),
+    ]
+    ancien_niveau, anciens_handlers = racine.level, racine.handlers[:]
+    racine.handlers = [handler]
+    try:
+        for nom_methode, appeler in methodes.items():
+            decoree = getattr(UtilisateurService, nom_methode)
+            print(nom_methode)
+            for nom, niveau, actif, taux, brute in scenarios:
+                racine.setLevel(niveau)
+                configurer_log(actif=actif, taux_echantillonnage=taux)
+                f = decoree.__wrapped__ if brute else decoree
+                ns = mesurer(lambda f=f: appeler(f), args.appels)
+                print(f"  {nom:<20} {ns:10.0f} ns/appel")
+    finally:
+        racine.handlers = anciens_handlers
+        racine.setLevel(ancien_niveau)
+        configurer_log(actif=True, taux_echantillonnage=1.0)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
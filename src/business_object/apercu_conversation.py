@@ -0,0 +1,86 @@
+from src.business_object.conversation import Conversation
+from src.business_object.echange import Echange
+
+
+class ApercuConversation:
+    """
+    Classe représentant une conversation telle qu'affichée dans une liste
+
+    Attributs
+    ----------
+    conversation : Conversation
+        la conversation (sans ses échanges)
+    nb_messages : int
+        nombre de messages de la conversation
+    nb_participants : int
+        nombre de participants
+    dernier_message : Echange | None
+        dernier message, contenu tronqué (None si la conversation est vide)
+    """
+
+    __slots__ = ("conversation", "nb_messages", "nb_participants", "dernier_message")
+
+    def __init__(
+        self,
+        conversation: Conversation,
+        nb_messages: int = 0,
+        nb_participants: int = 0,
+        dernier_message: Echange | None = None,
+    ):
+        """
+        Constructeur de la classe ApercuConversation.
+
+        Parameters
+        ----------
+        conversation : Conversation
+            Conversation résumée.
+        nb_messages : int, optional
+            Nombre de messages.
+        nb_participants : int, optional
+            Nombre de participants.
+        dernier_message : Echange | None, optional
+            Dernier message (aperçu).
+        """
+        self.conversation = conversation
+        self.nb_messages = nb_messages
+        self.nb_participants = nb_participants
+        self.dernier_message = dernier_message
+
+    def afficher_apercu(self, longueur: int = 40) -> str:
+        """
+        Retourne une ligne résumant la conversation.
+
+        Parameters
+        ----------
+        longueur : int, optional
+            Nombre maximal de caractères de l'aperçu du dernier message.
+
+        Returns
+        -------
+        str
+            Chaîne de la forme :
+            `"[id] nom — 4 messages, 3 participants — alice : début du message…"`.
+        """
+        conv = self.conversation
+        texte = (
+            f"[{conv.id}] {conv.nom} — {self.nb_messages} message(s), "
+            f"{self.nb_participants} participant(s)"
+        )
+        if self.dernier_message is None:
+            return texte
+        apercu = " ".join((self.dernier_message.message or "").split())
+        if len(apercu) > longueur:
+            apercu = apercu[: longueur - 1].rstrip() + "…"
+        auteur = self.dernier_message.agent_name or self.dernier_message.agent
+        return f"{texte} — {auteur} : {apercu}"
+
+    def __str__(self):
+        """
+        Représentation textuelle par défaut de l'objet ApercuConversation.
+
+        Returns
+        -------
+        str
+            Résultat de : `self.afficher_apercu()`.
+        """
+        return self.afficher_apercu()
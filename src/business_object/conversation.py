@@ -21,6 +21,16 @@ class Conversation:
         liste des participants de la conversation
     """
 
+    __slots__ = (
+        "id",
+        "nom",
+        "proprietaire_id",
+        "date_creation",
+        "personnalisation",
+        "echanges",
+        "participants",
+    )
+
     def __init__(
         self,
         nom: str,
@@ -56,6 +66,22 @@ class Conversation:
         self.echanges = []
         self.participants = []
 
+    def en_dict(self) -> dict:
+        """
+        Retourne les attributs de la conversation, échanges compris (export JSON).
+
+        Returns
+        -------
+        dict
+            Un champ par attribut déclaré ; les échanges sont convertis avec
+            `Echange.en_dict`.
+        """
+        valeurs = {nom: getattr(self, nom) for nom in self.__slots__}
+        valeurs["echanges"] = [
+            e.en_dict() if hasattr(e, "en_dict") else e for e in self.echanges
+        ]
+        return valeurs
+
     def afficher_conv(self) -> str:
         """
         Retourne une représentation lisible et courte de la conversation.
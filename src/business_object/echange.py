@@ -5,6 +5,10 @@ class Echange:
     """
     Classe représentant un échange (message) dans une conversation
 
+    Les attributs sont déclarés (``__slots__``) : un échange n'a pas de
+    ``__dict__``, ce qui réduit sa taille en mémoire pour les longs fils et
+    les exports.
+
     Attributs
     ----------
     id : int
@@ -13,10 +17,18 @@ class Echange:
         identifiant ou type d'agent (ex: "utilisateur", "machine")
     message : str
         contenu du message
+    agent_name : str
+        nom affiché de l'émetteur
     date_msg : datetime
         date et heure de l'envoi du message
+    emetteur : str | None
+        émetteur en base ('utilisateur' ou 'ia'), si l'échange en vient ou y va
+    utilisateur_id : int | None
+        auteur du message en base (None pour l'IA)
     """
 
+    __slots__ = ("id", "agent", "message", "agent_name", "date_msg", "emetteur", "utilisateur_id")
+
     def __init__(
         self,
         message: str,
@@ -24,6 +36,8 @@ class Echange:
         agent_name: str = "",
         id: int = None,
         date_msg: datetime = None,
+        emetteur: str | None = None,
+        utilisateur_id: int | None = None,
     ):
         """
         Initialise un nouvel échange.
@@ -40,12 +54,38 @@ class Echange:
             Identifiant unique de l’échange.
         date_msg : datetime, optional
             Date et heure d’envoi.
+        emetteur : str | None, optional
+            Émetteur en base ('utilisateur' ou 'ia').
+        utilisateur_id : int | None, optional
+            Identifiant de l'auteur en base.
         """
         self.id = id
         self.agent = agent
         self.message = message
         self.agent_name = agent_name
         self.date_msg = date_msg if date_msg else datetime.now()
+        self.emetteur = emetteur
+        self.utilisateur_id = utilisateur_id
+
+    @property
+    def contenu(self) -> str:
+        """Contenu du message (nom de la colonne en base)."""
+        return self.message
+
+    @contenu.setter
+    def contenu(self, valeur: str):
+        self.message = valeur
+
+    def en_dict(self) -> dict:
+        """
+        Retourne les attributs de l'échange (export JSON).
+
+        Returns
+        -------
+        dict
+            Un champ par attribut déclaré.
+        """
+        return {nom: getattr(self, nom) for nom in self.__slots__}
 
     def afficher_echange(self) -> str:
         """
@@ -0,0 +1,283 @@
+import datetime
+import operator
+from array import array
+from collections import Counter
+from itertools import repeat
+
+from src.business_object.echange import Echange
+
+
+class LotMessages:
+    """
+    Lot de messages stocké par colonnes (statistiques, exports).
+
+    Au lieu d'un objet `Echange` par message, chaque champ est une colonne :
+    tableaux d'entiers 64 bits (``array``) pour les identifiants, les dates
+    (microsecondes depuis l'epoch, UTC) et les codes d'émetteur, et un seul
+    texte pour tous les contenus, découpé par des positions de début.
+    Les agrégats (`compter_par_emetteur`, `longueurs`...) parcourent les
+    colonnes sans construire d'objet par message ; un `Echange` n'est créé
+    qu'à l'accès (``lot[i]``, itération).
+
+    Attributs
+    ----------
+    ids : array
+        identifiants des messages
+    conversation_ids : array
+        conversation de chaque message
+    horodatages : array
+        dates d'envoi, en microsecondes depuis l'epoch (UTC)
+    emetteurs : array
+        codes d'émetteur (voir `EMETTEURS`)
+    utilisateur_ids : array
+        auteurs (`SANS_UTILISATEUR` pour l'IA)
+    debuts : array
+        position de chaque contenu dans le texte commun, plus la fin du dernier
+    pseudos : dict[int, str]
+        pseudo de chaque auteur (une entrée par utilisateur, pas par message)
+    fuseau : datetime.tzinfo
+        fuseau des dates rendues (`date`, `Echange.date_msg`)
+    """
+
+    # Code de l'émetteur -> valeur de la colonne messages.emetteur
+    EMETTEURS = ("utilisateur", "ia")
+    SANS_UTILISATEUR = 0
+
+    _CODES = {emetteur: code for code, emetteur in enumerate(EMETTEURS)}
+    _EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+    # Tous les décalages horaires sont des multiples d'un quart d'heure
+    _QUART_HEURE_US = 15 * 60 * 1_000_000
+
+    __slots__ = (
+        "ids",
+        "conversation_ids",
+        "horodatages",
+        "emetteurs",
+        "utilisateur_ids",
+        "debuts",
+        "pseudos",
+        "fuseau",
+        "_texte",
+        "_morceaux",
+    )
+
+    def __init__(self, fuseau: datetime.tzinfo = datetime.timezone.utc):
+        """
+        Crée un lot vide.
+
+        Parameters
+        ----------
+        fuseau : datetime.tzinfo, optional
+            Fuseau des dates rendues, by default UTC.
+        """
+        self.ids = array("q")
+        self.conversation_ids = array("q")
+        self.horodatages = array("q")
+        self.emetteurs = array("b")
+        self.utilisateur_ids = array("q")
+        self.debuts = array("q", [0])
+        self.pseudos: dict[int, str] = {}
+        self.fuseau = fuseau
+        self._texte = ""
+        self._morceaux: list[str] = []
+
+    @classmethod
+    def depuis_lignes(
+        cls, lignes, fuseau: datetime.tzinfo = datetime.timezone.utc
+    ) -> "LotMessages":
+        """
+        Construit un lot à partir de lignes de curseur, consommées une à une.
+
+        Parameters
+        ----------
+        lignes : Iterable[Mapping]
+            Lignes avec les clés ``id``, ``conversation_id``, ``horodatage_us``,
+            ``emetteur``, ``utilisateur_id``, ``contenu`` et ``utilisateur_pseudo``
+            (voir `ConversationDAO.lire_lot_messages`).
+        fuseau : datetime.tzinfo, optional
+            Fuseau des dates rendues, by default UTC.
+
+        Returns
+        -------
+        LotMessages
+        """
+        lot = cls(fuseau)
+        for r in lignes:
+            lot.ajouter(
+                r["id"],
+                r["conversation_id"],
+                r["horodatage_us"],
+                r["emetteur"],
+                r["contenu"],
+                r["utilisateur_id"],
+                r["utilisateur_pseudo"],
+            )
+        return lot
+
+    def ajouter(
+        self,
+        id: int,
+        conversation_id: int,
+        horodatage_us: int,
+        emetteur: str,
+        contenu: str,
+        utilisateur_id: int | None = None,
+        pseudo: str | None = None,
+    ) -> None:
+        """
+        Ajoute un message à la fin du lot.
+
+        Raises
+        ------
+        ValueError
+            Si l'émetteur est inconnu.
+        """
+        code = self._CODES.get(emetteur)
+        if code is None:
+            raise ValueError(f"emetteur invalide: {emetteur!r} (attendu {self.EMETTEURS})")
+        contenu = contenu or ""
+        self.ids.append(id)
+        self.conversation_ids.append(conversation_id)
+        self.horodatages.append(horodatage_us)
+        self.emetteurs.append(code)
+        self.utilisateur_ids.append(utilisateur_id or self.SANS_UTILISATEUR)
+        self.debuts.append(self.debuts[-1] + len(contenu))
+        self._morceaux.append(contenu)
+        if utilisateur_id is not None and pseudo:
+            self.pseudos[utilisateur_id] = pseudo
+
+    # --- Accès à un message ---
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _tampon(self) -> str:
+        if self._morceaux:
+            self._texte += "".join(self._morceaux)
+            self._morceaux = []
+        return self._texte
+
+    def texte(self, i: int) -> str:
+        """Contenu du message `i`."""
+        return self._tampon()[self.debuts[i] : self.debuts[i + 1]]
+
+    def date(self, i: int) -> datetime.datetime:
+        """Date d'envoi du message `i`, dans le fuseau du lot."""
+        return self._date(self.horodatages[i])
+
+    def _date(self, horodatage_us: int) -> datetime.datetime:
+        return (self._EPOCH + datetime.timedelta(microseconds=horodatage_us)).astimezone(
+            self.fuseau
+        )
+
+    def _agent_name(self, code: int, utilisateur_id: int) -> str:
+        if self.EMETTEURS[code] == "ia":
+            return "Assistant"
+        return self.pseudos.get(utilisateur_id) or "Utilisateur"
+
+    def __getitem__(self, i: int):
+        """
+        Message `i` sous forme d'`Echange` (créé à la demande).
+
+        Returns
+        -------
+        Echange
+        """
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("indice de message hors du lot")
+        emetteur = self.EMETTEURS[self.emetteurs[i]]
+        utilisateur_id = self.utilisateur_ids[i]
+        return Echange(
+            id=self.ids[i],
+            agent=emetteur,
+            message=self.texte(i),
+            date_msg=self.date(i),
+            agent_name=self._agent_name(self.emetteurs[i], utilisateur_id),
+            emetteur=emetteur,
+            utilisateur_id=utilisateur_id or None,
+        )
+
+    def __iter__(self):
+        """Parcourt les messages sous forme d'`Echange`, un à la fois."""
+        for i in range(len(self)):
+            yield self[i]
+
+    # --- Agrégats par colonnes ---
+
+    def longueurs(self) -> array:
+        """Longueur (en caractères) de chaque message."""
+        return array("q", map(operator.sub, self.debuts[1:], self.debuts[:-1]))
+
+    def longueur_moyenne(self) -> float:
+        """Longueur moyenne des messages (0.0 si le lot est vide)."""
+        return (self.debuts[-1] / len(self)) if len(self) else 0.0
+
+    def compter_par_emetteur(self) -> dict[str, int]:
+        """Nombre de messages par émetteur ('utilisateur', 'ia')."""
+        comptes = Counter(self.emetteurs)
+        return {emetteur: comptes[code] for code, emetteur in enumerate(self.EMETTEURS)}
+
+    def compter_par_conversation(self) -> Counter:
+        """Nombre de messages par identifiant de conversation."""
+        return Counter(self.conversation_ids)
+
+    def compter_par_jour(self) -> list[tuple[datetime.date, int]]:
+        """
+        Nombre de messages par jour (dans le fuseau du lot), par jour croissant.
+
+        Les dates sont d'abord regroupées par quart d'heure, puis seuls les
+        quarts d'heure distincts sont convertis en jour local.
+        """
+        quarts = Counter(
+            map(operator.floordiv, self.horodatages, repeat(self._QUART_HEURE_US))
+        )
+        par_jour: Counter = Counter()
+        for quart, nb in quarts.items():
+            par_jour[self._date(quart * self._QUART_HEURE_US).date()] += nb
+        return sorted(par_jour.items())
+
+    def periode(self) -> tuple[datetime.datetime, datetime.datetime] | None:
+        """Dates du premier et du dernier message (None si le lot est vide)."""
+        if not len(self):
+            return None
+        return self._date(min(self.horodatages)), self._date(max(self.horodatages))
+
+    # --- Exports ---
+
+    def en_dicts(self):
+        """
+        Parcourt les messages sous forme de dictionnaires (export JSON).
+
+        Yields
+        ------
+        dict
+            Mêmes champs que `Echange.en_dict`, sans créer d'`Echange`.
+        """
+        texte = self._tampon()
+        for i, (id_, horodatage, code, utilisateur_id) in enumerate(
+            zip(self.ids, self.horodatages, self.emetteurs, self.utilisateur_ids)
+        ):
+            emetteur = self.EMETTEURS[code]
+            yield {
+                "id": id_,
+                "agent": emetteur,
+                "message": texte[self.debuts[i] : self.debuts[i + 1]],
+                "agent_name": self._agent_name(code, utilisateur_id),
+                "date_msg": self._date(horodatage),
+                "emetteur": emetteur,
+                "utilisateur_id": utilisateur_id or None,
+            }
+
+    def lignes_texte(self):
+        """
+        Parcourt les messages sous la forme de `Echange.afficher_echange`.
+
+        Yields
+        ------
+        str
+            ``"[AAAA-MM-JJ HH:MM:SS] agent: message"``
+        """
+        for d in self.en_dicts():
+            yield f"[{d['date_msg']:%Y-%m-%d %H:%M:%S}] {d['agent_name']}: {d['message']}"
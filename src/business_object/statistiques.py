@@ -106,6 +106,22 @@ class Statistiques:
         self._sujet_counts.update(s.strip() for s in sujets if isinstance(s, str) and s.strip())
         self.sujets_plus_frequents = self._rebuild_top_sujets()
 
+    def ajouter_comptes_sujets(self, comptes: Iterable[tuple[str, int]]) -> None:
+        """
+        Ajoute des sujets déjà comptés (paires (sujet, nombre)) dans le
+        compteur interne et met à jour la liste des sujets les plus fréquents.
+
+        Parameters
+        ----------
+        comptes : Iterable[tuple[str, int]]
+            Paires (sujet, nombre d'occurrences), par exemple le résultat de
+            `ConversationDAO.sujets_plus_frequents`.
+        """
+        for sujet, nb in comptes:
+            if isinstance(sujet, str) and sujet.strip() and int(nb) > 0:
+                self._sujet_counts[sujet.strip()] += int(nb)
+        self.sujets_plus_frequents = self._rebuild_top_sujets()
+
     def top_sujets(self, k: int = 10) -> List[str]:
         """
         Retourne les k sujets les plus fréquents.
@@ -156,6 +172,28 @@ class Statistiques:
         self.sujets_plus_frequents = self._rebuild_top_sujets()
         return self
 
+    @classmethod
+    def agreger(cls, partielles: Iterable["Statistiques"]) -> "Statistiques":
+        """
+        Combine des statistiques partielles (par exemple calculées par
+        tranches d'utilisateurs dans des processus séparés) en un seul objet.
+
+        Parameters
+        ----------
+        partielles : Iterable[Statistiques]
+            Statistiques à combiner ; les valeurs None sont ignorées.
+
+        Returns
+        -------
+        Statistiques
+            Nouvel objet contenant la somme de toutes les statistiques.
+        """
+        total = cls()
+        for stats in partielles:
+            if stats is not None:
+                total.fusionner(stats)
+        return total
+
     # --------- Représentations ---------
 
     def afficher_stats(self) -> str:
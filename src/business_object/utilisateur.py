@@ -1,7 +1,6 @@
-import hmac
 from typing import Optional
 
-from src.utils.securite import hash_password
+from src.utils.securite import doit_rehacher, hacher_mot_de_passe, verifier_mot_de_passe
 
 
 class Utilisateur:
@@ -17,7 +16,7 @@ class Utilisateur:
     Parameters
     ----------
     pseudo : str
-        Nom d'utilisateur (utilisé également comme sel pour le hash du mot de passe).
+        Nom d'utilisateur (sert aussi de sel pour les anciens hashs SHA-256).
     password_hash : str | None, optional
         Hash du mot de passe stocké. Peut être None lors de la création
         initiale ou si le mot de passe doit être défini plus tard.
@@ -102,24 +101,24 @@ class Utilisateur:
         """
         Hash et enregistre un mot de passe.
 
-        Le mot de passe est hashé avec la fonction de sécurité utilisée
-        dans les services métier : `hash_password(mot_de_passe, self.pseudo)`,
-        afin de garantir une cohérence globale (sel basé sur le pseudo).
+        Le mot de passe est haché avec la KDF configurée
+        (`hacher_mot_de_passe`) : le hash encodé contient l'algorithme, les
+        paramètres de coût et un sel aléatoire.
 
         Parameters
         ----------
         mot_de_passe : str
             Mot de passe en clair.
         """
-        self.password_hash = hash_password(mot_de_passe, self.pseudo)
+        self.password_hash = hacher_mot_de_passe(mot_de_passe)
 
     def verifier_password(self, mot_de_passe: str) -> bool:
         """
         Vérifie si un mot de passe en clair correspond au hash enregistré.
 
-        Le mot de passe fourni est re-hashé avec le même sel (`self.pseudo`)
-        puis comparé au hash stocké en utilisant `hmac.compare_digest`, afin
-        d'éviter les attaques par timing.
+        Les hashs KDF sont vérifiés avec les paramètres qu'ils contiennent ; les
+        anciens hashs SHA-256 sont recalculés avec le pseudo comme sel. La
+        comparaison se fait en temps constant.
 
         Parameters
         ----------
@@ -133,8 +132,19 @@ class Utilisateur:
         """
         if self.password_hash is None:
             return False
-        expected = hash_password(mot_de_passe, self.pseudo)
-        return hmac.compare_digest(self.password_hash, expected)
+        return verifier_mot_de_passe(mot_de_passe, self.password_hash, self.pseudo)
+
+    def doit_rehacher_password(self) -> bool:
+        """
+        Indique si le hash enregistré doit être recalculé (ancien format SHA-256,
+        autre algorithme ou coût différent du coût courant).
+
+        Returns
+        -------
+        bool
+            True si le mot de passe doit être ré-haché à la prochaine connexion.
+        """
+        return self.password_hash is not None and doit_rehacher(self.password_hash)
 
     def ajouter_conversation(self, conversation) -> None:
         """
@@ -1,19 +1,67 @@
+import datetime
+import email.utils
 import json
 import logging
-import os
+import time
 from typing import List, Optional
 
 import requests
+from urllib3.exceptions import NewConnectionError
 
 from src.business_object.echange import Echange
+from src.client.metriques_llm import AppelLLM, MetriquesLLM
+from src.utils.config import obtenir_parametres
+from src.utils.traces import span
+
+# Réponses après lesquelles l'appel peut être retenté : la génération n'a pas
+# eu lieu (504 est exclu : le service peut encore être en train de générer)
+STATUTS_A_RETENTER = frozenset([429, 502, 503])
+
+
+def _connexion_impossible(erreur: requests.RequestException) -> bool:
+    """True si la requête n'a pas atteint le service (connexion refusée, DNS, délai)."""
+    if isinstance(erreur, requests.ConnectTimeout):
+        return True
+    if not isinstance(erreur, requests.ConnectionError) or not erreur.args:
+        return False
+    return isinstance(getattr(erreur.args[0], "reason", None), NewConnectionError)
+
+
+def _attente_demandee(resp) -> float | None:
+    """Attente demandée par l'en-tête Retry-After (secondes ou date HTTP), None si absente."""
+    valeur = resp.headers.get("Retry-After")
+    if not valeur:
+        return None
+    try:
+        return max(0.0, float(valeur))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(valeur)
+    except (TypeError, ValueError):
+        return None
+    maintenant = datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (date - maintenant).total_seconds())
 
 
 class LLM_API:
     """
     Client pour l'API LLM (Large Language Model).
     Permet de générer une réponse en envoyant l'historique de la conversation.
+
+    Par défaut, un appel n'est pas retenté (``LLM_RETENTATIVES=0``). Sinon,
+    seul un appel que le service n'a pas traité est renvoyé : connexion
+    impossible, ou statut de `STATUTS_A_RETENTER`. Un délai de lecture dépassé
+    ou un 504 ne sont jamais retentés (la génération a pu avoir lieu). L'attente
+    est doublée à chaque fois (``LLM_ATTENTE_S``, 0.5 s) ; sur un 429, elle
+    respecte l'en-tête Retry-After, et l'appel est abandonné si celui-ci dépasse
+    ``LLM_DELAI_S``.
+    Les mesures du dernier appel sont dans `dernier_appel` (voir `AppelLLM`).
     """
 
+    def __init__(self):
+        self.dernier_appel: AppelLLM | None = None
+
     def generate(
         self,
         history: List[Echange],
@@ -25,11 +73,9 @@ class LLM_API:
         """
         Envoie l'historique de conversation à l'API et renvoie la réponse du modèle.
         """
+        parametres = obtenir_parametres()
         # URL du service
-        base_url = os.getenv(
-            "ENSAI_GPT_BASE_URL", "https://ensai-gpt-109912438483.europe-west4.run.app"
-        )
-        endpoint = base_url.rstrip("/") + "/generate"
+        endpoint = parametres.llm_url.rstrip("/") + "/generate"
 
         logging.debug(f"[LLM_API] generate() endpoint={endpoint}")
 
@@ -58,12 +104,61 @@ class LLM_API:
         if stop:
             parameters["stop"] = list(stop)
 
-        logging.debug(f"[LLM_API] payload envoyé : {parameters}")
+        logging.debug("[LLM_API] payload envoyé : %s", parameters)
 
-        try:
-            resp = requests.post(endpoint, json=parameters, timeout=30)
-        except requests.RequestException as exc:
-            logging.exception("Erreur de connexion à l'API LLM: %s", exc)
+        # Taille du corps tel que requests l'encode (json.dumps par défaut, UTF-8)
+        octets_requete = len(json.dumps(parameters).encode("utf-8"))
+        nb_retentatives = parametres.llm_retentatives
+        attente_s = parametres.llm_attente_s
+
+        debut = time.perf_counter()
+        tentative = 0
+        while True:
+            resp, exc = None, None
+            try:
+                with span(
+                    "llm.generate", nb_messages=len(history), octets_requete=octets_requete
+                ) as s:
+                    resp = requests.post(
+                        endpoint, json=parameters, timeout=parametres.llm_delai_s
+                    )
+                    s.ajouter(statut_http=resp.status_code, tentative=tentative)
+            except requests.RequestException as erreur:
+                exc = erreur
+            if tentative >= nb_retentatives:
+                break
+            attente = attente_s * 2**tentative
+            if exc is not None:
+                a_retenter = _connexion_impossible(exc)
+            else:
+                a_retenter = resp.status_code in STATUTS_A_RETENTER
+                demandee = _attente_demandee(resp) if resp.status_code == 429 else None
+                if demandee is not None:
+                    a_retenter = demandee <= parametres.llm_delai_s
+                    attente = max(attente, demandee)
+            if not a_retenter:
+                break
+            logging.warning(
+                "[LLM_API] Tentative %s échouée (%s), nouvel essai dans %.1f s",
+                tentative + 1,
+                exc or f"HTTP {resp.status_code}",
+                attente,
+            )
+            time.sleep(attente)
+            tentative += 1
+
+        appel = AppelLLM(
+            latence_ms=0,
+            octets_requete=octets_requete,
+            nb_messages=len(history),
+            statut_http=resp.status_code if resp is not None else None,
+            nb_retentatives=tentative,
+        )
+        self.dernier_appel = appel
+
+        if exc is not None:
+            self._terminer_mesure(appel, debut)
+            logging.error("Erreur de connexion à l'API LLM: %s", exc)
             return Echange(
                 agent="assistant",
                 agent_name="Assistant",
@@ -71,6 +166,7 @@ class LLM_API:
             )
 
         if not resp.ok:
+            self._terminer_mesure(appel, debut)
             logging.error(f"[LLM_API] Réponse HTTP {resp.status_code} : {resp.text[:200]}")
             try:
                 j = resp.json()
@@ -90,6 +186,12 @@ class LLM_API:
             data = resp.text
             logging.debug(f"[LLM_API] Réponse texte brute reçue : {data}")
 
+        usage = data.get("usage") if isinstance(data, dict) else None
+        if isinstance(usage, dict):
+            appel.tokens_prompt = usage.get("prompt_tokens")
+            appel.tokens_reponse = usage.get("completion_tokens")
+        self._terminer_mesure(appel, debut)
+
         def extract_content(data):
             """Récupère le texte utile depuis les différents formats possibles de réponse."""
             # 1. Chaîne directe
@@ -125,3 +227,9 @@ class LLM_API:
         logging.info("[LLM_API] Réponse extraite avec succès depuis l'API")
 
         return Echange(agent="assistant", agent_name="Assistant", message=content)
+
+    @staticmethod
+    def _terminer_mesure(appel: AppelLLM, debut: float) -> None:
+        appel.latence_ms = int((time.perf_counter() - debut) * 1000)
+        MetriquesLLM().enregistrer(appel)
+        logging.debug("[LLM_API] %r", appel)
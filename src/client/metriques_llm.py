@@ -0,0 +1,212 @@
+"""
+Mesure des appels au LLM : durée, taille de la requête, jetons, statut HTTP.
+
+`LLM_API.generate` produit un `AppelLLM` par appel (disponible ensuite dans
+``LLM_API.dernier_appel``) et l'ajoute aux histogrammes de `MetriquesLLM`.
+`ConversationService.demander_assistant` l'enregistre aussi dans la table
+``appels_llm``, avec la conversation concernée (par lots, voir
+`JournalAppelsLLM`).
+
+Les métriques s'exportent au format texte Prometheus ; l'application les
+écrit à la fermeture dans ``LLM_METRIQUES_FICHIER`` si la variable est
+renseignée.
+"""
+
+import os
+import threading
+
+from src.utils.singleton import Singleton
+
+# Bornes des histogrammes
+BORNES_LATENCE_S = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+BORNES_OCTETS = (1_024, 4_096, 16_384, 65_536, 262_144, 1_048_576)
+
+_PREFIXE = "ensaigpt_llm"
+
+
+class AppelLLM:
+    """
+    Mesures d'un appel au LLM (tentatives comprises).
+
+    Attributes
+    ----------
+    latence_ms : int
+        Durée totale, attentes entre tentatives comprises.
+    octets_requete : int
+        Taille du corps JSON envoyé.
+    nb_messages : int
+        Longueur de l'historique envoyé.
+    statut_http : int | None
+        Statut de la dernière réponse (None si le service n'a pas répondu).
+    nb_retentatives : int
+        Tentatives après la première.
+    tokens_prompt, tokens_reponse : int | None
+        Jetons comptés par le service, s'il les renvoie (champ ``usage``).
+    """
+
+    __slots__ = (
+        "latence_ms",
+        "octets_requete",
+        "nb_messages",
+        "statut_http",
+        "nb_retentatives",
+        "tokens_prompt",
+        "tokens_reponse",
+    )
+
+    def __init__(
+        self,
+        latence_ms: int,
+        octets_requete: int,
+        nb_messages: int,
+        statut_http: int | None,
+        nb_retentatives: int = 0,
+        tokens_prompt: int | None = None,
+        tokens_reponse: int | None = None,
+    ):
+        self.latence_ms = latence_ms
+        self.octets_requete = octets_requete
+        self.nb_messages = nb_messages
+        self.statut_http = statut_http
+        self.nb_retentatives = nb_retentatives
+        self.tokens_prompt = tokens_prompt
+        self.tokens_reponse = tokens_reponse
+
+    @property
+    def succes(self) -> bool:
+        return self.statut_http is not None and 200 <= self.statut_http < 300
+
+    def __repr__(self):
+        return (
+            f"AppelLLM(latence_ms={self.latence_ms}, octets_requete={self.octets_requete}, "
+            f"nb_messages={self.nb_messages}, statut_http={self.statut_http}, "
+            f"nb_retentatives={self.nb_retentatives}, tokens_prompt={self.tokens_prompt}, "
+            f"tokens_reponse={self.tokens_reponse})"
+        )
+
+
+class _Histogramme:
+    __slots__ = ("bornes", "nb", "total", "compteurs")
+
+    def __init__(self, bornes: tuple):
+        self.bornes = bornes
+        self.nb = 0
+        self.total = 0.0
+        self.compteurs = [0] * (len(bornes) + 1)
+
+    def ajouter(self, valeur: float) -> None:
+        self.nb += 1
+        self.total += valeur
+        i = 0
+        while i < len(self.bornes) and valeur > self.bornes[i]:
+            i += 1
+        self.compteurs[i] += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Borne supérieure de l'intervalle contenant le quantile `q`."""
+        if not self.nb:
+            return None
+        rang, cumul = q * self.nb, 0
+        for borne, compteur in zip(self.bornes, self.compteurs):
+            cumul += compteur
+            if cumul >= rang:
+                return borne
+        return float("inf")
+
+    def prometheus(self, nom: str) -> list[str]:
+        lignes, cumul = [], 0
+        for borne, compteur in zip(self.bornes, self.compteurs):
+            cumul += compteur
+            lignes.append(f'{nom}_bucket{{le="{borne}"}} {cumul}')
+        lignes.append(f'{nom}_bucket{{le="+Inf"}} {self.nb}')
+        lignes.append(f"{nom}_sum {self.total:g}")
+        lignes.append(f"{nom}_count {self.nb}")
+        return lignes
+
+
+class MetriquesLLM(metaclass=Singleton):
+    """Cumul des appels au LLM du processus (partagé par les threads)."""
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self.vider()
+
+    def vider(self) -> None:
+        with self._verrou:
+            self._latence = _Histogramme(BORNES_LATENCE_S)
+            self._octets = _Histogramme(BORNES_OCTETS)
+            self._statuts: dict[str, int] = {}
+            self._nb_erreurs = 0
+            self._nb_retentatives = 0
+            self._tokens_prompt = 0
+            self._tokens_reponse = 0
+
+    def enregistrer(self, appel: AppelLLM) -> None:
+        statut = str(appel.statut_http) if appel.statut_http is not None else "sans_reponse"
+        with self._verrou:
+            self._latence.ajouter(appel.latence_ms / 1000)
+            self._octets.ajouter(appel.octets_requete)
+            self._statuts[statut] = self._statuts.get(statut, 0) + 1
+            self._nb_erreurs += not appel.succes
+            self._nb_retentatives += appel.nb_retentatives
+            self._tokens_prompt += appel.tokens_prompt or 0
+            self._tokens_reponse += appel.tokens_reponse or 0
+
+    def resume(self) -> dict:
+        """
+        Indicateurs cumulés.
+
+        Returns
+        -------
+        dict
+            ``nb_appels``, ``nb_erreurs``, ``taux_erreur``, ``nb_retentatives``,
+            ``statuts`` (appels par statut HTTP), ``latence_p50_s``,
+            ``latence_p95_s`` (bornes d'histogramme), ``octets_requete``,
+            ``tokens_prompt`` et ``tokens_reponse`` (totaux).
+        """
+        with self._verrou:
+            nb = self._latence.nb
+            return {
+                "nb_appels": nb,
+                "nb_erreurs": self._nb_erreurs,
+                "taux_erreur": self._nb_erreurs / nb if nb else 0.0,
+                "nb_retentatives": self._nb_retentatives,
+                "statuts": dict(self._statuts),
+                "latence_p50_s": self._latence.quantile(0.5),
+                "latence_p95_s": self._latence.quantile(0.95),
+                "octets_requete": int(self._octets.total),
+                "tokens_prompt": self._tokens_prompt,
+                "tokens_reponse": self._tokens_reponse,
+            }
+
+    def exporter_prometheus(self) -> str:
+        """Métriques au format texte d'exposition Prometheus."""
+        latence, octets = f"{_PREFIXE}_duree_secondes", f"{_PREFIXE}_requete_octets"
+        with self._verrou:
+            sortie = [
+                f"# HELP {latence} Durée des appels au LLM (tentatives comprises).",
+                f"# TYPE {latence} histogram",
+                *self._latence.prometheus(latence),
+                f"# HELP {octets} Taille du corps des requêtes envoyées au LLM.",
+                f"# TYPE {octets} histogram",
+                *self._octets.prometheus(octets),
+                f"# HELP {_PREFIXE}_appels_total Appels au LLM par statut HTTP.",
+                f"# TYPE {_PREFIXE}_appels_total counter",
+                *(
+                    f'{_PREFIXE}_appels_total{{statut="{statut}"}} {nb}'
+                    for statut, nb in sorted(self._statuts.items())
+                ),
+                f"# TYPE {_PREFIXE}_retentatives_total counter",
+                f"{_PREFIXE}_retentatives_total {self._nb_retentatives}",
+                f"# TYPE {_PREFIXE}_tokens_total counter",
+                f'{_PREFIXE}_tokens_total{{type="prompt"}} {self._tokens_prompt}',
+                f'{_PREFIXE}_tokens_total{{type="reponse"}} {self._tokens_reponse}',
+            ]
+        return "\n".join(sortie) + "\n"
+
+    def ecrire_prometheus(self, chemin: str) -> None:
+        """Écrit l'export Prometheus dans un fichier (remplacé d'un coup)."""
+        temporaire = f"{chemin}.tmp"
+        with open(temporaire, "w", encoding="utf-8") as f:
+            f.write(self.exporter_prometheus())
+        os.replace(temporaire, chemin)
@@ -1,16 +1,91 @@
 import datetime
 import logging
-import re
 from collections import Counter
 from typing import List
+from zoneinfo import ZoneInfo
 
+from psycopg2.extras import execute_values
+
+from src.business_object.apercu_conversation import ApercuConversation
 from src.business_object.conversation import Conversation
 from src.business_object.echange import Echange
+from src.business_object.lot_messages import LotMessages
 from src.dao.db_connection import DBConnection
 from src.dao.prompt_dao import PromptDAO
+from src.utils.config import obtenir_parametres
+from src.utils.extraction_sujets import compter_mots_par_cle, delta_sujets
+
+
+class ErreurAucuneConversation(Exception):
+    """Levée quand un utilisateur n'a aucune conversation."""
+
+    pass
 
 
 class ConversationDAO:
+    # Nombre de lignes lues à la fois lors du calcul des sujets
+    TAILLE_LOT_SUJETS = 5000
+
+    # Requêtes de lecture des textes pour le calcul des sujets :
+    # source -> {par_utilisateur: requête}
+    _REQUETES_TEXTES = {
+        "titres": {
+            True: """
+                SELECT cp.utilisateur_id AS cle, c.titre AS texte
+                FROM conversations c
+                JOIN conversations_participants cp ON cp.conversation_id = c.id
+                WHERE %(id_user)s::int IS NULL OR cp.utilisateur_id = %(id_user)s;
+            """,
+            False: """
+                SELECT NULL::int AS cle, titre AS texte
+                FROM conversations;
+            """,
+        },
+        "messages": {
+            True: """
+                SELECT utilisateur_id AS cle, contenu AS texte
+                FROM messages
+                WHERE emetteur = 'utilisateur'
+                  AND (%(id_user)s::int IS NULL OR utilisateur_id = %(id_user)s);
+            """,
+            False: """
+                SELECT NULL::int AS cle, contenu AS texte
+                FROM messages
+                WHERE emetteur = 'utilisateur';
+            """,
+        },
+    }
+
+    # Recherches par jour : `cree_le` est comparé à un intervalle [start, end[
+    # (voir `_bornes_jour`), ce qui permet d'utiliser l'index
+    # idx_messages_conv_cree (conversation_id, cree_le).
+    _SQL_RECHERCHE_DATE = """
+        SELECT DISTINCT c.id, c.titre, c.prompt_id, c.proprietaire_id, c.cree_le
+        FROM conversations c
+        JOIN conversations_participants cp
+        ON cp.conversation_id = c.id
+        JOIN messages m
+        ON m.conversation_id = c.id
+        WHERE cp.utilisateur_id = %(uid)s
+        AND m.cree_le >= %(start)s
+        AND m.cree_le <  %(end)s
+        ORDER BY c.cree_le DESC;
+    """
+
+    _SQL_RECHERCHE_MOT_ET_DATE = """
+        SELECT DISTINCT c.id, c.titre, c.prompt_id, c.proprietaire_id, c.cree_le
+        FROM conversations c
+        JOIN conversations_participants cp
+        ON cp.conversation_id = c.id
+        JOIN messages m
+        ON m.conversation_id = c.id
+        WHERE cp.utilisateur_id = %(uid)s
+        AND m.cree_le >= %(start)s
+        AND m.cree_le <  %(end)s
+        AND m.contenu ILIKE %(pattern)s
+        ORDER BY c.cree_le DESC;
+    """
+
     @staticmethod
     def creer_conversation(
         conversation: Conversation, proprietaire_id: int | None = None
@@ -98,6 +173,9 @@ class ConversationDAO:
                         """,
                         {"cid": conversation.id, "uid": proprietaire_id},
                     )
+                    ConversationDAO._appliquer_delta_sujets(
+                        cur, [proprietaire_id], delta_sujets(None, titre)
+                    )
 
         logging.info(
             "Conversation créée (id=%s, titre=%r, prompt_id=%r, proprietaire_id=%r)",
@@ -215,15 +293,36 @@ class ConversationDAO:
             raise Exception(f"l'id {id_conv} est invalide et doit être un entier naturel")
         with DBConnection().connection as conn:
             with conn.cursor() as cursor:
+                # On récupère l'ancien titre et les participants dans la même
+                # requête pour mettre à jour l'index des sujets.
                 cursor.execute(
                     """
-                    UPDATE conversations                          
-                    SET titre = %(nouveau_nom)s                   
-                    WHERE id = %(id_conv)s;
+                    UPDATE conversations c
+                    SET titre = %(nouveau_nom)s
+                    FROM (
+                        SELECT id, titre
+                        FROM conversations
+                        WHERE id = %(id_conv)s
+                        FOR UPDATE
+                    ) AS ancien
+                    WHERE c.id = ancien.id
+                    RETURNING ancien.titre AS ancien_titre,
+                              ARRAY(
+                                  SELECT cp.utilisateur_id
+                                  FROM conversations_participants cp
+                                  WHERE cp.conversation_id = c.id
+                              ) AS participants;
                     """,
                     {"nouveau_nom": nouveau_nom, "id_conv": id_conv},
                 )
                 count = cursor.rowcount
+                if count > 0:
+                    row = cursor.fetchone()
+                    ConversationDAO._appliquer_delta_sujets(
+                        cursor,
+                        row["participants"],
+                        delta_sujets(row["ancien_titre"], nouveau_nom),
+                    )
         if count > 0:
             logging.info("Titre conversation modifié avec succès (id=%s)", id_conv)
             return "titre modifié avec succès"
@@ -260,10 +359,21 @@ class ConversationDAO:
                     """
                 DELETE FROM conversations
                 WHERE id = %(id_conv)s
+                RETURNING titre,
+                          ARRAY(
+                              SELECT cp.utilisateur_id
+                              FROM conversations_participants cp
+                              WHERE cp.conversation_id = %(id_conv)s
+                          ) AS participants;
                 """,
                     {"id_conv": id_conv},
                 )
-            count = cursor.rowcount
+                count = cursor.rowcount
+                if count > 0:
+                    row = cursor.fetchone()
+                    ConversationDAO._appliquer_delta_sujets(
+                        cursor, row["participants"], delta_sujets(row["titre"], None)
+                    )
         if count > 0:
             logging.info("Conversation supprimée (id=%s)", id_conv)
             return f"la conversation d'id={id_conv} a bien été supprimée"
@@ -294,15 +404,15 @@ class ConversationDAO:
             id_user,
             n,
         )
+        # derniere_activite est tenue à jour par trigger à chaque message :
+        # l'index idx_participants_activite donne directement les n plus
+        # récentes, sans lire les messages.
         query = """
-
-            SELECT c.*, MAX(m.cree_le) AS dernier_message
-            FROM conversations c
-            JOIN conversations_participants uc ON c.id = uc.conversation_id
-            LEFT JOIN messages m ON c.id = m.conversation_id
-            WHERE uc.utilisateur_id = %(id_user)s
-            GROUP BY c.id
-            ORDER BY dernier_message DESC NULLS LAST
+            SELECT c.id, c.titre, c.prompt_id, c.proprietaire_id, c.cree_le
+            FROM conversations_participants cp
+            JOIN conversations c ON c.id = cp.conversation_id
+            WHERE cp.utilisateur_id = %(id_user)s
+            ORDER BY cp.derniere_activite DESC NULLS LAST
         """
 
         params = {"id_user": id_user}
@@ -330,6 +440,180 @@ class ConversationDAO:
             for row in rows
         ]
 
+    @staticmethod
+    def page_conversations(
+        id_user: int, limite: int = 20, decalage: int = 0, longueur_apercu: int = 120
+    ) -> tuple[list[ApercuConversation], int]:
+        """
+        Une page des conversations d'un utilisateur, avec leur dernier message,
+        leur nombre de messages et de participants, en une seule requête.
+
+        La page est d'abord choisie sur `conversations_participants` (index
+        idx_participants_activite) ; le nombre total vient d'une fonction de
+        fenêtre sur ce même parcours. Les jointures LATERAL ne sont ensuite
+        évaluées que pour les conversations de la page.
+
+        Parameters
+        ----------
+        id_user : int
+            Identifiant de l'utilisateur.
+        limite : int, optional
+            Nombre de conversations par page, by default 20.
+        decalage : int, optional
+            Nombre de conversations à sauter, by default 0.
+        longueur_apercu : int, optional
+            Nombre de caractères du dernier message renvoyés, by default 120.
+
+        Returns
+        -------
+        tuple[list[ApercuConversation], int]
+            Les aperçus, de la plus récemment active à la plus ancienne, et le
+            nombre total de conversations de l'utilisateur (0 si la page est
+            vide).
+        """
+        logging.debug(
+            "Page de conversations pour user_id=%s (limite=%s, decalage=%s)",
+            id_user,
+            limite,
+            decalage,
+        )
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    WITH page AS (
+                        SELECT cp.conversation_id,
+                               cp.derniere_activite,
+                               COUNT(*) OVER () AS nb_total
+                        FROM conversations_participants cp
+                        WHERE cp.utilisateur_id = %(id_user)s
+                        ORDER BY cp.derniere_activite DESC NULLS LAST, cp.conversation_id DESC
+                        LIMIT %(limite)s OFFSET %(decalage)s
+                    )
+                    SELECT c.id, c.titre, c.prompt_id, c.proprietaire_id, c.cree_le,
+                           page.nb_total,
+                           nm.nb_messages,
+                           np.nb_participants,
+                           dm.id AS dernier_id,
+                           dm.emetteur AS dernier_emetteur,
+                           dm.apercu AS dernier_apercu,
+                           dm.cree_le AS dernier_cree_le,
+                           dm.utilisateur_id AS dernier_utilisateur_id,
+                           u.pseudo AS dernier_pseudo
+                    FROM page
+                    JOIN conversations c ON c.id = page.conversation_id
+                    LEFT JOIN LATERAL (
+                        SELECT m.id, m.emetteur, m.cree_le, m.utilisateur_id,
+                               LEFT(m.contenu, %(longueur)s) AS apercu
+                        FROM messages m
+                        WHERE m.conversation_id = c.id
+                        ORDER BY m.cree_le DESC, m.id DESC
+                        LIMIT 1
+                    ) dm ON TRUE
+                    LEFT JOIN utilisateurs u ON u.id = dm.utilisateur_id
+                    CROSS JOIN LATERAL (
+                        SELECT COUNT(*) AS nb_messages
+                        FROM messages m
+                        WHERE m.conversation_id = c.id
+                    ) nm
+                    CROSS JOIN LATERAL (
+                        SELECT COUNT(*) AS nb_participants
+                        FROM conversations_participants p
+                        WHERE p.conversation_id = c.id
+                    ) np
+                    ORDER BY page.derniere_activite DESC NULLS LAST, c.id DESC;
+                    """,
+                    {
+                        "id_user": id_user,
+                        "limite": limite,
+                        "decalage": decalage,
+                        "longueur": longueur_apercu,
+                    },
+                )
+                rows = cursor.fetchall() or []
+
+        apercus = []
+        for row in rows:
+            dernier = None
+            if row["dernier_id"] is not None:
+                emetteur = row["dernier_emetteur"]
+                dernier = Echange(
+                    id=row["dernier_id"],
+                    agent=emetteur,
+                    message=row["dernier_apercu"],
+                    date_msg=row["dernier_cree_le"],
+                    agent_name=(
+                        "Assistant"
+                        if emetteur == "ia"
+                        else row["dernier_pseudo"] or "Utilisateur"
+                    ),
+                    emetteur=emetteur,
+                    utilisateur_id=row["dernier_utilisateur_id"],
+                )
+            apercus.append(
+                ApercuConversation(
+                    Conversation(
+                        id=row["id"],
+                        nom=row["titre"],
+                        personnalisation=row["prompt_id"],
+                        date_creation=row["cree_le"],
+                        proprietaire_id=row["proprietaire_id"],
+                    ),
+                    nb_messages=int(row["nb_messages"]),
+                    nb_participants=int(row["nb_participants"]),
+                    dernier_message=dernier,
+                )
+            )
+        nb_total = int(rows[0]["nb_total"]) if rows else 0
+        logging.info(
+            "Page de conversations pour user_id=%s (nb=%s, total=%s)",
+            id_user,
+            len(apercus),
+            nb_total,
+        )
+        return apercus, nb_total
+
+    @staticmethod
+    def recalculer_derniere_activite() -> int:
+        """
+        Recalcule `derniere_activite` des conversations et de leurs
+        participants à partir des messages.
+
+        À lancer une fois sur une base existante (mise à niveau) ; ensuite
+        les triggers sur `messages` et `conversations_participants` suffisent.
+
+        Returns
+        -------
+        int
+            Nombre de conversations mises à jour.
+        """
+        with DBConnection().connection as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE conversations c
+                    SET derniere_activite = m.derniere
+                    FROM (
+                        SELECT co.id, MAX(me.cree_le) AS derniere
+                        FROM conversations co
+                        LEFT JOIN messages me ON me.conversation_id = co.id
+                        GROUP BY co.id
+                    ) AS m
+                    WHERE c.id = m.id;
+                    """
+                )
+                nb = cur.rowcount
+                cur.execute(
+                    """
+                    UPDATE conversations_participants cp
+                    SET derniere_activite = c.derniere_activite
+                    FROM conversations c
+                    WHERE c.id = cp.conversation_id;
+                    """
+                )
+        logging.info("Dernière activité recalculée (%s conversation(s)).", nb)
+        return nb
+
     @staticmethod
     def rechercher_mot_clef(id_user: int, mot_clef: str) -> list[Conversation]:
         """
@@ -398,6 +682,42 @@ class ConversationDAO:
             for r in rows
         ]
 
+    @staticmethod
+    def _fuseau() -> ZoneInfo:
+        """Fuseau horaire des dates saisies (paramètre ``FUSEAU_HORAIRE``)."""
+        return ZoneInfo(obtenir_parametres().fuseau_horaire)
+
+    @staticmethod
+    def _bornes_jour(date) -> tuple[datetime.datetime, datetime.datetime]:
+        """
+        Bornes [début, fin[ de la journée de `date`, timezone-aware.
+
+        Les recherches par jour filtrent `cree_le` par intervalle plutôt
+        qu'avec DATE(cree_le) : l'index sur `cree_le` reste utilisable et,
+        si `messages` est partitionnée, seules les partitions du jour sont lues.
+
+        Le jour est pris dans le fuseau de `date` si c'est un datetime aware,
+        sinon dans celui de l'application (``FUSEAU_HORAIRE``, Europe/Paris
+        par défaut), et non dans celui de la session PostgreSQL. Les deux
+        bornes sont calculées séparément : un jour de changement d'heure dure
+        23 ou 25 heures.
+
+        Raises
+        ------
+        Exception
+            Si `date` n'est ni un datetime.date ni un datetime.datetime.
+        """
+        if not isinstance(date, datetime.date):
+            raise Exception(f"la date {date!r} n'est pas au format datetime/date")
+        fuseau = date.tzinfo if isinstance(date, datetime.datetime) else None
+        fuseau = fuseau or ConversationDAO._fuseau()
+        jour = datetime.date(date.year, date.month, date.day)
+        d0 = datetime.datetime.combine(jour, datetime.time(), tzinfo=fuseau)
+        d1 = datetime.datetime.combine(
+            jour + datetime.timedelta(days=1), datetime.time(), tzinfo=fuseau
+        )
+        return d0, d1
+
     @staticmethod
     def rechercher_date(id_user: int, date: datetime.date) -> list[Conversation]:
         """
@@ -425,32 +745,14 @@ class ConversationDAO:
             id_user,
             date,
         )
-        # Normalisation du paramètre "date" en début/fin de journée
-        if isinstance(date, datetime.date) and not isinstance(date, datetime.datetime):
-            d0 = datetime.datetime(date.year, date.month, date.day)
-        elif isinstance(date, datetime.datetime):
-            d0 = datetime.datetime(date.year, date.month, date.day)
-        else:
-            raise Exception(f"la date {date!r} n'est pas au format datetime/date")
-
-        d1 = d0 + datetime.timedelta(days=1)
-
-        sql = """
-            SELECT DISTINCT c.id, c.titre, c.prompt_id, c.proprietaire_id, c.cree_le
-            FROM conversations c
-            JOIN conversations_participants cp
-            ON cp.conversation_id = c.id
-            JOIN messages m
-            ON m.conversation_id = c.id
-            WHERE cp.utilisateur_id = %(uid)s
-            AND m.cree_le >= %(start)s
-            AND m.cree_le <  %(end)s
-            ORDER BY c.cree_le DESC;
-        """
+        d0, d1 = ConversationDAO._bornes_jour(date)
 
         with DBConnection().connection as conn:
             with conn.cursor() as cur:
-                cur.execute(sql, {"uid": id_user, "start": d0, "end": d1})
+                cur.execute(
+                    ConversationDAO._SQL_RECHERCHE_DATE,
+                    {"uid": id_user, "start": d0, "end": d1},
+                )
                 rows = cur.fetchall() or []
 
         logging.info(
@@ -500,27 +802,15 @@ class ConversationDAO:
             mot_cle,
             date,
         )
-        if not isinstance(date, datetime.date):
-            raise Exception(f"la date {date} n'est pas au format date")
+        d0, d1 = ConversationDAO._bornes_jour(date)
         if not isinstance(mot_cle, str) or not mot_cle.strip():
             return []
         pattern = f"%{mot_cle.strip()}%"
         with DBConnection().connection as conn:
             with conn.cursor() as cur:
                 cur.execute(
-                    """
-                    SELECT DISTINCT c.id, c.titre, c.prompt_id, c.proprietaire_id, c.cree_le
-                    FROM conversations c
-                    JOIN conversations_participants cp
-                    ON cp.conversation_id = c.id
-                    JOIN messages m
-                    ON m.conversation_id = c.id
-                    WHERE cp.utilisateur_id = %(uid)s
-                    AND DATE(m.cree_le) = %(d)s
-                    AND m.contenu ILIKE %(pattern)s
-                    ORDER BY c.cree_le DESC;
-                    """,
-                    {"uid": id_user, "d": date, "pattern": pattern},
+                    ConversationDAO._SQL_RECHERCHE_MOT_ET_DATE,
+                    {"uid": id_user, "start": d0, "end": d1, "pattern": pattern},
                 )
                 rows = cur.fetchall() or []
         logging.info(
@@ -618,30 +908,7 @@ class ConversationDAO:
                 rows = cur.fetchall() or []
 
         # --- Construction des objets Echange ---
-        echanges: List[Echange] = []
-        for r in rows:
-            emetteur = r["emetteur"]  # 'utilisateur' ou 'ia'
-            pseudo = r.get("utilisateur_pseudo")  # nom utilisateur ou None
-            # Nom pour affichage
-            if emetteur == "ia":
-                agent_name = "Assistant"
-            else:
-                agent_name = pseudo or "Utilisateur"
-
-            # Création de l'objet Echange enrichi
-            e = Echange(
-                id=r["id"],
-                agent=emetteur,  # conserve la valeur brute pour le LLM
-                message=r["contenu"],
-                date_msg=r["cree_le"],
-                agent_name=agent_name,  # <-- nom affiché
-            )
-
-            # Champs supplémentaires pour compatibilité
-            setattr(e, "emetteur", emetteur)
-            setattr(e, "utilisateur_id", r["utilisateur_id"])
-
-            echanges.append(e)
+        echanges: List[Echange] = [ConversationDAO._echange_depuis_ligne(r) for r in rows]
 
         # Si on a utilisé LIMIT/OFFSET → remettre dans l'ordre chronologique
         if limit is not None:
@@ -654,6 +921,152 @@ class ConversationDAO:
         )
         return echanges
 
+    @staticmethod
+    def _echange_depuis_ligne(r) -> Echange:
+        """Construit un `Echange` à partir d'une ligne de messages jointe à utilisateurs."""
+        emetteur = r["emetteur"]  # 'utilisateur' ou 'ia'
+        pseudo = r.get("utilisateur_pseudo")  # nom utilisateur ou None
+        # Nom pour affichage
+        if emetteur == "ia":
+            agent_name = "Assistant"
+        else:
+            agent_name = pseudo or "Utilisateur"
+
+        return Echange(
+            id=r["id"],
+            agent=emetteur,  # conserve la valeur brute pour le LLM
+            message=r["contenu"],
+            date_msg=r["cree_le"],
+            agent_name=agent_name,  # <-- nom affiché
+            emetteur=emetteur,
+            utilisateur_id=r["utilisateur_id"],
+        )
+
+    @staticmethod
+    def lire_echanges_apres(id_conv: int, dernier: Echange | None) -> List[Echange]:
+        """
+        Récupère les messages d'une conversation postérieurs à un message connu.
+
+        Sert à compléter un fil gardé en mémoire avec les messages écrits depuis
+        par d'autres participants : la lecture parcourt l'index
+        (conversation_id, cree_le) à partir du message connu, elle ne relit pas
+        l'historique.
+
+        Parameters
+        ----------
+        id_conv : int
+            Identifiant de la conversation.
+        dernier : Echange | None
+            Dernier message connu (avec `id` et `date_msg` issus de la base),
+            None si la conversation était vide.
+
+        Returns
+        -------
+        List[Echange]
+            Messages suivants, triés chronologiquement (souvent aucun).
+        """
+        if dernier is None:
+            return ConversationDAO.lire_echanges(id_conv, offset=0, limit=None)
+
+        with DBConnection().connection as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT
+                        m.id,
+                        m.emetteur,
+                        m.contenu,
+                        m.cree_le,
+                        m.utilisateur_id,
+                        u.pseudo AS utilisateur_pseudo
+                    FROM messages m
+                    LEFT JOIN utilisateurs u ON u.id = m.utilisateur_id
+                    WHERE m.conversation_id = %(id_conv)s
+                      AND (m.cree_le, m.id) > (%(cree_le)s, %(id)s)
+                    ORDER BY m.cree_le ASC, m.id ASC;
+                    """,
+                    {"id_conv": id_conv, "cree_le": dernier.date_msg, "id": dernier.id},
+                )
+                rows = cur.fetchall() or []
+
+        logging.debug(
+            "Messages après id=%s (conv_id=%s) : %s", dernier.id, id_conv, len(rows)
+        )
+        return [ConversationDAO._echange_depuis_ligne(r) for r in rows]
+
+    @staticmethod
+    def lire_lot_messages(id_conv: int | None = None) -> LotMessages:
+        """
+        Lit des messages sous forme de colonnes (statistiques, exports).
+
+        Les lignes sont lues par lots via un curseur serveur et versées
+        directement dans les colonnes du `LotMessages`, sans objet `Echange`
+        intermédiaire ; les dates arrivent déjà converties en microsecondes.
+
+        Parameters
+        ----------
+        id_conv : int | None, optional
+            Conversation à lire, by default None (tous les messages).
+
+        Returns
+        -------
+        LotMessages
+            Messages triés par conversation puis chronologiquement, dates
+            rendues dans le fuseau de l'application (``FUSEAU_HORAIRE``).
+        """
+        logging.debug("Lecture d'un lot de messages (conv_id=%r)", id_conv)
+        with DBConnection().connection as conn:
+            with conn.cursor(name="lot_messages") as cur:
+                cur.itersize = ConversationDAO.TAILLE_LOT_SUJETS
+                cur.execute(
+                    """
+                    SELECT
+                        m.id,
+                        m.conversation_id,
+                        (EXTRACT(EPOCH FROM m.cree_le) * 1000000)::bigint AS horodatage_us,
+                        m.emetteur,
+                        m.contenu,
+                        m.utilisateur_id,
+                        u.pseudo AS utilisateur_pseudo
+                    FROM messages m
+                    LEFT JOIN utilisateurs u ON u.id = m.utilisateur_id
+                    WHERE %(id_conv)s::int IS NULL OR m.conversation_id = %(id_conv)s
+                    ORDER BY m.conversation_id, m.cree_le, m.id;
+                    """,
+                    {"id_conv": id_conv},
+                )
+                lot = LotMessages.depuis_lignes(cur, fuseau=ConversationDAO._fuseau())
+        logging.info("Lot de messages lu (conv_id=%r, nb_messages=%s)", id_conv, len(lot))
+        return lot
+
+    @staticmethod
+    def _requete_recherche_echanges(
+        conversation_id: int, mot_clef: str | None, date
+    ) -> tuple[str, dict]:
+        """
+        Construit la requête de `rechercher_echange`.
+
+        Seuls les filtres renseignés sont ajoutés ; la date est un intervalle
+        [start, end[ sur `cree_le`, servi par idx_messages_conv_cree.
+
+        Returns
+        -------
+        tuple[str, dict]
+            Requête SQL et ses paramètres.
+        """
+        conditions = ["conversation_id = %(conversation_id)s"]
+        params = {"conversation_id": conversation_id}
+        if mot_clef:
+            conditions.append("contenu ILIKE %(mot_clef)s")
+            params["mot_clef"] = f"%{mot_clef}%"
+        if date is not None:
+            params["start"], params["end"] = ConversationDAO._bornes_jour(date)
+            conditions.append("cree_le >= %(start)s AND cree_le < %(end)s")
+        requete = (
+            "SELECT * FROM messages WHERE " + " AND ".join(conditions) + " ORDER BY cree_le, id;"
+        )
+        return requete, params
+
     def rechercher_echange(
         conversation_id: int, mot_clef: str, date: datetime.date
     ) -> list[Echange]:
@@ -665,14 +1078,14 @@ class ConversationDAO:
         conversation_id : int
             Identifiant de la conversation.
         mot_clef : str
-            Mot-clé recherché dans le contenu du message.
+            Mot-clé recherché dans le contenu du message (ignoré si vide).
         date : datetime.date
-            Date exacte des messages.
+            Date exacte des messages (ignorée si None).
 
         Returns
         -------
         list[Echange]
-            Liste des échanges trouvés.
+            Liste des échanges trouvés, par ordre chronologique.
 
         Raises
         ------
@@ -685,18 +1098,12 @@ class ConversationDAO:
             mot_clef,
             date,
         )
+        requete, params = ConversationDAO._requete_recherche_echanges(
+            conversation_id, mot_clef, date
+        )
         with DBConnection().connection as conn:
             with conn.cursor() as cursor:
-                cursor.execute(
-                    """
-                    SELECT *
-                    FROM messages
-                    WHERE conversation_id = %(conversation_id)s
-                    AND contenu ILIKE %(mot_clef)s
-                    AND DATE(cree_le) = DATE(%(date)s);
-                    """,
-                    {"conversation_id": conversation_id, "mot_clef": f"%{mot_clef}%", "date": date},
-                )
+                cursor.execute(requete, params)
                 res = cursor.fetchall()
 
             if not res:
@@ -784,11 +1191,18 @@ class ConversationDAO:
                 cursor.execute(
                     """
                     INSERT INTO conversations_participants (conversation_id, utilisateur_id)
-                    VALUES (%(conversation_id)s, %(id_user)s);
+                    VALUES (%(conversation_id)s, %(id_user)s)
+                    RETURNING (
+                        SELECT titre FROM conversations WHERE id = %(conversation_id)s
+                    ) AS titre;
                     """,
                     {"conversation_id": conversation_id, "id_user": id_user},
                 )
                 count = cursor.rowcount
+                if count > 0:
+                    ConversationDAO._appliquer_delta_sujets(
+                        cursor, [id_user], delta_sujets(None, cursor.fetchone()["titre"])
+                    )
 
             if count > 0:
                 logging.info(
@@ -860,11 +1274,18 @@ class ConversationDAO:
                     """
                     DELETE FROM conversations_participants
                     WHERE conversation_id = %(id_conv)s
-                    AND utilisateur_id = %(id_user)s;
+                    AND utilisateur_id = %(id_user)s
+                    RETURNING (
+                        SELECT titre FROM conversations WHERE id = %(id_conv)s
+                    ) AS titre;
                     """,
                     {"id_conv": conversation_id, "id_user": id_user},
                 )
                 count = cursor.rowcount
+                if count > 0:
+                    ConversationDAO._appliquer_delta_sujets(
+                        cursor, [id_user], delta_sujets(cursor.fetchone()["titre"], None)
+                    )
 
         if count > 0:
             logging.info(
@@ -905,13 +1326,7 @@ class ConversationDAO:
         Exception
             Si l'émetteur est invalide ou si un utilisateur_id est manquant.
         """
-        emetteur = (
-            getattr(echange, "emetteur", None)
-            or getattr(echange, "expediteur", None)
-            or getattr(echange, "agent", None)  # <- on ajoute ça pour prendre en compte une modif
-        )
-        contenu = getattr(echange, "contenu", None) or getattr(echange, "message", None)
-        utilisateur_id = getattr(echange, "utilisateur_id", None)
+        emetteur, contenu, utilisateur_id = ConversationDAO._champs_echange(echange)
 
         logging.debug(
             "Ajout échange (conv_id=%s, emetteur=%r, utilisateur_id=%r)",
@@ -920,15 +1335,6 @@ class ConversationDAO:
             utilisateur_id,
         )
 
-        if emetteur not in ("utilisateur", "ia"):
-            logging.error("emetteur invalide pour ajout échange : %r", emetteur)
-            raise Exception(f"emetteur invalide: {emetteur!r} (attendu 'utilisateur' ou 'ia')")
-
-        # Contrainte fonctionnelle cohérente avec le CHECK de la table
-        if emetteur == "utilisateur" and utilisateur_id is None:
-            logging.error("utilisateur_id manquant pour ajout échange (emetteur='utilisateur')")
-            raise Exception("utilisateur_id requis quand emetteur='utilisateur'")
-
         with DBConnection().connection as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
@@ -953,6 +1359,93 @@ class ConversationDAO:
         )
         return True
 
+    @staticmethod
+    def ajouter_echanges(id_conv: int, echanges: list[Echange]) -> int | None:
+        """
+        Ajoute plusieurs messages dans une conversation en une seule requête.
+
+        Chaque échange reçoit son `id` et sa date (`date_msg`) issus de la base.
+        La requête renvoie aussi l'identifiant du dernier message déjà présent,
+        lu par l'index (conversation_id, cree_le) sans compter les messages :
+        il permet de vérifier qu'un fil gardé en mémoire est à jour.
+
+        Parameters
+        ----------
+        id_conv : int
+            Identifiant de la conversation.
+        echanges : list[Echange]
+            Messages à insérer, dans l'ordre.
+
+        Returns
+        -------
+        int | None
+            Identifiant du dernier message de la conversation juste avant
+            l'insertion (None si elle était vide, ou si rien n'est inséré).
+
+        Raises
+        ------
+        Exception
+            Si un émetteur est invalide ou si un utilisateur_id est manquant.
+        """
+        lignes = [(id_conv, *ConversationDAO._champs_echange(e)) for e in echanges]
+        if not lignes:
+            return None
+        logging.debug("Ajout de %s échange(s) (conv_id=%s)", len(lignes), id_conv)
+
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                rows = execute_values(
+                    cursor,
+                    """
+                    INSERT INTO messages (conversation_id, emetteur, contenu, utilisateur_id)
+                    VALUES %s
+                    RETURNING id, cree_le,
+                              (SELECT m.id
+                               FROM messages m
+                               WHERE m.conversation_id = messages.conversation_id
+                               ORDER BY m.cree_le DESC, m.id DESC
+                               LIMIT 1) AS id_precedent;
+                    """,
+                    lignes,
+                    fetch=True,
+                )
+        for echange, row in zip(echanges, rows):
+            echange.id = row["id"]
+            echange.date_msg = row["cree_le"]
+        logging.info(
+            "%s échange(s) ajouté(s) (conv_id=%s, message_ids=%s)",
+            len(rows),
+            id_conv,
+            [r["id"] for r in rows],
+        )
+        # Les lignes insérées ne sont pas visibles de la sous-requête
+        return rows[0]["id_precedent"]
+
+    @staticmethod
+    def _champs_echange(echange: Echange) -> tuple[str, str, int | None]:
+        """
+        Extrait et valide (emetteur, contenu, utilisateur_id) d'un échange à persister.
+
+        Raises
+        ------
+        Exception
+            Si l'émetteur est invalide ou si un utilisateur_id est manquant.
+        """
+        emetteur = echange.emetteur or echange.agent
+        contenu = echange.message
+        utilisateur_id = echange.utilisateur_id
+
+        if emetteur not in ("utilisateur", "ia"):
+            logging.error("emetteur invalide pour ajout échange : %r", emetteur)
+            raise Exception(f"emetteur invalide: {emetteur!r} (attendu 'utilisateur' ou 'ia')")
+
+        # Contrainte fonctionnelle cohérente avec le CHECK de la table
+        if emetteur == "utilisateur" and utilisateur_id is None:
+            logging.error("utilisateur_id manquant pour ajout échange (emetteur='utilisateur')")
+            raise Exception("utilisateur_id requis quand emetteur='utilisateur'")
+
+        return emetteur, contenu, utilisateur_id
+
     @staticmethod
     def mettre_a_j_preprompt_id(conversation_id: int, prompt_id: int) -> bool:
         """
@@ -1023,8 +1516,17 @@ class ConversationDAO:
             Nombre total de conversations.
         """
         logging.debug("Comptage conversations pour user_id=%s", id_user)
-        liste_CONV = ConversationDAO.lister_conversations(id_user=id_user)
-        total = len(liste_CONV)
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT COUNT(*) AS nb
+                    FROM conversations_participants
+                    WHERE utilisateur_id = %(id_user)s;
+                    """,
+                    {"id_user": id_user},
+                )
+                total = int(cursor.fetchone()["nb"])
         logging.info(
             "Nombre total de conversations pour user_id=%s : %s",
             id_user,
@@ -1081,6 +1583,9 @@ class ConversationDAO:
         """
         Détermine les sujets les plus fréquents dans les titres des conversations d’un utilisateur.
 
+        Les comptes sont lus dans la table `sujets_utilisateurs`, tenue à jour à
+        chaque création, renommage ou suppression de conversation.
+
         Parameters
         ----------
         id_user : int
@@ -1095,7 +1600,7 @@ class ConversationDAO:
 
         Raises
         ------
-        Exception
+        ErreurAucuneConversation
             Si l'utilisateur n'a aucune conversation.
         """
         logging.debug(
@@ -1103,67 +1608,40 @@ class ConversationDAO:
             id_user,
             k,
         )
-        query = """
-            SELECT c.titre
-            FROM conversations c
-            JOIN conversations_participants uc ON c.id = uc.conversation_id
-            WHERE uc.utilisateur_id = %(id_user)s;
-            """
-
         with DBConnection().connection as conn:
             with conn.cursor() as cursor:
-                cursor.execute(query, {"id_user": id_user})
-                titres = [row["titre"] for row in cursor.fetchall()]
+                cursor.execute(
+                    """
+                    SELECT mot, nb
+                    FROM sujets_utilisateurs
+                    WHERE utilisateur_id = %(id_user)s
+                    ORDER BY nb DESC, mot ASC
+                    LIMIT %(k)s;
+                    """,
+                    {"id_user": id_user, "k": k},
+                )
+                rows = cursor.fetchall() or []
 
-        if not titres:
-            logging.warning(
-                "Aucune conversation trouvée pour sujets fréquents (user_id=%s)",
-                id_user,
-            )
-            raise Exception(f"Aucune conversation trouvée pour l'utilisateur {id_user}")
-
-        # Liste de mots à ignorer (articles, prépositions courantes, etc.)
-        stop_words = {
-            "le",
-            "la",
-            "les",
-            "de",
-            "des",
-            "du",
-            "un",
-            "une",
-            "et",
-            "en",
-            "à",
-            "a",
-            "au",
-            "aux",
-            "pour",
-            "par",
-            "avec",
-            "sur",
-            "dans",
-            "d",
-            "l",
-            "l'",
-            "au",
-            "aux",
-        }
-
-        mots = []
-        for titre in titres:
-            # Mettre en minuscules et retirer la ponctuation
-            titre_nettoye = re.sub(r"[^\w\s']", " ", titre.lower())
-            # Séparer en mots
-            for mot in titre_nettoye.split():
-                # Nettoyer les apostrophes
-                mot = re.sub(r"^l['’]", "", mot)
-                # Ajouter seulement si ce n'est pas un mot vide
-                if mot and mot not in stop_words:
-                    mots.append(mot)
+                if not rows:
+                    cursor.execute(
+                        """
+                        SELECT 1
+                        FROM conversations_participants
+                        WHERE utilisateur_id = %(id_user)s
+                        LIMIT 1;
+                        """,
+                        {"id_user": id_user},
+                    )
+                    if cursor.fetchone() is None:
+                        logging.warning(
+                            "Aucune conversation trouvée pour sujets fréquents (user_id=%s)",
+                            id_user,
+                        )
+                        raise ErreurAucuneConversation(
+                            f"Aucune conversation trouvée pour l'utilisateur {id_user}"
+                        )
 
-        compteur = Counter(mots)
-        sujets_frequents = compteur.most_common(k)
+        sujets_frequents = [(r["mot"], int(r["nb"])) for r in rows]
 
         logging.info(
             "Sujets les plus fréquents pour user_id=%s : %r",
@@ -1171,3 +1649,279 @@ class ConversationDAO:
             sujets_frequents,
         )
         return sujets_frequents
+
+    @staticmethod
+    def reconstruire_sujets(id_user: int | None = None) -> int:
+        """
+        Recalcule entièrement la table `sujets_utilisateurs` à partir des titres.
+
+        Utilisé après le peuplement de la base (les scripts SQL n'alimentent pas
+        l'index des sujets) ou pour corriger une éventuelle dérive.
+
+        Parameters
+        ----------
+        id_user : int | None, optional
+            Limite la reconstruction à un utilisateur, by default None (tous).
+
+        Returns
+        -------
+        int
+            Nombre de lignes (utilisateur, mot) écrites.
+        """
+        logging.debug("Reconstruction de l'index des sujets (user_id=%r)", id_user)
+        with DBConnection().connection as conn:
+            comptes = compter_mots_par_cle(
+                ConversationDAO._flux_textes(conn, "titres", id_user=id_user)
+            )
+            uids, mots, nbs = [], [], []
+            for uid, compteur in comptes.items():
+                for mot, nb in compteur.items():
+                    uids.append(uid)
+                    mots.append(mot)
+                    nbs.append(nb)
+
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    DELETE FROM sujets_utilisateurs
+                    WHERE %(id_user)s::int IS NULL OR utilisateur_id = %(id_user)s;
+                    """,
+                    {"id_user": id_user},
+                )
+                cursor.execute(
+                    """
+                    INSERT INTO sujets_utilisateurs (utilisateur_id, mot, nb)
+                    SELECT * FROM unnest(%(uids)s::int[], %(mots)s::text[], %(nbs)s::int[]);
+                    """,
+                    {"uids": uids, "mots": mots, "nbs": nbs},
+                )
+        logging.info("Index des sujets reconstruit (%s ligne(s))", len(mots))
+        return len(mots)
+
+    @staticmethod
+    def reconstruire_sujets_lot(cursor, apres_id: int, taille_lot: int) -> list[int]:
+        """
+        Recalcule `sujets_utilisateurs` pour un lot d'utilisateurs (remplissage).
+
+        Les utilisateurs du lot sont verrouillés (FOR NO KEY UPDATE) avant la
+        lecture des titres : une mise à jour incrémentale concurrente
+        (`_appliquer_delta_sujets`, qui les verrouille en FOR SHARE) attend la
+        fin du lot et s'applique sur les comptes recalculés, ou le lot attend
+        qu'elle soit validée et relit les titres à jour. Rejouer un lot donne
+        le même résultat.
+
+        Parameters
+        ----------
+        cursor
+            Curseur psycopg2 ouvert ; la transaction est validée par l'appelant.
+        apres_id : int
+            Le lot commence au premier utilisateur d'identifiant supérieur.
+        taille_lot : int
+            Nombre maximal d'utilisateurs traités.
+
+        Returns
+        -------
+        list[int]
+            Identifiants des utilisateurs traités, croissants (vide à la fin).
+        """
+        cursor.execute(
+            """
+            SELECT id FROM utilisateurs
+            WHERE id > %(apres_id)s
+            ORDER BY id
+            LIMIT %(taille_lot)s
+            FOR NO KEY UPDATE;
+            """,
+            {"apres_id": apres_id, "taille_lot": taille_lot},
+        )
+        ids = [r["id"] for r in cursor.fetchall()]
+        if not ids:
+            return []
+
+        cursor.execute(
+            """
+            SELECT cp.utilisateur_id AS cle, c.titre AS texte
+            FROM conversations c
+            JOIN conversations_participants cp ON cp.conversation_id = c.id
+            WHERE cp.utilisateur_id = ANY(%(ids)s::int[]);
+            """,
+            {"ids": ids},
+        )
+        comptes = compter_mots_par_cle((r["cle"], r["texte"]) for r in cursor.fetchall())
+        uids, mots, nbs = [], [], []
+        for uid, compteur in comptes.items():
+            for mot, nb in compteur.items():
+                uids.append(uid)
+                mots.append(mot)
+                nbs.append(nb)
+
+        cursor.execute(
+            "DELETE FROM sujets_utilisateurs WHERE utilisateur_id = ANY(%(ids)s::int[]);",
+            {"ids": ids},
+        )
+        cursor.execute(
+            """
+            INSERT INTO sujets_utilisateurs (utilisateur_id, mot, nb)
+            SELECT * FROM unnest(%(uids)s::int[], %(mots)s::text[], %(nbs)s::int[]);
+            """,
+            {"uids": uids, "mots": mots, "nbs": nbs},
+        )
+        logging.debug(
+            "Sujets recalculés pour %s utilisateur(s) (%s ligne(s))", len(ids), len(mots)
+        )
+        return ids
+
+    @staticmethod
+    def sujets_par_utilisateur(source: str = "titres", k: int = 10) -> dict[int, list[tuple[str, int]]]:
+        """
+        Calcule en un seul passage les sujets les plus fréquents de tous les utilisateurs.
+
+        Parameters
+        ----------
+        source : str, optional
+            "titres" (titres des conversations auxquelles l'utilisateur participe)
+            ou "messages" (messages envoyés par l'utilisateur), by default "titres".
+        k : int, optional
+            Nombre de sujets retournés par utilisateur, by default 10.
+
+        Returns
+        -------
+        dict[int, list[tuple[str, int]]]
+            Paires (mot, fréquence) pour chaque identifiant d'utilisateur.
+
+        Raises
+        ------
+        ValueError
+            Si la source est inconnue.
+        """
+        logging.debug("Sujets par utilisateur (source=%r, k=%s)", source, k)
+        with DBConnection().connection as conn:
+            comptes = compter_mots_par_cle(ConversationDAO._flux_textes(conn, source))
+        res = {uid: compteur.most_common(k) for uid, compteur in comptes.items()}
+        logging.info("Sujets calculés pour %s utilisateur(s) (source=%r)", len(res), source)
+        return res
+
+    @staticmethod
+    def sujets_globaux(source: str = "titres", k: int = 10) -> list[tuple[str, int]]:
+        """
+        Détermine les sujets les plus fréquents sur l'ensemble de la plateforme.
+
+        Chaque conversation (ou message) n'est comptée qu'une fois, quel que
+        soit son nombre de participants.
+
+        Parameters
+        ----------
+        source : str, optional
+            "titres" ou "messages", by default "titres".
+        k : int, optional
+            Nombre de sujets à retourner, by default 10.
+
+        Returns
+        -------
+        list[tuple[str, int]]
+            Liste des paires (mot, fréquence).
+
+        Raises
+        ------
+        ValueError
+            Si la source est inconnue.
+        """
+        logging.debug("Sujets globaux (source=%r, k=%s)", source, k)
+        with DBConnection().connection as conn:
+            comptes = compter_mots_par_cle(
+                ConversationDAO._flux_textes(conn, source, par_utilisateur=False)
+            )
+        sujets = comptes.get(None, Counter()).most_common(k)
+        logging.info("Sujets globaux (source=%r) : %r", source, sujets)
+        return sujets
+
+    @staticmethod
+    def _flux_textes(conn, source: str, id_user: int | None = None, par_utilisateur: bool = True):
+        """
+        Parcourt les textes à analyser sous forme de couples (utilisateur_id, texte).
+
+        Les lignes sont lues par lots via un curseur serveur (nommé), pour ne
+        pas charger tout le corpus en mémoire.
+
+        Parameters
+        ----------
+        conn
+            Connexion psycopg2 ouverte (dans une transaction).
+        source : str
+            "titres" ou "messages".
+        id_user : int | None, optional
+            Limite le parcours à un utilisateur, by default None.
+        par_utilisateur : bool, optional
+            Si False, la clé vaut toujours None et chaque texte n'est lu qu'une fois.
+
+        Yields
+        ------
+        tuple[int | None, str]
+            Couple (utilisateur_id, texte).
+
+        Raises
+        ------
+        ValueError
+            Si la source est inconnue.
+        """
+        if source not in ConversationDAO._REQUETES_TEXTES:
+            raise ValueError(f"source de sujets inconnue : {source!r} (attendu 'titres' ou 'messages')")
+        with conn.cursor(name="flux_textes_sujets") as cursor:
+            cursor.itersize = ConversationDAO.TAILLE_LOT_SUJETS
+            cursor.execute(
+                ConversationDAO._REQUETES_TEXTES[source][par_utilisateur], {"id_user": id_user}
+            )
+            for row in cursor:
+                yield row["cle"], row["texte"]
+
+    @staticmethod
+    def _appliquer_delta_sujets(cursor, utilisateur_ids: list[int], delta: dict[str, int]) -> None:
+        """
+        Applique une variation signée des comptes de mots-clés pour des utilisateurs.
+
+        S'exécute sur le curseur appelant, donc dans la même transaction que
+        la modification de la conversation. Les utilisateurs sont verrouillés
+        en FOR SHARE jusqu'à la fin de la transaction, pour ne pas se mêler à
+        un recalcul de leurs comptes (`reconstruire_sujets_lot`).
+
+        Parameters
+        ----------
+        cursor
+            Curseur psycopg2 ouvert.
+        utilisateur_ids : list[int]
+            Utilisateurs concernés (participants de la conversation).
+        delta : dict[str, int]
+            Variation par mot-clé (voir `delta_sujets`).
+        """
+        if not utilisateur_ids or not delta:
+            return
+        cursor.execute(
+            """
+            WITH u AS (
+                SELECT id FROM utilisateurs
+                WHERE id = ANY(%(uids)s::int[])
+                ORDER BY id
+                FOR SHARE
+            )
+            INSERT INTO sujets_utilisateurs (utilisateur_id, mot, nb)
+            SELECT u.id, s.mot, s.nb
+            FROM u
+            CROSS JOIN unnest(%(mots)s::text[], %(nbs)s::int[]) AS s(mot, nb)
+            ON CONFLICT (utilisateur_id, mot)
+            DO UPDATE SET nb = sujets_utilisateurs.nb + EXCLUDED.nb;
+            """,
+            {
+                "uids": list(utilisateur_ids),
+                "mots": list(delta.keys()),
+                "nbs": list(delta.values()),
+            },
+        )
+        if any(nb < 0 for nb in delta.values()):
+            cursor.execute(
+                """
+                DELETE FROM sujets_utilisateurs
+                WHERE utilisateur_id = ANY(%(uids)s::int[])
+                  AND nb <= 0;
+                """,
+                {"uids": list(utilisateur_ids)},
+            )
@@ -1,10 +1,10 @@
 import logging
-import os
 
-import dotenv
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
+from src.dao.metriques_sql import CurseurInstrumente
+from src.utils.config import obtenir_parametres
 from src.utils.singleton import Singleton
 
 
@@ -18,28 +18,42 @@ class DBConnection(metaclass=Singleton):
         """Ouverture de la connexion"""
         logging.debug("[DBConnection] Initialisation de la connexion BDD...")
 
-        dotenv.load_dotenv()
-
         try:
-            self.__connection = psycopg2.connect(
-                host=os.environ["POSTGRES_HOST"],
-                port=os.environ["POSTGRES_PORT"],
-                database=os.environ["POSTGRES_DATABASE"],
-                user=os.environ["POSTGRES_USER"],
-                password=os.environ["POSTGRES_PASSWORD"],
-                options=f"-c search_path={os.environ['POSTGRES_SCHEMA']}",
-                cursor_factory=RealDictCursor,
-            )
+            self.__connection = self.ouvrir_connexion()
+            parametres = obtenir_parametres()
             logging.info(
                 "[DBConnection] Connexion établie avec succès vers la base '%s' (schema=%s).",
-                os.environ.get("POSTGRES_DATABASE"),
-                os.environ.get("POSTGRES_SCHEMA"),
+                parametres.postgres_database,
+                parametres.postgres_schema,
             )
 
         except Exception as e:
             logging.error("[DBConnection] ERREUR de connexion à la base : %s", e)
             raise
 
+    @staticmethod
+    def ouvrir_connexion():
+        """
+        Ouvre une nouvelle connexion, distincte de la connexion partagée.
+
+        Destinée aux tâches de fond (threads) : la connexion partagée porte
+        les transactions du fil principal, qu'un autre thread ne doit pas
+        valider à sa place. L'appelant est responsable de la fermeture.
+
+        Les requêtes sont mesurées (voir `src.dao.metriques_sql`), sauf si
+        ``SQL_INSTRUMENTATION`` vaut 0.
+        """
+        parametres = obtenir_parametres()
+        return psycopg2.connect(
+            host=parametres.postgres_host,
+            port=parametres.postgres_port,
+            database=parametres.postgres_database,
+            user=parametres.postgres_user,
+            password=parametres.postgres_password,
+            options=f"-c search_path={parametres.postgres_schema}",
+            cursor_factory=CurseurInstrumente if parametres.sql_instrumentation else RealDictCursor,
+        )
+
     @property
     def connection(self):
         return self.__connection
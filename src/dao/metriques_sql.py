@@ -0,0 +1,339 @@
+"""
+Mesure des requêtes SQL : durée, nombre de lignes, requêtes lentes.
+
+Les connexions de `DBConnection` utilisent `CurseurInstrumente`, qui chronomètre
+chaque `execute` et alimente, par requête normalisée (paramètres et
+littéraux remplacés par ``?``), un histogramme des durées. Au-delà du seuil
+``SQL_SEUIL_LENT_MS``, la requête est journalisée avec son plan (EXPLAIN, une
+fois par requête normalisée). Dans une trace (`src.utils.traces`), chaque
+requête devient aussi un span enfant ``sql``.
+
+Les métriques s'exportent au format texte Prometheus ; l'application les
+écrit à la fermeture dans ``SQL_METRIQUES_FICHIER`` si la variable est
+renseignée.
+
+Usage :
+    python -m src.dao.metriques_sql logs/metriques_sql.prom
+"""
+
+import argparse
+import functools
+import logging
+import os
+import re
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2.extras import RealDictCursor
+
+from src.utils.config import obtenir_parametres
+from src.utils.singleton import Singleton
+from src.utils.traces import enregistrer_span
+
+# Bornes des histogrammes, en secondes
+BORNES_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Nombre maximal de requêtes distinctes suivies (les suivantes sont regroupées)
+NB_MAX_REQUETES = 500
+_AUTRES = "(autres requêtes)"
+
+# Longueur maximale d'une requête normalisée dans les métriques
+LONGUEUR_MAX = 300
+
+_PREFIXE = "ensaigpt_sql"
+
+_COMMENTAIRE = re.compile(r"--[^\n]*")
+_CHAINE = re.compile(r"'(?:[^']|'')*'")
+_PARAMETRE = re.compile(r"%\(\w+\)s|%s")
+_NOMBRE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_ESPACES = re.compile(r"\s+")
+_N_UPLETS = re.compile(r"(\((?:\?, )*\?\))(?:, \((?:\?, )*\?\))+")
+_EXPLICABLE = re.compile(r"^(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+
+def normaliser_requete(requete: str) -> str:
+    """
+    Forme normalisée d'une requête : sans commentaires ni valeurs, espaces
+    réduits, listes de n-uplets ``VALUES`` ramenées à une seule.
+
+    Examples
+    --------
+    >>> normaliser_requete("SELECT * FROM t WHERE id = %(id)s AND nom = 'a'")
+    'SELECT * FROM t WHERE id = ? AND nom = ?'
+    """
+    texte = _COMMENTAIRE.sub(" ", requete)
+    texte = _CHAINE.sub("?", texte)
+    texte = _PARAMETRE.sub("?", texte)
+    texte = _NOMBRE.sub("?", texte)
+    texte = _ESPACES.sub(" ", texte).strip().rstrip(";").strip()
+    texte = _N_UPLETS.sub(r"\1, ...", texte)
+    return texte[:LONGUEUR_MAX]
+
+
+# Requêtes passées en texte avec leurs paramètres à part : en petit nombre,
+# elles se répètent. Une requête composée ou en octets (execute_values) a ses
+# valeurs en ligne et ne se répète pas : elle est normalisée sans cache.
+_normaliser_modele = functools.lru_cache(maxsize=2048)(normaliser_requete)
+
+
+class _Histogramme:
+    __slots__ = ("nb", "total_s", "max_s", "nb_lignes", "compteurs")
+
+    def __init__(self):
+        self.nb = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.nb_lignes = 0
+        self.compteurs = [0] * (len(BORNES_S) + 1)
+
+    def ajouter(self, duree_s: float, nb_lignes: int) -> None:
+        self.nb += 1
+        self.total_s += duree_s
+        self.max_s = max(self.max_s, duree_s)
+        if nb_lignes > 0:
+            self.nb_lignes += nb_lignes
+        i = 0
+        while i < len(BORNES_S) and duree_s > BORNES_S[i]:
+            i += 1
+        self.compteurs[i] += 1
+
+
+class MetriquesSQL(metaclass=Singleton):
+    """Histogrammes des durées par requête normalisée (partagés par les threads)."""
+
+    def __init__(self):
+        self._requetes: dict[str, _Histogramme] = {}
+        self._verrou = threading.Lock()
+        self._plans_journalises: set[str] = set()
+        self.seuil_lent_ms = obtenir_parametres().sql_seuil_lent_ms
+
+    def enregistrer(self, requete: str, duree_s: float, nb_lignes: int = -1) -> None:
+        """
+        Ajoute une exécution.
+
+        Parameters
+        ----------
+        requete : str
+            Requête normalisée.
+        duree_s : float
+            Durée d'exécution, en secondes.
+        nb_lignes : int, optional
+            Lignes lues ou modifiées (-1 si inconnu).
+        """
+        with self._verrou:
+            histogramme = self._requetes.get(requete)
+            if histogramme is None:
+                if len(self._requetes) >= NB_MAX_REQUETES:
+                    requete = _AUTRES
+                histogramme = self._requetes.setdefault(requete, _Histogramme())
+            histogramme.ajouter(duree_s, nb_lignes)
+
+    def premier_plan(self, requete: str) -> bool:
+        """True la première fois qu'une requête lente est signalée (plan à journaliser)."""
+        with self._verrou:
+            if requete in self._plans_journalises:
+                return False
+            self._plans_journalises.add(requete)
+            return True
+
+    def vider(self) -> None:
+        with self._verrou:
+            self._requetes.clear()
+            self._plans_journalises.clear()
+
+    def resume(self) -> list[dict]:
+        """
+        Une ligne par requête, de la plus coûteuse (temps cumulé) à la moins coûteuse.
+
+        Returns
+        -------
+        list[dict]
+            ``requete``, ``nb``, ``total_ms``, ``moyenne_ms``, ``max_ms`` et
+            ``nb_lignes``.
+        """
+        with self._verrou:
+            lignes = [
+                {
+                    "requete": requete,
+                    "nb": h.nb,
+                    "total_ms": h.total_s * 1000,
+                    "moyenne_ms": h.total_s * 1000 / h.nb,
+                    "max_ms": h.max_s * 1000,
+                    "nb_lignes": h.nb_lignes,
+                }
+                for requete, h in self._requetes.items()
+            ]
+        return sorted(lignes, key=lambda ligne: ligne["total_ms"], reverse=True)
+
+    def exporter_prometheus(self) -> str:
+        """Métriques au format texte d'exposition Prometheus."""
+        nom = f"{_PREFIXE}_duree_secondes"
+        sortie = [
+            f"# HELP {nom} Durée d'exécution des requêtes SQL.",
+            f"# TYPE {nom} histogram",
+        ]
+        lignes_lues = [
+            f"# HELP {_PREFIXE}_lignes_total Lignes lues ou modifiées par les requêtes SQL.",
+            f"# TYPE {_PREFIXE}_lignes_total counter",
+        ]
+        with self._verrou:
+            for requete, h in sorted(self._requetes.items()):
+                etiquette = f'requete="{_echapper(requete)}"'
+                cumul = 0
+                for borne, compteur in zip(BORNES_S, h.compteurs):
+                    cumul += compteur
+                    sortie.append(f'{nom}_bucket{{{etiquette},le="{borne}"}} {cumul}')
+                sortie.append(f'{nom}_bucket{{{etiquette},le="+Inf"}} {h.nb}')
+                sortie.append(f"{nom}_sum{{{etiquette}}} {h.total_s:.6f}")
+                sortie.append(f"{nom}_count{{{etiquette}}} {h.nb}")
+                lignes_lues.append(f"{_PREFIXE}_lignes_total{{{etiquette}}} {h.nb_lignes}")
+        return "\n".join(sortie + lignes_lues) + "\n"
+
+    def ecrire_prometheus(self, chemin: str) -> None:
+        """Écrit l'export Prometheus dans un fichier (remplacé d'un coup)."""
+        temporaire = f"{chemin}.tmp"
+        with open(temporaire, "w", encoding="utf-8") as f:
+            f.write(self.exporter_prometheus())
+        os.replace(temporaire, chemin)
+
+
+def _echapper(valeur: str) -> str:
+    return valeur.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class CurseurInstrumente(RealDictCursor):
+    """
+    Curseur (lignes en dict) qui mesure chacune de ses requêtes.
+
+    Le plan d'une requête lente est obtenu par un EXPLAIN sur un curseur
+    distinct, dans un point de sauvegarde : un échec de l'EXPLAIN n'affecte
+    ni la transaction en cours ni les résultats de ce curseur. Une requête
+    en échec est mesurée, mais sans plan : sa transaction est interrompue et
+    l'exception de l'appelant doit remonter telle quelle.
+    """
+
+    def execute(self, query, vars=None):
+        debut = time.perf_counter()
+        try:
+            resultat = super().execute(query, vars)
+        except BaseException:
+            self._mesurer(query, vars, time.perf_counter() - debut, reussie=False)
+            raise
+        self._mesurer(query, vars, time.perf_counter() - debut)
+        return resultat
+
+    def executemany(self, query, vars_list):
+        debut = time.perf_counter()
+        try:
+            resultat = super().executemany(query, vars_list)
+        except BaseException:
+            self._mesurer(query, None, time.perf_counter() - debut, reussie=False)
+            raise
+        self._mesurer(query, None, time.perf_counter() - debut)
+        return resultat
+
+    def _mesurer(self, query, vars, duree_s: float, reussie: bool = True) -> None:
+        if isinstance(query, str):
+            texte, requete = query, _normaliser_modele(query)
+        else:
+            texte = _texte(query, self)
+            requete = normaliser_requete(texte)
+        metriques = MetriquesSQL()
+        metriques.enregistrer(requete, duree_s, self.rowcount)
+        enregistrer_span("sql", duree_s, requete=requete, nb_lignes=self.rowcount)
+        if duree_s * 1000 < metriques.seuil_lent_ms:
+            return
+        plan = None
+        if reussie and _EXPLICABLE.match(requete) and metriques.premier_plan(requete):
+            plan = self._plan(texte, vars)
+        logging.warning(
+            "[SQL] Requête lente%s (%.1f ms, %s ligne(s)) : %s%s",
+            "" if reussie else " en échec",
+            duree_s * 1000,
+            self.rowcount,
+            requete,
+            f"\n{plan}" if plan else "",
+        )
+
+    def _plan(self, texte: str, vars) -> str | None:
+        connexion = self.connection
+        if (
+            connexion.closed
+            or connexion.get_transaction_status()
+            != psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+        ):
+            return None
+        with connexion.cursor(cursor_factory=psycopg2.extensions.cursor) as cur:
+            try:
+                cur.execute("SAVEPOINT plan_requete_lente;")
+            except psycopg2.Error:
+                return None
+            try:
+                cur.execute("EXPLAIN " + texte, vars)
+                plan = "\n".join(ligne[0] for ligne in cur.fetchall())
+            except psycopg2.Error:
+                cur.execute("ROLLBACK TO SAVEPOINT plan_requete_lente;")
+                return None
+            cur.execute("RELEASE SAVEPOINT plan_requete_lente;")
+            return plan
+
+
+def _texte(query, curseur) -> str:
+    """Texte d'une requête composée (psycopg2.sql) ou en octets."""
+    if isinstance(query, bytes):
+        return query.decode()
+    return query.as_string(curseur)
+
+
+_LIGNE_PROMETHEUS = re.compile(r'^(\w+)\{requete="((?:[^"\\]|\\.)*)"(?:,le="[^"]*")?\} (\S+)$')
+
+
+def lire_prometheus(texte: str) -> list[dict]:
+    """
+    Relit un export de `MetriquesSQL.exporter_prometheus`.
+
+    Returns
+    -------
+    list[dict]
+        Même forme que `MetriquesSQL.resume` (sans ``max_ms``).
+    """
+    requetes: dict[str, dict] = {}
+    for ligne in texte.splitlines():
+        correspondance = _LIGNE_PROMETHEUS.match(ligne)
+        if not correspondance:
+            continue
+        nom, requete, valeur = correspondance.groups()
+        requete = requete.replace("\\n", "\n").replace('\\"', '"').replace("\\\\", "\\")
+        entree = requetes.setdefault(requete, {"requete": requete, "nb": 0, "total_ms": 0.0})
+        if nom.endswith("_sum"):
+            entree["total_ms"] = float(valeur) * 1000
+        elif nom.endswith("_count"):
+            entree["nb"] = int(valeur)
+        elif nom.endswith("_lignes_total"):
+            entree["nb_lignes"] = int(valeur)
+    for entree in requetes.values():
+        entree["moyenne_ms"] = entree["total_ms"] / entree["nb"] if entree["nb"] else 0.0
+    return sorted(requetes.values(), key=lambda e: e["total_ms"], reverse=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Résumé des métriques SQL exportées")
+    parser.add_argument("fichier", help="export Prometheus (SQL_METRIQUES_FICHIER)")
+    parser.add_argument("--nb", type=int, default=20, help="nombre de requêtes affichées")
+    args = parser.parse_args(argv)
+
+    with open(args.fichier, encoding="utf-8") as f:
+        resume = lire_prometheus(f.read())
+    print(f"{'nb':>8} {'total ms':>10} {'moy. ms':>9} {'lignes':>9}  requête")
+    for e in resume[: args.nb]:
+        print(
+            f"{e['nb']:>8} {e['total_ms']:>10.1f} {e['moyenne_ms']:>9.2f} "
+            f"{e.get('nb_lignes', 0):>9}  {e['requete']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,9 @@
 import logging
+import threading
+import time
 
 from src.dao.db_connection import DBConnection
+from src.utils.config import obtenir_parametres
 
 
 class PromptDAO:
@@ -23,8 +26,99 @@ class PromptDAO:
     - ``id`` (int)
     - ``nom`` (str)
     - ``contenu`` (str) — peut avoir d'autres variantes selon la structure interne
+
+    Cache
+    -----
+    La table ``prompts`` est petite et change rarement : elle est chargée
+    en une seule requête dans un cache de classe, puis toutes les lectures
+    sont servies depuis la mémoire. Le cache est invalidé :
+
+    - par notification PostgreSQL (trigger ``NOTIFY prompts_modifies`` sur la
+      table, écouté par ``LISTEN`` sur la connexion de l'application) ;
+    - explicitement via ``invalider_cache()`` ;
+    - par sécurité, au bout de ``DUREE_CACHE_S`` secondes.
     """
 
+    # Canal de notification émis par le trigger de la table prompts
+    CANAL_NOTIFICATION = "prompts_modifies"
+
+    # Durée de vie maximale du cache (filet de sécurité si une notification est perdue)
+    DUREE_CACHE_S = obtenir_parametres().cache_duree_prompts_s
+
+    # (prompts indexés par id, ids indexés par nom), ou None si à recharger
+    _contenu_cache: tuple[dict[int, dict], dict[str, int]] | None = None
+    _charge_le: float = 0.0
+    _connexion_ecoutee = None
+    _verrou = threading.Lock()
+
+    @classmethod
+    def invalider_cache(cls) -> None:
+        """Vide le cache : le prochain accès rechargera la table ``prompts``."""
+        with cls._verrou:
+            cls._contenu_cache = None
+        logging.debug("[PromptDAO] Cache des prompts invalidé")
+
+    @classmethod
+    def _recevoir_notifications(cls, conn) -> None:
+        """Invalide le cache si une notification de modification est arrivée."""
+        if conn is not cls._connexion_ecoutee:
+            return
+        try:
+            conn.poll()
+        except Exception as e:
+            logging.warning(f"[PromptDAO] Lecture des notifications impossible : {e}")
+            cls.invalider_cache()
+            return
+        recues = [n for n in conn.notifies if n.channel == cls.CANAL_NOTIFICATION]
+        if recues:
+            conn.notifies[:] = [n for n in conn.notifies if n.channel != cls.CANAL_NOTIFICATION]
+            logging.info(f"[PromptDAO] {len(recues)} notification(s) de modification reçue(s)")
+            cls.invalider_cache()
+
+    @classmethod
+    def _cache(cls) -> tuple[dict[int, dict], dict[str, int]]:
+        """
+        Retourne le cache des prompts, en le chargeant si besoin.
+
+        Returns
+        -------
+        tuple[dict[int, dict], dict[str, int]]
+            Prompts indexés par identifiant, et identifiants indexés par nom.
+        """
+        conn = DBConnection().connection
+        cls._recevoir_notifications(conn)
+
+        cache = cls._contenu_cache
+        if cache is not None and time.monotonic() - cls._charge_le < cls.DUREE_CACHE_S:
+            return cache
+
+        with cls._verrou:
+            try:
+                with conn:
+                    with conn.cursor() as cur:
+                        if conn is not cls._connexion_ecoutee:
+                            cur.execute(f"LISTEN {cls.CANAL_NOTIFICATION};")
+                        cur.execute(
+                            """
+                            SELECT id, nom, contenu, version
+                            FROM prompts
+                            ORDER BY id;
+                            """
+                        )
+                        rows = cur.fetchall() or []
+            except Exception as e:
+                logging.error(f"[PromptDAO] ERREUR chargement du cache des prompts : {e}")
+                raise
+
+            cls._connexion_ecoutee = conn
+            cls._contenu_cache = (
+                {row["id"]: dict(row) for row in rows},
+                {row["nom"]: row["id"] for row in rows},
+            )
+            cls._charge_le = time.monotonic()
+            logging.info(f"[PromptDAO] Cache des prompts chargé ({len(rows)} prompts)")
+            return cls._contenu_cache
+
     @staticmethod
     def obtenir_id_par_nom(nom: str) -> int | None:
         """
@@ -42,21 +136,15 @@ class PromptDAO:
         """
         logging.debug(f"[PromptDAO] Recherche ID pour nom='{nom}'")
 
-        try:
-            with DBConnection().connection as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT id FROM prompts WHERE nom = %(nom)s;", {"nom": nom})
-                    row = cur.fetchone()
-        except Exception as e:
-            logging.error(f"[PromptDAO] ERREUR obtenir_id_par_nom ('{nom}') : {e}")
-            raise
+        _, ids_par_nom = PromptDAO._cache()
+        prompt_id = ids_par_nom.get(nom)
 
-        if row:
-            logging.info(f"[PromptDAO] ID trouvé pour '{nom}' : {row['id']}")
-        else:
+        if prompt_id is None:
             logging.info(f"[PromptDAO] Aucun prompt trouvé pour '{nom}'")
+        else:
+            logging.debug(f"[PromptDAO] ID trouvé pour '{nom}' : {prompt_id}")
 
-        return row["id"] if row else None
+        return prompt_id
 
     @staticmethod
     def existe_id(prompt_id: int) -> bool:
@@ -73,18 +161,9 @@ class PromptDAO:
         bool
             True si le prompt existe, False sinon.
         """
-        logging.debug(f"[PromptDAO] Vérification de l'existence du prompt_id={prompt_id}")
-
-        try:
-            with DBConnection().connection as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT 1 FROM prompts WHERE id = %(id)s;", {"id": prompt_id})
-                    exists = cur.fetchone() is not None
-        except Exception as e:
-            logging.error(f"[PromptDAO] ERREUR exists_id({prompt_id}) : {e}")
-            raise
-
-        logging.info(f"[PromptDAO] exists_id({prompt_id}) -> {exists}")
+        prompts_par_id, _ = PromptDAO._cache()
+        exists = prompt_id in prompts_par_id
+        logging.debug(f"[PromptDAO] exists_id({prompt_id}) -> {exists}")
         return exists
 
     @staticmethod
@@ -100,35 +179,16 @@ class PromptDAO:
         list[dict]
             Liste complète des prompts présents en base.
         """
-        logging.debug("[PromptDAO] Récupération de la liste des prompts")
-
-        try:
-            with DBConnection().connection as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        SELECT id, nom
-                        FROM prompts
-                        ORDER BY id;
-                        """
-                    )
-                    rows = cur.fetchall() or []
-        except Exception as e:
-            logging.error("[PromptDAO] ERREUR lister_prompts : %s", e)
-            raise
-
-        logging.info(f"[PromptDAO] {len(rows)} prompts trouvés")
-        return rows
+        prompts_par_id, _ = PromptDAO._cache()
+        prompts = [{"id": p["id"], "nom": p["nom"]} for p in prompts_par_id.values()]
+        logging.debug(f"[PromptDAO] {len(prompts)} prompts trouvés")
+        return prompts
 
     @staticmethod
     def obtenir_texte_prompt_par_id(prompt_id: int) -> str | None:
         """
         Renvoie le texte d'un prompt à partir de son identifiant.
 
-        La méthode récupère toute la ligne de la table puis tente d'extraire
-        le contenu du champ ``contenu`` (ou autre champ éventuel si la table
-        évolue). Si aucun enregistrement n'est trouvé, elle renvoie ``None``.
-
         Parameters
         ----------
         prompt_id : int
@@ -139,30 +199,14 @@ class PromptDAO:
         str | None
             Le texte du prompt, ou ``None`` s'il n'existe pas en base.
         """
-        logging.debug(f"[PromptDAO] Récupération du contenu du prompt_id={prompt_id}")
-
-        try:
-            with DBConnection().connection as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        SELECT *
-                        FROM prompts
-                        WHERE id = %(id)s;
-                        """,
-                        {"id": prompt_id},
-                    )
-                    row = cur.fetchone()
-        except Exception as e:
-            logging.error(f"[PromptDAO] ERREUR obtenir_texte_prompt_par_id({prompt_id}) : {e}")
-            raise
-
+        prompts_par_id, _ = PromptDAO._cache()
+        row = prompts_par_id.get(prompt_id)
         if not row:
             logging.info(f"[PromptDAO] Aucun prompt trouvé pour id={prompt_id}")
             return None
 
         texte = row.get("contenu")
-        logging.info(
+        logging.debug(
             f"[PromptDAO] Contenu récupéré pour id={prompt_id}, "
             f"{len(texte) if texte else 0} caractères."
         )
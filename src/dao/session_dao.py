@@ -1,7 +1,5 @@
 import logging
 
-from psycopg2.extras import RealDictCursor
-
 from src.dao.db_connection import DBConnection
 
 
@@ -22,8 +20,60 @@ class SessionDAO:
     - ``user_id`` (int) : identifiant de l'utilisateur concerné
     - ``connexion`` (timestamp) : date et heure de début de session
     - ``deconnexion`` (timestamp, nullable) : date de fin de session
+    - ``dernier_signal`` (timestamp) : dernier signe de vie du client
+    - ``duree_cumulee`` (bool) : durée déjà comptée dans le cumul de l'utilisateur
+
+    Les sessions ouvertes (``deconnexion IS NULL``) sont couvertes par des
+    index partiels : leur recherche ne dépend pas du nombre de sessions fermées.
+
+    Toute fermeture de session ajoute sa durée au cumul
+    ``utilisateurs.temps_utilisation``, dans la même requête, et marque la
+    session (``duree_cumulee``) pour qu'elle ne soit pas recomptée.
     """
 
+    # Suite commune des requêtes de fermeture : `fermees` est une CTE
+    # « UPDATE sessions ... RETURNING user_id, connexion, deconnexion ».
+    _CUMULER_DUREES = """
+        , cumul AS (
+            UPDATE utilisateurs u
+            SET temps_utilisation = COALESCE(u.temps_utilisation, interval '0') + f.duree
+            FROM (
+                SELECT user_id, SUM(GREATEST(deconnexion - connexion, interval '0')) AS duree
+                FROM fermees
+                GROUP BY user_id
+            ) AS f
+            WHERE u.id = f.user_id
+        )
+        SELECT COUNT(*) AS nb FROM fermees;
+    """
+
+    @staticmethod
+    def _fermer(cur, requete_fermeture: str, params: dict) -> int:
+        """
+        Exécute une fermeture de sessions et cumule leurs durées par utilisateur.
+
+        Parameters
+        ----------
+        cur : cursor
+        requete_fermeture : str
+            ``UPDATE sessions SET deconnexion = ..., duree_cumulee = true WHERE ...``
+            (sans RETURNING).
+        params : dict
+
+        Returns
+        -------
+        int
+            Nombre de sessions fermées.
+        """
+        cur.execute(
+            "WITH fermees AS ("
+            + requete_fermeture
+            + " RETURNING user_id, connexion, deconnexion)"
+            + SessionDAO._CUMULER_DUREES,
+            params,
+        )
+        return int(cur.fetchone()["nb"])
+
     def ouvrir(self, user_id: int, device: str | None = "cli") -> int:
         """
         Ouvre une nouvelle session pour un utilisateur.
@@ -52,7 +102,7 @@ class SessionDAO:
 
         try:
             with DBConnection().connection as conn:
-                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                with conn.cursor() as cur:
                     cur.execute(
                         """
                         INSERT INTO sessions(user_id, connexion, deconnexion)
@@ -72,6 +122,58 @@ class SessionDAO:
             )
             raise
 
+    def ouvrir_a_la_connexion(self, user_id: int, nouveau_hash: str | None = None) -> int:
+        """
+        Ouvre la session d'un utilisateur qui vient de s'authentifier.
+
+        Une seule requête (CTE) ouvre la session et, si `nouveau_hash` est
+        fourni, enregistre le mot de passe ré-haché : les deux écritures de la
+        connexion sont faites dans la même transaction, en un aller-retour.
+
+        Parameters
+        ----------
+        user_id : int
+            Identifiant de l'utilisateur authentifié.
+        nouveau_hash : str | None, optional
+            Nouveau hash du mot de passe, by default None (pas de ré-hachage).
+
+        Returns
+        -------
+        int
+            L'identifiant de la session nouvellement créée.
+        """
+        logging.debug(
+            f"[SessionDAO] Connexion : ouverture de session pour user_id={user_id} "
+            f"(ré-hachage={nouveau_hash is not None})"
+        )
+
+        try:
+            with DBConnection().connection as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        WITH maj_mot_de_passe AS (
+                            UPDATE utilisateurs
+                            SET mot_de_passe = %(hash)s
+                            WHERE id = %(uid)s
+                              AND %(hash)s::text IS NOT NULL
+                        )
+                        INSERT INTO sessions(user_id, connexion, deconnexion)
+                        VALUES (%(uid)s, NOW(), NULL)
+                        RETURNING id;
+                        """,
+                        {"uid": user_id, "hash": nouveau_hash},
+                    )
+                    sid = int(cur.fetchone()["id"])
+                    logging.info(f"[SessionDAO] Session ouverte (id={sid}) pour user_id={user_id}")
+                    return sid
+
+        except Exception as e:
+            logging.error(
+                f"[SessionDAO] ERREUR lors de l'ouverture de session user_id={user_id} : {e}"
+            )
+            raise
+
     def fermer_derniere_ouverte(self, user_id: int) -> bool:
         """
         Ferme la dernière session encore ouverte de l'utilisateur.
@@ -101,22 +203,25 @@ class SessionDAO:
         try:
             with DBConnection().connection as conn:
                 with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        UPDATE sessions
-                        SET deconnexion = NOW()
-                        WHERE id = (
-                            SELECT id
-                            FROM sessions
-                            WHERE user_id = %(uid)s
-                            AND deconnexion IS NULL
-                            ORDER BY connexion DESC
-                            LIMIT 1
-                        );
-                        """,
-                        {"uid": user_id},
+                    closed = (
+                        self._fermer(
+                            cur,
+                            """
+                            UPDATE sessions
+                            SET deconnexion = NOW(), duree_cumulee = true
+                            WHERE id = (
+                                SELECT id
+                                FROM sessions
+                                WHERE user_id = %(uid)s
+                                AND deconnexion IS NULL
+                                ORDER BY connexion DESC
+                                LIMIT 1
+                            )
+                            """,
+                            {"uid": user_id},
+                        )
+                        > 0
                     )
-                    closed = cur.rowcount > 0
         except Exception as e:
             logging.error(f"[SessionDAO] ERREUR fermeture session user_id={user_id} : {e}")
             raise
@@ -127,3 +232,107 @@ class SessionDAO:
             logging.info(f"[SessionDAO] Aucune session ouverte trouvée pour user_id={user_id}")
 
         return closed
+
+    def fermer(self, session_ids: list[int]) -> int:
+        """
+        Ferme plusieurs sessions en une requête.
+
+        Parameters
+        ----------
+        session_ids : list[int]
+            Identifiants des sessions à fermer (les sessions déjà fermées sont ignorées).
+
+        Returns
+        -------
+        int
+            Nombre de sessions fermées.
+        """
+        if not session_ids:
+            return 0
+        logging.debug(f"[SessionDAO] Fermeture de {len(session_ids)} session(s)")
+        try:
+            with DBConnection().connection as conn:
+                with conn.cursor() as cur:
+                    nb = self._fermer(
+                        cur,
+                        """
+                        UPDATE sessions
+                        SET deconnexion = NOW(), duree_cumulee = true
+                        WHERE id = ANY(%(ids)s)
+                          AND deconnexion IS NULL
+                        """,
+                        {"ids": list(session_ids)},
+                    )
+        except Exception as e:
+            logging.error(f"[SessionDAO] ERREUR fermeture des sessions {session_ids} : {e}")
+            raise
+        logging.info(f"[SessionDAO] {nb} session(s) fermée(s)")
+        return nb
+
+    def signaler(self, session_ids: list[int], connexion=None) -> int:
+        """
+        Enregistre un signe de vie (heartbeat) pour des sessions ouvertes.
+
+        Parameters
+        ----------
+        session_ids : list[int]
+            Sessions actives du processus.
+        connexion : optional
+            Connexion à utiliser (tâche de fond), par défaut la connexion partagée.
+
+        Returns
+        -------
+        int
+            Nombre de sessions mises à jour (une session déjà fermée, par
+            exemple par le nettoyage, n'est pas rouverte).
+        """
+        if not session_ids:
+            return 0
+        with connexion or DBConnection().connection as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE sessions
+                    SET dernier_signal = NOW()
+                    WHERE id = ANY(%(ids)s)
+                      AND deconnexion IS NULL;
+                    """,
+                    {"ids": list(session_ids)},
+                )
+                return cur.rowcount
+
+    def fermer_sessions_inactives(self, delai_s: float, connexion=None) -> int:
+        """
+        Ferme en une seule requête les sessions sans signe de vie depuis `delai_s`.
+
+        Ces sessions sont celles de clients arrêtés brutalement. Elles sont
+        fermées à la date de leur dernier signal, et non à la date du
+        nettoyage, pour ne pas compter le temps passé sans client.
+
+        Parameters
+        ----------
+        delai_s : float
+            Durée d'inactivité, en secondes, au-delà de laquelle une session est fermée.
+        connexion : optional
+            Connexion à utiliser (tâche de fond), par défaut la connexion partagée.
+
+        Returns
+        -------
+        int
+            Nombre de sessions fermées.
+        """
+        with connexion or DBConnection().connection as conn:
+            with conn.cursor() as cur:
+                nb = self._fermer(
+                    cur,
+                    """
+                    UPDATE sessions
+                    SET deconnexion = dernier_signal, duree_cumulee = true
+                    WHERE deconnexion IS NULL
+                      AND dernier_signal < NOW() - make_interval(secs => %(delai)s)
+                    """,
+                    {"delai": float(delai_s)},
+                )
+        if nb:
+            logging.info(f"[SessionDAO] {nb} session(s) inactive(s) fermée(s)")
+        return nb
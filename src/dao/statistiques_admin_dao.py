@@ -0,0 +1,398 @@
+import datetime
+import logging
+
+from psycopg2.extras import execute_values
+
+from src.business_object.statistiques import Statistiques
+from src.client.metriques_llm import AppelLLM
+from src.dao.db_connection import DBConnection
+from src.utils.config import obtenir_parametres
+
+
+class StatistiquesAdminDAO:
+    """
+    Requêtes d'analyse transverses (tous utilisateurs confondus).
+
+    Les agrégats sont calculés côté PostgreSQL. Chaque requête est exécutée
+    dans une transaction où `max_parallel_workers_per_gather` est relevé
+    (SET LOCAL), afin que le planificateur puisse utiliser des parcours
+    parallèles sur les grosses tables (messages, sessions).
+    """
+
+    # Nombre de workers parallèles autorisés par nœud Gather
+    PARALLELISME = obtenir_parametres().sql_parallelisme
+
+    # Percentiles de latence calculés par défaut
+    PERCENTILES_LATENCE = (0.5, 0.9, 0.99)
+
+    @staticmethod
+    def _activer_parallelisme(cursor) -> None:
+        """Autorise les plans parallèles pour la transaction courante."""
+        cursor.execute(
+            "SELECT set_config('max_parallel_workers_per_gather', %(n)s, true);",
+            {"n": str(StatistiquesAdminDAO.PARALLELISME)},
+        )
+
+    @staticmethod
+    def enregistrer_appel_llm(
+        conversation_id: int | None, latence_ms: int, appel: AppelLLM | None = None
+    ) -> bool:
+        """
+        Enregistre la durée d'un appel au LLM, et ses mesures si elles sont connues.
+
+        Parameters
+        ----------
+        conversation_id : int | None
+            Conversation concernée (None si l'appel est hors conversation).
+        latence_ms : int
+            Durée de l'appel, en millisecondes.
+        appel : AppelLLM | None, optional
+            Mesures du client (taille, jetons, statut, tentatives).
+
+        Returns
+        -------
+        bool
+            True si l'enregistrement a réussi.
+        """
+        appels = [(conversation_id, latence_ms, appel)]
+        return StatistiquesAdminDAO.enregistrer_appels_llm(appels) > 0
+
+    @staticmethod
+    def enregistrer_appels_llm(appels: list[tuple[int | None, int, AppelLLM | None]]) -> int:
+        """
+        Enregistre plusieurs appels au LLM en une seule requête.
+
+        Les appels attendent dans `JournalAppelsLLM` avant d'être écrits : une
+        conversation supprimée entre-temps est enregistrée à NULL (comme le
+        ferait ``ON DELETE SET NULL``), sans faire échouer le reste du lot.
+
+        Parameters
+        ----------
+        appels : list[tuple[int | None, int, AppelLLM | None]]
+            ``(conversation_id, latence_ms, appel)`` pour chaque appel (voir
+            `enregistrer_appel_llm`).
+
+        Returns
+        -------
+        int
+            Nombre de lignes insérées.
+        """
+        lignes = [
+            (
+                conversation_id,
+                int(latence_ms),
+                appel and appel.octets_requete,
+                appel and appel.nb_messages,
+                appel and appel.statut_http,
+                appel.succes if appel else None,
+                appel.nb_retentatives if appel else 0,
+                appel and appel.tokens_prompt,
+                appel and appel.tokens_reponse,
+            )
+            for conversation_id, latence_ms, appel in appels
+        ]
+        if not lignes:
+            return 0
+        logging.debug("[StatistiquesAdminDAO] %s appel(s) LLM à enregistrer", len(lignes))
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO appels_llm (conversation_id, latence_ms, octets_requete,
+                                            nb_messages, statut_http, succes, nb_retentatives,
+                                            tokens_prompt, tokens_reponse)
+                    SELECT c.id, v.latence_ms, v.octets_requete, v.nb_messages,
+                           v.statut_http, v.succes, v.nb_retentatives,
+                           v.tokens_prompt, v.tokens_reponse
+                    FROM (VALUES %s) AS v (conversation_id, latence_ms, octets_requete,
+                                           nb_messages, statut_http, succes, nb_retentatives,
+                                           tokens_prompt, tokens_reponse)
+                    LEFT JOIN conversations c ON c.id = v.conversation_id;
+                    """,
+                    lignes,
+                    template="(%s::int, %s::int, %s::int, %s::int, %s::smallint, %s::boolean,"
+                    " %s::smallint, %s::int, %s::int)",
+                    page_size=len(lignes),
+                )
+                return cursor.rowcount
+
+    @staticmethod
+    def couts_llm_par_conversation(limite: int = 10) -> list[dict]:
+        """
+        Conversations qui consomment le plus d'appels au LLM (temps cumulé).
+
+        Parameters
+        ----------
+        limite : int, optional
+            Nombre de conversations retournées, by default 10.
+
+        Returns
+        -------
+        list[dict]
+            ``conversation_id``, ``nb_appels``, ``latence_totale_ms``,
+            ``latence_max_ms``, ``octets_requete``, ``tokens`` (prompt et
+            réponse), ``nb_erreurs`` et ``nb_retentatives`` ; la plus coûteuse
+            en premier.
+        """
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                StatistiquesAdminDAO._activer_parallelisme(cursor)
+                cursor.execute(
+                    """
+                    SELECT conversation_id,
+                           count(*)                                   AS nb_appels,
+                           sum(latence_ms)                            AS latence_totale_ms,
+                           max(latence_ms)                            AS latence_max_ms,
+                           coalesce(sum(octets_requete), 0)           AS octets_requete,
+                           coalesce(sum(tokens_prompt), 0)
+                             + coalesce(sum(tokens_reponse), 0)       AS tokens,
+                           count(*) FILTER (WHERE NOT succes)         AS nb_erreurs,
+                           sum(nb_retentatives)                       AS nb_retentatives
+                    FROM appels_llm
+                    WHERE conversation_id IS NOT NULL
+                    GROUP BY conversation_id
+                    ORDER BY latence_totale_ms DESC
+                    LIMIT %(limite)s;
+                    """,
+                    {"limite": int(limite)},
+                )
+                return [dict(r) for r in cursor.fetchall() or []]
+
+    @staticmethod
+    def utilisateurs_actifs_par_jour(
+        debut: datetime.date, fin: datetime.date
+    ) -> list[tuple[datetime.date, int]]:
+        """
+        Compte les utilisateurs actifs (session ouverte ou message envoyé) par jour.
+
+        Parameters
+        ----------
+        debut : datetime.date
+            Premier jour inclus.
+        fin : datetime.date
+            Dernier jour inclus.
+
+        Returns
+        -------
+        list[tuple[datetime.date, int]]
+            Paires (jour, nombre d'utilisateurs actifs), par jour croissant.
+        """
+        logging.debug("[StatistiquesAdminDAO] Utilisateurs actifs du %s au %s", debut, fin)
+        params = {"d0": debut, "d1": fin + datetime.timedelta(days=1)}
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                StatistiquesAdminDAO._activer_parallelisme(cursor)
+                cursor.execute(
+                    """
+                    SELECT jour, COUNT(DISTINCT utilisateur_id) AS nb
+                    FROM (
+                        SELECT date_trunc('day', connexion)::date AS jour,
+                               user_id AS utilisateur_id
+                        FROM sessions
+                        WHERE connexion >= %(d0)s AND connexion < %(d1)s
+                        UNION ALL
+                        SELECT date_trunc('day', cree_le)::date,
+                               utilisateur_id
+                        FROM messages
+                        WHERE emetteur = 'utilisateur'
+                          AND cree_le >= %(d0)s AND cree_le < %(d1)s
+                    ) AS activite
+                    GROUP BY jour
+                    ORDER BY jour;
+                    """,
+                    params,
+                )
+                rows = cursor.fetchall() or []
+        res = [(r["jour"], int(r["nb"])) for r in rows]
+        logging.info("[StatistiquesAdminDAO] Utilisateurs actifs : %s jour(s)", len(res))
+        return res
+
+    @staticmethod
+    def messages_par_prompt() -> list[dict]:
+        """
+        Volume de messages par profil de prompt.
+
+        Returns
+        -------
+        list[dict]
+            Une entrée par prompt (None pour les conversations sans prompt) avec
+            les clés `prompt`, `nb_conversations` et `nb_messages`, par volume décroissant.
+        """
+        logging.debug("[StatistiquesAdminDAO] Messages par prompt")
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                StatistiquesAdminDAO._activer_parallelisme(cursor)
+                cursor.execute(
+                    """
+                    SELECT p.nom AS prompt,
+                           COUNT(DISTINCT c.id) AS nb_conversations,
+                           COALESCE(SUM(m.nb), 0) AS nb_messages
+                    FROM conversations c
+                    LEFT JOIN prompts p ON p.id = c.prompt_id
+                    LEFT JOIN (
+                        SELECT conversation_id, COUNT(*) AS nb
+                        FROM messages
+                        GROUP BY conversation_id
+                    ) AS m ON m.conversation_id = c.id
+                    GROUP BY p.nom
+                    ORDER BY nb_messages DESC, prompt NULLS LAST;
+                    """
+                )
+                rows = cursor.fetchall() or []
+        res = [
+            {
+                "prompt": r["prompt"],
+                "nb_conversations": int(r["nb_conversations"]),
+                "nb_messages": int(r["nb_messages"]),
+            }
+            for r in rows
+        ]
+        logging.info("[StatistiquesAdminDAO] Messages par prompt : %r", res)
+        return res
+
+    @staticmethod
+    def longueur_moyenne_conversations() -> float:
+        """
+        Nombre moyen de messages par conversation (conversations vides incluses).
+
+        Returns
+        -------
+        float
+            Longueur moyenne, 0.0 s'il n'y a aucune conversation.
+        """
+        logging.debug("[StatistiquesAdminDAO] Longueur moyenne des conversations")
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                StatistiquesAdminDAO._activer_parallelisme(cursor)
+                cursor.execute(
+                    """
+                    SELECT (SELECT COUNT(*) FROM messages)::float
+                           / NULLIF((SELECT COUNT(*) FROM conversations), 0) AS moyenne;
+                    """
+                )
+                row = cursor.fetchone()
+        moyenne = float(row["moyenne"]) if row and row["moyenne"] is not None else 0.0
+        logging.info("[StatistiquesAdminDAO] Longueur moyenne : %.2f", moyenne)
+        return moyenne
+
+    @staticmethod
+    def percentiles_latence_llm(percentiles: tuple[float, ...] | None = None) -> dict[float, float]:
+        """
+        Percentiles de latence des appels au LLM (en millisecondes).
+
+        Parameters
+        ----------
+        percentiles : tuple[float, ...] | None, optional
+            Percentiles voulus entre 0 et 1, by default `PERCENTILES_LATENCE`.
+
+        Returns
+        -------
+        dict[float, float]
+            Latence pour chaque percentile (vide si aucun appel enregistré).
+        """
+        percentiles = tuple(percentiles or StatistiquesAdminDAO.PERCENTILES_LATENCE)
+        logging.debug("[StatistiquesAdminDAO] Percentiles de latence %r", percentiles)
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                StatistiquesAdminDAO._activer_parallelisme(cursor)
+                cursor.execute(
+                    """
+                    SELECT percentile_cont(%(p)s::float8[])
+                           WITHIN GROUP (ORDER BY latence_ms) AS valeurs
+                    FROM appels_llm;
+                    """,
+                    {"p": list(percentiles)},
+                )
+                row = cursor.fetchone()
+        valeurs = row["valeurs"] if row else None
+        if not valeurs:
+            return {}
+        res = dict(zip(percentiles, (float(v) for v in valeurs)))
+        logging.info("[StatistiquesAdminDAO] Percentiles de latence : %r", res)
+        return res
+
+    @staticmethod
+    def lister_ids_utilisateurs() -> list[int]:
+        """
+        Liste les identifiants de tous les utilisateurs.
+
+        Returns
+        -------
+        list[int]
+            Identifiants triés par ordre croissant.
+        """
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT id FROM utilisateurs ORDER BY id;")
+                return [r["id"] for r in cursor.fetchall() or []]
+
+    @staticmethod
+    def stats_tranche(ids_utilisateurs: list[int]) -> Statistiques:
+        """
+        Statistiques cumulées d'une tranche d'utilisateurs.
+
+        Les compteurs sont la somme des statistiques individuelles : une
+        conversation à plusieurs participants est comptée pour chacun d'eux,
+        comme dans `Statistiques_Service.stats_utilisateur`.
+
+        Parameters
+        ----------
+        ids_utilisateurs : list[int]
+            Identifiants des utilisateurs de la tranche.
+
+        Returns
+        -------
+        Statistiques
+            Statistiques partielles, à combiner avec `Statistiques.fusionner`.
+        """
+        stats = Statistiques()
+        if not ids_utilisateurs:
+            return stats
+        params = {"ids": list(ids_utilisateurs)}
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                StatistiquesAdminDAO._activer_parallelisme(cursor)
+                cursor.execute(
+                    """
+                    SELECT
+                        (SELECT COUNT(*)
+                         FROM conversations_participants
+                         WHERE utilisateur_id = ANY(%(ids)s)) AS nb_conversations,
+                        (SELECT COUNT(*)
+                         FROM messages
+                         WHERE emetteur = 'utilisateur'
+                           AND utilisateur_id = ANY(%(ids)s)) AS nb_messages,
+                        (COALESCE((SELECT EXTRACT(EPOCH FROM SUM(temps_utilisation))
+                                   FROM utilisateurs
+                                   WHERE id = ANY(%(ids)s)), 0)
+                         + COALESCE((SELECT SUM(EXTRACT(EPOCH FROM now() - connexion))
+                                     FROM sessions
+                                     WHERE user_id = ANY(%(ids)s)
+                                       AND deconnexion IS NULL), 0)
+                        ) / 3600.0 AS heures;
+                    """,
+                    params,
+                )
+                row = cursor.fetchone()
+                cursor.execute(
+                    """
+                    SELECT mot, SUM(nb) AS nb
+                    FROM sujets_utilisateurs
+                    WHERE utilisateur_id = ANY(%(ids)s)
+                    GROUP BY mot;
+                    """,
+                    params,
+                )
+                sujets = [(r["mot"], int(r["nb"])) for r in cursor.fetchall() or []]
+
+        stats.incrementer_conversations(int(row["nb_conversations"]))
+        stats.incrementer_messages(int(row["nb_messages"]))
+        stats.ajouter_temps(float(row["heures"]))
+        stats.ajouter_comptes_sujets(sujets)
+        logging.debug(
+            "[StatistiquesAdminDAO] Tranche de %s utilisateur(s) : %s",
+            len(ids_utilisateurs),
+            stats,
+        )
+        return stats
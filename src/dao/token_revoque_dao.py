@@ -0,0 +1,95 @@
+import datetime
+import logging
+
+from src.dao.db_connection import DBConnection
+
+
+class TokenRevoqueDAO:
+    """
+    Accès à la table ``tokens_revoques`` (liste noire des tokens JWT).
+
+    Table concernée
+    ----------------
+    Table : ``tokens_revoques``
+    Colonnes :
+    - ``jti`` (str) : identifiant unique du token (clé primaire)
+    - ``expire_le`` (timestamptz) : expiration du token ; la ligne est inutile au-delà
+    """
+
+    @staticmethod
+    def revoquer(jti: str, expire_le: datetime.datetime) -> bool:
+        """
+        Ajoute un token à la liste noire et purge les entrées expirées.
+
+        Parameters
+        ----------
+        jti : str
+            Identifiant du token.
+        expire_le : datetime.datetime
+            Date d'expiration du token (timezone-aware).
+
+        Returns
+        -------
+        bool
+            True si le token vient d'être révoqué, False s'il l'était déjà.
+        """
+        logging.debug("[TokenRevoqueDAO] Révocation jti=%s (expire le %s)", jti, expire_le)
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM tokens_revoques WHERE expire_le <= now();")
+                purges = cursor.rowcount
+                cursor.execute(
+                    """
+                    INSERT INTO tokens_revoques (jti, expire_le)
+                    VALUES (%(jti)s, %(expire_le)s)
+                    ON CONFLICT (jti) DO NOTHING;
+                    """,
+                    {"jti": jti, "expire_le": expire_le},
+                )
+                ajoute = cursor.rowcount > 0
+        if purges:
+            logging.info("[TokenRevoqueDAO] %s token(s) expiré(s) purgé(s)", purges)
+        return ajoute
+
+    @staticmethod
+    def est_revoque(jti: str) -> bool:
+        """
+        Indique si un token (non expiré) est dans la liste noire.
+
+        Parameters
+        ----------
+        jti : str
+            Identifiant du token.
+
+        Returns
+        -------
+        bool
+        """
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT 1
+                    FROM tokens_revoques
+                    WHERE jti = %(jti)s AND expire_le > now();
+                    """,
+                    {"jti": jti},
+                )
+                return cursor.fetchone() is not None
+
+    @staticmethod
+    def purger_expires() -> int:
+        """
+        Supprime les tokens expirés de la liste noire.
+
+        Returns
+        -------
+        int
+            Nombre de lignes supprimées.
+        """
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM tokens_revoques WHERE expire_le <= now();")
+                nb = cursor.rowcount
+        logging.info("[TokenRevoqueDAO] %s token(s) expiré(s) purgé(s)", nb)
+        return nb
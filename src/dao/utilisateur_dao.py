@@ -1,8 +1,6 @@
 import logging
 from typing import Optional
 
-from psycopg2.extras import RealDictCursor
-
 from src.business_object.utilisateur import Utilisateur
 from src.dao.db_connection import DBConnection
 from src.utils.log_decorator import log
@@ -216,6 +214,51 @@ class UtilisateurDao(metaclass=Singleton):
             for row in rows
         ]
 
+    @log
+    def modifier_mot_de_passe(self, utilisateur: Utilisateur) -> bool:
+        """
+        Enregistre le hash de mot de passe courant d'un utilisateur.
+
+        Utilisé notamment pour ré-hacher un mot de passe à la connexion
+        (ancien hash SHA-256 ou coût de la KDF modifié).
+
+        Parameters
+        ----------
+        utilisateur : Utilisateur
+            Utilisateur (id défini) dont ``password_hash`` est à jour.
+
+        Returns
+        -------
+        bool
+            True si une ligne a été mise à jour, False sinon.
+        """
+        logging.debug("Mise à jour du hash de mot de passe (id=%s).", utilisateur.id)
+        try:
+            with DBConnection().connection as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        UPDATE utilisateurs
+                        SET mot_de_passe = %(mot_de_passe)s
+                        WHERE id = %(id)s;
+                        """,
+                        {"id": utilisateur.id, "mot_de_passe": utilisateur.password_hash},
+                    )
+                    res = cursor.rowcount
+        except Exception as e:
+            logging.error(
+                "Erreur lors de la mise à jour du mot de passe id=%s : %s",
+                utilisateur.id,
+                e,
+            )
+            raise
+
+        if res > 0:
+            logging.info("Hash de mot de passe mis à jour (id=%s).", utilisateur.id)
+        else:
+            logging.warning("Aucun utilisateur mis à jour pour id=%s.", utilisateur.id)
+        return res > 0
+
     @log
     def supprimer(self, utilisateur: Utilisateur) -> bool:
         """
@@ -270,9 +313,10 @@ class UtilisateurDao(metaclass=Singleton):
     @log
     def heures_utilisation(self, user_id: int) -> float:
         """
-        Calcule le temps total d’utilisation (sessions fermées uniquement).
+        Temps total d’utilisation (sessions fermées uniquement).
 
-        Seules les sessions dont ``deconnexion`` n'est pas NULL sont prises en compte.
+        Lit le cumul ``utilisateurs.temps_utilisation``, tenu à jour par
+        `SessionDAO` à chaque fermeture de session.
 
         Parameters
         ----------
@@ -290,20 +334,18 @@ class UtilisateurDao(metaclass=Singleton):
         )
         try:
             with DBConnection().connection as conn:
-                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                with conn.cursor() as cur:
                     cur.execute(
                         """
-                        SELECT COALESCE(
-                          SUM(EXTRACT(EPOCH FROM (deconnexion - connexion))) / 3600.0, 0
-                        ) AS total_heures
-                        FROM sessions
-                        WHERE user_id = %(uid)s
-                          AND deconnexion IS NOT NULL;
+                        SELECT EXTRACT(EPOCH FROM COALESCE(temps_utilisation, interval '0'))
+                               / 3600.0 AS total_heures
+                        FROM utilisateurs
+                        WHERE id = %(uid)s;
                         """,
                         {"uid": user_id},
                     )
                     row = cur.fetchone()
-                    total = float(row["total_heures"] or 0.0)
+                    total = float(row["total_heures"] or 0.0) if row else 0.0
                     logging.info(
                         "Heures d'utilisation (fermées) pour user_id=%s : %.2f h",
                         user_id,
@@ -318,9 +360,11 @@ class UtilisateurDao(metaclass=Singleton):
     def heures_utilisation_incl_courante(self, user_id: int) -> float:
         """
         Calcule le temps total d'utilisation en comptabilisant également
-        la session actuellement ouverte (si elle existe).
+        les sessions actuellement ouvertes.
 
-        La durée d'une session ouverte est : ``NOW() - connexion``.
+        Cumul des sessions fermées + ``NOW() - connexion`` pour chaque session
+        ouverte (index partiel sur les sessions ouvertes) : le coût ne dépend
+        pas de l'historique des sessions.
 
         Parameters
         ----------
@@ -338,14 +382,20 @@ class UtilisateurDao(metaclass=Singleton):
         )
         try:
             with DBConnection().connection as conn:
-                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                with conn.cursor() as cur:
                     cur.execute(
                         """
-                        SELECT COALESCE(
-                          SUM(EXTRACT(EPOCH FROM (COALESCE(deconnexion, NOW()) - connexion))) / 3600.0, 0
-                        ) AS total_heures
-                        FROM sessions
-                        WHERE user_id = %(uid)s;
+                        SELECT (
+                          COALESCE(
+                            (SELECT EXTRACT(EPOCH FROM temps_utilisation)
+                             FROM utilisateurs
+                             WHERE id = %(uid)s), 0)
+                          + COALESCE(
+                            (SELECT SUM(EXTRACT(EPOCH FROM (NOW() - connexion)))
+                             FROM sessions
+                             WHERE user_id = %(uid)s
+                               AND deconnexion IS NULL), 0)
+                        ) / 3600.0 AS total_heures;
                         """,
                         {"uid": user_id},
                     )
@@ -363,3 +413,44 @@ class UtilisateurDao(metaclass=Singleton):
                 user_id,
             )
             raise
+
+    @staticmethod
+    def recalculer_temps_utilisation() -> int:
+        """
+        Recalcule le cumul ``temps_utilisation`` de tous les utilisateurs à
+        partir de l'historique des sessions fermées.
+
+        À lancer pour contrôler le cumul ; le fonctionnement normal n'en a
+        pas besoin (mise à niveau : migration 0006). Toutes les sessions
+        fermées sont marquées comme comptées (``duree_cumulee``).
+
+        Returns
+        -------
+        int
+            Nombre d'utilisateurs mis à jour.
+        """
+        with DBConnection().connection as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    WITH marquees AS (
+                        UPDATE sessions
+                        SET duree_cumulee = true
+                        WHERE deconnexion IS NOT NULL AND NOT duree_cumulee
+                    )
+                    UPDATE utilisateurs u
+                    SET temps_utilisation = s.duree
+                    FROM (
+                        SELECT ut.id,
+                               SUM(GREATEST(se.deconnexion - se.connexion, interval '0')) AS duree
+                        FROM utilisateurs ut
+                        LEFT JOIN sessions se
+                          ON se.user_id = ut.id AND se.deconnexion IS NOT NULL
+                        GROUP BY ut.id
+                    ) AS s
+                    WHERE u.id = s.id;
+                    """
+                )
+                nb = cur.rowcount
+        logging.info("Cumul des temps d'utilisation recalculé (%s utilisateur(s)).", nb)
+        return nb
@@ -1,18 +1,20 @@
 import logging
+import sys
 
-import dotenv
-
-from src.dao.utilisateur_dao import UtilisateurDao
-from src.service.auth_service import Auth_Service
+from src.utils.config import charger_parametres
 from src.utils.log_init import initialiser_logs
 from src.view.accueil.accueil_vue import AccueilVue
 
 # Ajouts pour la déconnexion si l'utilisateur fait un ctrl+c
 from src.view.session import Session
 
+# Les services, DAO et vues des autres menus ne sont importés qu'au premier
+# usage (menu choisi, première requête) : le menu d'accueil s'affiche sans
+# attendre psycopg2, jwt ou requests.
+
 if __name__ == "__main__":
-    # On charge les variables d'environnement
-    dotenv.load_dotenv(override=True)
+    # On charge les paramètres (.env prioritaire sur l'environnement)
+    parametres = charger_parametres(remplacer_env=True)
     initialiser_logs("Application")
 
     logging.info("Démarrage de l'application")
@@ -58,6 +60,9 @@ if __name__ == "__main__":
             # Invalidation du token si nécessaire
             if s.token:
                 try:
+                    from src.dao.utilisateur_dao import UtilisateurDao
+                    from src.service.auth_service import Auth_Service
+
                     auth_service = Auth_Service(UtilisateurDao())
                     auth_service.se_deconnecter(s.token)
                     logging.info("Token utilisateur invalidé lors de la fermeture de session.")
@@ -76,7 +81,32 @@ if __name__ == "__main__":
             print("Aucune session ouverte.")
             logging.info("Ctrl + C sans session utilisateur active.")
 
-    # Lorsque l'on quitte l'application (cas normal ou Ctrl+C)
+    # Lorsque l'on quitte l'application (cas normal ou Ctrl+C) ; la tâche de
+    # fond et les métriques n'existent que si une connexion ou un appel a eu lieu
+    surveillance = sys.modules.get("src.service.surveillance_sessions")
+    if surveillance is not None:
+        surveillance.SurveillanceSessions().arreter()
+
+    # Appels au LLM encore en attente d'écriture dans la table appels_llm
+    journal = sys.modules.get("src.service.journal_appels_llm")
+    if journal is not None:
+        journal.JournalAppelsLLM().vider()
+
+    # Export des temps de requêtes SQL et des appels au LLM (format Prometheus)
+    metriques_sql = sys.modules.get("src.dao.metriques_sql")
+    if metriques_sql is not None and parametres.sql_metriques_fichier:
+        try:
+            metriques_sql.MetriquesSQL().ecrire_prometheus(parametres.sql_metriques_fichier)
+        except OSError:
+            logging.exception("Échec de l'export des métriques SQL")
+    metriques_llm = sys.modules.get("src.client.metriques_llm")
+    if metriques_llm is not None:
+        if parametres.llm_metriques_fichier:
+            try:
+                metriques_llm.MetriquesLLM().ecrire_prometheus(parametres.llm_metriques_fichier)
+            except OSError:
+                logging.exception("Échec de l'export des métriques LLM")
+        logging.info("Appels au LLM : %s", metriques_llm.MetriquesLLM().resume())
     print("----------------------------------")
     print("Au revoir")
 
@@ -1,6 +1,13 @@
+import datetime
+import hashlib
 import logging
 
+from src.business_object.utilisateur import Utilisateur
+from src.dao.session_dao import SessionDAO
 from src.dao.utilisateur_dao import UtilisateurDao
+from src.service.cache_tokens import CacheTokens
+from src.service.revocation_tokens import obtenir_revocation
+from src.service.utilisateur_service import UtilisateurService
 from src.utils.jtw_utils import creer_token
 from src.utils.jtw_utils import verifier_token as verif_token
 
@@ -12,17 +19,18 @@ class Auth_Service:
     Ce service encapsule la logique métier liée à l'authentification :
     - Connexion / vérification du mot de passe
     - Génération de tokens JWT
-    - Gestion des tokens invalidés (déconnexion)
+    - Gestion des tokens révoqués (déconnexion)
 
     Attributes
     ----------
     utilisateur_dao : UtilisateurDao
         DAO permettant d'accéder aux utilisateurs en base.
-    tokens_invalides : set[str]
-        Ensemble des tokens invalidés après déconnexion.
+    revocations : RevocationMemoire | RevocationPostgres
+        Liste noire des tokens révoqués, indexée par `jti`. Par défaut, la
+        liste partagée par le processus (voir `obtenir_revocation`).
     """
 
-    def __init__(self, utilisateur_dao: UtilisateurDao):
+    def __init__(self, utilisateur_dao: UtilisateurDao, revocations=None):
         """
         Initialise le service avec un DAO utilisateur.
 
@@ -30,11 +38,40 @@ class Auth_Service:
         ----------
         utilisateur_dao : UtilisateurDao
             Instance du DAO pour accéder aux utilisateurs.
+        revocations : RevocationMemoire | RevocationPostgres | None, optional
+            Liste noire à utiliser, by default None (liste partagée).
         """
         self.utilisateur_dao = utilisateur_dao
-        self.tokens_invalides = set()  # liste noire des tokens déconnectés
+        self.revocations = revocations if revocations is not None else obtenir_revocation()
         logging.debug("Initialisation Auth_Service avec UtilisateurDao=%r", utilisateur_dao)
 
+    @staticmethod
+    def _cle_revocation(claims: dict, token: str) -> str:
+        """
+        Clé de révocation d'un token : son `jti`, ou à défaut (tokens émis
+        avant l'ajout du `jti`) l'empreinte SHA-256 du token.
+        """
+        return claims.get("jti") or hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def _authentifier(self, pseudo: str, mdp: str) -> Utilisateur:
+        """
+        Retrouve l'utilisateur (une requête) et vérifie son mot de passe.
+
+        Raises
+        ------
+        ValueError
+            Si l'utilisateur n'existe pas ou si le mot de passe est incorrect.
+        """
+        utilisateur = self.utilisateur_dao.trouver_par_pseudo(pseudo)
+        if not utilisateur:
+            logging.warning("Connexion échouée : utilisateur %r introuvable.", pseudo)
+            raise ValueError("Utilisateur introuvable.")
+
+        if not utilisateur.verifier_password(mdp):
+            logging.warning("Connexion échouée : mot de passe incorrect pour pseudo=%r", pseudo)
+            raise ValueError("Mot de passe incorrect.")
+        return utilisateur
+
     def se_connecter(self, pseudo: str, mdp: str) -> str:
         """
         Authentifie un utilisateur avec son pseudo et mot de passe.
@@ -61,25 +98,78 @@ class Auth_Service:
         """
         logging.debug("Tentative de connexion pour pseudo=%r", pseudo)
 
-        utilisateur = self.utilisateur_dao.trouver_par_pseudo(pseudo)
-        if not utilisateur:
-            logging.warning("Connexion échouée : utilisateur %r introuvable.", pseudo)
-            raise ValueError("Utilisateur introuvable.")
-
-        if not utilisateur.verifier_password(mdp):
-            logging.warning("Connexion échouée : mot de passe incorrect pour pseudo=%r", pseudo)
-            raise ValueError("Mot de passe incorrect.")
+        utilisateur = self._authentifier(pseudo, mdp)
+        UtilisateurService.rehacher_si_necessaire(utilisateur, mdp, self.utilisateur_dao)
 
         token = creer_token(utilisateur.id, utilisateur.pseudo)
         logging.info("Connexion réussie pour pseudo=%r (id=%s)", utilisateur.pseudo, utilisateur.id)
         return token
 
+    def connecter(self, pseudo: str, mdp: str) -> tuple[Utilisateur, str, int | None]:
+        """
+        Connexion complète : authentification, token et ouverture de session.
+
+        Deux requêtes au plus : la lecture de l'utilisateur, puis une requête
+        unique qui ouvre la ligne `sessions` et enregistre, si besoin, le mot
+        de passe ré-haché (voir `SessionDAO.ouvrir_a_la_connexion`).
+
+        Parameters
+        ----------
+        pseudo : str
+            Pseudo saisi (normalisé comme à la création du compte).
+        mdp : str
+            Mot de passe en clair
+
+        Returns
+        -------
+        tuple[Utilisateur, str, int | None]
+            L'utilisateur authentifié, son token et l'identifiant de la session
+            en base (None si l'ouverture de session a échoué).
+
+        Raises
+        ------
+        ValueError
+            Si le pseudo est vide, si l'utilisateur n'existe pas ou si le mot
+            de passe est incorrect.
+        """
+        pseudo_n = UtilisateurService._norm_pseudo(pseudo)
+        if not pseudo_n or not mdp:
+            raise ValueError("Pseudo ou mot de passe manquant.")
+        logging.debug("Connexion pour pseudo=%r", pseudo_n)
+
+        utilisateur = self._authentifier(pseudo_n, mdp)
+
+        ancien_hash = utilisateur.password_hash
+        nouveau_hash = None
+        if utilisateur.doit_rehacher_password():
+            utilisateur.set_password(mdp)
+            nouveau_hash = utilisateur.password_hash
+
+        token = creer_token(utilisateur.id, utilisateur.pseudo)
+
+        try:
+            session_id = SessionDAO().ouvrir_a_la_connexion(utilisateur.id, nouveau_hash)
+        except Exception as e:
+            logging.error("Ouverture de session impossible (id=%s) : %s", utilisateur.id, e)
+            utilisateur.password_hash = ancien_hash
+            session_id = None
+
+        logging.info(
+            "Connexion réussie pour pseudo=%r (id=%s, session=%s)",
+            utilisateur.pseudo,
+            utilisateur.id,
+            session_id,
+        )
+        return utilisateur, token, session_id
+
     def se_deconnecter(self, token: str) -> None:
         """
-        Déconnecte un utilisateur en invalidant son token.
+        Déconnecte un utilisateur en révoquant son token.
 
-        L'ajout du token dans la liste noire empêche toute utilisation
-        ultérieure de ce token pour accéder aux ressources protégées.
+        Le token est ajouté à la liste noire jusqu'à son expiration, ce qui
+        empêche toute utilisation ultérieure, y compris depuis un autre
+        processus lorsque la liste noire est en base. Un token déjà invalide
+        ou expiré n'a pas besoin d'être révoqué.
 
         Parameters
         ----------
@@ -87,18 +177,27 @@ class Auth_Service:
             Token de session à invalider
         """
         logging.debug("Demande de déconnexion pour token commençant par %r", token[:10])
-        self.tokens_invalides.add(token)
-        logging.info(
-            "Token ajouté à la liste noire (nb_tokens_invalides=%s)", len(self.tokens_invalides)
-        )
+        try:
+            claims = verif_token(token)
+        except Exception:
+            logging.info("Token déjà invalide ou expiré : rien à révoquer.")
+            return
+        expire_le = datetime.datetime.fromtimestamp(claims["exp"], tz=datetime.timezone.utc)
+        self.revocations.revoquer(self._cle_revocation(claims, token), expire_le)
+        CacheTokens().retirer(token)
+        logging.info("Token révoqué jusqu'au %s", expire_le.isoformat())
 
     def verifier_token(self, token: str) -> bool:
         """
         Vérifie la validité d'un token JWT.
 
         Un token est considéré valide si :
-        - il n'est pas dans la liste noire des tokens invalidés
         - sa signature et sa date d'expiration sont correctes
+        - il n'est pas dans la liste noire des tokens révoqués
+
+        La signature d'un token déjà vérifié n'est pas recalculée : ses claims
+        sont lus dans `CacheTokens` jusqu'à son expiration. La liste noire est
+        consultée à chaque appel.
 
         Parameters
         ----------
@@ -110,18 +209,18 @@ class Auth_Service:
         bool
             True si le token est valide et actif, False sinon
         """
-        logging.debug(
-            "Vérification du token (liste noire contient %s token(s))",
-            len(self.tokens_invalides),
-        )
-
-        if token in self.tokens_invalides:
+        cache = CacheTokens()
+        claims = cache.obtenir(token)
+        if claims is None:
+            try:
+                claims = verif_token(token)
+            except Exception:
+                logging.warning("Token invalide ou expiré.")
+                return False
+            cache.enregistrer(token, claims)
+        if self.revocations.est_revoque(self._cle_revocation(claims, token)):
             logging.info("Token rejeté : présent dans la liste noire.")
+            cache.retirer(token)
             return False
-        try:
-            verif_token(token)
-            logging.debug("Token valide et non expiré.")
-            return True
-        except Exception:
-            logging.warning("Token invalide ou expiré.")
-            return False
+        logging.debug("Token valide et non expiré.")
+        return True
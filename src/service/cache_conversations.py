@@ -0,0 +1,262 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Iterable
+
+from src.business_object.conversation import Conversation
+from src.business_object.echange import Echange
+from src.utils.config import obtenir_parametres
+from src.utils.singleton import Singleton
+
+
+class ContexteConversation:
+    """
+    Contexte d'une conversation gardé en mémoire pour la boucle de discussion.
+
+    Attributs
+    ---------
+    conversation : Conversation | None
+        Métadonnées de la conversation (titre, prompt, propriétaire...).
+    prompt_systeme : str | None
+        Texte du prompt système résolu.
+    echanges : deque[Echange] | None
+        Derniers messages, dans l'ordre chronologique (None si non chargés).
+    fil_complet : bool
+        True si `echanges` contient tout l'historique de la conversation.
+    """
+
+    def __init__(self, taille_fil: int):
+        self.conversation: Conversation | None = None
+        self.prompt_systeme: str | None = None
+        self.echanges: deque[Echange] | None = None
+        self.fil_complet = False
+        self.taille_fil = taille_fil
+        self.maj_le = time.monotonic()
+
+    @property
+    def dernier(self) -> Echange | None:
+        """Dernier message du fil en cache (None si le fil est vide ou non chargé)."""
+        return self.echanges[-1] if self.echanges else None
+
+
+class CacheConversations(metaclass=Singleton):
+    """
+    Cache des contextes de conversation (métadonnées, prompt système, fin du fil).
+
+    Le cache est alimenté à la lecture et mis à jour en écriture (write-through)
+    par `ConversationService` : ajout de messages, renommage, changement de
+    prompt. La suppression d'une conversation retire son entrée.
+
+    Les messages écrits par un autre processus (autre participant) ne passent
+    pas par ce cache : ils sont lus à partir du dernier message en cache avant
+    chaque appel au LLM, une entrée expire au bout de `DUREE_S` secondes, et
+    le fil est invalidé si le dernier message relevé à l'insertion n'est pas
+    celui du cache.
+    """
+
+    # Nombre maximal de conversations gardées en mémoire
+    NB_MAX_CONVERSATIONS = obtenir_parametres().cache_nb_conversations
+
+    # Nombre maximal de messages gardés par conversation
+    TAILLE_FIL = obtenir_parametres().cache_taille_fil
+
+    # Nombre maximal de messages d'un historique complet gardé en mémoire
+    TAILLE_FIL_COMPLET = obtenir_parametres().cache_taille_fil_complet
+
+    # Durée de vie d'une entrée, en secondes
+    DUREE_S = obtenir_parametres().cache_duree_conversations_s
+
+    def __init__(self):
+        self._entrees: OrderedDict[int, ContexteConversation] = OrderedDict()
+        self._verrou = threading.Lock()
+
+    # --------- Lecture ---------
+
+    def obtenir(self, id_conversation: int) -> ContexteConversation | None:
+        """
+        Retourne le contexte d'une conversation s'il est en cache et valide.
+
+        Parameters
+        ----------
+        id_conversation : int
+            Identifiant de la conversation.
+
+        Returns
+        -------
+        ContexteConversation | None
+        """
+        with self._verrou:
+            ctx = self._entrees.get(id_conversation)
+            if ctx is None:
+                return None
+            if time.monotonic() - ctx.maj_le > self.DUREE_S:
+                del self._entrees[id_conversation]
+                logging.debug("[CacheConversations] Entrée expirée (conv=%s)", id_conversation)
+                return None
+            self._entrees.move_to_end(id_conversation)
+            return ctx
+
+    def lire_fil(self, id_conversation: int, decalage: int, limite: int | None) -> list | None:
+        """
+        Lit une page du fil depuis le cache, si elle y est entièrement.
+
+        Parameters
+        ----------
+        id_conversation : int
+        decalage : int
+            Nombre de messages à ignorer depuis les plus récents.
+        limite : int | None
+            Nombre de messages voulus, None pour tout l'historique.
+
+        Returns
+        -------
+        list[Echange] | None
+            Les messages dans l'ordre chronologique, ou None si le cache ne
+            permet pas de répondre.
+        """
+        ctx = self.obtenir(id_conversation)
+        if ctx is None or ctx.echanges is None:
+            return None
+        echanges = list(ctx.echanges)
+        if limite is None:
+            return echanges if ctx.fil_complet and decalage == 0 else None
+        fin = len(echanges) - decalage
+        if fin < 0:
+            return [] if ctx.fil_complet else None
+        debut = fin - limite
+        if debut < 0 and not ctx.fil_complet:
+            return None
+        return echanges[max(0, debut) : fin]
+
+    # --------- Alimentation ---------
+
+    def _entree(self, id_conversation: int) -> ContexteConversation:
+        """Retourne (en la créant si besoin) l'entrée d'une conversation. Verrou requis."""
+        ctx = self._entrees.get(id_conversation)
+        if ctx is None:
+            ctx = ContexteConversation(self.TAILLE_FIL)
+            self._entrees[id_conversation] = ctx
+            while len(self._entrees) > self.NB_MAX_CONVERSATIONS:
+                self._entrees.popitem(last=False)
+        self._entrees.move_to_end(id_conversation)
+        return ctx
+
+    def enregistrer_metadonnees(
+        self, id_conversation: int, conversation: Conversation | None, prompt_systeme: str
+    ) -> None:
+        """
+        Enregistre les métadonnées et le prompt système d'une conversation.
+
+        Parameters
+        ----------
+        id_conversation : int
+        conversation : Conversation | None
+        prompt_systeme : str
+        """
+        with self._verrou:
+            ctx = self._entree(id_conversation)
+            ctx.conversation = conversation
+            ctx.prompt_systeme = prompt_systeme
+
+    def enregistrer_fil(
+        self, id_conversation: int, echanges: Iterable[Echange], complet: bool = False
+    ) -> None:
+        """
+        Enregistre la fin du fil lue en base.
+
+        Sans `complet`, le fil est gardé sur `TAILLE_FIL` messages et considéré
+        complet si moins de `TAILLE_FIL + 1` messages ont été lus (la lecture
+        se fait avec `limit=TAILLE_FIL + 1`).
+
+        Parameters
+        ----------
+        id_conversation : int
+        echanges : Iterable[Echange]
+            Messages dans l'ordre chronologique.
+        complet : bool, optional
+            True si `echanges` est tout l'historique (conversation plus longue
+            que `TAILLE_FIL`, lue pour le LLM) : il est gardé sur
+            `TAILLE_FIL_COMPLET` messages et complété ensuite, sans relecture,
+            tant qu'il ne dépasse pas cette taille.
+        """
+        echanges = list(echanges)
+        with self._verrou:
+            ctx = self._entree(id_conversation)
+            taille = max(ctx.taille_fil, self.TAILLE_FIL_COMPLET) if complet else ctx.taille_fil
+            ctx.echanges = deque(echanges, maxlen=taille)
+            ctx.fil_complet = len(echanges) <= taille
+            ctx.maj_le = time.monotonic()
+
+    # --------- Write-through ---------
+
+    def ajouter_echanges(
+        self, id_conversation: int, echanges: list[Echange], id_precedent: int | None
+    ) -> None:
+        """
+        Ajoute à la fin du fil des messages lus ou écrits en base.
+
+        Parameters
+        ----------
+        id_conversation : int
+        echanges : list[Echange]
+            Messages, dans l'ordre.
+        id_precedent : int | None
+            Identifiant du message qui précède `echanges` en base (None si la
+            conversation était vide). S'il diffère du dernier message en
+            cache, un autre processus a écrit dans la conversation et le fil
+            en cache est abandonné.
+        """
+        with self._verrou:
+            ctx = self._entrees.get(id_conversation)
+            if ctx is None or ctx.echanges is None:
+                return
+            dernier = ctx.dernier
+            id_cache = dernier.id if dernier is not None else None
+            if id_cache != id_precedent:
+                logging.info(
+                    "[CacheConversations] Fil désynchronisé (conv=%s, cache=%s, base=%s)",
+                    id_conversation,
+                    id_cache,
+                    id_precedent,
+                )
+                ctx.echanges = None
+                ctx.fil_complet = False
+                return
+            for e in echanges:
+                if len(ctx.echanges) == ctx.echanges.maxlen:
+                    ctx.fil_complet = False
+                ctx.echanges.append(e)
+            ctx.maj_le = time.monotonic()
+
+    def renommer(self, id_conversation: int, nouveau_titre: str) -> None:
+        """Met à jour le titre d'une conversation en cache."""
+        with self._verrou:
+            ctx = self._entrees.get(id_conversation)
+            if ctx is not None and ctx.conversation is not None:
+                ctx.conversation.nom = nouveau_titre
+
+    def changer_prompt(self, id_conversation: int, prompt_id: int | None, prompt_systeme: str) -> None:
+        """Met à jour le prompt (identifiant et texte) d'une conversation en cache."""
+        with self._verrou:
+            ctx = self._entrees.get(id_conversation)
+            if ctx is None:
+                return
+            if ctx.conversation is not None:
+                ctx.conversation.personnalisation = prompt_id
+            ctx.prompt_systeme = prompt_systeme
+
+    def invalider(self, id_conversation: int | None = None) -> None:
+        """
+        Retire une conversation du cache (ou vide tout le cache).
+
+        Parameters
+        ----------
+        id_conversation : int | None, optional
+            Conversation à retirer, by default None (tout le cache).
+        """
+        with self._verrou:
+            if id_conversation is None:
+                self._entrees.clear()
+            else:
+                self._entrees.pop(id_conversation, None)
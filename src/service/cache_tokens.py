@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+
+from src.utils.config import obtenir_parametres
+from src.utils.singleton import Singleton
+
+
+class CacheTokens(metaclass=Singleton):
+    """
+    Cache LRU des tokens JWT déjà vérifiés (token -> claims décodés).
+
+    Évite de recalculer la signature HS256 à chaque vérification d'un même
+    token. Une entrée est valable jusqu'à l'expiration (`exp`) du token et
+    est retirée à sa révocation. Le cache ne remplace pas la consultation de
+    la liste noire, qui reste faite à chaque vérification (un autre processus
+    peut avoir révoqué le token).
+    """
+
+    # Nombre maximal de tokens gardés en mémoire
+    NB_MAX_TOKENS = obtenir_parametres().cache_nb_tokens
+
+    def __init__(self):
+        self._entrees: OrderedDict[str, dict] = OrderedDict()
+        self._verrou = threading.Lock()
+        self.nb_trouves = 0
+        self.nb_manques = 0
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def obtenir(self, token: str) -> dict | None:
+        """
+        Retourne les claims d'un token déjà vérifié et non expiré.
+
+        Parameters
+        ----------
+        token : str
+
+        Returns
+        -------
+        dict | None
+            Claims décodés, ou None si le token n'est pas (ou plus) en cache.
+        """
+        with self._verrou:
+            claims = self._entrees.get(token)
+            if claims is not None and claims.get("exp", 0) <= time.time():
+                del self._entrees[token]
+                claims = None
+            if claims is None:
+                self.nb_manques += 1
+                return None
+            self._entrees.move_to_end(token)
+            self.nb_trouves += 1
+            return claims
+
+    def enregistrer(self, token: str, claims: dict) -> None:
+        """
+        Met en cache les claims d'un token dont la signature vient d'être vérifiée.
+
+        Parameters
+        ----------
+        token : str
+        claims : dict
+            Claims décodés (doivent contenir `exp`).
+        """
+        if "exp" not in claims:
+            return
+        with self._verrou:
+            self._entrees[token] = claims
+            self._entrees.move_to_end(token)
+            while len(self._entrees) > self.NB_MAX_TOKENS:
+                self._entrees.popitem(last=False)
+
+    def retirer(self, token: str) -> None:
+        """Retire un token du cache (révocation)."""
+        with self._verrou:
+            self._entrees.pop(token, None)
+
+    def vider(self) -> None:
+        """Vide le cache et remet les compteurs à zéro."""
+        with self._verrou:
+            self._entrees.clear()
+            self.nb_trouves = 0
+            self.nb_manques = 0
+
+    def metriques(self) -> dict:
+        """
+        Indicateurs d'efficacité du cache.
+
+        Returns
+        -------
+        dict
+            ``nb_trouves``, ``nb_manques``, ``taux_reussite`` (entre 0 et 1)
+            et ``taille`` (nombre d'entrées).
+        """
+        with self._verrou:
+            total = self.nb_trouves + self.nb_manques
+            return {
+                "nb_trouves": self.nb_trouves,
+                "nb_manques": self.nb_manques,
+                "taux_reussite": self.nb_trouves / total if total else 0.0,
+                "taille": len(self._entrees),
+            }
@@ -1,12 +1,18 @@
 import logging
+import time
 from datetime import datetime as Date
 from pathlib import Path
 from typing import List
 
+from src.business_object.apercu_conversation import ApercuConversation
 from src.business_object.conversation import Conversation
 from src.business_object.echange import Echange
+from src.client.metriques_llm import AppelLLM
 from src.dao.conversation_dao import ConversationDAO
 from src.dao.prompt_dao import PromptDAO
+from src.service.cache_conversations import CacheConversations
+from src.service.journal_appels_llm import JournalAppelsLLM
+from src.utils.traces import span
 
 
 class ErreurValidation(Exception):
@@ -115,32 +121,17 @@ class ConversationService:
             )
             return ConversationService.DEFAULT_SYSTEM_PROMPT
 
+        ctx = CacheConversations().obtenir(id_conversation)
+        if ctx is not None and ctx.prompt_systeme is not None:
+            return ctx.prompt_systeme
+
         try:
             conv = ConversationDAO.trouver_par_id(id_conv=id_conversation)
-            prompt_id = getattr(conv, "personnalisation", None)
-            if not prompt_id:
-                logging.debug(
-                    "Conversation %s sans personnalisation, utilisation du prompt par défaut.",
-                    id_conversation,
-                )
-                return ConversationService.DEFAULT_SYSTEM_PROMPT
-
-            from src.dao.prompt_dao import PromptDAO
-
-            txt = PromptDAO.obtenir_texte_prompt_par_id(prompt_id)
-            if txt:
-                logging.debug(
-                    "Prompt système personnalisé récupéré pour conv=%s (prompt_id=%s).",
-                    id_conversation,
-                    prompt_id,
-                )
-            else:
-                logging.debug(
-                    "Prompt_id=%s pour conv=%s sans texte, utilisation du prompt par défaut.",
-                    prompt_id,
-                    id_conversation,
-                )
-            return txt or ConversationService.DEFAULT_SYSTEM_PROMPT
+            txt = ConversationService._texte_prompt_systeme(
+                getattr(conv, "personnalisation", None), id_conversation
+            )
+            CacheConversations().enregistrer_metadonnees(id_conversation, conv, txt)
+            return txt
 
         except Exception as e:
             logging.warning(
@@ -150,6 +141,44 @@ class ConversationService:
             )
             return ConversationService.DEFAULT_SYSTEM_PROMPT
 
+    @staticmethod
+    def _texte_prompt_systeme(prompt_id: int | None, id_conversation: int | None = None) -> str:
+        """
+        Retourne le texte d'un prompt, ou le prompt par défaut s'il n'y en a pas.
+
+        Parameters
+        ----------
+        prompt_id : int | None
+            Identifiant du prompt de la conversation.
+        id_conversation : int | None, optional
+            Identifiant de la conversation (pour les logs).
+
+        Returns
+        -------
+        str
+        """
+        if not prompt_id:
+            logging.debug(
+                "Conversation %s sans personnalisation, utilisation du prompt par défaut.",
+                id_conversation,
+            )
+            return ConversationService.DEFAULT_SYSTEM_PROMPT
+
+        txt = PromptDAO.obtenir_texte_prompt_par_id(prompt_id)
+        if txt:
+            logging.debug(
+                "Prompt système personnalisé récupéré pour conv=%s (prompt_id=%s).",
+                id_conversation,
+                prompt_id,
+            )
+        else:
+            logging.debug(
+                "Prompt_id=%s pour conv=%s sans texte, utilisation du prompt par défaut.",
+                prompt_id,
+                id_conversation,
+            )
+        return txt or ConversationService.DEFAULT_SYSTEM_PROMPT
+
     @staticmethod
     def creer_conv(titre: str, personnalisation, id_proprietaire: int | None = None) -> str:
         """
@@ -299,6 +328,7 @@ class ConversationService:
         try:
             succes = ConversationDAO.renommer_conv(id_conversation, nouveau_titre)
             if succes:
+                CacheConversations().renommer(id_conversation, nouveau_titre)
                 logging.info("Conversation %s renommée en '%s'", id_conversation, nouveau_titre)
             else:
                 logging.warning("Aucune conversation trouvée pour id=%s", id_conversation)
@@ -345,6 +375,7 @@ class ConversationService:
             )
         try:
             succes = ConversationDAO.supprimer_conv(id_conv=id_conversation)
+            CacheConversations().invalider(id_conversation)
             if succes:
                 logging.info("Conversation %s supprimée avec succès", id_conversation)
             else:
@@ -418,6 +449,54 @@ class ConversationService:
             )
             raise
 
+    @staticmethod
+    def page_conversations(
+        id_utilisateur: int, limite: int = 20, decalage: int = 0
+    ) -> tuple[List[ApercuConversation], int]:
+        """
+        Une page des conversations d’un utilisateur, prête à afficher.
+
+        Chaque conversation est accompagnée de son dernier message, de son
+        nombre de messages et de participants, lus en une seule requête.
+
+        Parameters
+        ----------
+        id_utilisateur : int
+            Identifiant de l’utilisateur
+        limite : int
+            Nombre de conversations par page
+        decalage : int
+            Nombre de conversations à sauter (pages précédentes)
+
+        Returns
+        -------
+        tuple[List[ApercuConversation], int]
+            Les aperçus de la page et le nombre total de conversations
+
+        Raises
+        ------
+        ErreurValidation
+            Si id_utilisateur manquant, limite ou décalage invalide
+        """
+        if id_utilisateur is None:
+            raise ErreurValidation("L'identifiant de l'utilisateur est requis.")
+        if limite is None or limite < 1:
+            raise ErreurValidation("La limite doit être plus grande ou égale à 1.")
+        if decalage is None or decalage < 0:
+            raise ErreurValidation("Le décalage doit être positif ou nul.")
+
+        apercus, nb_total = ConversationDAO.page_conversations(
+            id_user=id_utilisateur, limite=limite, decalage=decalage
+        )
+        logging.info(
+            "Page de conversations pour utilisateur id=%s (decalage=%s, nb=%s, total=%s)",
+            id_utilisateur,
+            decalage,
+            len(apercus),
+            nb_total,
+        )
+        return apercus, nb_total
+
     def rechercher_conversations(
         id_utilisateur: int, mot_cle=None, date_recherche=None
     ) -> List["Conversation"]:
@@ -533,6 +612,13 @@ class ConversationService:
         else:
             limit = max(1, int(limite))
 
+        en_cache = CacheConversations().lire_fil(id_conversation, offset, limit)
+        if en_cache is not None:
+            logging.debug(
+                "Fil lu depuis le cache (conv=%s, nb_messages=%s)", id_conversation, len(en_cache)
+            )
+            return en_cache
+
         try:
             echanges = (
                 ConversationDAO.lire_echanges(id_conversation, offset=offset, limit=limit) or []
@@ -760,6 +846,12 @@ class ConversationService:
             print(prompt_id)
             succes = ConversationDAO.mettre_a_j_preprompt_id(id_conversation, prompt_id)
             if succes:
+                if CacheConversations().obtenir(id_conversation) is not None:
+                    CacheConversations().changer_prompt(
+                        id_conversation,
+                        prompt_id,
+                        ConversationService._texte_prompt_systeme(prompt_id, id_conversation),
+                    )
                 logging.info(
                     "Personnalisation mise à jour (prompt_id=%s) pour la conversation %s",
                     prompt_id,
@@ -807,14 +899,11 @@ class ConversationService:
             export_dir = Path("exports")
             export_dir.mkdir(parents=True, exist_ok=True)
 
-            # On récupère tous les échanges de la conversation
-            echanges = ConversationDAO.lire_echanges(
-                id_conversation,
-                offset=0,
-                limit=None,  # None = toute la conversation
-            )
+            # Tous les messages de la conversation, en colonnes : aucun Echange
+            # n'est construit pour l'export
+            lot = ConversationDAO.lire_lot_messages(id_conversation)
 
-            if not echanges:
+            if not len(lot):
                 logging.info(
                     "Export demandé pour conv=%s mais aucun échange trouvé.",
                     id_conversation,
@@ -823,15 +912,18 @@ class ConversationService:
             if format_ == "json":
                 import json
 
+                # Même contenu que json.dump(liste, indent=2), écrit message par message
                 filename = export_dir / f"conversation_{id_conversation}.json"
                 with filename.open("w", encoding="utf-8") as fichier:
-                    json.dump(
-                        [e.__dict__ for e in echanges],
-                        fichier,
-                        ensure_ascii=False,
-                        indent=2,
-                        default=str,
-                    )
+                    fichier.write("[")
+                    for i, d in enumerate(lot.en_dicts()):
+                        fichier.write(",\n  " if i else "\n  ")
+                        fichier.write(
+                            json.dumps(d, ensure_ascii=False, indent=2, default=str).replace(
+                                "\n", "\n  "
+                            )
+                        )
+                    fichier.write("\n]" if len(lot) else "]")
 
             elif format_ == "txt":
                 # On récupère les métadonnées de la conversation
@@ -859,23 +951,7 @@ class ConversationService:
                     fichier.write("\n" + "-" * 60 + "\n\n")
 
                     # Corps de la conversation
-                    for e in echanges:
-                        if hasattr(e, "afficher_echange"):
-                            ligne = e.afficher_echange()
-                        else:
-                            date_msg = getattr(e, "date_msg", None)
-                            agent_name = getattr(e, "agent_name", getattr(e, "agent", ""))
-                            message = getattr(e, "message", "")
-                            if date_msg is not None:
-                                try:
-                                    ligne = (
-                                        f"[{date_msg:%Y-%m-%d %H:%M:%S}] {agent_name}: {message}"
-                                    )
-                                except Exception:
-                                    ligne = f"{agent_name}: {message}"
-                            else:
-                                ligne = f"{agent_name}: {message}"
-
+                    for ligne in lot.lignes_texte():
                         fichier.write(ligne + "\n")
 
             logging.info(
@@ -893,17 +969,77 @@ class ConversationService:
             )
             raise
 
+    @staticmethod
+    def _historique_pour_llm(id_conversation: int) -> list:
+        """
+        Retourne tout l'historique d'une conversation, depuis le cache si possible.
+
+        Au premier appel, les `TAILLE_FIL + 1` derniers messages sont lus et mis
+        en cache ; si la conversation est plus longue, l'historique complet est
+        lu une fois et gardé en entier. Ensuite, seuls les messages postérieurs
+        au dernier message en cache (écrits par d'autres participants) sont lus
+        et ajoutés au cache, avant la construction du prompt.
+
+        Parameters
+        ----------
+        id_conversation : int
+
+        Returns
+        -------
+        list[Echange]
+            Messages dans l'ordre chronologique.
+        """
+        cache = CacheConversations()
+        ctx = cache.obtenir(id_conversation)
+        if ctx is not None and ctx.echanges is not None:
+            dernier = ctx.dernier
+            suivants = ConversationDAO.lire_echanges_apres(id_conversation, dernier)
+            if suivants:
+                logging.debug(
+                    "%s message(s) d'autres participants (conv=%s)", len(suivants), id_conversation
+                )
+                cache.ajouter_echanges(
+                    id_conversation, suivants, dernier.id if dernier is not None else None
+                )
+            echanges = cache.lire_fil(id_conversation, 0, None)
+            if echanges is not None:
+                return echanges
+        else:
+            derniers = ConversationDAO.lire_echanges(
+                id_conversation, offset=0, limit=cache.TAILLE_FIL + 1
+            ) or []
+            cache.enregistrer_fil(id_conversation, derniers)
+            if len(derniers) <= cache.TAILLE_FIL:
+                return list(derniers)
+
+        logging.debug("Conversation %s plus longue que le cache, lecture complète.", id_conversation)
+        echanges = ConversationDAO.lire_echanges(id_conversation, offset=0, limit=None) or []
+        cache.enregistrer_fil(id_conversation, echanges, complet=True)
+        return echanges
+
+    @staticmethod
+    def _mesures_appel(client) -> AppelLLM | None:
+        """Mesures du dernier appel du client LLM (None si le client n'en fournit pas)."""
+        appel = getattr(client, "dernier_appel", None)
+        return appel if isinstance(appel, AppelLLM) else None
+
     @staticmethod
     def demander_assistant(
         message: str,
         options=None,
         id_conversation: int | None = None,
         id_user: int | None = None,
+        pseudo: str | None = None,
     ):
         """
         Envoie un message à l’assistant (LLM) et reçoit une réponse.
         - Injecte un message 'system' en tête du history (non stocké en BDD).
         - Si id_conversation est fourni, charge l'historique et persiste les échanges.
+        - Le prompt système et l'historique sont servis par `CacheConversations` :
+          en régime établi, un tour coûte une lecture indexée des messages écrits
+          depuis par d'autres participants (souvent aucun), un INSERT (les deux
+          messages) et l'appel LLM ; la mesure de l'appel est écrite par lots
+          (`JournalAppelsLLM`).
         - id_user est recommandé pour satisfaire la contrainte BDD (utilisateur_id NOT NULL)
         lorsque emetteur='utilisateur'.
 
@@ -917,6 +1053,8 @@ class ConversationService:
             Identifiant de conversation pour historiser les échanges
         id_user : int | None
             Identifiant utilisateur (requis si persisté dans la BDD)
+        pseudo : str | None
+            Pseudo de l'utilisateur, affiché pour son message dans le fil en cache
 
         Returns
         -------
@@ -961,92 +1099,111 @@ class ConversationService:
             stop,
         )
 
-        # 1) Prompt système (non persisté en BDD)
-        try:
-            system_prompt = ConversationService._resoudre_prompt_systeme_pour_conv(id_conversation)
-        except Exception:
-            system_prompt = getattr(
-                ConversationService, "DEFAULT_SYSTEM_PROMPT", "Tu es un assistant utile."
-            )
-
-        # 2) Historique existant -> rôles LLM (user/assistant)
-        history = [{"role": "system", "content": system_prompt}]
-        if id_conversation:
+        with span("tour_chat", conversation_id=id_conversation) as tour:
+            # 1) Prompt système (non persisté en BDD)
             try:
-                anciens = ConversationDAO.lire_echanges(id_conversation, offset=0, limit=None) or []
-                for e in anciens:
-                    emet = (
-                        getattr(e, "expediteur", "")
-                        or getattr(e, "agent", "")
-                        or getattr(e, "emetteur", "")
-                    ).lower()
-                    role = "assistant" if emet in ("ia", "assistant") else "user"
-                    contenu = getattr(e, "message", getattr(e, "contenu", "")) or ""
-                    history.append({"role": role, "content": contenu})
-            except Exception as e:
-                logging.warning(
-                    "Impossible de récupérer l'historique (conv=%s) : %s", id_conversation, e
+                with span("prompt_systeme"):
+                    system_prompt = ConversationService._resoudre_prompt_systeme_pour_conv(
+                        id_conversation
+                    )
+            except Exception:
+                system_prompt = getattr(
+                    ConversationService, "DEFAULT_SYSTEM_PROMPT", "Tu es un assistant utile."
                 )
 
-        # 3) Ajoute le message utilisateur courant à l'historique d'appel LLM
-        history.append({"role": "user", "content": message})
+            # 2) Historique existant -> rôles LLM (user/assistant)
+            history = [{"role": "system", "content": system_prompt}]
+            if id_conversation:
+                try:
+                    with span("historique") as etape:
+                        anciens = ConversationService._historique_pour_llm(id_conversation)
+                        etape.ajouter(nb_messages=len(anciens))
+                    for e in anciens:
+                        emet = (e.emetteur or e.agent or "").lower()
+                        role = "assistant" if emet in ("ia", "assistant") else "user"
+                        contenu = e.message or ""
+                        history.append({"role": role, "content": contenu})
+                except Exception as e:
+                    logging.warning(
+                        "Impossible de récupérer l'historique (conv=%s) : %s", id_conversation, e
+                    )
 
-        logging.debug(
-            "Historique envoyé au LLM (conv=%r) : %s messages.",
-            id_conversation,
-            len(history),
-        )
+            # 3) Ajoute le message utilisateur courant à l'historique d'appel LLM
+            history.append({"role": "user", "content": message})
 
-        # 4) Appel LLM (le client attend une liste d'Echange(agent, message))
-        client = LLM_API()
-        reponse = client.generate(
-            history=[
-                Echange(agent=h["role"], message=h["content"], agent_name=None) for h in history
-            ],
-            temperature=temperature,
-            top_p=top_p,
-            max_tokens=max_tokens,
-            stop=stop,
-        )
+            logging.debug(
+                "Historique envoyé au LLM (conv=%r) : %s messages.",
+                id_conversation,
+                len(history),
+            )
 
-        # 5) Réponse pour la VUE (respecte le constructeur Echange)
-        echange_assistant_vue = Echange(
-            agent="assistant",
-            message=getattr(reponse, "message", str(reponse)),
-            agent_name="Assistant",
-            date_msg=Date.today(),
-        )
+            # 4) Appel LLM (le client attend une liste d'Echange(agent, message))
+            client = LLM_API()
+            debut_appel = time.perf_counter()
+            reponse = client.generate(
+                history=[
+                    Echange(agent=h["role"], message=h["content"], agent_name=None) for h in history
+                ],
+                temperature=temperature,
+                top_p=top_p,
+                max_tokens=max_tokens,
+                stop=stop,
+            )
+            latence_ms = int((time.perf_counter() - debut_appel) * 1000)
+            tour.ajouter(nb_messages_envoyes=len(history), latence_llm_ms=latence_ms)
+            with span("enregistrer_appel_llm"):
+                JournalAppelsLLM().ajouter(
+                    id_conversation, latence_ms, ConversationService._mesures_appel(client)
+                )
 
-        logging.debug(
-            "Réponse assistant générée (longueur message=%s caractères).",
-            len(echange_assistant_vue.message or ""),
-        )
+            # 5) Réponse pour la VUE (respecte le constructeur Echange)
+            echange_assistant_vue = Echange(
+                agent="assistant",
+                message=getattr(reponse, "message", str(reponse)),
+                agent_name="Assistant",
+                date_msg=Date.today(),
+            )
 
-        # 6) Persistance BDD (si id_conversation connu et méthode DAO présente)
-        if id_conversation and hasattr(ConversationDAO, "ajouter_echange"):
-            try:
-                # Message utilisateur à persister
-                e_user_db = Echange(agent="user", message=message)
-                # Attributs attendus par la DAO (emetteur/ contenu / utilisateur_id)
-                setattr(e_user_db, "emetteur", "utilisateur")
-                setattr(e_user_db, "contenu", message)
-                setattr(e_user_db, "utilisateur_id", id_user)  # requis si la BDD l'impose
-
-                # Message assistant à persister
-                e_assistant_db = Echange(agent="assistant", message=echange_assistant_vue.message)
-                setattr(e_assistant_db, "emetteur", "ia")
-                setattr(e_assistant_db, "contenu", echange_assistant_vue.message)
-                setattr(e_assistant_db, "utilisateur_id", None)
-
-                ConversationDAO.ajouter_echange(id_conversation, e_user_db)
-                ConversationDAO.ajouter_echange(id_conversation, e_assistant_db)
-            except Exception as e:
-                logging.warning(
-                    "Échec de la persistance des échanges (conv=%s) : %s", id_conversation, e
-                )
-        else:
-            logging.info(
-                "Historique non persisté (pas d'id_conversation ou DAO sans ajouter_echange)."
+            logging.debug(
+                "Réponse assistant générée (longueur message=%s caractères).",
+                len(echange_assistant_vue.message or ""),
             )
 
-        return echange_assistant_vue
+            # 6) Persistance BDD (si id_conversation connu et méthode DAO présente)
+            if id_conversation and hasattr(ConversationDAO, "ajouter_echanges"):
+                try:
+                    # Message utilisateur à persister (forme de ConversationDAO.lire_echanges)
+                    e_user_db = Echange(
+                        agent="utilisateur",
+                        message=message,
+                        agent_name=pseudo or "Utilisateur",
+                        emetteur="utilisateur",
+                        utilisateur_id=id_user,  # requis si la BDD l'impose
+                    )
+
+                    # Message assistant à persister
+                    e_assistant_db = Echange(
+                        agent="ia",
+                        message=echange_assistant_vue.message,
+                        agent_name="Assistant",
+                        emetteur="ia",
+                    )
+
+                    # Une seule requête pour les deux messages, puis mise à jour du cache
+                    nouveaux = [e_user_db, e_assistant_db]
+                    with span("ajouter_echanges"):
+                        id_precedent = ConversationDAO.ajouter_echanges(id_conversation, nouveaux)
+                        CacheConversations().ajouter_echanges(
+                            id_conversation, nouveaux, id_precedent
+                        )
+                except Exception as e:
+                    CacheConversations().invalider(id_conversation)
+                    logging.warning(
+                        "Échec de la persistance des échanges (conv=%s) : %s", id_conversation, e
+                    )
+            else:
+                logging.info(
+                    "Historique non persisté (pas d'id_conversation ou DAO sans ajouter_echange)."
+                )
+
+            return echange_assistant_vue
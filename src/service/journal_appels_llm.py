@@ -0,0 +1,88 @@
+import logging
+import threading
+import time
+
+from src.client.metriques_llm import AppelLLM
+from src.dao.statistiques_admin_dao import StatistiquesAdminDAO
+from src.utils.config import obtenir_parametres
+from src.utils.singleton import Singleton
+
+
+class JournalAppelsLLM(metaclass=Singleton):
+    """
+    Tampon des appels au LLM à enregistrer dans la table ``appels_llm``.
+
+    Un tour de chat ne fait pas d'écriture pour sa mesure : l'appel est gardé
+    en mémoire, puis les appels en attente sont insérés en une seule requête
+    dès qu'il y en a `TAILLE_LOT`, ou au premier appel suivant qui arrive
+    plus de `DELAI_S` secondes après le plus ancien. `vider` écrit le reste
+    (fermeture de l'application, statistiques à jour).
+
+    Les appels d'un lot dont l'écriture échoue sont perdus (la mesure n'est
+    pas indispensable) et comptés dans `nb_perdus`.
+    """
+
+    # Nombre d'appels déclenchant une écriture
+    TAILLE_LOT = obtenir_parametres().llm_journal_taille_lot
+
+    # Attente maximale d'un appel avant écriture, en secondes
+    DELAI_S = obtenir_parametres().llm_journal_delai_s
+
+    def __init__(self):
+        self._attente: list[tuple[int | None, int, AppelLLM | None]] = []
+        self._plus_ancien = 0.0
+        self._verrou = threading.Lock()
+        self.nb_perdus = 0
+
+    def __len__(self):
+        return len(self._attente)
+
+    def ajouter(
+        self, conversation_id: int | None, latence_ms: int, appel: AppelLLM | None = None
+    ) -> None:
+        """
+        Ajoute un appel au tampon, et écrit le lot s'il est plein ou trop ancien.
+
+        Parameters
+        ----------
+        conversation_id : int | None
+            Conversation concernée (None si l'appel est hors conversation).
+        latence_ms : int
+            Durée de l'appel, en millisecondes.
+        appel : AppelLLM | None, optional
+            Mesures du client (taille, jetons, statut, tentatives).
+        """
+        maintenant = time.monotonic()
+        with self._verrou:
+            if not self._attente:
+                self._plus_ancien = maintenant
+            self._attente.append((conversation_id, latence_ms, appel))
+            a_ecrire = (
+                len(self._attente) >= self.TAILLE_LOT
+                or maintenant - self._plus_ancien >= self.DELAI_S
+            )
+        if a_ecrire:
+            self.vider()
+
+    def vider(self) -> int:
+        """
+        Écrit tous les appels en attente.
+
+        Returns
+        -------
+        int
+            Nombre d'appels écrits (0 si aucun, ou si l'écriture a échoué).
+        """
+        with self._verrou:
+            lot, self._attente = self._attente, []
+        if not lot:
+            return 0
+        try:
+            StatistiquesAdminDAO.enregistrer_appels_llm(lot)
+        except Exception as e:
+            with self._verrou:
+                self.nb_perdus += len(lot)
+            logging.warning("%s appel(s) LLM non enregistré(s) : %s", len(lot), e)
+            return 0
+        logging.debug("%s appel(s) LLM enregistré(s)", len(lot))
+        return len(lot)
@@ -0,0 +1,140 @@
+import datetime
+import heapq
+import logging
+import threading
+import time
+
+from src.dao.token_revoque_dao import TokenRevoqueDAO
+from src.utils.config import obtenir_parametres
+
+
+class RevocationMemoire:
+    """
+    Liste noire des tokens en mémoire (un seul processus).
+
+    Les entrées sont indexées par `jti` (recherche en O(1)) et oubliées à
+    l'expiration du token : un tas trié par date d'expiration permet de purger
+    les entrées expirées à chaque révocation, sans parcourir tout le dictionnaire.
+    """
+
+    def __init__(self):
+        self._expirations: dict[str, float] = {}
+        self._tas: list[tuple[float, str]] = []
+        self._verrou = threading.Lock()
+
+    def __len__(self):
+        return len(self._expirations)
+
+    def _purger(self, maintenant: float) -> None:
+        """Retire les entrées expirées. Verrou requis."""
+        while self._tas and self._tas[0][0] <= maintenant:
+            exp, jti = heapq.heappop(self._tas)
+            if self._expirations.get(jti) == exp:
+                del self._expirations[jti]
+
+    def revoquer(self, jti: str, expire_le: datetime.datetime) -> bool:
+        """
+        Révoque un token jusqu'à son expiration.
+
+        Parameters
+        ----------
+        jti : str
+            Identifiant du token.
+        expire_le : datetime.datetime
+            Date d'expiration du token (timezone-aware).
+
+        Returns
+        -------
+        bool
+            True si le token vient d'être révoqué, False s'il l'était déjà.
+        """
+        exp = expire_le.timestamp()
+        with self._verrou:
+            maintenant = time.time()
+            self._purger(maintenant)
+            if exp <= maintenant or jti in self._expirations:
+                return False
+            self._expirations[jti] = exp
+            heapq.heappush(self._tas, (exp, jti))
+            return True
+
+    def est_revoque(self, jti: str) -> bool:
+        """True si le token est révoqué et pas encore expiré."""
+        exp = self._expirations.get(jti)
+        return exp is not None and exp > time.time()
+
+    def vider(self) -> None:
+        """Oublie toutes les révocations."""
+        with self._verrou:
+            self._expirations.clear()
+            self._tas.clear()
+
+
+class RevocationPostgres:
+    """
+    Liste noire des tokens en base (table ``tokens_revoques``).
+
+    Partagée par tous les processus de l'application et conservée au
+    redémarrage. La recherche se fait sur la clé primaire `jti`.
+    """
+
+    def revoquer(self, jti: str, expire_le: datetime.datetime) -> bool:
+        """Voir `RevocationMemoire.revoquer`."""
+        return TokenRevoqueDAO.revoquer(jti, expire_le)
+
+    def est_revoque(self, jti: str) -> bool:
+        """Voir `RevocationMemoire.est_revoque`."""
+        return TokenRevoqueDAO.est_revoque(jti)
+
+
+_STOCKAGES = {"memoire": RevocationMemoire, "postgres": RevocationPostgres}
+
+
+def creer_revocation(stockage: str | None = None):
+    """
+    Construit une liste noire de tokens.
+
+    Parameters
+    ----------
+    stockage : str | None, optional
+        ``memoire`` ou ``postgres``, by default None (variable d'environnement
+        ``REVOCATION_TOKENS``, ``postgres`` si absente).
+
+    Returns
+    -------
+    RevocationMemoire | RevocationPostgres
+
+    Raises
+    ------
+    ValueError
+        Si le type de stockage est inconnu.
+    """
+    stockage = (stockage or obtenir_parametres().revocation_tokens).lower()
+    if stockage not in _STOCKAGES:
+        raise ValueError(f"Stockage de révocation inconnu : {stockage!r}")
+    return _STOCKAGES[stockage]()
+
+
+_revocation = None
+
+
+def obtenir_revocation():
+    """Retourne la liste noire partagée par le processus (créée au premier appel)."""
+    global _revocation
+    if _revocation is None:
+        _revocation = creer_revocation()
+        logging.info("[revocation_tokens] Stockage : %s", type(_revocation).__name__)
+    return _revocation
+
+
+def configurer_revocation(revocation) -> None:
+    """
+    Remplace la liste noire partagée (tests, changement de stockage).
+
+    Parameters
+    ----------
+    revocation : RevocationMemoire | RevocationPostgres | None
+        None pour revenir à la configuration de l'environnement.
+    """
+    global _revocation
+    _revocation = revocation
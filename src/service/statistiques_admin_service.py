@@ -0,0 +1,165 @@
+import datetime
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from src.business_object.statistiques import Statistiques
+from src.dao.statistiques_admin_dao import StatistiquesAdminDAO
+from src.service.journal_appels_llm import JournalAppelsLLM
+
+
+def _stats_tranche(ids_utilisateurs: list[int]) -> Statistiques:
+    """Calcul d'une tranche (exécuté dans un processus du pool)."""
+    return StatistiquesAdminDAO.stats_tranche(ids_utilisateurs)
+
+
+class StatistiquesAdmin_Service:
+    """
+    Service d'analyse globale (tous utilisateurs), destiné à l'administration.
+    """
+
+    # Nombre d'utilisateurs par tranche pour le calcul en parallèle
+    TAILLE_TRANCHE = 500
+
+    def __init__(self):
+        self.dao = StatistiquesAdminDAO()
+
+    def utilisateurs_actifs_par_jour(
+        self, debut: datetime.date | None = None, fin: datetime.date | None = None
+    ) -> list[tuple[datetime.date, int]]:
+        """
+        Nombre d'utilisateurs actifs par jour.
+
+        Parameters
+        ----------
+        debut : datetime.date | None, optional
+            Premier jour inclus (par défaut 30 jours avant `fin`).
+        fin : datetime.date | None, optional
+            Dernier jour inclus (par défaut aujourd'hui).
+
+        Returns
+        -------
+        list[tuple[datetime.date, int]]
+            Paires (jour, nombre d'utilisateurs actifs).
+
+        Raises
+        ------
+        ValueError
+            Si `debut` est postérieur à `fin`.
+        """
+        fin = fin or datetime.date.today()
+        debut = debut or fin - datetime.timedelta(days=30)
+        if debut > fin:
+            raise ValueError(f"Période invalide : {debut} > {fin}")
+        return self.dao.utilisateurs_actifs_par_jour(debut, fin)
+
+    def messages_par_prompt(self) -> list[dict]:
+        """
+        Volume de messages et de conversations par profil de prompt.
+
+        Returns
+        -------
+        list[dict]
+            Voir `StatistiquesAdminDAO.messages_par_prompt`.
+        """
+        return self.dao.messages_par_prompt()
+
+    def longueur_moyenne_conversations(self) -> float:
+        """
+        Nombre moyen de messages par conversation.
+
+        Returns
+        -------
+        float
+        """
+        return self.dao.longueur_moyenne_conversations()
+
+    def percentiles_latence_llm(
+        self, percentiles: tuple[float, ...] | None = None
+    ) -> dict[float, float]:
+        """
+        Percentiles de latence des appels au LLM, en millisecondes.
+
+        Parameters
+        ----------
+        percentiles : tuple[float, ...] | None, optional
+            Percentiles voulus entre 0 et 1.
+
+        Returns
+        -------
+        dict[float, float]
+
+        Raises
+        ------
+        ValueError
+            Si un percentile n'est pas compris entre 0 et 1.
+        """
+        if percentiles and any(not 0 <= p <= 1 for p in percentiles):
+            raise ValueError(f"Percentiles invalides : {percentiles!r}")
+        JournalAppelsLLM().vider()
+        return self.dao.percentiles_latence_llm(percentiles)
+
+    def couts_llm_par_conversation(self, limite: int = 10) -> list[dict]:
+        """
+        Conversations qui cumulent le plus de temps d'appel au LLM.
+
+        Parameters
+        ----------
+        limite : int, optional
+            Nombre de conversations retournées, by default 10.
+
+        Returns
+        -------
+        list[dict]
+            Voir `StatistiquesAdminDAO.couts_llm_par_conversation`.
+
+        Raises
+        ------
+        ValueError
+            Si `limite` n'est pas strictement positive.
+        """
+        if limite <= 0:
+            raise ValueError(f"Limite invalide : {limite!r}")
+        JournalAppelsLLM().vider()
+        return self.dao.couts_llm_par_conversation(limite)
+
+    def stats_tous_utilisateurs(self, nb_processus: int | None = None) -> Statistiques:
+        """
+        Statistiques cumulées de tous les utilisateurs.
+
+        Les utilisateurs sont découpés en tranches de `TAILLE_TRANCHE` ; chaque
+        tranche est agrégée en SQL dans un processus du pool, puis les résultats
+        partiels sont combinés avec `Statistiques.agreger`.
+
+        Les processus sont lancés par ``spawn`` et non copiés (``fork``) : ils
+        n'héritent ni de la connexion du parent, dont la fermeture dans un
+        enfant couperait la session du parent, ni de ses threads. Chacun ouvre
+        sa propre connexion.
+
+        Parameters
+        ----------
+        nb_processus : int | None, optional
+            Nombre de processus du pool. 1 (ou une seule tranche) : calcul
+            séquentiel dans le processus courant.
+
+        Returns
+        -------
+        Statistiques
+        """
+        ids = self.dao.lister_ids_utilisateurs()
+        tranches = [
+            ids[i : i + self.TAILLE_TRANCHE] for i in range(0, len(ids), self.TAILLE_TRANCHE)
+        ]
+        logging.info(
+            "[StatistiquesAdmin_Service] %s utilisateur(s) répartis en %s tranche(s)",
+            len(ids),
+            len(tranches),
+        )
+
+        if nb_processus == 1 or len(tranches) <= 1:
+            return Statistiques.agreger(_stats_tranche(t) for t in tranches)
+
+        with ProcessPoolExecutor(
+            max_workers=nb_processus, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            return Statistiques.agreger(pool.map(_stats_tranche, tranches))
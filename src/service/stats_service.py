@@ -1,7 +1,7 @@
 import logging
 
 from src.business_object.statistiques import Statistiques
-from src.dao.conversation_dao import ConversationDAO
+from src.dao.conversation_dao import ConversationDAO, ErreurAucuneConversation
 from src.dao.utilisateur_dao import UtilisateurDao
 
 
@@ -10,6 +10,8 @@ class Statistiques_Service:
     Service pour gérer les statistiques des utilisateurs et des conversations
     """
 
+    NB_SUJETS = 10
+
     def __init__(self):
         self.conv_dao = ConversationDAO()
         self.user_dao = UtilisateurDao()
@@ -21,7 +23,8 @@ class Statistiques_Service:
         Calcule:
           - nb_conversations : len(lister_conversations(id_user))
           - nb_messages      : somme(len(lire_echanges(conv.id))) sur ses conversations
-          - sujets_plus_frequents : titres/nom des conversations (approx)
+          - sujets_plus_frequents : mots-clés les plus fréquents des titres
+            (lus dans l'index des sujets, sans recharger les conversations)
           - heures_utilisation : 0.0 (pas d'implémentation directe ici)
 
         Parameters
@@ -58,15 +61,17 @@ class Statistiques_Service:
         )
         stats.incrementer_messages(nb_msgs)
 
-        # 3) Top sujet :
-        convs = self.conv_dao.lister_conversations(id_user) or []
-        titres = [c.nom for c in convs if c.nom]
+        # 3) Top sujets (index des mots-clés tenu à jour par le DAO) :
+        try:
+            sujets = self.conv_dao.sujets_plus_frequents(id_user, k=self.NB_SUJETS)
+        except ErreurAucuneConversation:
+            sujets = []
         logging.debug(
-            "[Statistiques_Service] Utilisateur %s : %s titre(s) de conversation récupérés.",
+            "[Statistiques_Service] Utilisateur %s : %s sujet(s) récupérés.",
             id_user,
-            len(titres),
+            len(sujets),
         )
-        stats.ajouter_sujets(titres)
+        stats.ajouter_comptes_sujets(sujets)
 
         # 4) Heures d'utilisation (en incluant la session en cours)
         heures = float(self.user_dao.heures_utilisation_incl_courante(id_user))
@@ -88,22 +93,51 @@ class Statistiques_Service:
 
         return stats
 
-    # Inutile ou à repenser
-    #
-    # def stats_conversation(self, id_conv: int) -> Statistiques:
-    #     """
-    #     Retourne les statistiques liées à une conversation donnée
-    #
-    #     Calcule:
-    #         - Nb de message
-    #         - ?
-    #
-    #     Parameters
-    #     ----------
-    #     id_conv : int
-    #         Identifiant de la conversation
-    #
-    #     Returns
-    #     -------
-    #     Statistiques
-    #     """
+    def sujets_globaux(self, k: int = 10, source: str = "titres") -> list[tuple[str, int]]:
+        """
+        Retourne les sujets les plus fréquents sur l'ensemble des utilisateurs.
+
+        Parameters
+        ----------
+        k : int, optional
+            Nombre de sujets à retourner.
+        source : str, optional
+            "titres" (titres des conversations) ou "messages" (messages des utilisateurs).
+
+        Returns
+        -------
+        list[tuple[str, int]]
+            Paires (sujet, nombre d'occurrences).
+        """
+        logging.debug("[Statistiques_Service] Sujets globaux (k=%s, source=%r)", k, source)
+        return self.conv_dao.sujets_globaux(source=source, k=k)
+
+    def stats_conversation(self, id_conv: int) -> dict:
+        """
+        Retourne les statistiques liées à une conversation donnée
+
+        Les messages sont lus en colonnes (`LotMessages`) et agrégés sans
+        construire d'objet par message.
+
+        Parameters
+        ----------
+        id_conv : int
+            Identifiant de la conversation
+
+        Returns
+        -------
+        dict
+            ``nb_messages``, ``par_emetteur`` (messages par émetteur),
+            ``longueur_moyenne`` (en caractères), ``par_jour`` (paires
+            (jour, nombre de messages)) et ``periode`` (dates du premier et
+            du dernier message, ou None).
+        """
+        logging.debug("[Statistiques_Service] Calcul stats_conversation pour id_conv=%r", id_conv)
+        lot = self.conv_dao.lire_lot_messages(id_conv)
+        return {
+            "nb_messages": len(lot),
+            "par_emetteur": lot.compter_par_emetteur(),
+            "longueur_moyenne": lot.longueur_moyenne(),
+            "par_jour": lot.compter_par_jour(),
+            "periode": lot.periode(),
+        }
@@ -0,0 +1,106 @@
+import logging
+import threading
+
+from src.dao.db_connection import DBConnection
+from src.dao.session_dao import SessionDAO
+from src.utils.config import obtenir_parametres
+from src.utils.singleton import Singleton
+
+
+class SurveillanceSessions(metaclass=Singleton):
+    """
+    Tâche de fond de suivi des sessions.
+
+    À chaque cycle, un thread démon :
+    - envoie un signe de vie pour les sessions ouvertes par ce processus ;
+    - ferme, en une requête, les sessions de tous les clients restés sans
+      signe de vie depuis `DELAI_INACTIVITE_S` (client arrêté brutalement).
+
+    Le thread utilise sa propre connexion à la base, pour ne pas valider les
+    transactions en cours du fil principal.
+    """
+
+    # Intervalle entre deux cycles, en secondes
+    INTERVALLE_S = obtenir_parametres().sessions_intervalle_s
+
+    # Inactivité au-delà de laquelle une session est considérée abandonnée
+    DELAI_INACTIVITE_S = obtenir_parametres().sessions_delai_inactivite_s
+
+    def __init__(self):
+        self._sessions: set[int] = set()
+        self._verrou = threading.Lock()
+        self._arret = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def suivre(self, session_id: int) -> None:
+        """Ajoute une session ouverte par ce processus aux signes de vie."""
+        with self._verrou:
+            self._sessions.add(session_id)
+
+    def oublier(self, session_id: int) -> None:
+        """Retire une session (fermée) des signes de vie."""
+        with self._verrou:
+            self._sessions.discard(session_id)
+
+    def cycle(self, connexion=None) -> tuple[int, int]:
+        """
+        Exécute un cycle : signes de vie puis fermeture des sessions inactives.
+
+        Parameters
+        ----------
+        connexion : optional
+            Connexion à utiliser, par défaut la connexion partagée.
+
+        Returns
+        -------
+        tuple[int, int]
+            (sessions signalées, sessions inactives fermées)
+        """
+        with self._verrou:
+            ids = list(self._sessions)
+        dao = SessionDAO()
+        nb_signales = dao.signaler(ids, connexion) if ids else 0
+        nb_fermees = dao.fermer_sessions_inactives(self.DELAI_INACTIVITE_S, connexion)
+        logging.debug(
+            "[SurveillanceSessions] Cycle : %s signal(s), %s session(s) inactive(s) fermée(s)",
+            nb_signales,
+            nb_fermees,
+        )
+        return nb_signales, nb_fermees
+
+    def _boucle(self) -> None:
+        connexion = None
+        try:
+            while not self._arret.wait(self.INTERVALLE_S):
+                try:
+                    if connexion is None or connexion.closed:
+                        connexion = DBConnection.ouvrir_connexion()
+                    self.cycle(connexion)
+                except Exception:
+                    logging.exception("[SurveillanceSessions] Échec du cycle")
+        finally:
+            if connexion is not None and not connexion.closed:
+                connexion.close()
+
+    def demarrer(self) -> None:
+        """Démarre le thread de suivi (sans effet s'il tourne déjà)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._arret.clear()
+        self._thread = threading.Thread(
+            target=self._boucle, name="surveillance-sessions", daemon=True
+        )
+        self._thread.start()
+        logging.info(
+            "[SurveillanceSessions] Démarrée (intervalle=%ss, délai d'inactivité=%ss)",
+            self.INTERVALLE_S,
+            self.DELAI_INACTIVITE_S,
+        )
+
+    def arreter(self, attente_s: float = 5.0) -> None:
+        """Arrête le thread de suivi et attend sa fin."""
+        self._arret.set()
+        if self._thread is not None:
+            self._thread.join(attente_s)
+            self._thread = None
+        logging.info("[SurveillanceSessions] Arrêtée")
@@ -3,7 +3,7 @@ import logging
 from src.business_object.utilisateur import Utilisateur
 from src.dao.utilisateur_dao import UtilisateurDao
 from src.utils.log_decorator import log
-from src.utils.securite import hash_password
+from src.utils.securite import hacher_mot_de_passe
 
 
 class UtilisateurService:
@@ -107,7 +107,7 @@ class UtilisateurService:
             logging.info("Échec création compte : pseudo déjà utilisé (%r).", pseudo_n)
             return None
 
-        user = Utilisateur(id=None, pseudo=pseudo_n, password_hash=hash_password(mdp, pseudo_n))
+        user = Utilisateur(id=None, pseudo=pseudo_n, password_hash=hacher_mot_de_passe(mdp))
         created = UtilisateurDao().creer_utilisateur(user)
 
         if isinstance(created, Utilisateur):
@@ -227,6 +227,46 @@ class UtilisateurService:
         logging.debug("Vérification pseudo déjà utilisé (%r) -> %s", pseudo_n, existe)
         return existe
 
+    @staticmethod
+    def rehacher_si_necessaire(
+        utilisateur: Utilisateur, mdp: str, dao: UtilisateurDao | None = None
+    ) -> bool:
+        """
+        Ré-hache le mot de passe d'un utilisateur qui vient de s'authentifier,
+        si son hash est dans un ancien format ou avec un autre coût.
+
+        Un échec de l'enregistrement est journalisé mais n'empêche pas la
+        connexion : le ré-hachage sera retenté à la connexion suivante.
+
+        Parameters:
+        -----------
+        utilisateur : Utilisateur
+            L'utilisateur authentifié.
+        mdp : str
+            Le mot de passe en clair qui vient d'être vérifié.
+        dao : UtilisateurDao | None
+            DAO à utiliser (par défaut l'instance partagée).
+
+        Returns:
+        --------
+        bool
+            True si un nouveau hash a été enregistré.
+        """
+        if not utilisateur.doit_rehacher_password():
+            return False
+        ancien_hash = utilisateur.password_hash
+        utilisateur.set_password(mdp)
+        try:
+            ok = (dao or UtilisateurDao()).modifier_mot_de_passe(utilisateur)
+        except Exception as e:
+            logging.warning("Ré-hachage non enregistré (id=%s) : %s", utilisateur.id, e)
+            ok = False
+        if not ok:
+            utilisateur.password_hash = ancien_hash
+            return False
+        logging.info("Mot de passe ré-haché (id=%s).", utilisateur.id)
+        return True
+
     @log
     def se_connecter(self, pseudo: str, mdp: str) -> Utilisateur | None:
         """
@@ -262,6 +302,7 @@ class UtilisateurService:
 
         if u.verifier_password(mdp):
             logging.info("Connexion réussie pour pseudo=%r (id=%s).", u.pseudo, u.id)
+            self.rehacher_si_necessaire(u, mdp)
             return u
 
         logging.info("Connexion échouée : mot de passe incorrect pour pseudo=%r.", pseudo_n)
@@ -0,0 +1,24 @@
+from src.business_object.apercu_conversation import ApercuConversation
+from src.business_object.conversation import Conversation
+from src.business_object.echange import Echange
+
+
+def test_afficher_apercu_sans_message():
+    """Conversation vide : titre et compteurs seulement."""
+    apercu = ApercuConversation(Conversation(nom="Révisions", id=4), 0, 1)
+
+    assert apercu.afficher_apercu() == "[4] Révisions — 0 message(s), 1 participant(s)"
+
+
+def test_afficher_apercu_tronque_le_dernier_message():
+    """Le dernier message est ramené sur une ligne et tronqué."""
+    dernier = Echange(
+        message="Bonjour,\nvoici   une question assez longue", agent="ia", agent_name="Assistant"
+    )
+    apercu = ApercuConversation(Conversation(nom="Révisions", id=4), 12, 3, dernier)
+
+    texte = apercu.afficher_apercu(longueur=20)
+
+    assert texte.startswith("[4] Révisions — 12 message(s), 3 participant(s) — Assistant : ")
+    assert texte.endswith("Bonjour, voici une…")
+    assert "\n" not in texte
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+import pytest
+
+from src.business_object.conversation import Conversation
+from src.business_object.echange import Echange
+
+
+def test_conversation_attributs_declares():
+    """Pas de __dict__ : un attribut non déclaré est refusé."""
+    conv = Conversation(nom="Révisions", id=1, proprietaire_id=7)
+
+    assert not hasattr(conv, "__dict__")
+    with pytest.raises(AttributeError):
+        conv.titre = "Révisions"
+
+
+def test_conversation_en_dict_avec_echanges():
+    """en_dict convertit aussi les échanges de la conversation."""
+    date = datetime(2025, 7, 21)
+    conv = Conversation(nom="Révisions", id=1, date_creation=date, proprietaire_id=7)
+    conv.ajouter_echange(Echange(message="Bonjour", id=10, date_msg=date))
+    conv.ajouter_participant(7)
+
+    d = conv.en_dict()
+
+    assert d["nom"] == "Révisions"
+    assert d["participants"] == [7]
+    assert d["echanges"][0]["message"] == "Bonjour"
+    assert d["echanges"][0]["id"] == 10
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+import pytest
+
+from src.business_object.echange import Echange
+
+
+def test_echange_attributs_declares():
+    """Pas de __dict__ : un attribut non déclaré est refusé."""
+    # GIVEN
+    e = Echange(message="Bonjour", agent="utilisateur", emetteur="utilisateur", utilisateur_id=7)
+
+    # THEN
+    assert not hasattr(e, "__dict__")
+    assert (e.emetteur, e.utilisateur_id) == ("utilisateur", 7)
+    with pytest.raises(AttributeError):
+        e.expediteur = "utilisateur"
+
+
+def test_echange_contenu_alias_de_message():
+    """`contenu` (nom de la colonne en base) lit et écrit `message`."""
+    e = Echange(message="avant")
+
+    e.contenu = "après"
+
+    assert e.message == "après"
+    assert e.contenu == "après"
+
+
+def test_echange_en_dict():
+    """en_dict renvoie tous les champs déclarés (export JSON)."""
+    date = datetime(2025, 7, 21, 10, 30)
+    e = Echange(message="Salut", agent="ia", agent_name="Assistant", id=3, date_msg=date)
+
+    assert e.en_dict() == {
+        "id": 3,
+        "agent": "ia",
+        "message": "Salut",
+        "agent_name": "Assistant",
+        "date_msg": date,
+        "emetteur": None,
+        "utilisateur_id": None,
+    }
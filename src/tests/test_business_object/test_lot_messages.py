@@ -0,0 +1,114 @@
+import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from src.business_object.echange import Echange
+from src.business_object.lot_messages import LotMessages
+
+PARIS = ZoneInfo("Europe/Paris")
+
+
+def _us(*args, tz=datetime.timezone.utc) -> int:
+    """Microsecondes depuis l'epoch d'une date."""
+    d = datetime.datetime(*args, tzinfo=tz)
+    return int(d.timestamp()) * 1_000_000
+
+
+@pytest.fixture
+def lot():
+    """Deux conversations, trois messages (heures de Paris)."""
+    lot = LotMessages(fuseau=PARIS)
+    lot.ajouter(1, 2, _us(2025, 7, 21, 23, 30, tz=PARIS), "utilisateur", "Bonjour", 7, "alice")
+    lot.ajouter(2, 2, _us(2025, 7, 22, 0, 30, tz=PARIS), "ia", "Salut, que veux-tu ?")
+    lot.ajouter(3, 5, _us(2025, 7, 22, 9, 0, tz=PARIS), "utilisateur", "", 8)
+    return lot
+
+
+def test_depuis_lignes_colonnes():
+    """Les lignes de curseur sont versées dans les colonnes."""
+    lignes = [
+        {
+            "id": 10,
+            "conversation_id": 2,
+            "horodatage_us": _us(2025, 7, 21, 10, 0),
+            "emetteur": "utilisateur",
+            "contenu": "abc",
+            "utilisateur_id": 7,
+            "utilisateur_pseudo": "alice",
+        },
+        {
+            "id": 11,
+            "conversation_id": 2,
+            "horodatage_us": _us(2025, 7, 21, 10, 1),
+            "emetteur": "ia",
+            "contenu": "de",
+            "utilisateur_id": None,
+            "utilisateur_pseudo": None,
+        },
+    ]
+
+    lot = LotMessages.depuis_lignes(iter(lignes))
+
+    assert list(lot.ids) == [10, 11]
+    assert list(lot.emetteurs) == [0, 1]
+    assert list(lot.utilisateur_ids) == [7, LotMessages.SANS_UTILISATEUR]
+    assert list(lot.debuts) == [0, 3, 5]
+    assert lot.pseudos == {7: "alice"}
+    assert [lot.texte(0), lot.texte(1)] == ["abc", "de"]
+
+
+def test_acces_echange_a_la_demande(lot):
+    """lot[i] construit un Echange équivalent à celui de lire_echanges."""
+    e = lot[0]
+
+    assert isinstance(e, Echange)
+    assert (e.id, e.emetteur, e.agent, e.utilisateur_id) == (1, "utilisateur", "utilisateur", 7)
+    assert e.message == "Bonjour"
+    assert e.agent_name == "alice"
+    assert e.date_msg == datetime.datetime(2025, 7, 21, 23, 30, tzinfo=PARIS)
+    assert lot[-2].agent_name == "Assistant"
+    assert lot[-2].utilisateur_id is None
+    assert [m.id for m in lot] == [1, 2, 3]
+    with pytest.raises(IndexError):
+        lot[3]
+
+
+def test_agregats(lot):
+    """Agrégats calculés sur les colonnes."""
+    assert len(lot) == 3
+    assert list(lot.longueurs()) == [7, 20, 0]
+    assert lot.longueur_moyenne() == pytest.approx(9.0)
+    assert lot.compter_par_emetteur() == {"utilisateur": 2, "ia": 1}
+    assert lot.compter_par_conversation() == {2: 2, 5: 1}
+
+
+def test_compter_par_jour_dans_le_fuseau(lot):
+    """Le jour est celui du fuseau du lot (23h30 à Paris reste le 21, en UTC c'est 21h30)."""
+    assert lot.compter_par_jour() == [
+        (datetime.date(2025, 7, 21), 1),
+        (datetime.date(2025, 7, 22), 2),
+    ]
+    debut, fin = lot.periode()
+    assert debut.hour == 23 and fin.hour == 9
+
+
+def test_lot_vide():
+    lot = LotMessages()
+
+    assert len(lot) == 0
+    assert lot.longueur_moyenne() == 0.0
+    assert lot.periode() is None
+    assert lot.compter_par_jour() == []
+    assert list(lot.en_dicts()) == []
+
+
+def test_exports_identiques_a_echange(lot):
+    """en_dicts et lignes_texte produisent le rendu de Echange, sans Echange."""
+    assert list(lot.en_dicts()) == [e.en_dict() for e in lot]
+    assert list(lot.lignes_texte()) == [e.afficher_echange() for e in lot]
+
+
+def test_emetteur_invalide():
+    with pytest.raises(ValueError, match="emetteur invalide"):
+        LotMessages().ajouter(1, 1, 0, "robot", "x")
@@ -444,6 +444,39 @@ class TestStatistiques:
         assert stats_totales._sujet_counts["Python"] == 2
 
 
+    def test_ajouter_comptes_sujets(self):
+        """Teste l'ajout de sujets déjà comptés"""
+        # GIVEN: Des statistiques contenant déjà un sujet
+        stats = Statistiques(sujets_plus_frequents=["python"])
+
+        # WHEN: On ajoute des paires (sujet, nombre)
+        stats.ajouter_comptes_sujets([("python", 2), ("matrice", 5), ("", 3), ("vide", 0)])
+
+        # THEN: Les comptes sont cumulés, les entrées invalides ignorées
+        assert stats._sujet_counts["python"] == 3
+        assert stats._sujet_counts["matrice"] == 5
+        assert "vide" not in stats._sujet_counts
+        assert stats.sujets_plus_frequents == ["matrice", "python"]
+
+
+    def test_agreger_statistiques_partielles(self):
+        """Teste la combinaison de résultats partiels (tranches d'utilisateurs)"""
+        # GIVEN: Deux résultats partiels et une valeur absente
+        a = Statistiques(nb_conversations=2, nb_messages=5, sujets_plus_frequents=["python"])
+        b = Statistiques(nb_conversations=1, heures_utilisation=1.0, sujets_plus_frequents=["python"])
+
+        # WHEN: On les agrège
+        total = Statistiques.agreger([a, None, b])
+
+        # THEN: Un nouvel objet contient la somme, les partielles sont inchangées
+        assert total is not a
+        assert total.nb_conversations == 3
+        assert total.nb_messages == 5
+        assert total.heures_utilisation == 1.0
+        assert total._sujet_counts["python"] == 2
+        assert a.nb_conversations == 2
+
+
 # Exécution des tests avec pytest
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--tb=short"])
\ No newline at end of file
@@ -1,7 +1,9 @@
+import hashlib
 import re
 from unittest.mock import patch
 
 from src.business_object.utilisateur import Utilisateur
+from src.utils.securite import HacheurScrypt, configurer_hacheur
 
 
 # --- Doubles très simples pour les conversations ---
@@ -71,44 +73,50 @@ def test_set_password_genere_un_hash():
     u = Utilisateur(pseudo="alice", id=10)
 
     with patch(
-        "src.business_object.utilisateur.hash_password", return_value="H(secret|alice)"
+        "src.business_object.utilisateur.hacher_mot_de_passe", return_value="$kdf$secret"
     ) as mock_hash:
         u.set_password("secret")
 
-    assert u.password_hash == "H(secret|alice)"
-    mock_hash.assert_called_once_with("secret", "alice")
+    assert u.password_hash == "$kdf$secret"
+    mock_hash.assert_called_once_with("secret")
 
 
 def test_verifier_password_ok():
     u = Utilisateur(pseudo="alice", id=10)
 
-    # 1er appel pour set_password -> "H(secret|alice)"
-    # 2e appel pour verifier_password("secret") -> "H(secret|alice)"
     with patch(
-        "src.business_object.utilisateur.hash_password",
-        side_effect=lambda mdp, sel: f"H({mdp}|{sel})",
-    ) as mock_hash:
+        "src.business_object.utilisateur.hacher_mot_de_passe",
+        side_effect=lambda mdp: f"$kdf${mdp}",
+    ):
         u.set_password("secret")
+
+    with patch(
+        "src.business_object.utilisateur.verifier_mot_de_passe",
+        side_effect=lambda mdp, h, sel: h == f"$kdf${mdp}",
+    ) as mock_verif:
         ok = u.verifier_password("secret")
 
     assert ok is True
-    # 2 appels : set_password et verifier_password
-    assert mock_hash.call_count == 2
+    mock_verif.assert_called_once_with("secret", "$kdf$secret", "alice")
 
 
 def test_verifier_password_ko():
     u = Utilisateur(pseudo="alice", id=10)
 
     with patch(
-        "src.business_object.utilisateur.hash_password",
-        side_effect=lambda mdp, sel: f"H({mdp}|{sel})",
-    ) as mock_hash:
+        "src.business_object.utilisateur.hacher_mot_de_passe",
+        side_effect=lambda mdp: f"$kdf${mdp}",
+    ):
         u.set_password("secret")
+
+    with patch(
+        "src.business_object.utilisateur.verifier_mot_de_passe",
+        side_effect=lambda mdp, h, sel: h == f"$kdf${mdp}",
+    ) as mock_verif:
         ok = u.verifier_password("mauvais")
 
     assert ok is False
-    # 2 appels : set_password("secret") et verifier_password("mauvais")
-    assert mock_hash.call_count == 2
+    mock_verif.assert_called_once_with("mauvais", "$kdf$secret", "alice")
 
 
 def test_verifier_password_sans_hash_renvoie_false():
@@ -122,23 +130,33 @@ def test_verifier_password_sans_hash_renvoie_false():
     assert ok is False
 
 
+def test_verifier_password_hash_herite_sha256():
+    # GIVEN : ancien hash sha256(mdp || pseudo)
+    u = Utilisateur(
+        pseudo="alice",
+        id=10,
+        password_hash=hashlib.sha256(b"secretalice").hexdigest(),
+    )
+
+    # WHEN / THEN
+    assert u.verifier_password("secret") is True
+    assert u.verifier_password("mauvais") is False
+    assert u.doit_rehacher_password() is True
+
+
 def test_from_plain_password_construit_un_user_valide():
-    with patch(
-        "src.business_object.utilisateur.hash_password",
-        side_effect=lambda mdp, sel: f"H({mdp}|{sel})",
-    ) as mock_hash:
+    configurer_hacheur(HacheurScrypt(ln=4))
+    try:
         u = Utilisateur.from_plain_password("carol", "top")
 
         assert u.id is None
         assert u.pseudo == "carol"
-        assert u.password_hash == "H(top|carol)"
-        # vérification avec le même patch (appel 3) :
+        assert u.password_hash.startswith("$scrypt$ln=4,")
         assert u.verifier_password("top") is True
-
-    # Appels attendus :
-    # 1) set_password("top") dans from_plain_password
-    # 2) verifier_password("top") à la fin du test
-    assert mock_hash.call_count == 2
+        assert u.verifier_password("autre") is False
+        assert u.doit_rehacher_password() is False
+    finally:
+        configurer_hacheur(None)
 
 
 # ------------------ Conversations ------------------
@@ -5,7 +5,18 @@ from unittest.mock import MagicMock
 import pytest
 
 from src.business_object.echange import Echange
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
 from src.client.llm_client import LLM_API
+from src.utils.config import configurer_parametres
+
+
+@pytest.fixture(autouse=True)
+def url_de_test():
+    """On force l'URL pour éviter toute dépendance d'environnement."""
+    precedents = configurer_parametres(llm_url="https://exemple.test")
+    yield
+    configurer_parametres(precedents)
 
 
 def _fake_response_ok_type_mistral(text):
@@ -37,11 +48,12 @@ def _fake_response_ok_type_mistral(text):
     return resp
 
 
-def _fake_response_http_error(status_code=422, detail="Validation Error"):
+def _fake_response_http_error(status_code=422, detail="Validation Error", headers=None):
     """Fausse réponse HTTP avec code != 200 et détail JSON."""
     resp = types.SimpleNamespace()
     resp.ok = False
     resp.status_code = status_code
+    resp.headers = headers or {}
 
     def _json():
         return {"detail": detail}
@@ -65,13 +77,10 @@ def _fake_response_plain_text(txt="plain-text-response"):
     return resp
 
 
-def test_generate_ok_openai_format(monkeypatch):
+def test_generate_ok_openai_format():
     """Succès : extraction de choices[0].message.content"""
 
     # GIVEN
-    # on force l'URL pour éviter toute dépendance d'environnement
-    monkeypatch.setenv("ENSAI_GPT_BASE_URL", "https://exemple.test")
-
     # Mock de requests.post -> renvoie une réponse OK type OpenAI
     import requests
 
@@ -106,11 +115,9 @@ def test_generate_ok_openai_format(monkeypatch):
     assert sent["max_tokens"] == 32
 
 
-def test_generate_http_error_returns_echange(monkeypatch):
+def test_generate_http_error_returns_echange():
     """Erreur HTTP : on renvoie un Echange 'assistant' avec le message d'erreur lisible."""
     # GIVEN
-    monkeypatch.setenv("ENSAI_GPT_BASE_URL", "https://exemple.test")
-
     import requests
 
     requests.post = MagicMock(return_value=_fake_response_http_error(422, "Validation Error"))
@@ -128,11 +135,9 @@ def test_generate_http_error_returns_echange(monkeypatch):
     assert "Validation Error" in res.message
 
 
-def test_generate_plain_text_response(monkeypatch):
+def test_generate_plain_text_response():
     """Réponse texte brut : on renvoie le .text tel quel."""
     # GIVEN
-    monkeypatch.setenv("ENSAI_GPT_BASE_URL", "https://exemple.test")
-
     import requests
 
     requests.post = MagicMock(return_value=_fake_response_plain_text("OK TEXTE BRUT"))
@@ -146,3 +151,183 @@ def test_generate_plain_text_response(monkeypatch):
     # THEN
     assert isinstance(res, Echange)
     assert res.message == "OK TEXTE BRUT"
+
+
+def test_generate_mesure_l_appel(monkeypatch):
+    """Les mesures du dernier appel (taille, jetons, statut) sont disponibles et cumulées."""
+    import requests
+
+    from src.client.metriques_llm import MetriquesLLM
+
+    monkeypatch.setattr(
+        requests, "post", MagicMock(return_value=_fake_response_ok_type_mistral("Bonjour"))
+    )
+    MetriquesLLM().vider()
+
+    api = LLM_API()
+    api.generate(
+        history=[Echange(agent="user", message="Dis bonjour")],
+        temperature=0.7,
+        top_p=1.0,
+        max_tokens=32,
+    )
+
+    appel = api.dernier_appel
+    envoye = requests.post.call_args.kwargs["json"]
+    assert appel.octets_requete == len(json.dumps(envoye).encode("utf-8"))
+    assert appel.nb_messages == 1
+    assert appel.statut_http == 200 and appel.succes
+    assert appel.nb_retentatives == 0
+    assert (appel.tokens_prompt, appel.tokens_reponse) == (10, 5)
+    assert appel.latence_ms >= 0
+    resume = MetriquesLLM().resume()
+    assert resume["nb_appels"] == 1
+    assert resume["tokens_prompt"] == 10
+
+
+def test_generate_retente_si_service_indisponible(monkeypatch):
+    """503 puis succès : une nouvelle tentative, réponse normale."""
+    configurer_parametres(llm_retentatives=2)
+    import requests
+
+    monkeypatch.setattr(
+        requests,
+        "post",
+        MagicMock(
+            side_effect=[
+                _fake_response_http_error(503, "Indisponible"),
+                _fake_response_ok_type_mistral("Enfin"),
+            ]
+        ),
+    )
+    monkeypatch.setattr("src.client.llm_client.time.sleep", MagicMock())
+
+    api = LLM_API()
+    history = [Echange(agent="user", message="x")]
+    res = api.generate(history=history, temperature=0, top_p=1, max_tokens=5)
+
+    assert res.message == "Enfin"
+    assert requests.post.call_count == 2
+    assert api.dernier_appel.nb_retentatives == 1
+
+
+def test_generate_abandonne_apres_les_retentatives(monkeypatch):
+    """Service injoignable : LLM_RETENTATIVES nouvelles tentatives puis message d'erreur."""
+    configurer_parametres(llm_retentatives=2)
+    import requests
+
+    from src.client.metriques_llm import MetriquesLLM
+
+    refus = NewConnectionError(None, "Connection refused")
+    echec = MagicMock(side_effect=requests.ConnectionError(MaxRetryError(None, "/", refus)))
+    monkeypatch.setattr(requests, "post", echec)
+    attente = MagicMock()
+    monkeypatch.setattr("src.client.llm_client.time.sleep", attente)
+    MetriquesLLM().vider()
+
+    api = LLM_API()
+    history = [Echange(agent="user", message="x")]
+    res = api.generate(history=history, temperature=0, top_p=1, max_tokens=5)
+
+    assert "Impossible de contacter" in res.message
+    assert requests.post.call_count == 3
+    assert [c.args[0] for c in attente.call_args_list] == [0.5, 1.0]
+    assert api.dernier_appel.statut_http is None
+    assert MetriquesLLM().resume()["taux_erreur"] == 1.0
+
+
+def test_generate_ne_retente_pas_par_defaut(monkeypatch):
+    """Sans LLM_RETENTATIVES, un 503 est rendu tel quel."""
+    import requests
+
+    monkeypatch.setattr(
+        requests, "post", MagicMock(return_value=_fake_response_http_error(503, "Indisponible"))
+    )
+
+    api = LLM_API()
+    api.generate(history=[Echange(agent="user", message="x")], temperature=0, top_p=1, max_tokens=5)
+
+    requests.post.assert_called_once()
+    assert api.dernier_appel.statut_http == 503
+
+
+@pytest.mark.parametrize("issue", ["delai_lecture", "504"])
+def test_generate_ne_retente_pas_une_generation_possible(monkeypatch, issue):
+    """Délai de lecture dépassé ou 504 : le service a pu générer, on ne renvoie pas."""
+    configurer_parametres(llm_retentatives=2)
+    import requests
+
+    if issue == "504":
+        post = MagicMock(return_value=_fake_response_http_error(504, "Gateway Timeout"))
+    else:
+        post = MagicMock(side_effect=requests.ReadTimeout("trop long"))
+    monkeypatch.setattr(requests, "post", post)
+    attente = MagicMock()
+    monkeypatch.setattr("src.client.llm_client.time.sleep", attente)
+
+    api = LLM_API()
+    api.generate(history=[Echange(agent="user", message="x")], temperature=0, top_p=1, max_tokens=5)
+
+    post.assert_called_once()
+    attente.assert_not_called()
+
+
+def test_generate_respecte_retry_after(monkeypatch):
+    """429 : l'attente est celle demandée par Retry-After si elle dépasse le back-off."""
+    configurer_parametres(llm_retentatives=2, llm_delai_s=30)
+    import requests
+
+    monkeypatch.setattr(
+        requests,
+        "post",
+        MagicMock(
+            side_effect=[
+                _fake_response_http_error(429, "Trop de requêtes", {"Retry-After": "3"}),
+                _fake_response_ok_type_mistral("Enfin"),
+            ]
+        ),
+    )
+    attente = MagicMock()
+    monkeypatch.setattr("src.client.llm_client.time.sleep", attente)
+
+    res = LLM_API().generate(
+        history=[Echange(agent="user", message="x")], temperature=0, top_p=1, max_tokens=5
+    )
+
+    assert res.message == "Enfin"
+    attente.assert_called_once_with(3.0)
+
+
+def test_generate_abandonne_si_retry_after_trop_long(monkeypatch):
+    """429 avec un Retry-After supérieur à LLM_DELAI_S : pas de nouvelle tentative."""
+    configurer_parametres(llm_retentatives=2, llm_delai_s=30)
+    import requests
+
+    reponse = _fake_response_http_error(429, "Trop de requêtes", {"Retry-After": "120"})
+    monkeypatch.setattr(requests, "post", MagicMock(return_value=reponse))
+    attente = MagicMock()
+    monkeypatch.setattr("src.client.llm_client.time.sleep", attente)
+
+    api = LLM_API()
+    api.generate(history=[Echange(agent="user", message="x")], temperature=0, top_p=1, max_tokens=5)
+
+    requests.post.assert_called_once()
+    attente.assert_not_called()
+    assert api.dernier_appel.statut_http == 429
+
+
+def test_generate_ne_retente_pas_une_erreur_de_requete(monkeypatch):
+    """422 : la requête est invalide, inutile de la renvoyer."""
+    configurer_parametres(llm_retentatives=2)
+    import requests
+
+    monkeypatch.setattr(
+        requests, "post", MagicMock(return_value=_fake_response_http_error(422, "Validation Error"))
+    )
+
+    api = LLM_API()
+    api.generate(history=[Echange(agent="user", message="x")], temperature=0, top_p=1, max_tokens=5)
+
+    requests.post.assert_called_once()
+    assert api.dernier_appel.statut_http == 422
+    assert not api.dernier_appel.succes
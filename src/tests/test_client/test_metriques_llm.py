@@ -0,0 +1,64 @@
+import pytest
+
+from src.client.metriques_llm import AppelLLM, MetriquesLLM
+
+
+@pytest.fixture
+def metriques():
+    m = MetriquesLLM()
+    m.vider()
+    yield m
+    m.vider()
+
+
+def appel(latence_ms=800, statut=200, **kwargs):
+    return AppelLLM(
+        latence_ms=latence_ms, octets_requete=2_000, nb_messages=3, statut_http=statut, **kwargs
+    )
+
+
+def test_succes():
+    assert appel(statut=200).succes
+    assert not appel(statut=503).succes
+    assert not appel(statut=None).succes
+
+
+def test_resume(metriques):
+    for _ in range(18):
+        metriques.enregistrer(appel(tokens_prompt=100, tokens_reponse=20))
+    metriques.enregistrer(appel(latence_ms=15_000, statut=503, nb_retentatives=1))
+    metriques.enregistrer(appel(latence_ms=30_000, statut=None, nb_retentatives=1))
+
+    resume = metriques.resume()
+    assert resume["nb_appels"] == 20
+    assert resume["nb_erreurs"] == 2
+    assert resume["taux_erreur"] == pytest.approx(0.1)
+    assert resume["nb_retentatives"] == 2
+    assert resume["statuts"] == {"200": 18, "503": 1, "sans_reponse": 1}
+    assert resume["latence_p50_s"] == 1.0
+    assert resume["latence_p95_s"] == 20.0
+    assert resume["octets_requete"] == 40_000
+    assert (resume["tokens_prompt"], resume["tokens_reponse"]) == (1_800, 360)
+
+
+def test_resume_vide(metriques):
+    resume = metriques.resume()
+    assert resume["nb_appels"] == 0
+    assert resume["taux_erreur"] == 0.0
+    assert resume["latence_p50_s"] is None
+
+
+def test_exporter_prometheus(metriques, tmp_path):
+    metriques.enregistrer(appel(latence_ms=300, tokens_prompt=7))
+    metriques.enregistrer(appel(statut=None))
+
+    texte = metriques.exporter_prometheus()
+    assert 'ensaigpt_llm_duree_secondes_bucket{le="0.5"} 1' in texte
+    assert 'ensaigpt_llm_duree_secondes_bucket{le="+Inf"} 2' in texte
+    assert "ensaigpt_llm_duree_secondes_count 2" in texte
+    assert 'ensaigpt_llm_appels_total{statut="sans_reponse"} 1' in texte
+    assert 'ensaigpt_llm_tokens_total{type="prompt"} 7' in texte
+
+    chemin = tmp_path / "llm.prom"
+    metriques.ecrire_prometheus(str(chemin))
+    assert chemin.read_text(encoding="utf-8") == texte
@@ -6,8 +6,10 @@ import pytest
 
 from src.business_object.conversation import Conversation
 from src.business_object.echange import Echange
-from src.dao.conversation_dao import ConversationDAO
+from src.dao.conversation_dao import ConversationDAO, ErreurAucuneConversation
+from src.dao.db_connection import DBConnection
 from src.dao.prompt_dao import PromptDAO
+from src.utils.config import configurer_parametres
 from src.utils.reset_database import ResetDatabase
 
 
@@ -121,6 +123,60 @@ def test_lister_conv():
     assert res[1].id == 1
 
 
+def test_lister_conv_remonte_apres_message():
+    """Un nouveau message fait remonter la conversation en tête de liste."""
+    e = Echange(id=None, agent="ia", message="relance", date_msg="2030-01-01 00:00:00+00")
+    ConversationDAO.ajouter_echange(1, e)
+
+    res = ConversationDAO.lister_conversations(9, n=1)
+
+    assert [c.id for c in res] == [1]
+
+
+def test_lister_conv_sans_lire_les_messages():
+    """Le listing suit l'index (utilisateur, derniere_activite) sans toucher messages."""
+    with DBConnection().connection as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off;")
+            cursor.execute(
+                """
+                EXPLAIN SELECT c.id
+                FROM conversations_participants cp
+                JOIN conversations c ON c.id = cp.conversation_id
+                WHERE cp.utilisateur_id = %(id_user)s
+                ORDER BY cp.derniere_activite DESC NULLS LAST
+                LIMIT 5;
+                """,
+                {"id_user": 9},
+            )
+            plan = "\n".join(r["QUERY PLAN"] for r in cursor.fetchall())
+    assert "idx_participants_activite" in plan
+    assert "messages" not in plan
+    assert "Sort" not in plan
+
+
+def test_participants_suivent_derniere_activite():
+    """Chaque participant porte la dernière activité de sa conversation."""
+    with DBConnection().connection as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT cp.derniere_activite = c.derniere_activite AS egales
+                FROM conversations_participants cp
+                JOIN conversations c ON c.id = cp.conversation_id
+                WHERE cp.conversation_id = 2;
+                """
+            )
+            rows = cursor.fetchall()
+    assert rows and all(r["egales"] for r in rows)
+
+
+def test_recalculer_derniere_activite():
+    assert ConversationDAO.recalculer_derniere_activite() > 0
+    res = ConversationDAO.lister_conversations(9)
+    assert res[0].id == 1
+
+
 # 9 dans conv 1 et 3
 def test_retirer_participant_ok():
     # WHEN
@@ -197,9 +253,55 @@ def test_sujets_plus_frequents_aucune_conversation():
     # GIVEN
     id_user = 9999
     # WHEN / THEN
-    with pytest.raises(Exception) as exc_info:
+    with pytest.raises(ErreurAucuneConversation):
         ConversationDAO.sujets_plus_frequents(id_user, k=5)
-    assert "aucune conversation" in str(exc_info.value).lower()
+
+
+def test_sujets_plus_frequents_mis_a_jour_au_renommage():
+    """L'index des sujets suit la création, le renommage et la suppression."""
+    # GIVEN
+    conv = ConversationDAO.creer_conversation(Conversation(nom="jardinage des tomates"), 5)
+    mots = [mot for mot, _ in ConversationDAO.sujets_plus_frequents(5, k=50)]
+    assert "jardinage" in mots
+    # WHEN
+    ConversationDAO.renommer_conv(conv.id, "cuisine des tomates")
+    mots = dict(ConversationDAO.sujets_plus_frequents(5, k=50))
+    # THEN
+    assert "jardinage" not in mots
+    assert "cuisine" in mots
+    # WHEN
+    ConversationDAO.supprimer_conv(conv.id)
+    # THEN
+    assert "cuisine" not in dict(ConversationDAO.sujets_plus_frequents(5, k=50))
+
+
+def test_reconstruire_sujets_lot():
+    """Un lot recalcule les comptes des utilisateurs qu'il couvre, et seulement eux."""
+    ConversationDAO.creer_conversation(Conversation(nom="astronomie des comètes"), 5)
+    avant = dict(ConversationDAO.sujets_plus_frequents(5, k=50))
+    with DBConnection().connection as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM sujets_utilisateurs WHERE utilisateur_id = 5;")
+            assert ConversationDAO.reconstruire_sujets_lot(cur, 4, 1) == [5]
+            assert ConversationDAO.reconstruire_sujets_lot(cur, 10**9, 10) == []
+    assert dict(ConversationDAO.sujets_plus_frequents(5, k=50)) == avant
+
+
+def test_sujets_globaux_titres():
+    """Les sujets globaux comptent chaque titre une seule fois."""
+    res = dict(ConversationDAO.sujets_globaux("titres", k=100))
+    assert res["matrice"] == 1
+
+
+def test_sujets_par_utilisateur_messages():
+    """Les sujets des messages sont calculés pour tous les utilisateurs en un passage."""
+    res = ConversationDAO.sujets_par_utilisateur("messages", k=5)
+    assert "heureux" in dict(res[10])
+
+
+def test_sujets_source_invalide():
+    with pytest.raises(ValueError):
+        ConversationDAO.sujets_globaux("inconnue")
 
 
 def test_creer_conversation_titre_vide():
@@ -344,6 +446,39 @@ def test_lire_echanges_pagine():
     assert echanges[0].date_msg <= echanges[1].date_msg
 
 
+def test_lire_lot_messages_comme_lire_echanges():
+    """Le lot en colonnes rend les mêmes messages que lire_echanges."""
+    lot = ConversationDAO.lire_lot_messages(id_conv=2)
+    echanges = ConversationDAO.lire_echanges(id_conv=2, offset=0, limit=None)
+
+    assert len(lot) == len(echanges) == 4
+    assert set(lot.conversation_ids) == {2}
+    assert [e.en_dict() for e in lot] == [e.en_dict() for e in echanges]
+
+
+def test_page_conversations_apercus():
+    """Une page : même ordre que lister_conversations, avec compteurs et dernier message."""
+    apercus, nb_total = ConversationDAO.page_conversations(id_user=10, limite=50)
+    conversations = ConversationDAO.lister_conversations(id_user=10)
+
+    assert nb_total == len(conversations) == len(apercus)
+    assert {a.conversation.id for a in apercus} == {c.id for c in conversations}
+    conv2 = next(a for a in apercus if a.conversation.id == 2)
+    echanges = ConversationDAO.lire_echanges(id_conv=2, offset=0, limit=None)
+    assert conv2.nb_messages == len(echanges)
+    assert conv2.nb_participants >= 3
+    assert conv2.dernier_message.id == echanges[-1].id
+
+
+def test_page_conversations_decalage():
+    """Le total reste celui de toutes les conversations ; la page suivante les complète."""
+    premiere, nb_total = ConversationDAO.page_conversations(id_user=10, limite=1)
+    suite, _ = ConversationDAO.page_conversations(id_user=10, limite=50, decalage=1)
+
+    assert len(premiere) == min(1, nb_total)
+    assert len(premiere) + len(suite) == nb_total
+
+
 def test_rechercher_echange_ok():
     """Recherche d'échanges par mot+date."""
     d = datetime.date(2025, 7, 21)
@@ -361,6 +496,95 @@ def test_rechercher_echange_aucun():
     assert "Aucun échange trouvé pour la conversation" in str(exc.value)
 
 
+def test_rechercher_echange_sans_date():
+    """Date absente : filtre sur le mot-clé seul."""
+    res = ConversationDAO.rechercher_echange(conversation_id=2, mot_clef="heureux", date=None)
+    assert len(res) == 1
+
+
+def test_rechercher_echange_sans_mot_clef():
+    """Mot-clé absent : tous les messages du jour."""
+    d = datetime.date(2025, 7, 22)
+    res = ConversationDAO.rechercher_echange(conversation_id=2, mot_clef=None, date=d)
+    assert [e.message for e in res] == ["je suis puissant et toi ?"]
+
+
+def test_bornes_jour_fuseau_application():
+    """Une date seule est un jour du fuseau de l'application."""
+    precedents = configurer_parametres(fuseau_horaire="Europe/Paris")
+    try:
+        d0, d1 = ConversationDAO._bornes_jour(datetime.date(2025, 7, 21))
+    finally:
+        configurer_parametres(precedents)
+    utc = datetime.timezone.utc
+    assert d0 == datetime.datetime(2025, 7, 20, 22, 0, tzinfo=utc)
+    assert d1 == datetime.datetime(2025, 7, 21, 22, 0, tzinfo=utc)
+
+
+def test_bornes_jour_changement_heure():
+    """Le jour du passage à l'heure d'hiver dure 25 heures."""
+    precedents = configurer_parametres(fuseau_horaire="Europe/Paris")
+    try:
+        d0, d1 = ConversationDAO._bornes_jour(datetime.date(2025, 10, 26))
+    finally:
+        configurer_parametres(precedents)
+    utc = datetime.timezone.utc
+    assert d1.astimezone(utc) - d0.astimezone(utc) == datetime.timedelta(hours=25)
+
+
+def test_bornes_jour_datetime_aware():
+    """Un datetime aware garde son propre fuseau."""
+    utc = datetime.timezone.utc
+    d0, d1 = ConversationDAO._bornes_jour(datetime.datetime(2025, 7, 21, 1, 0, tzinfo=utc))
+    assert d0 == datetime.datetime(2025, 7, 21, tzinfo=utc)
+    assert d1 == datetime.datetime(2025, 7, 22, tzinfo=utc)
+
+
+def _plan(requete: str, params: dict) -> str:
+    """Plan d'exécution d'une requête, parcours séquentiels désactivés."""
+    with DBConnection().connection as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off;")
+            cursor.execute("EXPLAIN " + requete, params)
+            return "\n".join(r["QUERY PLAN"] for r in cursor.fetchall())
+
+
+def test_rechercher_date_utilise_index():
+    """La recherche par jour passe par l'index (conversation_id, cree_le)."""
+    d0, d1 = ConversationDAO._bornes_jour(datetime.date(2025, 7, 21))
+    plan = _plan(ConversationDAO._SQL_RECHERCHE_DATE, {"uid": 10, "start": d0, "end": d1})
+    assert "idx_messages_conv_cree" in plan
+
+
+def test_rechercher_conv_mot_et_date_utilise_index():
+    d0, d1 = ConversationDAO._bornes_jour(datetime.date(2025, 7, 21))
+    plan = _plan(
+        ConversationDAO._SQL_RECHERCHE_MOT_ET_DATE,
+        {"uid": 10, "start": d0, "end": d1, "pattern": "%heureux%"},
+    )
+    assert "idx_messages_conv_cree" in plan
+
+
+def test_rechercher_echange_utilise_index():
+    requete, params = ConversationDAO._requete_recherche_echanges(
+        2, None, datetime.date(2025, 7, 22)
+    )
+    plan = _plan(requete, params)
+    assert "Index Cond" in plan
+    assert "idx_messages_conv_cree" in plan
+
+
+def test_messages_utilisateur_par_periode_utilise_index():
+    """Les messages d'un utilisateur sur une période sont lus par index."""
+    d0, d1 = ConversationDAO._bornes_jour(datetime.date(2025, 7, 21))
+    plan = _plan(
+        "SELECT id FROM messages WHERE utilisateur_id = %(uid)s"
+        " AND cree_le >= %(start)s AND cree_le < %(end)s;",
+        {"uid": 10, "start": d0, "end": d1},
+    )
+    assert "idx_messages_utilisateur_cree" in plan
+
+
 def test_ajouter_participant_ok():
     """Ajout d'un nouveau participant dans une conversation."""
     # conv 1 n'a pas encore user_id=1 comme participant
@@ -425,6 +649,46 @@ def test_ajouter_echange_utilisateur_ok():
     assert isinstance(e.id, int)
 
 
+def test_ajouter_echanges_une_requete():
+    """Ajout groupé : ids et dates renseignés, dernier message avant insertion renvoyé."""
+    conv = ConversationDAO.creer_conversation(Conversation(nom="conv_test_lot"), 9)
+
+    e_user = Echange(agent="utilisateur", message="Question")
+    setattr(e_user, "emetteur", "utilisateur")
+    setattr(e_user, "utilisateur_id", 9)
+    e_ia = Echange(agent="ia", message="Réponse")
+    setattr(e_ia, "emetteur", "ia")
+
+    assert ConversationDAO.ajouter_echanges(conv.id, [e_user, e_ia]) is None
+    assert e_user.id < e_ia.id
+    assert ConversationDAO.ajouter_echanges(conv.id, [e_user]) == e_ia.id
+    assert [e.message for e in ConversationDAO.lire_echanges(conv.id, limit=None)][:2] == [
+        "Question",
+        "Réponse",
+    ]
+
+
+def test_lire_echanges_apres():
+    """Seuls les messages postérieurs au dernier message connu sont lus."""
+    conv = ConversationDAO.creer_conversation(Conversation(nom="conv_test_suite"), 9)
+    premier = Echange(agent="ia", message="Premier", emetteur="ia")
+    second = Echange(agent="ia", message="Second", emetteur="ia")
+    ConversationDAO.ajouter_echanges(conv.id, [premier, second])
+
+    assert [e.message for e in ConversationDAO.lire_echanges_apres(conv.id, None)] == [
+        "Premier",
+        "Second",
+    ]
+    assert [e.id for e in ConversationDAO.lire_echanges_apres(conv.id, premier)] == [second.id]
+    assert ConversationDAO.lire_echanges_apres(conv.id, second) == []
+
+
+def test_ajouter_echanges_emetteur_invalide():
+    e = Echange(agent="robot", message="x")
+    with pytest.raises(Exception, match="emetteur invalide"):
+        ConversationDAO.ajouter_echanges(1, [e])
+
+
 def test_mettre_a_j_preprompt_id_ok():
     """Mise à jour de prompt_id sur une conversation existante."""
     conv = Conversation(nom="conv_pour_prompt")
@@ -0,0 +1,132 @@
+import logging
+import types
+from unittest.mock import MagicMock
+
+import psycopg2
+import pytest
+
+from src.dao.db_connection import DBConnection
+from src.dao.metriques_sql import (
+    CurseurInstrumente,
+    MetriquesSQL,
+    _normaliser_modele,
+    lire_prometheus,
+    normaliser_requete,
+)
+
+
+@pytest.fixture(autouse=True)
+def metriques_vides():
+    MetriquesSQL().vider()
+    yield
+    MetriquesSQL().vider()
+
+
+def test_normaliser_requete():
+    assert (
+        normaliser_requete(
+            """
+            -- commentaire
+            SELECT * FROM messages_2025_07
+            WHERE id = %(id)s AND contenu ILIKE '%%l''été%%' AND n > 3.5;
+            """
+        )
+        == "SELECT * FROM messages_2025_07 WHERE id = ? AND contenu ILIKE ? AND n > ?"
+    )
+
+
+def test_normaliser_execute_values():
+    """Les lots de execute_values donnent la même requête quelle que soit leur taille."""
+    a = normaliser_requete("INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y') RETURNING id")
+    b = normaliser_requete("INSERT INTO t (a, b) VALUES (3, 'z') RETURNING id")
+    assert a == "INSERT INTO t (a, b) VALUES (?, ?), ... RETURNING id"
+    assert b == "INSERT INTO t (a, b) VALUES (?, ?) RETURNING id"
+
+
+def test_requete_en_octets_hors_cache():
+    """Un lot execute_values (octets, valeurs en ligne) n'entre pas dans le cache."""
+    curseur = types.SimpleNamespace(rowcount=1)
+    _normaliser_modele.cache_clear()
+    for i in range(3):
+        requete = f"INSERT INTO t (a) VALUES ({i}, 'message {i}')".encode()
+        CurseurInstrumente._mesurer(curseur, requete, None, 0.0)
+    CurseurInstrumente._mesurer(curseur, "SELECT * FROM t WHERE id = %s", (1,), 0.0)
+    CurseurInstrumente._mesurer(curseur, "SELECT * FROM t WHERE id = %s", (2,), 0.0)
+
+    assert _normaliser_modele.cache_info().currsize == 1
+    assert _normaliser_modele.cache_info().hits == 1
+    assert {e["requete"]: e["nb"] for e in MetriquesSQL().resume()} == {
+        "INSERT INTO t (a) VALUES (?, ?)": 3,
+        "SELECT * FROM t WHERE id = ?": 2,
+    }
+
+
+def test_histogramme_et_export_prometheus():
+    m = MetriquesSQL()
+    m.enregistrer('SELECT "x" FROM t', 0.002, 3)
+    m.enregistrer('SELECT "x" FROM t', 0.3, 1)
+    m.enregistrer("DELETE FROM t", 0.0005, -1)
+
+    texte = m.exporter_prometheus()
+
+    assert "# TYPE ensaigpt_sql_duree_secondes histogram" in texte
+    assert 'ensaigpt_sql_duree_secondes_bucket{requete="SELECT \\"x\\" FROM t",le="0.0025"} 1' in texte
+    assert 'ensaigpt_sql_duree_secondes_bucket{requete="SELECT \\"x\\" FROM t",le="+Inf"} 2' in texte
+    assert 'ensaigpt_sql_lignes_total{requete="DELETE FROM t"} 0' in texte
+
+    resume = lire_prometheus(texte)
+    assert [e["requete"] for e in resume] == ['SELECT "x" FROM t', "DELETE FROM t"]
+    assert resume[0]["nb"] == 2 and resume[0]["nb_lignes"] == 4
+    assert resume[0]["total_ms"] == pytest.approx(302)
+
+
+def test_requetes_distinctes_bornees(monkeypatch):
+    monkeypatch.setattr("src.dao.metriques_sql.NB_MAX_REQUETES", 2)
+    m = MetriquesSQL()
+    for i in range(4):
+        m.enregistrer(f"SELECT {i}", 0.001)
+    assert {e["requete"] for e in m.resume()} == {"SELECT 0", "SELECT 1", "(autres requêtes)"}
+
+
+def test_curseur_mesure_les_requetes():
+    with DBConnection().connection as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT generate_series(1, %(n)s) AS i;", {"n": 5})
+            cur.fetchall()
+    (entree,) = [e for e in MetriquesSQL().resume() if "generate_series" in e["requete"]]
+    assert entree["requete"] == "SELECT generate_series(?, ?) AS i"
+    assert entree["nb"] == 1 and entree["nb_lignes"] == 5
+
+
+def test_requete_lente_journalisee_avec_plan(caplog, monkeypatch):
+    monkeypatch.setattr(MetriquesSQL(), "seuil_lent_ms", 0)
+    with caplog.at_level(logging.WARNING):
+        with DBConnection().connection as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT %(a)s::int + 1 AS r;", {"a": 1})
+                # Les résultats du curseur ne sont pas remplacés par le plan
+                assert cur.fetchone()["r"] == 2
+    assert "Requête lente" in caplog.text
+    assert "Result" in caplog.text
+
+
+def test_requete_lente_en_echec_non_expliquee(caplog, monkeypatch):
+    """Sans base : une requête lente en échec n'appelle pas `_plan`."""
+    monkeypatch.setattr(MetriquesSQL(), "seuil_lent_ms", 0)
+    curseur = types.SimpleNamespace(rowcount=-1, _plan=MagicMock())
+    with caplog.at_level(logging.WARNING):
+        CurseurInstrumente._mesurer(curseur, "SELECT 1 / 0", None, 0.5, reussie=False)
+    curseur._plan.assert_not_called()
+    assert "Requête lente en échec" in caplog.text
+
+
+def test_requete_lente_en_echec_sans_plan(caplog, monkeypatch):
+    """Une requête lente en échec garde son exception : pas d'EXPLAIN après l'échec."""
+    monkeypatch.setattr(MetriquesSQL(), "seuil_lent_ms", 0)
+    with caplog.at_level(logging.WARNING):
+        with pytest.raises(psycopg2.errors.DivisionByZero):
+            with DBConnection().connection as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1 / %(a)s AS r;", {"a": 0})
+    assert "Requête lente en échec" in caplog.text
+    assert "Result" not in caplog.text
@@ -0,0 +1,130 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.dao.db_connection import DBConnection
+from src.utils.migrations import Migrations, lister_migrations
+from src.utils.reset_database import ResetDatabase
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_test_environment():
+    with patch.dict(os.environ, {"SCHEMA": "projet_test_dao"}):
+        ResetDatabase().lancer(test_dao=True)
+        yield
+
+
+@pytest.fixture
+def connexion():
+    """Connexion dédiée sur le schéma de test (le runner la passe en autocommit)."""
+    conn = DBConnection.ouvrir_connexion()
+    with conn.cursor() as cur:
+        cur.execute("SET search_path TO projet_test_dao, public;")
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _ecrire(repertoire, nom, contenu):
+    (repertoire / nom).write_text(contenu, encoding="utf-8")
+
+
+def test_base_neuve_a_jour(connexion):
+    """Une base créée par init_db.sql n'a aucune migration en attente."""
+    with connexion.cursor() as cur:
+        deja = Migrations.versions_appliquees(cur)
+    assert deja >= {m.version for m in lister_migrations()}
+    assert Migrations.appliquer(connexion=connexion) == []
+
+
+def test_appliquer_les_trois_modes(tmp_path, connexion):
+    _ecrire(
+        tmp_path,
+        "0001_table.sql",
+        "CREATE TABLE essai_migration (id INT PRIMARY KEY, v INT);\n"
+        "INSERT INTO essai_migration SELECT g, NULL FROM generate_series(1, 25) g;\n",
+    )
+    _ecrire(
+        tmp_path,
+        "0002_index.sql",
+        "-- migration: sans-transaction\n"
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_essai_migration_v\n"
+        "  ON essai_migration (v);\n",
+    )
+    _ecrire(
+        tmp_path,
+        "0003_remplir.sql",
+        "-- migration: par-lots\n"
+        "UPDATE essai_migration SET v = id\n"
+        "WHERE id IN (SELECT id FROM essai_migration WHERE v IS NULL LIMIT %(taille_lot)s);\n",
+    )
+    with connexion.cursor() as cur:
+        cur.execute("DELETE FROM schema_migrations WHERE version <= 3;")
+    connexion.commit()
+
+    try:
+        res = Migrations.appliquer(str(tmp_path), taille_lot=10, pause_s=0, connexion=connexion)
+
+        assert res == [1, 2, 3]
+        with connexion.cursor() as cur:
+            cur.execute("SELECT count(*) AS nb FROM essai_migration WHERE v IS NULL;")
+            assert cur.fetchone()["nb"] == 0
+            cur.execute("SELECT to_regclass('idx_essai_migration_v') IS NOT NULL AS existe;")
+            assert cur.fetchone()["existe"]
+        # Rejouer ne fait rien
+        assert Migrations.appliquer(str(tmp_path), connexion=connexion) == []
+    finally:
+        with connexion.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS essai_migration;")
+            cur.execute("DELETE FROM schema_migrations;")
+            Migrations.marquer_appliquees(cur)
+        connexion.commit()
+
+
+def test_echec_transactionnel_non_enregistre(tmp_path, connexion):
+    _ecrire(tmp_path, "0900_casse.sql", "CREATE TABLE essai_casse (id INT);\nSELECT 1/0;\n")
+
+    with pytest.raises(Exception):
+        Migrations.appliquer(str(tmp_path), connexion=connexion)
+
+    with connexion.cursor() as cur:
+        cur.execute("SELECT to_regclass('essai_casse') IS NULL AS absente;")
+        assert cur.fetchone()["absente"]
+        assert 900 not in Migrations.versions_appliquees(cur)
+    connexion.commit()
+
+
+def test_remplir_temps_utilisation_sans_double_compte(connexion):
+    """0006 ajoute les seules sessions non cumulées, même après une fermeture récente."""
+    from src.dao.session_dao import SessionDAO
+    from src.dao.utilisateur_dao import UtilisateurDao
+
+    migration = next(m for m in lister_migrations() if m.version == 6)
+    avant = UtilisateurDao().heures_utilisation(3)
+    with connexion.cursor() as cur:
+        # Session fermée avant le cumul à la fermeture : 1 h, non marquée
+        cur.execute(
+            "INSERT INTO sessions (user_id, connexion, deconnexion) "
+            "VALUES (3, NOW() - interval '1 hour', NOW());"
+        )
+    connexion.commit()
+    # Session fermée par l'application pendant le remplissage : 2 h, cumulée
+    sid = SessionDAO().ouvrir(3)
+    with connexion.cursor() as cur:
+        cur.execute(
+            "UPDATE sessions SET connexion = NOW() - interval '2 hours' WHERE id = %(id)s;",
+            {"id": sid},
+        )
+    connexion.commit()
+    SessionDAO().fermer([sid])
+
+    while True:
+        with connexion.cursor() as cur:
+            cur.execute(migration.sql, {"taille_lot": 1})
+            nb = cur.rowcount
+        connexion.commit()
+        if nb <= 0:
+            break
+
+    assert UtilisateurDao().heures_utilisation(3) == pytest.approx(avant + 3, abs=0.01)
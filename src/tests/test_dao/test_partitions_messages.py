@@ -0,0 +1,91 @@
+import datetime
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.dao.conversation_dao import ConversationDAO
+from src.dao.db_connection import DBConnection
+from src.utils.partitions_messages import (
+    NB_MOIS_AVANCE,
+    PartitionsMessages,
+    bornes_partition,
+    debut_mois,
+    mois_suivant,
+    nom_partition,
+)
+from src.utils.reset_database import ResetDatabase
+
+
+@pytest.fixture(scope="module", autouse=True)
+def base_partitionnee():
+    """Base de test avec `messages` partitionnée, remise à l'état normal à la fin."""
+    with patch.dict(os.environ, {"SCHEMA": "projet_test_dao"}):
+        ResetDatabase().lancer(test_dao=True, partitionner_messages=True)
+        yield
+        ResetDatabase().lancer(test_dao=True, partitionner_messages=False)
+
+
+def _executer(requete: str, params: dict | None = None):
+    with DBConnection().connection as conn:
+        with conn.cursor() as cur:
+            cur.execute(requete, params)
+            return cur.fetchall()
+
+
+def test_table_partitionnee_et_donnees_conservees():
+    with DBConnection().connection as conn:
+        with conn.cursor() as cur:
+            assert PartitionsMessages.est_partitionnee(cur)
+    assert PartitionsMessages.partitionner() is False
+    rows = _executer("SELECT count(*) AS nb FROM messages_2025_07;")
+    assert rows[0]["nb"] > 0
+
+
+def test_recherche_par_date_limitee_a_une_partition():
+    d = datetime.date(2025, 7, 21)
+    assert ConversationDAO.rechercher_echange(2, "heureux", d)
+
+    d0, d1 = ConversationDAO._bornes_jour(d)
+    plan = _executer(
+        "EXPLAIN SELECT * FROM messages WHERE cree_le >= %(d0)s AND cree_le < %(d1)s;",
+        {"d0": d0, "d1": d1},
+    )
+    texte = "\n".join(next(iter(r.values())) for r in plan)
+    assert "messages_2025_07" in texte
+    assert "messages_defaut" not in texte
+
+
+def test_creer_partitions_deplace_les_lignes_de_la_partition_par_defaut():
+    # Un mois au-delà des partitions créées à l'avance : la ligne va dans la partition par défaut
+    mois = debut_mois(datetime.date.today())
+    for _ in range(NB_MOIS_AVANCE + 2):
+        mois = mois_suivant(mois)
+    _executer(
+        """
+        INSERT INTO messages (conversation_id, utilisateur_id, emetteur, contenu, cree_le)
+        VALUES (2, NULL, 'ia', 'message futur', %(cree_le)s)
+        RETURNING id;
+        """,
+        {"cree_le": bornes_partition(mois)[0] + datetime.timedelta(days=3)},
+    )
+    assert _executer("SELECT count(*) AS nb FROM messages_defaut;")[0]["nb"] == 1
+
+    crees = PartitionsMessages.creer_partitions(nb_mois_avance=NB_MOIS_AVANCE + 2)
+
+    assert nom_partition(mois) in crees
+    assert _executer("SELECT count(*) AS nb FROM messages_defaut;")[0]["nb"] == 0
+    rows = _executer(f"SELECT count(*) AS nb FROM {nom_partition(mois)};")
+    assert rows[0]["nb"] == 1
+
+
+def test_derniere_activite_tenue_apres_partitionnement():
+    """Le trigger de dernière activité est recréé sur la table partitionnée."""
+    _executer(
+        "INSERT INTO messages (conversation_id, emetteur, contenu, cree_le)"
+        " VALUES (4, 'ia', 'encore là', '2025-08-01 12:00:00+00') RETURNING id;"
+    )
+    rows = _executer("SELECT derniere_activite FROM conversations WHERE id = 4;")
+    assert rows[0]["derniere_activite"] == datetime.datetime(
+        2025, 8, 1, 12, tzinfo=datetime.timezone.utc
+    )
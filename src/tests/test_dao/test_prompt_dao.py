@@ -1,8 +1,9 @@
 import os
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
+from src.dao.db_connection import DBConnection
 from src.dao.prompt_dao import PromptDAO
 from src.utils.reset_database import ResetDatabase
 
@@ -75,3 +76,41 @@ def test_obtenir_texte_prompt_par_id_inexistant():
     """obtenir_texte_prompt_par_id renvoie None pour un id inexistant."""
     texte = PromptDAO.obtenir_texte_prompt_par_id(987654321)
     assert texte is None
+
+
+def test_cache_aucune_requete_en_regime_etabli():
+    """Une fois le cache chargé, les lectures ne font aucune requête."""
+    PromptDAO.invalider_cache()
+    prompt_id = PromptDAO.obtenir_id_par_nom("math_tuteur")
+
+    with patch("src.dao.prompt_dao.DBConnection") as MockDB:
+        faux_conn = MagicMock()
+        MockDB.return_value.connection = faux_conn
+        assert PromptDAO.existe_id(prompt_id) is True
+        assert PromptDAO.obtenir_texte_prompt_par_id(prompt_id)
+        assert PromptDAO.obtenir_id_par_nom("math_tuteur") == prompt_id
+
+    faux_conn.cursor.assert_not_called()
+
+
+def test_cache_invalide_par_notification():
+    """Une modification de la table (trigger NOTIFY) invalide le cache."""
+    prompt_id = PromptDAO.obtenir_id_par_nom("codeur_python")
+    assert "swagg" in PromptDAO.obtenir_texte_prompt_par_id(prompt_id)
+
+    with DBConnection().connection as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "UPDATE prompts SET contenu = %(c)s, version = version + 1 WHERE id = %(id)s;",
+                {"c": "Tu es un codeur python concis.", "id": prompt_id},
+            )
+
+    assert PromptDAO.obtenir_texte_prompt_par_id(prompt_id) == "Tu es un codeur python concis."
+
+
+def test_invalider_cache_recharge_les_prompts():
+    """invalider_cache force le rechargement au prochain accès."""
+    PromptDAO.obtenir_id_par_nom("math_prof")
+    PromptDAO.invalider_cache()
+    assert PromptDAO._contenu_cache is None
+    assert PromptDAO.obtenir_id_par_nom("math_prof") is not None
@@ -0,0 +1,96 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.dao.db_connection import DBConnection
+from src.dao.session_dao import SessionDAO
+from src.dao.utilisateur_dao import UtilisateurDao
+from src.utils.reset_database import ResetDatabase
+
+
+@pytest.fixture(scope="session", autouse=True)
+def setup_test_environment():
+    """Initialisation des données de test"""
+    with patch.dict(os.environ, {"SCHEMA": "projet_test_dao"}):
+        ResetDatabase().lancer(test_dao=True)
+        yield
+
+
+def _vieillir(session_id: int, minutes: int) -> None:
+    """Recule le dernier signal d'une session."""
+    with DBConnection().connection as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "UPDATE sessions SET dernier_signal = NOW() - make_interval(mins => %(m)s) "
+                "WHERE id = %(id)s;",
+                {"m": minutes, "id": session_id},
+            )
+
+
+def _deconnexion(session_id: int):
+    with DBConnection().connection as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT deconnexion, dernier_signal FROM sessions WHERE id = %(id)s;",
+                {"id": session_id},
+            )
+            return cur.fetchone()
+
+
+def test_fermer_plusieurs_sessions():
+    dao = SessionDAO()
+    ids = [dao.ouvrir(1), dao.ouvrir(2)]
+    assert dao.fermer(ids) == 2
+    assert dao.fermer(ids) == 0
+    assert dao.fermer([]) == 0
+
+
+def test_signaler_session_ouverte_seulement():
+    dao = SessionDAO()
+    ouverte, fermee = dao.ouvrir(1), dao.ouvrir(1)
+    dao.fermer([fermee])
+    assert dao.signaler([ouverte, fermee]) == 1
+    dao.fermer([ouverte])
+
+
+def test_fermer_sessions_inactives_au_dernier_signal():
+    dao = SessionDAO()
+    active, abandonnee = dao.ouvrir(1), dao.ouvrir(2)
+    _vieillir(abandonnee, 30)
+
+    assert dao.fermer_sessions_inactives(600) >= 1
+
+    row = _deconnexion(abandonnee)
+    assert row["deconnexion"] == row["dernier_signal"]
+    assert _deconnexion(active)["deconnexion"] is None
+    dao.fermer([active])
+
+
+def _reculer_connexion(session_id: int, heures: int) -> None:
+    with DBConnection().connection as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "UPDATE sessions SET connexion = NOW() - make_interval(hours => %(h)s) "
+                "WHERE id = %(id)s;",
+                {"h": heures, "id": session_id},
+            )
+
+
+def test_fermeture_cumule_le_temps_utilisation():
+    dao, udao = SessionDAO(), UtilisateurDao()
+    avant = udao.heures_utilisation(3)
+    sid = dao.ouvrir(3)
+    _reculer_connexion(sid, 2)
+
+    assert udao.heures_utilisation_incl_courante(3) == pytest.approx(avant + 2, abs=0.01)
+    assert dao.fermer([sid]) == 1
+    assert udao.heures_utilisation(3) == pytest.approx(avant + 2, abs=0.01)
+    assert udao.heures_utilisation_incl_courante(3) == pytest.approx(avant + 2, abs=0.01)
+
+
+def test_recalculer_temps_utilisation_coherent():
+    udao = UtilisateurDao()
+    avant = udao.heures_utilisation(3)
+    assert UtilisateurDao.recalculer_temps_utilisation() >= 1
+    assert udao.heures_utilisation(3) == pytest.approx(avant, abs=0.01)
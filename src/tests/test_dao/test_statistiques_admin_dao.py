@@ -0,0 +1,84 @@
+import datetime
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.business_object.statistiques import Statistiques
+from src.client.metriques_llm import AppelLLM
+from src.dao.statistiques_admin_dao import StatistiquesAdminDAO
+from src.utils.reset_database import ResetDatabase
+
+
+@pytest.fixture(scope="session", autouse=True)
+def setup_test_environment():
+    """Initialisation des données de test"""
+    with patch.dict(os.environ, {"SCHEMA": "projet_test_dao"}):
+        ResetDatabase().lancer(test_dao=True)
+        yield
+
+
+def test_utilisateurs_actifs_par_jour():
+    """Messages du 21/07/2025 au 24/07/2025 : un utilisateur actif par jour (sauf l'IA)."""
+    res = dict(
+        StatistiquesAdminDAO.utilisateurs_actifs_par_jour(
+            datetime.date(2025, 7, 21), datetime.date(2025, 7, 24)
+        )
+    )
+    assert res[datetime.date(2025, 7, 21)] == 1
+    assert datetime.date(2025, 7, 22) not in res
+
+
+def test_messages_par_prompt():
+    res = StatistiquesAdminDAO.messages_par_prompt()
+    total = sum(r["nb_messages"] for r in res)
+    assert total >= 10
+    assert all({"prompt", "nb_conversations", "nb_messages"} <= set(r) for r in res)
+
+
+def test_longueur_moyenne_conversations():
+    assert StatistiquesAdminDAO.longueur_moyenne_conversations() > 0
+
+
+def test_percentiles_latence_llm():
+    StatistiquesAdminDAO.enregistrer_appel_llm(1, 100)
+    StatistiquesAdminDAO.enregistrer_appel_llm(None, 300)
+    res = StatistiquesAdminDAO.percentiles_latence_llm((0.5,))
+    assert 100 <= res[0.5] <= 300
+
+
+def test_couts_llm_par_conversation():
+    StatistiquesAdminDAO.enregistrer_appel_llm(
+        2, 5_000, AppelLLM(5_000, 1_200, 4, 200, tokens_prompt=90, tokens_reponse=30)
+    )
+    StatistiquesAdminDAO.enregistrer_appel_llm(2, 7_000, AppelLLM(7_000, 1_500, 6, None, 1))
+    res = StatistiquesAdminDAO.couts_llm_par_conversation(limite=1)
+    assert len(res) == 1
+    assert res[0]["conversation_id"] == 2
+    assert res[0]["nb_appels"] == 2
+    assert res[0]["latence_totale_ms"] == 12_000
+    assert res[0]["octets_requete"] == 2_700
+    assert res[0]["tokens"] == 120
+    assert res[0]["nb_erreurs"] == 1
+    assert res[0]["nb_retentatives"] == 1
+
+
+def test_enregistrer_appels_llm_conversation_supprimee():
+    """Un appel d'une conversation supprimée est gardé sans conversation ; le lot passe."""
+    nb = StatistiquesAdminDAO.enregistrer_appels_llm(
+        [(1, 50, None), (999_999, 60, AppelLLM(60, 100, 2, 200, 0)), (None, 70, None)]
+    )
+    assert nb == 3
+    couts = StatistiquesAdminDAO.couts_llm_par_conversation(limite=100)
+    assert 999_999 not in [r["conversation_id"] for r in couts]
+
+
+def test_stats_tranche():
+    stats = StatistiquesAdminDAO.stats_tranche([9, 10])
+    assert isinstance(stats, Statistiques)
+    assert stats.nb_conversations == 3
+    assert stats.nb_messages == 2
+
+
+def test_stats_tranche_vide():
+    assert StatistiquesAdminDAO.stats_tranche([]).nb_conversations == 0
@@ -0,0 +1,41 @@
+import datetime
+import os
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from src.dao.token_revoque_dao import TokenRevoqueDAO
+from src.utils.reset_database import ResetDatabase
+
+
+@pytest.fixture(scope="session", autouse=True)
+def setup_test_environment():
+    """Initialisation des données de test"""
+    with patch.dict(os.environ, {"SCHEMA": "projet_test_dao"}):
+        ResetDatabase().lancer(test_dao=True)
+        yield
+
+
+def _dans(secondes: int) -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=secondes)
+
+
+def test_revoquer_puis_est_revoque():
+    jti = uuid.uuid4().hex
+    assert TokenRevoqueDAO.est_revoque(jti) is False
+    assert TokenRevoqueDAO.revoquer(jti, _dans(3600)) is True
+    assert TokenRevoqueDAO.est_revoque(jti) is True
+
+
+def test_revoquer_deux_fois():
+    jti = uuid.uuid4().hex
+    assert TokenRevoqueDAO.revoquer(jti, _dans(3600)) is True
+    assert TokenRevoqueDAO.revoquer(jti, _dans(3600)) is False
+
+
+def test_token_expire_n_est_plus_revoque_et_est_purge():
+    jti = uuid.uuid4().hex
+    TokenRevoqueDAO.revoquer(jti, _dans(-10))
+    assert TokenRevoqueDAO.est_revoque(jti) is False
+    assert TokenRevoqueDAO.purger_expires() >= 1
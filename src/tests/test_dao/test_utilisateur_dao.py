@@ -151,6 +151,27 @@ def test_supprimer_exception_sql():
             UtilisateurDao().supprimer(utilisateur)
 
 
+def test_modifier_mot_de_passe_ok():
+    """Le hash enregistré est remplacé (ré-hachage à la connexion)"""
+    # GIVEN
+    utilisateur = UtilisateurDao().trouver_par_id(3)
+    ancien_hash = utilisateur.password_hash
+    utilisateur.password_hash = "$scrypt$ln=4,r=8,p=1$c2Vs$aGFzaA"
+    # WHEN
+    ok = UtilisateurDao().modifier_mot_de_passe(utilisateur)
+    # THEN
+    assert ok is True
+    assert UtilisateurDao().trouver_par_id(3).password_hash == utilisateur.password_hash
+    utilisateur.password_hash = ancien_hash
+    UtilisateurDao().modifier_mot_de_passe(utilisateur)
+
+
+def test_modifier_mot_de_passe_utilisateur_inexistant():
+    """Aucune ligne mise à jour pour un id inconnu"""
+    utilisateur = Utilisateur(id=9999999, pseudo="fantome", password_hash="$scrypt$x")
+    assert UtilisateurDao().modifier_mot_de_passe(utilisateur) is False
+
+
 def test_heures_utilisation_avec_sessions():
     """Calcul des heures d'utilisation pour un utilisateur avec des sessions"""
     # GIVEN
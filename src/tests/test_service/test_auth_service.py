@@ -1,7 +1,11 @@
+from unittest.mock import MagicMock, patch
+
 import pytest
 from src.dao.utilisateur_dao import UtilisateurDao
 from src.business_object.utilisateur import Utilisateur
 from src.service.auth_service import Auth_Service
+from src.service.revocation_tokens import RevocationMemoire
+from src.utils.securite import HacheurScrypt, configurer_hacheur, hash_password
 from dotenv import load_dotenv
 
 load_dotenv('.env')
@@ -54,7 +58,7 @@ class TestAuthService:
         auth_service.se_deconnecter(token)
         
         # THEN
-        assert token in auth_service.tokens_invalides
+        assert auth_service.verifier_token(token) is False
 
     def test_verifier_token_valide(self, auth_service, utilisateur_test):
         # GIVEN
@@ -82,4 +86,84 @@ class TestAuthService:
         result = auth_service.verifier_token(token)
         
         # THEN
-        assert result is False
\ No newline at end of file
+        assert result is False
+    def test_connecter_ouvre_la_session(self, auth_service, utilisateur_test):
+        # WHEN
+        utilisateur, token, session_id = auth_service.connecter("  Alice_Test ", "Password123!")
+
+        # THEN
+        assert utilisateur.id == utilisateur_test.id
+        assert auth_service.verifier_token(token) is True
+        assert isinstance(session_id, int)
+
+    def test_connecter_mot_de_passe_incorrect(self, auth_service, utilisateur_test):
+        with pytest.raises(ValueError, match="Mot de passe incorrect."):
+            auth_service.connecter("alice_test", "mauvais_password")
+
+
+# --------- Connexion en un passage (sans base) ---------
+
+
+def _service_sans_base(utilisateur):
+    dao = MagicMock()
+    dao.trouver_par_pseudo.return_value = utilisateur
+    return Auth_Service(dao, RevocationMemoire()), dao
+
+
+def test_connecter_deux_requetes_au_plus(monkeypatch):
+    monkeypatch.setattr("src.utils.jtw_utils.SECRET_KEY", "cle_de_test")
+    configurer_hacheur(HacheurScrypt(ln=4))
+    try:
+        utilisateur = Utilisateur.from_plain_password("eve", "secret", id=7)
+        service, dao = _service_sans_base(utilisateur)
+        with patch("src.service.auth_service.SessionDAO") as MockSession:
+            MockSession.return_value.ouvrir_a_la_connexion.return_value = 42
+
+            u, token, session_id = service.connecter(" Eve ", "secret")
+
+        assert (u, session_id) == (utilisateur, 42)
+        assert service.verifier_token(token) is True
+        dao.trouver_par_pseudo.assert_called_once_with("eve")
+        dao.modifier_mot_de_passe.assert_not_called()
+        MockSession.return_value.ouvrir_a_la_connexion.assert_called_once_with(7, None)
+    finally:
+        configurer_hacheur(None)
+
+
+def test_connecter_rehache_dans_la_requete_de_session(monkeypatch):
+    monkeypatch.setattr("src.utils.jtw_utils.SECRET_KEY", "cle_de_test")
+    configurer_hacheur(HacheurScrypt(ln=4))
+    try:
+        utilisateur = Utilisateur(id=7, pseudo="eve", password_hash=hash_password("secret", "eve"))
+        service, dao = _service_sans_base(utilisateur)
+        with patch("src.service.auth_service.SessionDAO") as MockSession:
+            MockSession.return_value.ouvrir_a_la_connexion.return_value = 42
+            service.connecter("eve", "secret")
+
+        (uid, nouveau_hash), _ = MockSession.return_value.ouvrir_a_la_connexion.call_args
+        assert uid == 7
+        assert nouveau_hash.startswith("$scrypt$")
+        assert utilisateur.password_hash == nouveau_hash
+        dao.modifier_mot_de_passe.assert_not_called()
+    finally:
+        configurer_hacheur(None)
+
+
+def test_connecter_session_en_echec(monkeypatch):
+    monkeypatch.setattr("src.utils.jtw_utils.SECRET_KEY", "cle_de_test")
+    ancien = hash_password("secret", "eve")
+    utilisateur = Utilisateur(id=7, pseudo="eve", password_hash=ancien)
+    service, _ = _service_sans_base(utilisateur)
+    with patch("src.service.auth_service.SessionDAO") as MockSession:
+        MockSession.return_value.ouvrir_a_la_connexion.side_effect = RuntimeError("base")
+        u, token, session_id = service.connecter("eve", "secret")
+
+    assert session_id is None
+    assert u.password_hash == ancien
+
+
+def test_connecter_pseudo_vide():
+    service, dao = _service_sans_base(None)
+    with pytest.raises(ValueError):
+        service.connecter("   ", "secret")
+    dao.trouver_par_pseudo.assert_not_called()
@@ -0,0 +1,108 @@
+import pytest
+
+from src.business_object.conversation import Conversation
+from src.business_object.echange import Echange
+from src.service.cache_conversations import CacheConversations
+
+
+@pytest.fixture
+def cache():
+    c = CacheConversations()
+    c.invalider()
+    yield c
+    c.invalider()
+
+
+def messages(n, debut=0):
+    return [Echange(id=i, message=f"m{i}") for i in range(debut, debut + n)]
+
+
+def test_obtenir_absent(cache):
+    assert cache.obtenir(1) is None
+    assert cache.lire_fil(1, 0, 10) is None
+
+
+def test_lire_fil_complet(cache):
+    cache.enregistrer_fil(1, messages(5))
+    assert [e.id for e in cache.lire_fil(1, 0, 2)] == [3, 4]
+    assert [e.id for e in cache.lire_fil(1, 3, 10)] == [0, 1]
+    assert len(cache.lire_fil(1, 0, None)) == 5
+    assert cache.lire_fil(1, 10, 5) == []
+
+
+def test_lire_fil_incomplet(cache, monkeypatch):
+    """Un fil tronqué ne répond qu'aux pages qu'il contient entièrement."""
+    monkeypatch.setattr(CacheConversations, "TAILLE_FIL", 3)
+    cache.invalider()
+    cache.enregistrer_fil(1, messages(4))
+    assert [e.id for e in cache.lire_fil(1, 0, 2)] == [2, 3]
+    assert cache.lire_fil(1, 0, 5) is None
+    assert cache.lire_fil(1, 0, None) is None
+
+
+def test_ajouter_echanges_write_through(cache):
+    cache.enregistrer_fil(1, messages(2))
+    cache.ajouter_echanges(1, messages(2, debut=2), id_precedent=1)
+    assert [e.id for e in cache.lire_fil(1, 0, None)] == [0, 1, 2, 3]
+    assert cache.obtenir(1).dernier.id == 3
+
+
+def test_ajouter_echanges_conversation_vide(cache):
+    cache.enregistrer_fil(1, [])
+    assert cache.obtenir(1).dernier is None
+    cache.ajouter_echanges(1, messages(2), id_precedent=None)
+    assert [e.id for e in cache.lire_fil(1, 0, None)] == [0, 1]
+
+
+def test_ajouter_echanges_desynchronise(cache):
+    """Un autre processus a écrit : le fil en cache est abandonné."""
+    cache.enregistrer_fil(1, messages(2))
+    cache.ajouter_echanges(1, messages(2, debut=5), id_precedent=4)
+    assert cache.lire_fil(1, 0, 1) is None
+
+
+def test_enregistrer_fil_complet(cache, monkeypatch):
+    """Un historique complet plus long que TAILLE_FIL est gardé et complété en entier."""
+    monkeypatch.setattr(CacheConversations, "TAILLE_FIL", 3)
+    cache.invalider()
+    cache.enregistrer_fil(1, messages(5), complet=True)
+    cache.ajouter_echanges(1, messages(2, debut=5), id_precedent=4)
+    assert [e.id for e in cache.lire_fil(1, 0, None)] == list(range(7))
+
+
+def test_enregistrer_fil_complet_borne(cache, monkeypatch):
+    """Un historique complet ne dépasse pas TAILLE_FIL_COMPLET messages en mémoire."""
+    monkeypatch.setattr(CacheConversations, "TAILLE_FIL", 3)
+    monkeypatch.setattr(CacheConversations, "TAILLE_FIL_COMPLET", 6)
+    cache.invalider()
+    cache.enregistrer_fil(1, messages(5), complet=True)
+    cache.ajouter_echanges(1, messages(2, debut=5), id_precedent=4)
+    assert len(cache.obtenir(1).echanges) == 6
+    assert cache.lire_fil(1, 0, None) is None
+    cache.enregistrer_fil(2, messages(8), complet=True)
+    assert [e.id for e in cache.lire_fil(2, 0, 2)] == [6, 7]
+    assert cache.lire_fil(2, 0, None) is None
+
+
+def test_renommer_et_changer_prompt(cache):
+    cache.enregistrer_metadonnees(1, Conversation(id=1, nom="avant"), "PROMPT")
+    cache.renommer(1, "après")
+    cache.changer_prompt(1, 7, "NOUVEAU")
+    ctx = cache.obtenir(1)
+    assert ctx.conversation.nom == "après"
+    assert ctx.conversation.personnalisation == 7
+    assert ctx.prompt_systeme == "NOUVEAU"
+
+
+def test_expiration(cache, monkeypatch):
+    cache.enregistrer_metadonnees(1, None, "PROMPT")
+    monkeypatch.setattr(CacheConversations, "DUREE_S", -1)
+    assert cache.obtenir(1) is None
+
+
+def test_nombre_max_conversations(cache, monkeypatch):
+    monkeypatch.setattr(CacheConversations, "NB_MAX_CONVERSATIONS", 2)
+    for i in range(3):
+        cache.enregistrer_metadonnees(i, None, "PROMPT")
+    assert cache.obtenir(0) is None
+    assert cache.obtenir(2) is not None
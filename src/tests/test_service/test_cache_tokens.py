@@ -0,0 +1,95 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.service.auth_service import Auth_Service
+from src.service.cache_tokens import CacheTokens
+from src.service.revocation_tokens import RevocationMemoire
+from src.utils.jtw_utils import creer_token, verifier_token
+
+
+@pytest.fixture(autouse=True)
+def cache_vide(monkeypatch):
+    monkeypatch.setattr("src.utils.jtw_utils.SECRET_KEY", "cle_de_test")
+    CacheTokens().vider()
+    yield
+    CacheTokens().vider()
+
+
+def test_obtenir_apres_enregistrer():
+    cache = CacheTokens()
+    assert cache.obtenir("t") is None
+    cache.enregistrer("t", {"user_id": 1, "exp": time.time() + 60})
+    assert cache.obtenir("t")["user_id"] == 1
+    assert cache.metriques() == {
+        "nb_trouves": 1,
+        "nb_manques": 1,
+        "taux_reussite": 0.5,
+        "taille": 1,
+    }
+
+
+def test_entree_expiree_ignoree():
+    cache = CacheTokens()
+    cache.enregistrer("t", {"exp": time.time() - 1})
+    assert cache.obtenir("t") is None
+    assert len(cache) == 0
+
+
+def test_claims_sans_exp_non_mis_en_cache():
+    cache = CacheTokens()
+    cache.enregistrer("t", {"user_id": 1})
+    assert len(cache) == 0
+
+
+def test_taille_bornee_lru():
+    cache = CacheTokens()
+    exp = time.time() + 60
+    with patch.object(CacheTokens, "NB_MAX_TOKENS", 2):
+        cache.enregistrer("a", {"exp": exp})
+        cache.enregistrer("b", {"exp": exp})
+        cache.obtenir("a")  # "a" devient le plus récent
+        cache.enregistrer("c", {"exp": exp})
+
+    assert cache.obtenir("b") is None
+    assert cache.obtenir("a") is not None
+    assert cache.obtenir("c") is not None
+
+
+def test_verifier_token_ne_redecode_pas():
+    service = Auth_Service(MagicMock(), RevocationMemoire())
+    token = creer_token(1, "alice")
+
+    with patch("src.service.auth_service.verif_token", wraps=verifier_token) as mock_verif:
+        assert service.verifier_token(token) is True
+        assert service.verifier_token(token) is True
+        assert service.verifier_token(token) is True
+
+    assert mock_verif.call_count == 1
+    assert CacheTokens().metriques()["nb_trouves"] == 2
+
+
+def test_revocation_retire_du_cache():
+    revocations = RevocationMemoire()
+    service = Auth_Service(MagicMock(), revocations)
+    token = creer_token(1, "alice")
+    assert service.verifier_token(token) is True
+
+    service.se_deconnecter(token)
+
+    assert len(CacheTokens()) == 0
+    assert service.verifier_token(token) is False
+
+
+def test_revocation_par_un_autre_processus_respectee():
+    revocations = MagicMock()
+    revocations.est_revoque.return_value = False
+    service = Auth_Service(MagicMock(), revocations)
+    token = creer_token(1, "alice")
+    assert service.verifier_token(token) is True
+
+    revocations.est_revoque.return_value = True
+
+    assert service.verifier_token(token) is False
+    assert len(CacheTokens()) == 0
@@ -1,14 +1,38 @@
+import json
 from datetime import date
 from datetime import datetime as Date
+from datetime import timezone
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from src.business_object.apercu_conversation import ApercuConversation
 from src.business_object.conversation import Conversation
 from src.business_object.echange import Echange
+from src.business_object.lot_messages import LotMessages
 from src.dao.conversation_dao import ConversationDAO
 from src.dao.prompt_dao import PromptDAO
+from src.dao.statistiques_admin_dao import StatistiquesAdminDAO
+from src.service.cache_conversations import CacheConversations
 from src.service.conversation_service import ConversationService, ErreurNonTrouvee, ErreurValidation
+from src.service.journal_appels_llm import JournalAppelsLLM
+
+
+@pytest.fixture(autouse=True)
+def sans_journal_en_base(monkeypatch):
+    """Pas de base de données pendant ces tests : la mesure des appels LLM est ignorée."""
+    monkeypatch.setattr(StatistiquesAdminDAO, "enregistrer_appels_llm", MagicMock(side_effect=len))
+
+
+@pytest.fixture(autouse=True)
+def vider_cache_conversations(sans_journal_en_base):
+    """Chaque test part d'un cache de conversations (et d'un journal d'appels) vide."""
+    CacheConversations().invalider()
+    JournalAppelsLLM().vider()
+    yield
+    CacheConversations().invalider()
+    JournalAppelsLLM().vider()
+
 
 # Données factices
 liste_conversations = [
@@ -603,7 +627,10 @@ def test_exporter_conversation_json(tmp_path, monkeypatch):
     # On travaille dans un répertoire temporaire
     monkeypatch.chdir(tmp_path)
 
-    ConversationDAO.lire_echanges = MagicMock(return_value=liste_echanges)
+    lot = LotMessages()
+    lot.ajouter(1, 1, 1_753_092_000_000_000, "utilisateur", "Bonjour", 7, "alice")
+    lot.ajouter(2, 1, 1_753_092_001_000_000, "ia", "Salut !")
+    ConversationDAO.lire_lot_messages = MagicMock(return_value=lot)
     conv = Conversation(id=1, nom="Test", personnalisation=None)
     setattr(conv, "date_creation", Date.today())
     ConversationDAO.trouver_par_id = MagicMock(return_value=conv)
@@ -613,13 +640,17 @@ def test_exporter_conversation_json(tmp_path, monkeypatch):
 
     fichier = tmp_path / "exports" / "conversation_1.json"
     assert fichier.exists()
+    contenu = json.loads(fichier.read_text(encoding="utf-8"))
+    assert [m["message"] for m in contenu] == ["Bonjour", "Salut !"]
+    assert contenu[0]["agent_name"] == "alice"
+    assert contenu[1]["utilisateur_id"] is None
 
 
 def test_exporter_conversation_txt_sans_conv(tmp_path, monkeypatch):
     """Export TXT quand la conversation n'est pas retrouvée (fallback titre générique)."""
     monkeypatch.chdir(tmp_path)
 
-    ConversationDAO.lire_echanges = MagicMock(return_value=[])
+    ConversationDAO.lire_lot_messages = MagicMock(return_value=LotMessages())
     ConversationDAO.trouver_par_id = MagicMock(side_effect=Exception("introuvable"))
 
     service = ConversationService()
@@ -656,13 +687,15 @@ def test_demander_assistant_avec_conversation_et_persistance(monkeypatch):
         )
 
         # Historique ancien
-        ancien1 = Echange(agent="user", message="ancien msg", date_msg=Date.today())
-        setattr(ancien1, "expediteur", "utilisateur")
-        ancien2 = Echange(agent="assistant", message="ancien rep", date_msg=Date.today())
-        setattr(ancien2, "emetteur", "ia")
+        ancien1 = Echange(
+            agent="user", message="ancien msg", date_msg=Date.today(), emetteur="utilisateur"
+        )
+        ancien2 = Echange(
+            agent="assistant", message="ancien rep", date_msg=Date.today(), emetteur="ia"
+        )
 
         ConversationDAO.lire_echanges = MagicMock(return_value=[ancien1, ancien2])
-        ConversationDAO.ajouter_echange = MagicMock(return_value=True)
+        ConversationDAO.ajouter_echanges = MagicMock(return_value=None)
 
         e = ConversationService.demander_assistant(
             "Bonjour",
@@ -674,8 +707,16 @@ def test_demander_assistant_avec_conversation_et_persistance(monkeypatch):
         assert e.agent == "assistant"
         assert "Réponse" in e.message
 
-        # On a bien persisté les deux échanges (user + assistant)
-        assert ConversationDAO.ajouter_echange.call_count == 2
+        # On a bien persisté les deux échanges (user + assistant) en une seule requête
+        ConversationDAO.ajouter_echanges.assert_called_once()
+        id_conv, persistes = ConversationDAO.ajouter_echanges.call_args[0]
+        assert id_conv == 1
+        assert [p.emetteur for p in persistes] == ["utilisateur", "ia"]
+
+        # La mesure de l'appel attend dans le journal, puis est écrite par lot
+        assert len(JournalAppelsLLM()) == 1
+        assert JournalAppelsLLM().vider() == 1
+        assert StatistiquesAdminDAO.enregistrer_appels_llm.call_args[0][0][0][0] == 1
 
         # Vérifier la taille de l'historique passé au LLM
         args, kwargs = mock_client.generate.call_args
@@ -684,35 +725,14 @@ def test_demander_assistant_avec_conversation_et_persistance(monkeypatch):
         assert len(history) == 4
 
 def test_exporter_conversation_txt_avec_echanges(tmp_path, monkeypatch):
-    """
-    Couvre la boucle sur les échanges dans exporter_conversation (format TXT),
-    avec les deux cas :
-    - echange qui a afficher_echange()
-    - echange qui n'a PAS afficher_echange (fallback formatage date/agent/message)
-    """
+    """Export TXT : une ligne par message, au format de Echange.afficher_echange."""
     monkeypatch.chdir(tmp_path)
 
-    # 1) Premier échange avec méthode afficher_echange()
-    class EchangeAffichable:
-        def __init__(self):
-            self._txt = "LIGNE_FORMATTEE"
-
-        def afficher_echange(self):
-            return self._txt
-
-    e1 = EchangeAffichable()
-
-    # 2) Deuxième échange sans afficher_echange, mais avec date_msg / agent_name / message
-    class EchangeBrut:
-        def __init__(self):
-            self.date_msg = Date(2025, 1, 1, 12, 0, 0)
-            self.agent_name = "User"
-            self.message = "Bonjour"
-
-    e2 = EchangeBrut()
-
-    # On renvoie ces deux échanges
-    ConversationDAO.lire_echanges = MagicMock(return_value=[e1, e2])
+    # 2025-01-01 12:00:00 et 12:00:05 UTC
+    lot = LotMessages(fuseau=timezone.utc)
+    lot.ajouter(1, 3, 1_735_732_800_000_000, "utilisateur", "Bonjour", 7, "User")
+    lot.ajouter(2, 3, 1_735_732_805_000_000, "ia", "Salut")
+    ConversationDAO.lire_lot_messages = MagicMock(return_value=lot)
 
     # Conversation avec nom et date_creation
     conv = Conversation(id=3, nom="Sujet libre", personnalisation=None)
@@ -726,10 +746,10 @@ def test_exporter_conversation_txt_avec_echanges(tmp_path, monkeypatch):
     assert fichier.exists()
 
     contenu = fichier.read_text(encoding="utf-8")
-    # On vérifie qu'on a bien utilisé afficher_echange()
-    assert "LIGNE_FORMATTEE" in contenu
-    # Et aussi la ligne fallback (avec User: Bonjour)
-    assert "User: Bonjour" in contenu
+    assert "[2025-01-01 12:00:00] User: Bonjour" in contenu
+    assert "[2025-01-01 12:00:05] Assistant: Salut" in contenu
+    # Mêmes lignes que l'affichage d'un Echange
+    assert lot[0].afficher_echange() in contenu
 
 
 def test_demander_assistant_historique_erreur_mais_pas_de_crash(monkeypatch):
@@ -765,4 +785,156 @@ def test_demander_assistant_historique_erreur_mais_pas_de_crash(monkeypatch):
         assert "OK malgré erreur" in e.message
 
         # On vérifie qu'on a quand même appelé le LLM
-        mock_client.generate.assert_called_once()
\ No newline at end of file
+        mock_client.generate.assert_called_once()
+
+def _ajouter_echanges_factice():
+    """Remplace ConversationDAO.ajouter_echanges : ids attribués, dernier id précédent renvoyé."""
+    ids = iter(range(100, 200))
+    etat = {"dernier": None}
+
+    def ajouter(_id_conv, echanges):
+        precedent = etat["dernier"]
+        for e in echanges:
+            e.id = next(ids)
+        etat["dernier"] = echanges[-1].id
+        return precedent
+
+    return MagicMock(side_effect=ajouter)
+
+
+def test_demander_assistant_regime_etabli_sans_relecture(monkeypatch):
+    """
+    Deuxième tour dans la même conversation : le prompt système et l'historique
+    viennent du cache ; seuls les messages postérieurs au cache sont lus, puis
+    les deux messages sont insérés.
+    """
+    with patch("src.client.llm_client.LLM_API") as MockLLM:
+        mock_client = MockLLM.return_value
+        mock_client.generate.return_value = Echange(agent="assistant", message="Réponse")
+
+        conv = Conversation(id=5, nom="Sujet", personnalisation=None)
+        ConversationDAO.trouver_par_id = MagicMock(return_value=conv)
+        ConversationDAO.lire_echanges = MagicMock(return_value=[])
+        ConversationDAO.lire_echanges_apres = MagicMock(return_value=[])
+        ConversationDAO.ajouter_echanges = _ajouter_echanges_factice()
+
+        ConversationService.demander_assistant("Premier", id_conversation=5, id_user=1)
+        ConversationDAO.trouver_par_id.reset_mock()
+        ConversationDAO.lire_echanges.reset_mock()
+        ConversationDAO.lire_echanges_apres.assert_not_called()
+
+        ConversationService.demander_assistant("Second", id_conversation=5, id_user=1, pseudo="bob")
+
+        ConversationDAO.trouver_par_id.assert_not_called()
+        ConversationDAO.lire_echanges.assert_not_called()
+        ConversationDAO.lire_echanges_apres.assert_called_once()
+        id_conv, dernier = ConversationDAO.lire_echanges_apres.call_args[0]
+        assert (id_conv, dernier.id) == (5, 101)
+        assert ConversationDAO.ajouter_echanges.call_count == 2
+
+        # 1 system + 2 messages du premier tour + 1 nouveau
+        history = mock_client.generate.call_args.kwargs["history"]
+        assert len(history) == 4
+
+        # Le fil affiché est servi par le cache
+        fil = ConversationService.lire_fil(5, limite=2)
+        assert [e.agent_name for e in fil] == ["bob", "Assistant"]
+        ConversationDAO.lire_echanges.assert_not_called()
+
+
+def test_demander_assistant_message_d_un_autre_participant(monkeypatch):
+    """Un message écrit par un autre processus est lu avant l'appel et envoyé au LLM."""
+    with patch("src.client.llm_client.LLM_API") as MockLLM:
+        mock_client = MockLLM.return_value
+        mock_client.generate.return_value = Echange(agent="assistant", message="Réponse")
+        monkeypatch.setattr(
+            ConversationService, "_resoudre_prompt_systeme_pour_conv", lambda _id: "P"
+        )
+
+        ConversationDAO.lire_echanges = MagicMock(return_value=[])
+        ConversationDAO.ajouter_echanges = _ajouter_echanges_factice()
+        ConversationService.demander_assistant("Premier", id_conversation=5, id_user=1)
+
+        # Message d'alice, inséré par un autre processus après le premier tour
+        d_alice = Echange(id=150, agent="utilisateur", message="Et alice ?", emetteur="utilisateur")
+        ConversationDAO.lire_echanges_apres = MagicMock(return_value=[d_alice])
+        ConversationDAO.ajouter_echanges = MagicMock(return_value=150)
+
+        ConversationService.demander_assistant("Second", id_conversation=5, id_user=1)
+
+        history = mock_client.generate.call_args.kwargs["history"]
+        assert [h.message for h in history] == ["P", "Premier", "Réponse", "Et alice ?", "Second"]
+
+        # Le dernier id relevé à l'insertion est celui d'alice : le cache reste valable
+        assert len(CacheConversations().lire_fil(5, 0, None)) == 5
+        ConversationDAO.lire_echanges.assert_called_once()
+
+
+def test_demander_assistant_conversation_longue_lue_une_fois(monkeypatch):
+    """Une conversation plus longue que le cache est lue en entier une seule fois."""
+    monkeypatch.setattr(CacheConversations, "TAILLE_FIL", 2)
+    with patch("src.client.llm_client.LLM_API") as MockLLM:
+        mock_client = MockLLM.return_value
+        mock_client.generate.return_value = Echange(agent="assistant", message="Réponse")
+        monkeypatch.setattr(
+            ConversationService, "_resoudre_prompt_systeme_pour_conv", lambda _id: "P"
+        )
+
+        anciens = [
+            Echange(id=i, agent="ia", message=f"m{i}", emetteur="ia") for i in range(1, 5)
+        ]
+        ConversationDAO.lire_echanges = MagicMock(
+            side_effect=lambda _id, offset=0, limit=None: anciens[-limit:] if limit else anciens
+        )
+        ConversationDAO.lire_echanges_apres = MagicMock(return_value=[])
+        ConversationDAO.ajouter_echanges = MagicMock(side_effect=[4, None])
+
+        ConversationService.demander_assistant("Premier", id_conversation=8, id_user=1)
+        assert ConversationDAO.lire_echanges.call_count == 2
+        assert len(mock_client.generate.call_args.kwargs["history"]) == 6
+
+        ConversationService.demander_assistant("Second", id_conversation=8, id_user=1)
+        assert ConversationDAO.lire_echanges.call_count == 2
+        # 1 system + 4 anciens + 2 du premier tour + 1 nouveau
+        assert len(mock_client.generate.call_args.kwargs["history"]) == 8
+
+
+def test_renommer_conversation_met_a_jour_le_cache():
+    CacheConversations().enregistrer_metadonnees(1, Conversation(id=1, nom="avant"), "P")
+    ConversationDAO.renommer_conv = MagicMock(return_value="titre modifié avec succès")
+
+    ConversationService.renommer_conversation(1, "après")
+
+    assert CacheConversations().obtenir(1).conversation.nom == "après"
+
+
+def test_supprimer_conversation_invalide_le_cache():
+    CacheConversations().enregistrer_metadonnees(1, Conversation(id=1, nom="x"), "P")
+    ConversationDAO.est_proprietaire = MagicMock(return_value=True)
+    ConversationDAO.supprimer_conv = MagicMock(return_value="ok")
+
+    ConversationService.supprimer_conversation(1, id_demandeur=10)
+
+    assert CacheConversations().obtenir(1) is None
+
+
+def test_page_conversations_delegue_au_dao():
+    """Une page d'aperçus et le total viennent d'un seul appel DAO."""
+    apercus = [ApercuConversation(liste_conversations[0], nb_messages=4, nb_participants=2)]
+    with patch.object(
+        ConversationDAO, "page_conversations", return_value=(apercus, 31)
+    ) as mock_page:
+        res = ConversationService.page_conversations(7, limite=15, decalage=15)
+
+    assert res == (apercus, 31)
+    mock_page.assert_called_once_with(id_user=7, limite=15, decalage=15)
+
+
+@pytest.mark.parametrize(
+    "id_utilisateur, limite, decalage",
+    [(None, 20, 0), (7, 0, 0), (7, 20, -1)],
+)
+def test_page_conversations_parametres_invalides(id_utilisateur, limite, decalage):
+    """Utilisateur manquant, limite ou décalage invalide → ErreurValidation."""
+    with pytest.raises(ErreurValidation):
+        ConversationService.page_conversations(id_utilisateur, limite=limite, decalage=decalage)
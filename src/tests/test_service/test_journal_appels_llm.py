@@ -0,0 +1,59 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.client.metriques_llm import AppelLLM
+from src.dao.statistiques_admin_dao import StatistiquesAdminDAO
+from src.service.journal_appels_llm import JournalAppelsLLM
+
+
+@pytest.fixture
+def journal(monkeypatch):
+    j = JournalAppelsLLM()
+    with patch.object(StatistiquesAdminDAO, "enregistrer_appels_llm"):
+        j.vider()
+    monkeypatch.setattr(JournalAppelsLLM, "TAILLE_LOT", 3)
+    monkeypatch.setattr(JournalAppelsLLM, "DELAI_S", 60.0)
+    yield j
+    with patch.object(StatistiquesAdminDAO, "enregistrer_appels_llm"):
+        j.vider()
+
+
+def test_ecriture_par_lot(journal):
+    """Aucune écriture avant que le lot soit plein, puis une seule requête."""
+    with patch.object(StatistiquesAdminDAO, "enregistrer_appels_llm", side_effect=len) as dao:
+        journal.ajouter(1, 100)
+        journal.ajouter(2, 200, AppelLLM(200, 1_000, 3, 200))
+        dao.assert_not_called()
+        journal.ajouter(None, 300)
+
+    dao.assert_called_once()
+    assert [(c, l) for c, l, _ in dao.call_args[0][0]] == [(1, 100), (2, 200), (None, 300)]
+    assert len(journal) == 0
+
+
+def test_ecriture_apres_delai(journal, monkeypatch):
+    monkeypatch.setattr(JournalAppelsLLM, "DELAI_S", 0.0)
+    with patch.object(StatistiquesAdminDAO, "enregistrer_appels_llm", side_effect=len) as dao:
+        journal.ajouter(1, 100)
+    dao.assert_called_once()
+
+
+def test_vider(journal):
+    with patch.object(StatistiquesAdminDAO, "enregistrer_appels_llm", side_effect=len) as dao:
+        assert journal.vider() == 0
+        journal.ajouter(1, 100)
+        assert journal.vider() == 1
+    dao.assert_called_once()
+
+
+def test_echec_ecriture_compte_les_appels_perdus(journal):
+    """Une base indisponible ne fait pas échouer le tour de chat."""
+    perdus = journal.nb_perdus
+    with patch.object(
+        StatistiquesAdminDAO, "enregistrer_appels_llm", side_effect=Exception("DB HS")
+    ):
+        journal.ajouter(1, 100)
+        assert journal.vider() == 0
+    assert journal.nb_perdus == perdus + 1
+    assert len(journal) == 0
@@ -0,0 +1,113 @@
+import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.service.auth_service import Auth_Service
+from src.service.cache_tokens import CacheTokens
+from src.service.revocation_tokens import (
+    RevocationMemoire,
+    RevocationPostgres,
+    configurer_revocation,
+    creer_revocation,
+    obtenir_revocation,
+)
+from src.utils.config import configurer_parametres
+from src.utils.jtw_utils import creer_token, verifier_token
+
+
+@pytest.fixture(autouse=True)
+def cle_jwt(monkeypatch):
+    monkeypatch.setattr("src.utils.jtw_utils.SECRET_KEY", "cle_de_test")
+    CacheTokens().vider()
+
+
+def _dans(secondes: int) -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=secondes)
+
+
+# ------------------ RevocationMemoire ------------------
+
+
+def test_revoquer_puis_est_revoque():
+    r = RevocationMemoire()
+    assert r.est_revoque("a") is False
+    assert r.revoquer("a", _dans(60)) is True
+    assert r.est_revoque("a") is True
+    assert r.revoquer("a", _dans(60)) is False
+
+
+def test_token_deja_expire_non_conserve():
+    r = RevocationMemoire()
+    assert r.revoquer("a", _dans(-1)) is False
+    assert len(r) == 0
+
+
+def test_entrees_expirees_purgees(monkeypatch):
+    r = RevocationMemoire()
+    r.revoquer("a", _dans(10))
+    r.revoquer("b", _dans(1000))
+    maintenant = datetime.datetime.now(datetime.timezone.utc).timestamp()
+    monkeypatch.setattr("src.service.revocation_tokens.time.time", lambda: maintenant + 100)
+
+    assert r.est_revoque("a") is False
+    r.revoquer("c", _dans(1000))
+    assert len(r) == 2
+    assert r.est_revoque("b") is True
+
+
+# ------------------ Fabrique ------------------
+
+
+def test_creer_revocation():
+    assert isinstance(creer_revocation("memoire"), RevocationMemoire)
+    precedents = configurer_parametres(revocation_tokens="postgres")
+    try:
+        assert isinstance(creer_revocation(), RevocationPostgres)
+    finally:
+        configurer_parametres(precedents)
+    with pytest.raises(ValueError):
+        creer_revocation("redis")
+
+
+def test_obtenir_revocation_partagee():
+    precedents = configurer_parametres(revocation_tokens="memoire")
+    configurer_revocation(None)
+    try:
+        assert obtenir_revocation() is obtenir_revocation()
+        assert Auth_Service(MagicMock()).revocations is obtenir_revocation()
+    finally:
+        configurer_revocation(None)
+        configurer_parametres(precedents)
+
+
+# ------------------ Auth_Service ------------------
+
+
+def test_token_contient_un_jti_unique():
+    t1, t2 = creer_token(1, "alice"), creer_token(1, "alice")
+    assert verifier_token(t1)["jti"] != verifier_token(t2)["jti"]
+
+
+def test_deconnexion_revoque_le_token_pour_tous_les_services():
+    revocations = RevocationMemoire()
+    token = creer_token(1, "alice")
+    autre = creer_token(1, "alice")
+
+    Auth_Service(MagicMock(), revocations).se_deconnecter(token)
+
+    # une autre instance (ex. celle créée au Ctrl+C) voit la révocation
+    service = Auth_Service(MagicMock(), revocations)
+    assert service.verifier_token(token) is False
+    assert service.verifier_token(autre) is True
+    assert revocations.est_revoque(verifier_token(token)["jti"])
+
+
+def test_deconnexion_token_invalide_ignoree():
+    revocations = MagicMock()
+    Auth_Service(MagicMock(), revocations).se_deconnecter("pas_un_jwt")
+    revocations.revoquer.assert_not_called()
+
+
+def test_verifier_token_invalide():
+    assert Auth_Service(MagicMock(), RevocationMemoire()).verifier_token("pas_un_jwt") is False
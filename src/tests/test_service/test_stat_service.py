@@ -0,0 +1,87 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.business_object.lot_messages import LotMessages
+from src.business_object.statistiques import Statistiques
+from src.dao.conversation_dao import ErreurAucuneConversation
+from src.service.stats_service import Statistiques_Service
+
+
+@pytest.fixture
+def service():
+    """Service avec des DAO factices (aucun accès base)."""
+    s = Statistiques_Service.__new__(Statistiques_Service)
+    s.conv_dao = MagicMock()
+    s.user_dao = MagicMock()
+    s.conv_dao.compter_conversations.return_value = 3
+    s.conv_dao.compter_message_user.return_value = 12
+    s.user_dao.heures_utilisation_incl_courante.return_value = 1.5
+    return s
+
+
+def test_stats_utilisateur_id_none(service):
+    """id_user None -> statistiques vides, aucun appel DAO."""
+    stats = service.stats_utilisateur(None)
+    assert isinstance(stats, Statistiques)
+    assert stats.nb_conversations == 0
+    service.conv_dao.compter_conversations.assert_not_called()
+
+
+def test_stats_utilisateur_sujets_depuis_index(service):
+    """Les sujets viennent de l'index des mots-clés, pas de la liste des conversations."""
+    service.conv_dao.sujets_plus_frequents.return_value = [("python", 4), ("matrice", 2)]
+
+    stats = service.stats_utilisateur(7)
+
+    assert stats.nb_conversations == 3
+    assert stats.nb_messages == 12
+    assert stats.heures_utilisation == 1.5
+    assert stats.sujets_plus_frequents == ["python", "matrice"]
+    service.conv_dao.sujets_plus_frequents.assert_called_once_with(7, k=Statistiques_Service.NB_SUJETS)
+    service.conv_dao.lister_conversations.assert_not_called()
+
+
+def test_stats_utilisateur_sans_conversation(service):
+    """Aucune conversation -> liste de sujets vide, sans erreur."""
+    service.conv_dao.sujets_plus_frequents.side_effect = ErreurAucuneConversation("7")
+
+    stats = service.stats_utilisateur(7)
+
+    assert stats.sujets_plus_frequents == []
+
+
+def test_stats_utilisateur_erreur_sujets_propagee(service):
+    """Une autre erreur du DAO n'est pas masquée, même si son message parle de conversation."""
+    service.conv_dao.sujets_plus_frequents.side_effect = Exception(
+        "connexion perdue (aucune conversation lue)"
+    )
+
+    with pytest.raises(Exception, match="connexion perdue"):
+        service.stats_utilisateur(7)
+
+
+def test_sujets_globaux(service):
+    """Les sujets globaux sont délégués au DAO."""
+    service.conv_dao.sujets_globaux.return_value = [("python", 10)]
+
+    res = service.sujets_globaux(k=5, source="messages")
+
+    assert res == [("python", 10)]
+    service.conv_dao.sujets_globaux.assert_called_once_with(source="messages", k=5)
+
+
+def test_stats_conversation_depuis_lot(service):
+    """Les statistiques d'une conversation sont agrégées sur le lot en colonnes."""
+    lot = LotMessages()
+    lot.ajouter(1, 4, 1_753_092_000_000_000, "utilisateur", "Bonjour", 7, "alice")
+    lot.ajouter(2, 4, 1_753_092_060_000_000, "ia", "Salut")
+    service.conv_dao.lire_lot_messages.return_value = lot
+
+    stats = service.stats_conversation(4)
+
+    service.conv_dao.lire_lot_messages.assert_called_once_with(4)
+    assert stats["nb_messages"] == 2
+    assert stats["par_emetteur"] == {"utilisateur": 1, "ia": 1}
+    assert stats["longueur_moyenne"] == pytest.approx(6.0)
+    assert len(stats["par_jour"]) == 1
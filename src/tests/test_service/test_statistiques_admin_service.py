@@ -0,0 +1,84 @@
+import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.business_object.statistiques import Statistiques
+from src.dao.statistiques_admin_dao import StatistiquesAdminDAO
+from src.service.statistiques_admin_service import StatistiquesAdmin_Service
+
+
+def stats_tranche_factice(ids):
+    """Une conversation, deux messages et un sujet par utilisateur."""
+    return Statistiques(
+        nb_conversations=len(ids),
+        nb_messages=2 * len(ids),
+        heures_utilisation=0.5 * len(ids),
+        sujets_plus_frequents=["python"] * len(ids),
+    )
+
+
+@pytest.fixture
+def service():
+    s = StatistiquesAdmin_Service()
+    s.dao = MagicMock()
+    return s
+
+
+def test_utilisateurs_actifs_periode_par_defaut(service):
+    service.dao.utilisateurs_actifs_par_jour.return_value = []
+    service.utilisateurs_actifs_par_jour()
+    debut, fin = service.dao.utilisateurs_actifs_par_jour.call_args[0]
+    assert fin == datetime.date.today()
+    assert (fin - debut).days == 30
+
+
+def test_utilisateurs_actifs_periode_invalide(service):
+    with pytest.raises(ValueError):
+        service.utilisateurs_actifs_par_jour(datetime.date(2025, 2, 1), datetime.date(2025, 1, 1))
+
+
+def test_percentiles_invalides(service):
+    with pytest.raises(ValueError):
+        service.percentiles_latence_llm((0.5, 1.5))
+    service.dao.percentiles_latence_llm.assert_not_called()
+
+
+def test_stats_tous_utilisateurs_sequentiel(service):
+    service.TAILLE_TRANCHE = 2
+    service.dao.lister_ids_utilisateurs.return_value = [1, 2, 3, 4, 5]
+    with patch.object(StatistiquesAdminDAO, "stats_tranche", side_effect=stats_tranche_factice) as m:
+        stats = service.stats_tous_utilisateurs(nb_processus=1)
+
+    assert m.call_count == 3
+    assert stats.nb_conversations == 5
+    assert stats.nb_messages == 10
+    assert stats.heures_utilisation == 2.5
+    assert stats._sujet_counts["python"] == 5
+
+
+def test_stats_tous_utilisateurs_pool_de_processus(service):
+    service.TAILLE_TRANCHE = 2
+    service.dao.lister_ids_utilisateurs.return_value = list(range(1, 8))
+    # Les processus (spawn) importent le module à neuf : on remplace la
+    # fonction envoyée au pool, pas la méthode du DAO
+    with patch(
+        "src.service.statistiques_admin_service._stats_tranche", stats_tranche_factice
+    ):
+        stats = service.stats_tous_utilisateurs(nb_processus=2)
+
+    assert stats.nb_conversations == 7
+    assert stats.nb_messages == 14
+    assert stats.top_sujets(1) == ["python"]
+
+
+def test_stats_tous_utilisateurs_aucun_utilisateur(service):
+    service.dao.lister_ids_utilisateurs.return_value = []
+    stats = service.stats_tous_utilisateurs()
+    assert stats.nb_conversations == 0
+
+
+def test_couts_llm_limite_invalide(service):
+    with pytest.raises(ValueError):
+        service.couts_llm_par_conversation(0)
+    service.dao.couts_llm_par_conversation.assert_not_called()
@@ -0,0 +1,89 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.service.surveillance_sessions import SurveillanceSessions
+from src.utils.singleton import Singleton
+
+
+@pytest.fixture
+def surveillance():
+    Singleton._instances.pop(SurveillanceSessions, None)
+    s = SurveillanceSessions()
+    yield s
+    s.arreter(attente_s=1)
+    Singleton._instances.pop(SurveillanceSessions, None)
+
+
+def test_cycle_signale_les_sessions_suivies(surveillance):
+    surveillance.suivre(3)
+    surveillance.suivre(5)
+    surveillance.oublier(5)
+    with patch("src.service.surveillance_sessions.SessionDAO") as MockDao:
+        dao = MockDao.return_value
+        dao.signaler.return_value = 1
+        dao.fermer_sessions_inactives.return_value = 4
+
+        res = surveillance.cycle("conn")
+
+    assert res == (1, 4)
+    dao.signaler.assert_called_once_with([3], "conn")
+    dao.fermer_sessions_inactives.assert_called_once_with(
+        SurveillanceSessions.DELAI_INACTIVITE_S, "conn"
+    )
+
+
+def test_cycle_sans_session_locale_ferme_quand_meme_les_inactives(surveillance):
+    with patch("src.service.surveillance_sessions.SessionDAO") as MockDao:
+        dao = MockDao.return_value
+        dao.fermer_sessions_inactives.return_value = 0
+
+        assert surveillance.cycle() == (0, 0)
+
+    dao.signaler.assert_not_called()
+
+
+def test_thread_utilise_sa_propre_connexion(surveillance):
+    cycle_fait = threading.Event()
+    connexion = MagicMock(closed=False)
+    surveillance.INTERVALLE_S = 0.01
+    with (
+        patch(
+            "src.service.surveillance_sessions.DBConnection.ouvrir_connexion",
+            return_value=connexion,
+        ) as mock_ouvrir,
+        patch.object(
+            SurveillanceSessions, "cycle", side_effect=lambda c: cycle_fait.set() or (0, 0)
+        ) as mock_cycle,
+    ):
+        surveillance.demarrer()
+        assert cycle_fait.wait(2)
+        surveillance.arreter(attente_s=2)
+
+    mock_ouvrir.assert_called_once()
+    mock_cycle.assert_called_with(connexion)
+    connexion.close.assert_called_once()
+
+
+def test_erreur_de_cycle_ne_tue_pas_le_thread(surveillance):
+    appels = []
+    deux_cycles = threading.Event()
+
+    def cycle(_):
+        appels.append(1)
+        if len(appels) >= 2:
+            deux_cycles.set()
+        raise RuntimeError("base indisponible")
+
+    surveillance.INTERVALLE_S = 0.01
+    with (
+        patch(
+            "src.service.surveillance_sessions.DBConnection.ouvrir_connexion",
+            return_value=MagicMock(closed=False),
+        ),
+        patch.object(SurveillanceSessions, "cycle", side_effect=cycle),
+    ):
+        surveillance.demarrer()
+        assert deux_cycles.wait(2)
+        surveillance.arreter(attente_s=2)
@@ -1,7 +1,9 @@
+import hashlib
 from unittest.mock import patch
 
 from src.business_object.utilisateur import Utilisateur
 from src.service.utilisateur_service import UtilisateurService
+from src.utils.securite import HacheurScrypt, configurer_hacheur
 
 # --------- Données factices ----------
 liste_utilisateurs = [
@@ -35,7 +37,7 @@ def test_creer_compte_ok():
     pseudo, mdp = "alice", "1234"
     with (
         patch("src.service.utilisateur_service.UtilisateurDao") as MockDao,
-        patch("src.service.utilisateur_service.hash_password", return_value="HASHED") as mock_hash,
+        patch("src.service.utilisateur_service.hacher_mot_de_passe", return_value="HASHED") as mock_hash,
     ):
         mock_dao = MockDao.return_value
         mock_dao.trouver_par_pseudo.return_value = None  # pas déjà pris
@@ -46,7 +48,7 @@ def test_creer_compte_ok():
         assert user is not None
         assert user.pseudo == pseudo
         assert user.password_hash == "HASHED"
-        mock_hash.assert_called_once_with(mdp, pseudo)
+        mock_hash.assert_called_once_with(mdp)
         mock_dao.trouver_par_pseudo.assert_called_once_with(pseudo)
         mock_dao.creer_utilisateur.assert_called_once()
 
@@ -56,7 +58,7 @@ def test_creer_compte_echec_dao():
     pseudo, mdp = "bob", "0000"
     with (
         patch("src.service.utilisateur_service.UtilisateurDao") as MockDao,
-        patch("src.service.utilisateur_service.hash_password", return_value="HASHED") as mock_hash,
+        patch("src.service.utilisateur_service.hacher_mot_de_passe", return_value="HASHED") as mock_hash,
     ):
         mock_dao = MockDao.return_value
         mock_dao.trouver_par_pseudo.return_value = None
@@ -65,7 +67,7 @@ def test_creer_compte_echec_dao():
         user = UtilisateurService().creer_compte(pseudo, mdp)
 
         assert user is None
-        mock_hash.assert_called_once_with(mdp, pseudo)
+        mock_hash.assert_called_once_with(mdp)
         mock_dao.trouver_par_pseudo.assert_called_once_with(pseudo)
         mock_dao.creer_utilisateur.assert_called_once()
 
@@ -215,10 +217,13 @@ def test_supprimer_echec():
 
 def test_se_connecter_ok():
     """Connexion réussie : pseudo existe et hash concordant"""
-    user = Utilisateur(id=7, pseudo="eve", password_hash="HASH")
+    user = Utilisateur(id=7, pseudo="eve", password_hash="$scrypt$HASH")
     with (
         patch("src.service.utilisateur_service.UtilisateurDao") as MockDao,
-        patch("src.business_object.utilisateur.hash_password", return_value="HASH") as mock_hash,
+        patch(
+            "src.business_object.utilisateur.verifier_mot_de_passe", return_value=True
+        ) as mock_verif,
+        patch("src.business_object.utilisateur.doit_rehacher", return_value=False),
     ):
         mock_dao = MockDao.return_value
         mock_dao.trouver_par_pseudo.return_value = user
@@ -227,18 +232,19 @@ def test_se_connecter_ok():
 
         assert res is not None
         assert res == user
-        mock_hash.assert_called_once_with("secret", "eve")
+        mock_verif.assert_called_once_with("secret", "$scrypt$HASH", "eve")
         mock_dao.trouver_par_pseudo.assert_called_once_with("eve")
+        mock_dao.modifier_mot_de_passe.assert_not_called()
 
 
 def test_se_connecter_mauvais_mdp():
     """Connexion échouée : hash ne correspond pas"""
-    user = Utilisateur(id=8, pseudo="zoe", password_hash="HASH")
+    user = Utilisateur(id=8, pseudo="zoe", password_hash="$scrypt$HASH")
     with (
         patch("src.service.utilisateur_service.UtilisateurDao") as MockDao,
         patch(
-            "src.business_object.utilisateur.hash_password", return_value="AUTREHASH"
-        ) as mock_hash,
+            "src.business_object.utilisateur.verifier_mot_de_passe", return_value=False
+        ) as mock_verif,
     ):
         mock_dao = MockDao.return_value
         mock_dao.trouver_par_pseudo.return_value = user
@@ -246,8 +252,49 @@ def test_se_connecter_mauvais_mdp():
         res = UtilisateurService().se_connecter("zoe", "badpass")
 
         assert res is None
-        mock_hash.assert_called_once_with("badpass", "zoe")
+        mock_verif.assert_called_once_with("badpass", "$scrypt$HASH", "zoe")
         mock_dao.trouver_par_pseudo.assert_called_once_with("zoe")
+        mock_dao.modifier_mot_de_passe.assert_not_called()
+
+
+def test_se_connecter_rehache_un_hash_herite():
+    """Connexion avec un ancien hash SHA-256 : le mot de passe est ré-haché et enregistré"""
+    ancien = hashlib.sha256(b"secreteve").hexdigest()
+    user = Utilisateur(id=7, pseudo="eve", password_hash=ancien)
+    configurer_hacheur(HacheurScrypt(ln=4))
+    try:
+        with patch("src.service.utilisateur_service.UtilisateurDao") as MockDao:
+            mock_dao = MockDao.return_value
+            mock_dao.trouver_par_pseudo.return_value = user
+            mock_dao.modifier_mot_de_passe.return_value = True
+
+            res = UtilisateurService().se_connecter("eve", "secret")
+
+            assert res == user
+            assert user.password_hash.startswith("$scrypt$ln=4,")
+            assert user.verifier_password("secret") is True
+            mock_dao.modifier_mot_de_passe.assert_called_once_with(user)
+    finally:
+        configurer_hacheur(None)
+
+
+def test_se_connecter_rehachage_en_echec_ne_bloque_pas():
+    """Si l'enregistrement du nouveau hash échoue, la connexion réussit avec l'ancien hash"""
+    ancien = hashlib.sha256(b"secreteve").hexdigest()
+    user = Utilisateur(id=7, pseudo="eve", password_hash=ancien)
+    configurer_hacheur(HacheurScrypt(ln=4))
+    try:
+        with patch("src.service.utilisateur_service.UtilisateurDao") as MockDao:
+            mock_dao = MockDao.return_value
+            mock_dao.trouver_par_pseudo.return_value = user
+            mock_dao.modifier_mot_de_passe.side_effect = RuntimeError("base indisponible")
+
+            res = UtilisateurService().se_connecter("eve", "secret")
+
+            assert res == user
+            assert user.password_hash == ancien
+    finally:
+        configurer_hacheur(None)
 
 
 def test_se_connecter_pseudo_inconnu():
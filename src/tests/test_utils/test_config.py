@@ -0,0 +1,65 @@
+import dataclasses
+
+import pytest
+
+from src.utils.config import (
+    Parametres,
+    configurer_parametres,
+    obtenir_parametres,
+)
+
+
+def test_valeurs_par_defaut():
+    p = Parametres.depuis_environnement({})
+    assert p == Parametres()
+    assert p.postgres_schema == "public"
+    assert p.llm_retentatives == 0
+    assert p.sql_instrumentation is True
+
+
+def test_conversion_des_types():
+    p = Parametres.depuis_environnement(
+        {
+            "POSTGRES_SCHEMA": "projet",
+            "LLM_RETENTATIVES": "3",
+            "LLM_DELAI_S": "12.5",
+            "SQL_INSTRUMENTATION": "non",
+            "MESSAGES_PARTITIONNES": "Oui",
+            "TRACES_FICHIER": " logs/traces.jsonl ",
+            "CACHE_TAILLE_FIL": "",
+        }
+    )
+    assert p.postgres_schema == "projet"
+    assert p.llm_retentatives == 3
+    assert p.llm_delai_s == 12.5
+    assert p.sql_instrumentation is False
+    assert p.messages_partitionnes is True
+    assert p.traces_fichier == "logs/traces.jsonl"
+    assert p.cache_taille_fil == Parametres().cache_taille_fil
+
+
+@pytest.mark.parametrize("variable", ["LLM_RETENTATIVES", "LOGS_JSON"])
+def test_valeur_invalide(variable):
+    with pytest.raises(ValueError, match=variable):
+        Parametres.depuis_environnement({variable: "beaucoup"})
+
+
+def test_immuables_et_secrets_masques():
+    p = Parametres(postgres_password="s3cr3t-bdd", secret_key="s3cr3t-jwt")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        p.llm_retentatives = 5
+    assert "s3cr3t" not in repr(p)
+
+
+def test_lus_une_seule_fois():
+    assert obtenir_parametres() is obtenir_parametres()
+
+
+def test_configurer_parametres():
+    precedents = configurer_parametres(llm_retentatives=4)
+    try:
+        assert obtenir_parametres().llm_retentatives == 4
+        assert obtenir_parametres().postgres_schema == precedents.postgres_schema
+    finally:
+        configurer_parametres(precedents)
+    assert obtenir_parametres() is precedents
@@ -0,0 +1,50 @@
+"""
+Temps de démarrage de l'application (python -X importtime).
+
+Le menu d'accueil ne doit charger ni la base (psycopg2), ni les jetons (jwt),
+ni le client LLM (requests) : ces modules sont importés au premier usage.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+RACINE = Path(__file__).resolve().parents[3]
+
+# Modules qui ne doivent pas être chargés avant le premier menu
+MODULES_DIFFERES = ("psycopg2", "jwt", "requests", "src.dao", "src.service", "src.client")
+
+# Budget large (machine d'intégration lente) : seule une régression nette échoue
+BUDGET_IMPORT_S = 1.5
+
+
+def importer_main() -> dict[str, int]:
+    """Temps d'import cumulé de chaque module chargé par ``import src.main`` (µs)."""
+    sortie = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        cwd=RACINE,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    temps = {}
+    for ligne in sortie.splitlines():
+        if not ligne.startswith("import time:") or "|" not in ligne:
+            continue
+        _, cumul, module = ligne.split("|")
+        if cumul.strip().isdigit():
+            temps[module.strip()] = int(cumul)
+    return temps
+
+
+def test_demarrage_sans_modules_differes():
+    temps = importer_main()
+    charges = [
+        m for m in temps if any(m == d or m.startswith(d + ".") for d in MODULES_DIFFERES)
+    ]
+    assert charges == []
+
+
+def test_demarrage_dans_le_budget():
+    temps = importer_main()
+    assert temps["src.main"] / 1e6 < BUDGET_IMPORT_S
@@ -0,0 +1,59 @@
+from src.utils.extraction_sujets import (
+    compter_mots,
+    compter_mots_par_cle,
+    delta_sujets,
+    extraire_mots,
+    raciniser,
+)
+
+
+def test_extraire_mots_ponctuation_et_elisions():
+    """La ponctuation, les chiffres et les élisions servent de séparateurs."""
+    res = extraire_mots("J'ai regardé One Piece, l'été dernier (100kg) !")
+    assert res == ["regardé", "one", "piece", "dernier", "kg"]
+
+
+def test_extraire_mots_mots_vides():
+    """Les mots vides sont retirés."""
+    assert extraire_mots("Recette de pastèque au maroilles") == ["recette", "pastèque", "maroille"]
+
+
+def test_extraire_mots_articles_et_mots_outils():
+    """Les articles (le, la, les...) et mots-outils courants ne sont pas des sujets."""
+    res = extraire_mots("Le chat et les chiens : la niche, puis vers les jardins avant le dîner")
+    assert res == ["chat", "chien", "niche", "jardin", "dîner"]
+
+
+def test_extraire_mots_type_invalide():
+    assert extraire_mots(None) == []
+
+
+def test_raciniser_pluriels():
+    assert raciniser("tomates") == "tomate"
+    assert raciniser("journaux") == "journau"
+    assert raciniser("bus") == "bus"
+    assert raciniser("stress") == "stress"
+
+
+def test_compter_mots():
+    compteur = compter_mots(["Les tomates", "tomate farcie", None])
+    assert compteur["tomate"] == 2
+    assert compteur["farcie"] == 1
+
+
+def test_compter_mots_par_cle():
+    """Un seul passage sur des couples (clé, texte)."""
+    comptes = compter_mots_par_cle([(1, "python avancé"), (2, "python"), (1, "Python !")])
+    assert comptes[1]["python"] == 2
+    assert comptes[2]["python"] == 1
+    assert set(comptes) == {1, 2}
+
+
+def test_delta_sujets_renommage():
+    delta = delta_sujets("jardinage des tomates", "cuisine des tomates")
+    assert delta == {"cuisine": 1, "jardinage": -1}
+
+
+def test_delta_sujets_creation_suppression():
+    assert delta_sujets(None, "matrice") == {"matrice": 1}
+    assert delta_sujets("matrice", None) == {"matrice": -1}
@@ -0,0 +1,102 @@
+import logging
+import threading
+
+import pytest
+
+from src.utils.log_decorator import LogIndetation, configurer_log, log
+
+NOM_LOGGER = "src.utils.log_decorator"
+
+
+class Compteur:
+    """Argument qui compte ses conversions en texte."""
+
+    def __init__(self):
+        self.nb_str = 0
+
+    def __str__(self):
+        self.nb_str += 1
+        return "compteur"
+
+
+class Service:
+    @log
+    def connecter(self, pseudo, mdp):
+        return [1, 2, 3, 4]
+
+    @log
+    def externe(self, x):
+        return self.interne(x)
+
+    @log
+    def interne(self, x):
+        return LogIndetation.get_indentation()
+
+    @log
+    def echouer(self):
+        raise ValueError("échec")
+
+
+@pytest.fixture(autouse=True)
+def reglages_par_defaut():
+    configurer_log(actif=True, taux_echantillonnage=1)
+    yield
+    configurer_log(actif=True, taux_echantillonnage=1)
+
+
+def test_log_debut_fin_sortie_et_mot_de_passe_masque(caplog):
+    with caplog.at_level(logging.INFO, logger=NOM_LOGGER):
+        Service().connecter("alice", mdp="secret")
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert messages[0] == "    Service.connecter('alice', '*****') - DEBUT"
+    assert messages[1].endswith("- FIN")
+    assert messages[2] == "       └─> Sortie : ['1', '2', '3'] ... (4 elements)"
+    assert "secret" not in caplog.text
+
+
+def test_rien_n_est_formate_si_info_desactive(caplog):
+    arg = Compteur()
+    with caplog.at_level(logging.WARNING, logger=NOM_LOGGER):
+        Service().externe(arg)
+    assert caplog.records == []
+    assert arg.nb_str == 0
+
+
+def test_desactivation_globale_et_echantillonnage(caplog):
+    with caplog.at_level(logging.INFO, logger=NOM_LOGGER):
+        configurer_log(actif=False)
+        Service().connecter("alice", "x")
+        configurer_log(actif=True, taux_echantillonnage=0)
+        Service().connecter("alice", "x")
+    assert caplog.records == []
+
+
+def test_taux_invalide():
+    with pytest.raises(ValueError):
+        configurer_log(taux_echantillonnage=2)
+
+
+def test_indentation_imbriquee_et_par_thread(caplog):
+    """Un thread lancé pendant un appel décoré repart de zéro."""
+    resultats = {}
+
+    class Lanceur:
+        @log
+        def lancer(self):
+            fil = threading.Thread(target=lambda: resultats.update(thread=Service().interne(1)))
+            fil.start()
+            fil.join()
+            return Service().externe(1)
+
+    with caplog.at_level(logging.INFO, logger=NOM_LOGGER):
+        resultats["principal"] = Lanceur().lancer()
+
+    assert resultats == {"principal": " " * 12, "thread": " " * 4}
+
+
+def test_indentation_retablie_apres_exception(caplog):
+    with caplog.at_level(logging.INFO, logger=NOM_LOGGER):
+        with pytest.raises(ValueError):
+            Service().echouer()
+        assert Service().interne(1) == " " * 4
@@ -0,0 +1,83 @@
+import json
+import logging
+import queue
+
+import pytest
+
+from src.utils.log_init import (
+    FormateurJSON,
+    HandlerFileBornee,
+    arreter_file,
+    installer_file,
+    metriques_logs,
+)
+
+
+class Memoire(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lignes = []
+
+    def emit(self, record):
+        self.lignes.append(self.format(record))
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("test_log_init")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    yield logger
+    arreter_file()
+    logger.handlers.clear()
+
+
+def test_ecriture_deportee(logger):
+    memoire = Memoire()
+    logger.addHandler(memoire)
+
+    installer_file(logger, taille=100)
+    logger.info("bonjour %s", "toi")
+    arreter_file()
+
+    assert memoire.lignes == ["bonjour toi"]
+    assert not any(h is memoire for h in logger.handlers)
+    assert metriques_logs()["nb_emis"] == 1
+
+
+def test_file_pleine_enregistrements_perdus_et_comptes():
+    handler = HandlerFileBornee(queue.Queue(maxsize=2))
+    logger = logging.getLogger("test_log_init_plein")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for i in range(5):
+            logger.warning("message %s", i)
+    finally:
+        logger.removeHandler(handler)
+
+    m = handler.metriques()
+    assert (m["nb_emis"], m["nb_perdus"], m["en_attente"]) == (2, 3, 2)
+    assert m["perdus_par_niveau"] == {"WARNING": 3}
+
+
+def test_format_json(logger):
+    memoire = Memoire()
+    logger.addHandler(memoire)
+
+    installer_file(logger, format_json=True)
+    try:
+        raise ValueError("boum")
+    except ValueError:
+        logger.exception("échec %d", 3)
+    arreter_file()
+
+    entree = json.loads(memoire.lignes[0])
+    assert entree["message"] == "échec 3"
+    assert entree["niveau"] == "ERROR"
+    assert "ValueError: boum" in entree["exception"]
+
+
+def test_formateur_json_sans_exception():
+    record = logging.makeLogRecord({"msg": "a", "levelname": "INFO", "name": "x"})
+    assert "exception" not in json.loads(FormateurJSON().format(record))
@@ -0,0 +1,115 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.utils.migrations import (
+    MODE_PAR_LOTS,
+    MODE_SANS_TRANSACTION,
+    MODE_TRANSACTION,
+    Migration,
+    Migrations,
+    lister_migrations,
+)
+
+
+def _ecrire(repertoire, nom, contenu):
+    (repertoire / nom).write_text(contenu, encoding="utf-8")
+
+
+def test_lister_migrations_triees_par_version(tmp_path):
+    _ecrire(tmp_path, "0010_deux.sql", "SELECT 2;")
+    _ecrire(tmp_path, "0002_un.sql", "SELECT 1;")
+    _ecrire(tmp_path, "notes.txt", "ignoré")
+
+    res = lister_migrations(str(tmp_path))
+
+    assert [(m.version, m.nom) for m in res] == [(2, "un"), (10, "deux")]
+
+
+def test_lister_migrations_version_en_double(tmp_path):
+    _ecrire(tmp_path, "0001_a.sql", "SELECT 1;")
+    _ecrire(tmp_path, "001_b.sql", "SELECT 1;")
+    with pytest.raises(ValueError):
+        lister_migrations(str(tmp_path))
+
+
+def test_mode_selon_la_directive():
+    assert Migration(1, "a", "SELECT 1;").mode == MODE_TRANSACTION
+    assert Migration(1, "a", "-- migration: par-lots\nSELECT 1;").mode == MODE_PAR_LOTS
+    with pytest.raises(ValueError):
+        Migration(1, "a", "-- migration: plus-tard\nSELECT 1;")
+
+
+def test_instructions_sans_commentaires():
+    m = Migration(
+        1,
+        "index",
+        "-- migration: sans-transaction\n"
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS i1\n  ON t (a);\n"
+        "-- remplacé ; par i1\n"
+        "DROP INDEX CONCURRENTLY IF EXISTS i0;\n",
+    )
+    assert m.instructions() == [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS i1\n  ON t (a)",
+        "DROP INDEX CONCURRENTLY IF EXISTS i0",
+    ]
+
+
+def test_lister_migration_python(tmp_path):
+    _ecrire(
+        tmp_path,
+        "0003_calcul.py",
+        "def lot(cursor, taille_lot, position):\n    return 0, position\n",
+    )
+    _ecrire(tmp_path, "0004_sans_lot.py", "X = 1\n")
+
+    with pytest.raises(ValueError):
+        lister_migrations(str(tmp_path))
+    (tmp_path / "0004_sans_lot.py").unlink()
+
+    (m,) = lister_migrations(str(tmp_path))
+    assert (m.version, m.nom, m.mode) == (3, "calcul", MODE_PAR_LOTS)
+    assert m.lot(None, 10, None) == (0, None)
+
+
+def test_migration_python_par_lots_jusqu_a_epuisement():
+    """La position renvoyée par un lot est passée au suivant ; un lot vide termine."""
+    positions = []
+
+    def lot(_cursor, taille_lot, position):
+        positions.append(position)
+        debut = position or 0
+        fin = min(debut + taille_lot, 5)
+        return fin - debut, fin
+
+    connexion = MagicMock()
+    Migrations._appliquer_une(connexion, Migration(8, "calcul", "", lot), 2, 0)
+
+    assert positions == [None, 2, 4, 5]
+    assert connexion.commit.call_count == 5
+
+
+def test_index_concurrent_ignore_sur_table_partitionnee():
+    cur = MagicMock()
+    cur.fetchone.return_value = {"relkind": "p"}
+    instruction = "CREATE INDEX CONCURRENTLY IF NOT EXISTS i1\n  ON messages (a, b)"
+    assert Migrations._table_partitionnee(cur, instruction) == "messages"
+
+    cur.fetchone.return_value = {"relkind": "r"}
+    assert Migrations._table_partitionnee(cur, instruction) is None
+
+    cur.reset_mock()
+    assert Migrations._table_partitionnee(cur, "DROP INDEX CONCURRENTLY IF EXISTS i0") is None
+    cur.execute.assert_not_called()
+
+
+def test_migrations_du_projet():
+    """Les fichiers livrés respectent les contraintes de leur mode."""
+    migrations = lister_migrations()
+    assert [m.version for m in migrations] == list(range(1, len(migrations) + 1))
+    for m in migrations:
+        if m.mode == MODE_SANS_TRANSACTION:
+            assert "$$" not in m.sql
+        if m.mode == MODE_PAR_LOTS and m.lot is None:
+            assert len(m.instructions()) == 1
+            assert "%(taille_lot)s" in m.sql
@@ -0,0 +1,34 @@
+import datetime
+
+from src.utils.partitions_messages import (
+    bornes_partition,
+    debut_mois,
+    mois_couverts,
+    mois_suivant,
+    nom_partition,
+)
+
+
+def test_debut_et_mois_suivant():
+    assert debut_mois(datetime.date(2025, 7, 21)) == datetime.date(2025, 7, 1)
+    assert mois_suivant(datetime.date(2025, 7, 1)) == datetime.date(2025, 8, 1)
+    assert mois_suivant(datetime.date(2025, 12, 1)) == datetime.date(2026, 1, 1)
+
+
+def test_mois_couverts():
+    res = mois_couverts(datetime.date(2025, 11, 15), datetime.date(2026, 2, 3))
+    assert res == [
+        datetime.date(2025, 11, 1),
+        datetime.date(2025, 12, 1),
+        datetime.date(2026, 1, 1),
+        datetime.date(2026, 2, 1),
+    ]
+    assert mois_couverts(datetime.date(2026, 1, 1), datetime.date(2025, 1, 1)) == []
+
+
+def test_nom_et_bornes_partition():
+    mois = datetime.date(2025, 12, 1)
+    debut, fin = bornes_partition(mois)
+    assert nom_partition(mois) == "messages_2025_12"
+    assert debut == datetime.datetime(2025, 12, 1, tzinfo=datetime.timezone.utc)
+    assert fin == datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
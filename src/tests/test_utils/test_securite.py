@@ -0,0 +1,109 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from src.utils.config import configurer_parametres
+from src.utils.securite import (
+    HacheurScrypt,
+    configurer_hacheur,
+    creer_hacheur,
+    doit_rehacher,
+    hacher_mot_de_passe,
+    hash_password,
+    verifier_en_parallele,
+    verifier_mot_de_passe,
+    verifier_mot_de_passe_async,
+)
+
+
+@pytest.fixture(autouse=True)
+def hacheur_rapide():
+    """Coût scrypt minimal pour garder des tests rapides."""
+    configurer_hacheur(HacheurScrypt(ln=4))
+    yield
+    configurer_hacheur(None)
+
+
+def test_hash_password_herite_sha256():
+    assert hash_password("secret", "alice") == hashlib.sha256(b"secretalice").hexdigest()
+
+
+def test_hacher_encode_algorithme_et_parametres():
+    h = hacher_mot_de_passe("secret")
+    assert h.startswith("$scrypt$ln=4,r=8,p=1$")
+    assert len(h.split("$")) == 5
+
+
+def test_hacher_utilise_un_sel_aleatoire():
+    assert hacher_mot_de_passe("secret") != hacher_mot_de_passe("secret")
+
+
+def test_verifier_hash_kdf():
+    h = hacher_mot_de_passe("secret")
+    assert verifier_mot_de_passe("secret", h) is True
+    assert verifier_mot_de_passe("mauvais", h) is False
+
+
+def test_verifier_hash_herite():
+    h = hash_password("secret", "alice")
+    assert verifier_mot_de_passe("secret", h, "alice") is True
+    assert verifier_mot_de_passe("secret", h, "bob") is False
+
+
+def test_verifier_hash_vide_ou_mal_forme():
+    assert verifier_mot_de_passe("secret", None) is False
+    assert verifier_mot_de_passe("secret", "") is False
+    assert verifier_mot_de_passe("secret", "$scrypt$n'importe quoi") is False
+    assert verifier_mot_de_passe("secret", "$md5$abc$def") is False
+
+
+def test_hash_ancien_cout_reste_verifiable_et_doit_etre_rehache():
+    h = HacheurScrypt(ln=3).hacher("secret")
+    assert verifier_mot_de_passe("secret", h) is True
+    assert doit_rehacher(h) is True
+    assert doit_rehacher(hacher_mot_de_passe("secret")) is False
+
+
+def test_doit_rehacher_hash_herite():
+    assert doit_rehacher(hash_password("secret", "alice")) is True
+
+
+def test_verifier_en_parallele_conserve_l_ordre():
+    h = hacher_mot_de_passe("a")
+    res = verifier_en_parallele(
+        [("a", h, ""), ("b", h, ""), ("secret", hash_password("secret", "x"), "x")]
+    )
+    assert res == [True, False, True]
+
+
+def test_verifier_mot_de_passe_async():
+    h = hacher_mot_de_passe("secret")
+
+    async def scenario():
+        return await asyncio.gather(
+            verifier_mot_de_passe_async("secret", h),
+            verifier_mot_de_passe_async("autre", h),
+        )
+
+    assert asyncio.run(scenario()) == [True, False]
+
+
+def test_creer_hacheur_depuis_parametres():
+    precedents = configurer_parametres(mdp_algorithme="scrypt", mdp_scrypt_ln=12)
+    try:
+        hacheur = creer_hacheur()
+    finally:
+        configurer_parametres(precedents)
+    assert isinstance(hacheur, HacheurScrypt)
+    assert hacheur.ln == 12
+
+
+def test_creer_hacheur_algorithme_inconnu():
+    with pytest.raises(ValueError):
+        creer_hacheur("md5")
+
+
+def test_hacheur_scrypt_parametres_invalides():
+    with pytest.raises(ValueError):
+        HacheurScrypt(ln=0)
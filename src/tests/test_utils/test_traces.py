@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+from src.utils import traces
+from src.utils.traces import (
+    ExportateurJSONL,
+    cascade,
+    configurer_exportateur,
+    enregistrer_span,
+    lire_traces,
+    main,
+    span,
+)
+
+
+@pytest.fixture
+def fichier(tmp_path):
+    chemin = tmp_path / "traces.jsonl"
+    configurer_exportateur(ExportateurJSONL(str(chemin)))
+    yield chemin
+    configurer_exportateur(None)
+
+
+def lire(chemin):
+    return [json.loads(ligne) for ligne in chemin.read_text(encoding="utf-8").splitlines()]
+
+
+def test_inactif_sans_exportateur():
+    configurer_exportateur(None)
+    with span("tour_chat") as s:
+        s.ajouter(a=1)
+        enregistrer_span("sql", 0.001)
+    assert s is traces._SPAN_INERTE
+
+
+def test_trace_exportee_a_la_fin_de_la_racine(fichier):
+    with span("tour_chat", conversation_id=2) as racine:
+        with span("historique") as etape:
+            etape.ajouter(nb_messages=4)
+            enregistrer_span("sql", 0.002, requete="SELECT ?")
+        assert not fichier.exists()
+        with span("llm.generate"):
+            pass
+
+    spans = lire(fichier)
+    par_nom = {s["name"]: s for s in spans}
+    assert set(par_nom) == {"tour_chat", "historique", "sql", "llm.generate"}
+    assert {s["trace_id"] for s in spans} == {racine.trace_id}
+    assert par_nom["tour_chat"]["parent_span_id"] is None
+    assert par_nom["historique"]["parent_span_id"] == racine.span_id
+    assert par_nom["sql"]["parent_span_id"] == par_nom["historique"]["span_id"]
+    assert par_nom["historique"]["attributes"] == {"nb_messages": 4}
+    assert par_nom["tour_chat"]["attributes"] == {"conversation_id": 2}
+    for s in spans:
+        assert s["end_time_unix_nano"] >= s["start_time_unix_nano"]
+        assert s["status"] == {"code": "OK"}
+
+
+def test_sql_hors_trace_ignore(fichier):
+    enregistrer_span("sql", 0.001)
+    assert not fichier.exists()
+
+
+def test_erreur_enregistree(fichier):
+    with pytest.raises(ValueError):
+        with span("tour_chat"):
+            with span("llm.generate"):
+                raise ValueError("délai dépassé")
+
+    statuts = {s["name"]: s["status"] for s in lire(fichier)}
+    assert statuts["llm.generate"] == {"code": "ERROR", "message": "ValueError: délai dépassé"}
+    assert statuts["tour_chat"]["code"] == "ERROR"
+
+
+def test_lire_traces_et_cascade(fichier, capsys):
+    for i in range(3):
+        with span("tour_chat", numero=i):
+            with span("llm.generate"):
+                pass
+
+    dernieres = lire_traces(str(fichier), 2)
+    assert [t[0]["attributes"]["numero"] for t in dernieres] == [1, 2]
+
+    texte = cascade(dernieres[-1])
+    lignes = texte.splitlines()
+    assert lignes[0].startswith("trace ")
+    assert lignes[1].lstrip().startswith("tour_chat")
+    assert lignes[2].lstrip().startswith("llm.generate")
+    assert "  llm.generate" in lignes[2].split("|")[0]
+
+    assert main([str(fichier), "-n", "1"]) == 0
+    assert capsys.readouterr().out.count("trace ") == 1
+
+
+def test_tour_de_chat_trace(fichier):
+    from unittest.mock import MagicMock, patch
+
+    from src.business_object.echange import Echange
+    from src.dao.conversation_dao import ConversationDAO
+    from src.dao.statistiques_admin_dao import StatistiquesAdminDAO
+    from src.service.cache_conversations import CacheConversations
+    from src.service.conversation_service import ConversationService
+    from src.service.journal_appels_llm import JournalAppelsLLM
+
+    CacheConversations().invalider()
+    with (
+        patch("src.client.llm_client.LLM_API") as MockLLM,
+        patch.object(ConversationService, "_resoudre_prompt_systeme_pour_conv", lambda _id: "P"),
+        patch.object(ConversationDAO, "lire_echanges", MagicMock(return_value=[])),
+        patch.object(ConversationDAO, "ajouter_echanges", MagicMock(return_value=None)),
+        patch.object(StatistiquesAdminDAO, "enregistrer_appels_llm", MagicMock()),
+    ):
+        MockLLM.return_value.generate.return_value = Echange(agent="assistant", message="R")
+        ConversationService.demander_assistant("Bonjour", id_conversation=7, id_user=1)
+        JournalAppelsLLM().vider()
+    CacheConversations().invalider()
+
+    noms = [s["name"] for s in lire(fichier)]
+    assert noms[-1] == "tour_chat"
+    assert set(noms) == {
+        "tour_chat",
+        "prompt_systeme",
+        "historique",
+        "enregistrer_appel_llm",
+        "ajouter_echanges",
+    }
@@ -0,0 +1,192 @@
+"""
+Paramètres de l'application, lus une seule fois.
+
+Le fichier ``.env`` et les variables d'environnement sont analysés au premier
+appel de `obtenir_parametres` ; le résultat est un objet figé, partagé par
+tout le processus. Chaque champ de `Parametres` correspond à une variable
+d'environnement (voir ``.env.exemple``).
+
+Les modules lisent leurs réglages ici plutôt qu'avec ``os.getenv`` : aucun
+fichier n'est relu et les valeurs invalides sont signalées dès le chargement.
+"""
+
+import dataclasses
+import os
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+import dotenv
+
+_VRAI = ("1", "true", "oui")
+_FAUX = ("0", "false", "non")
+
+
+def _champ(variable: str, defaut, secret: bool = False):
+    return field(default=defaut, repr=not secret, metadata={"variable": variable})
+
+
+@dataclass(frozen=True)
+class Parametres:
+    """Réglages de l'application (immuables)."""
+
+    # --- Base de données ---
+    postgres_host: str | None = _champ("POSTGRES_HOST", None)
+    postgres_port: str | None = _champ("POSTGRES_PORT", None)
+    postgres_database: str | None = _champ("POSTGRES_DATABASE", None)
+    postgres_user: str | None = _champ("POSTGRES_USER", None)
+    postgres_password: str | None = _champ("POSTGRES_PASSWORD", None, secret=True)
+    postgres_schema: str = _champ("POSTGRES_SCHEMA", "public")
+    messages_partitionnes: bool = _champ("MESSAGES_PARTITIONNES", False)
+    fuseau_horaire: str = _champ("FUSEAU_HORAIRE", "Europe/Paris")
+    # Workers parallèles par nœud Gather pour les statistiques globales
+    sql_parallelisme: int = _champ("SQL_PARALLELISME", 4)
+
+    # --- Mesure des requêtes SQL ---
+    sql_instrumentation: bool = _champ("SQL_INSTRUMENTATION", True)
+    sql_seuil_lent_ms: float = _champ("SQL_SEUIL_LENT_MS", 200.0)
+    sql_metriques_fichier: str | None = _champ("SQL_METRIQUES_FICHIER", None)
+
+    # --- Sécurité ---
+    secret_key: str | None = _champ("SECRET_KEY", None, secret=True)
+    revocation_tokens: str = _champ("REVOCATION_TOKENS", "postgres")
+    mdp_algorithme: str = _champ("MDP_ALGORITHME", "scrypt")
+    mdp_scrypt_ln: int = _champ("MDP_SCRYPT_LN", 15)
+    mdp_scrypt_r: int = _champ("MDP_SCRYPT_R", 8)
+    mdp_scrypt_p: int = _champ("MDP_SCRYPT_P", 1)
+    mdp_argon2_temps: int = _champ("MDP_ARGON2_TEMPS", 3)
+    mdp_argon2_memoire_kio: int = _champ("MDP_ARGON2_MEMOIRE_KIO", 65536)
+
+    # --- Appels au LLM ---
+    llm_url: str = _champ(
+        "ENSAI_GPT_BASE_URL", "https://ensai-gpt-109912438483.europe-west4.run.app"
+    )
+    llm_delai_s: float = _champ("LLM_DELAI_S", 30.0)
+    llm_retentatives: int = _champ("LLM_RETENTATIVES", 0)
+    llm_attente_s: float = _champ("LLM_ATTENTE_S", 0.5)
+    llm_metriques_fichier: str | None = _champ("LLM_METRIQUES_FICHIER", None)
+    # Appels enregistrés dans la table appels_llm par lots
+    llm_journal_taille_lot: int = _champ("LLM_JOURNAL_TAILLE_LOT", 20)
+    llm_journal_delai_s: float = _champ("LLM_JOURNAL_DELAI_S", 60.0)
+
+    # --- Caches et tâches de fond ---
+    cache_nb_conversations: int = _champ("CACHE_NB_CONVERSATIONS", 100)
+    cache_taille_fil: int = _champ("CACHE_TAILLE_FIL", 200)
+    cache_taille_fil_complet: int = _champ("CACHE_TAILLE_FIL_COMPLET", 1000)
+    cache_duree_conversations_s: float = _champ("CACHE_DUREE_CONVERSATIONS_S", 600.0)
+    cache_nb_tokens: int = _champ("CACHE_NB_TOKENS", 256)
+    cache_duree_prompts_s: float = _champ("CACHE_DUREE_PROMPTS_S", 300.0)
+    sessions_intervalle_s: float = _champ("SESSIONS_INTERVALLE_S", 60.0)
+    sessions_delai_inactivite_s: int = _champ("SESSIONS_DELAI_INACTIVITE_S", 300)
+
+    # --- Logs et traces ---
+    log_decorateur: bool = _champ("LOG_DECORATEUR", True)
+    log_echantillonnage: float = _champ("LOG_ECHANTILLONNAGE", 1.0)
+    logs_asynchrones: bool = _champ("LOGS_ASYNCHRONES", True)
+    logs_taille_file: int = _champ("LOGS_TAILLE_FILE", 10_000)
+    logs_json: bool = _champ("LOGS_JSON", False)
+    traces_fichier: str | None = _champ("TRACES_FICHIER", None)
+
+    @classmethod
+    def depuis_environnement(cls, environ: Mapping[str, str] | None = None) -> "Parametres":
+        """
+        Construit les paramètres à partir de variables d'environnement.
+
+        Une variable absente ou vide garde la valeur par défaut du champ.
+
+        Parameters
+        ----------
+        environ : Mapping[str, str] | None, optional
+            Variables à lire, by default None (``os.environ``).
+
+        Raises
+        ------
+        ValueError
+            Si une valeur ne peut pas être convertie dans le type du champ.
+        """
+        environ = os.environ if environ is None else environ
+        valeurs = {}
+        for champ in dataclasses.fields(cls):
+            variable = champ.metadata["variable"]
+            brute = environ.get(variable)
+            if brute is None or not brute.strip():
+                continue
+            try:
+                valeurs[champ.name] = _convertir(brute.strip(), champ.type)
+            except ValueError:
+                raise ValueError(f"Valeur invalide pour {variable} : {brute!r}") from None
+        return cls(**valeurs)
+
+
+def _convertir(valeur: str, type_champ):
+    if type_champ is bool:
+        if valeur.lower() in _VRAI:
+            return True
+        if valeur.lower() in _FAUX:
+            return False
+        raise ValueError(valeur)
+    if type_champ in (int, float):
+        return type_champ(valeur)
+    return valeur
+
+
+_parametres: Parametres | None = None
+_verrou = threading.Lock()
+
+
+def charger_parametres(remplacer_env: bool = False) -> Parametres:
+    """
+    (Re)lit le fichier ``.env`` puis l'environnement.
+
+    Parameters
+    ----------
+    remplacer_env : bool, optional
+        Les valeurs du fichier ``.env`` remplacent celles déjà présentes dans
+        l'environnement (cas de l'application), by default False.
+
+    Returns
+    -------
+    Parametres
+        Les paramètres, désormais renvoyés par `obtenir_parametres`.
+    """
+    global _parametres
+    with _verrou:
+        dotenv.load_dotenv(override=remplacer_env)
+        _parametres = Parametres.depuis_environnement()
+        return _parametres
+
+
+def obtenir_parametres() -> Parametres:
+    """Paramètres du processus (chargés au premier appel)."""
+    parametres = _parametres
+    if parametres is None:
+        parametres = charger_parametres()
+    return parametres
+
+
+def configurer_parametres(parametres: Parametres | None = None, **modifications) -> Parametres:
+    """
+    Remplace les paramètres du processus (tests, outils).
+
+    Parameters
+    ----------
+    parametres : Parametres | None, optional
+        Nouveaux paramètres ; par défaut, les paramètres courants.
+    **modifications
+        Champs à changer (``llm_retentatives=2``...).
+
+    Returns
+    -------
+    Parametres
+        Les paramètres remplacés, pour les rétablir ensuite.
+
+    Examples
+    --------
+    >>> precedents = configurer_parametres(llm_retentatives=0)
+    >>> configurer_parametres(precedents)
+    """
+    global _parametres
+    precedents = obtenir_parametres()
+    parametres = parametres or precedents
+    _parametres = dataclasses.replace(parametres, **modifications) if modifications else parametres
+    return precedents
@@ -0,0 +1,137 @@
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Hashable, Iterable
+
+# Un mot = suite d'au moins deux lettres. Les chiffres, la ponctuation et les
+# apostrophes d'élision (l', d', j', qu'...) servent de séparateurs.
+_RE_MOT = re.compile(r"[^\W\d_]{2,}")
+
+# Mots vides du français (articles, pronoms, prépositions, auxiliaires courants, etc.)
+MOTS_VIDES = frozenset(
+    """
+    afin ah ai aie aient aies ainsi ait alors apres après as au aucun aucune aupres
+    auprès auquel aura aurait auront aussi autre autres aux auxquelles auxquels avaient
+    avais avait avant avec avez aviez avions avoir avons ayant bah beaucoup bien bon ca
+    car ce ceci cela celle celles celui cependant certaines certains ces cet cette ceux
+    chacun chacune chaque chez ci comme comment contre dans de dedans dehors deja depuis
+    des deux devrait dois doit doivent donc dont du duquel dès déjà elle elles en encore
+    enfin ensuite entre envers es est et etaient etais etait etant ete etes etre eu euh
+    eux faire fais fait faut font hors ici il ils jamais je jusqu la laquelle le lequel
+    les lesquelles lesquels leur leurs lors lorsqu lorsque lui là ma mais malgre malgré
+    me meme mes mien moi moins mon même ne neanmoins ni non nos notre nous néanmoins oh
+    ok on ont or ou oui où par parce parmi pas pendant peu peut peuvent peux plus
+    plusieurs pour pourquoi pourtant pres près puis puisqu puisque qu quand que quel
+    quelle quelles quelqu quelque quelques quels qui quoi quoiqu quoique rien sa sans
+    sauf se selon sera serai serait seront ses si sien soi soit sommes son sont sous
+    souvent suis sur ta te tel telle telles tels tes tien toi ton toujours tous tout
+    toute toutefois toutes tres trop très tu un une va vais vers veut veux voici voila
+    voilà vont vos votre vous vu à ça çà étaient étais était étant été êtes être
+    """.split()
+)
+
+# Terminaisons du pluriel retirées par la racinisation légère
+_TERMINAISONS_PLURIEL = ("s", "x")
+
+
+@lru_cache(maxsize=50_000)
+def raciniser(mot: str) -> str:
+    """
+    Racinisation légère : ramène un mot au singulier (retire un « s » ou « x » final).
+
+    Parameters
+    ----------
+    mot : str
+        Mot en minuscules.
+
+    Returns
+    -------
+    str
+        Racine du mot.
+    """
+    if len(mot) > 3 and mot.endswith(_TERMINAISONS_PLURIEL) and not mot.endswith("ss"):
+        return mot[:-1]
+    return mot
+
+
+def extraire_mots(texte: str) -> list[str]:
+    """
+    Découpe un texte (titre de conversation, message) en mots-clés.
+
+    Parameters
+    ----------
+    texte : str
+        Texte à découper.
+
+    Returns
+    -------
+    list[str]
+        Racines des mots en minuscules, sans ponctuation ni mots vides.
+    """
+    if not isinstance(texte, str):
+        return []
+    return [raciniser(m) for m in _RE_MOT.findall(texte.lower()) if m not in MOTS_VIDES]
+
+
+def compter_mots(textes: Iterable[str]) -> Counter[str]:
+    """
+    Compte les mots-clés d'une collection de textes.
+
+    Parameters
+    ----------
+    textes : Iterable[str]
+        Textes à analyser.
+
+    Returns
+    -------
+    Counter[str]
+        Nombre d'occurrences de chaque mot-clé.
+    """
+    compteur: Counter[str] = Counter()
+    for texte in textes:
+        compteur.update(extraire_mots(texte))
+    return compteur
+
+
+def compter_mots_par_cle(paires: Iterable[tuple[Hashable, str]]) -> dict[Hashable, Counter[str]]:
+    """
+    Compte les mots-clés de textes regroupés par clé, en un seul passage.
+
+    Permet de traiter par exemple tous les titres (ou messages) de tous les
+    utilisateurs d'un coup, à partir des lignes (utilisateur_id, texte).
+
+    Parameters
+    ----------
+    paires : Iterable[tuple[Hashable, str]]
+        Couples (clé, texte), par exemple (utilisateur_id, titre).
+
+    Returns
+    -------
+    dict[Hashable, Counter[str]]
+        Compteur de mots-clés pour chaque clé.
+    """
+    comptes: dict[Hashable, Counter[str]] = defaultdict(Counter)
+    for cle, texte in paires:
+        comptes[cle].update(extraire_mots(texte))
+    return dict(comptes)
+
+
+def delta_sujets(ancien_texte: str | None, nouveau_texte: str | None) -> dict[str, int]:
+    """
+    Calcule la variation des comptes de mots-clés entre deux textes.
+
+    Parameters
+    ----------
+    ancien_texte : str | None
+        Texte avant modification (None pour une création).
+    nouveau_texte : str | None
+        Texte après modification (None pour une suppression).
+
+    Returns
+    -------
+    dict[str, int]
+        Variation signée par mot-clé, sans les variations nulles.
+    """
+    delta = Counter(extraire_mots(nouveau_texte or ""))
+    delta.subtract(extraire_mots(ancien_texte or ""))
+    return {mot: nb for mot, nb in delta.items() if nb != 0}
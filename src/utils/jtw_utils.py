@@ -1,15 +1,16 @@
 import jwt 
 from datetime import datetime, timedelta, timezone
-import os
-from dotenv import load_dotenv
+import uuid
 
-load_dotenv()
-SECRET_KEY = os.getenv("SECRET_KEY")
+from src.utils.config import obtenir_parametres
+
+SECRET_KEY = obtenir_parametres().secret_key
 
 def creer_token(user_id: int, pseudo: str, duree_heures: int = 1) -> str:
     payload = {
         "user_id": user_id,
         "pseudo": pseudo,
+        "jti": uuid.uuid4().hex,  # identifiant unique, clé de la révocation
         "exp": datetime.now(timezone.utc) + timedelta(hours=duree_heures),
     }
     return jwt.encode(payload, SECRET_KEY, algorithm="HS256")
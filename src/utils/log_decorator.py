@@ -1,83 +1,142 @@
-import logging.config
+import logging
 import numbers
-
+import random
+from contextvars import ContextVar
 from functools import wraps
 
+from src.utils.config import obtenir_parametres
+
+# Paramètres dont la valeur n'apparaît jamais dans les logs
+PARAMETRES_MASQUES = frozenset(["password", "passwd", "pwd", "pass", "mot_de_passe", "mdp"])
+
+_logger = logging.getLogger(__name__)
+
+# Profondeur d'appel des méthodes décorées, propre à chaque thread / tâche
+_indentation: ContextVar[int] = ContextVar("indentation_log", default=0)
+
+# Réglages globaux (voir `configurer_log`)
+_actif = obtenir_parametres().log_decorateur
+_taux = obtenir_parametres().log_echantillonnage
+
+
+def configurer_log(actif: bool | None = None, taux_echantillonnage: float | None = None) -> None:
+    """
+    Règle le décorateur `log` pour tout le processus.
+
+    Parameters
+    ----------
+    actif : bool | None, optional
+        False pour ne plus rien tracer (variable ``LOG_DECORATEUR``).
+    taux_echantillonnage : float | None, optional
+        Part des appels tracés, entre 0 et 1 (variable ``LOG_ECHANTILLONNAGE``).
+    """
+    global _actif, _taux
+    if actif is not None:
+        _actif = actif
+    if taux_echantillonnage is not None:
+        if not 0 <= taux_echantillonnage <= 1:
+            raise ValueError("Le taux d'échantillonnage doit être entre 0 et 1")
+        _taux = taux_echantillonnage
+
 
 class LogIndetation:
     """Pour indenter les logs lorsque l'on rentre dans une nouvelle méthode"""
 
-    current_indentation = 0
-
     @classmethod
     def increase_indentation(cls):
         """Ajouter une indentation"""
-        cls.current_indentation += 1
+        _indentation.set(_indentation.get() + 1)
 
     @classmethod
     def decrease_indentation(cls):
         """Retirer une indentation"""
-        cls.current_indentation -= 1
+        _indentation.set(_indentation.get() - 1)
 
     @classmethod
     def get_indentation(cls):
         """Obtenir l'indentation"""
-        return "    " * cls.current_indentation
+        return "    " * _indentation.get()
 
 
-def log(func):
-    """Création d'un décorateur nommé log
-    Lorsque ce décorateur est appliqué à une méthode, cela affichera dans les logs :
-    - l'appel de cette méthode avec les valeurs de paramètres
-    - la sortie retournée par cette méthode
-    """
+class _Appel:
+    """Texte ``Classe.methode(args)``, construit seulement s'il est écrit."""
 
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        logger = logging.getLogger(__name__)
+    __slots__ = ("func", "noms", "args", "kwargs", "_texte")
+
+    def __init__(self, func, noms, args, kwargs):
+        self.func, self.noms, self.args, self.kwargs = func, noms, args, kwargs
+        self._texte = None
 
-        LogIndetation.increase_indentation()
-        indentation = LogIndetation.get_indentation()
+    def __str__(self):
+        if self._texte is None:
+            class_name = self.args[0].__class__.__name__ if self.args else ""
+            valeurs = [
+                "*****" if nom in PARAMETRES_MASQUES else _texte_argument(arg)
+                for nom, arg in zip(self.noms, self.args[1:])
+            ]
+            valeurs += [
+                "*****" if nom in PARAMETRES_MASQUES else _texte_argument(arg)
+                for nom, arg in self.kwargs.items()
+            ]
+            self._texte = f"{class_name}.{self.func.__name__}{tuple(valeurs)}"
+        return self._texte
 
-        # Recuperation des parametres de la methode
-        class_name = args[0].__class__.__name__ if args else ""
-        method_name = func.__name__
-        args_list = list(
-            [str(arg) if not isinstance(arg, numbers.Number) else arg for arg in args[1:]]
-            + list(kwargs.values())
-        )
 
-        # pour cacher les mots de passe
-        param_names = func.__code__.co_varnames[1 : func.__code__.co_argcount]
-        for i, v in enumerate(param_names):
-            if v in ["password", "passwd", "pwd", "pass", "mot_de_passe", "mdp"]:
-                args_list[i] = "*****"
+class _Sortie:
+    """Résumé de la valeur retournée, construit seulement s'il est écrit."""
 
-        # Transforme en tuple pour avoir un affichage avec des parentheses
-        args_list = tuple(args_list)
+    __slots__ = ("resultat",)
 
-        # Affichage dans le fichier de log
-        logger.info(f"{indentation}{class_name}.{method_name}{args_list} - DEBUT")
-        result = func(*args, **kwargs)
-        logger.info(f"{indentation}{class_name}.{method_name}{args_list} - FIN")
+    def __init__(self, resultat):
+        self.resultat = resultat
 
+    def __str__(self):
         # Reduction de l affichage de la sortie si trop longue
+        result = self.resultat
         if isinstance(result, list):
-            result_str = str([str(item) for item in result[:3]])
-            result_str += " ... (" + str(len(result)) + " elements)"
-        elif isinstance(result, dict):
-            result_str = [(str(k), str(v)) for k, v in result.items()][:3]
-            result_str += " ... (" + str(len(result)) + " elements)"
-        elif isinstance(result, str) and len(result) > 50:
-            result_str = result[:50]
-            result_str += " ... (" + str(len(result)) + " caracteres)"
-        else:
-            result_str = str(result)
-
-        logger.info(f"{indentation}   └─> Sortie : {result_str}")
-
-        LogIndetation.decrease_indentation()
-
-        return result
+            return str([str(item) for item in result[:3]]) + f" ... ({len(result)} elements)"
+        if isinstance(result, dict):
+            debut = [(str(k), str(v)) for k, v in list(result.items())[:3]]
+            return f"{debut} ... ({len(result)} elements)"
+        if isinstance(result, str) and len(result) > 50:
+            return f"{result[:50]} ... ({len(result)} caracteres)"
+        return str(result)
+
+
+def _texte_argument(arg):
+    return arg if isinstance(arg, numbers.Number) else str(arg)
+
+
+def log(func):
+    """Création d'un décorateur nommé log
+    Lorsque ce décorateur est appliqué à une méthode, cela affichera dans les logs :
+    - l'appel de cette méthode avec les valeurs de paramètres
+    - la sortie retournée par cette méthode
+
+    Rien n'est calculé si le niveau INFO est désactivé, si le décorateur est
+    coupé ou si l'appel n'est pas retenu par l'échantillonnage (voir
+    `configurer_log`) ; sinon les textes sont formatés par le handler.
+    """
+    noms = func.__code__.co_varnames[1 : func.__code__.co_argcount]
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _actif or not _logger.isEnabledFor(logging.INFO):
+            return func(*args, **kwargs)
+        if _taux < 1 and random.random() >= _taux:
+            return func(*args, **kwargs)
+
+        profondeur = _indentation.get() + 1
+        jeton = _indentation.set(profondeur)
+        indentation = "    " * profondeur
+        appel = _Appel(func, noms, args, kwargs)
+        try:
+            _logger.info("%s%s - DEBUT", indentation, appel)
+            result = func(*args, **kwargs)
+            _logger.info("%s%s - FIN", indentation, appel)
+            _logger.info("%s   └─> Sortie : %s", indentation, _Sortie(result))
+            return result
+        finally:
+            _indentation.reset(jeton)
 
     return wrapper
@@ -1,11 +1,179 @@
-import os
+import atexit
+import copy
+import datetime
+import json
 import logging
 import logging.config
+import logging.handlers
+import os
+import queue
+import threading
+
 import yaml
 
+from src.utils.config import obtenir_parametres
+
+# Nombre maximal d'enregistrements en attente d'écriture
+TAILLE_FILE = 10_000
+
+
+class FormateurJSON(logging.Formatter):
+    """Une ligne JSON par enregistrement (logs exploitables par un outil)."""
+
+    def format(self, record):
+        entree = {
+            "horodatage": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "niveau": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entree["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entree, ensure_ascii=False)
+
+
+class HandlerFileBornee(logging.handlers.QueueHandler):
+    """
+    Dépose les enregistrements dans une file bornée, sans jamais attendre.
+
+    Si la file est pleine (disque lent, rafale de logs), l'enregistrement est
+    abandonné et compté : l'application n'est jamais bloquée par les logs.
+    """
+
+    def __init__(self, file: queue.Queue):
+        super().__init__(file)
+        self._verrou = threading.Lock()
+        self.nb_emis = 0
+        self.nb_perdus = 0
+        self.perdus_par_niveau: dict[str, int] = {}
+
+    def prepare(self, record):
+        # File interne au processus : contrairement à QueueHandler, l'exception
+        # est gardée telle quelle pour le formateur ; seul le message est figé,
+        # ses arguments pouvant changer avant l'écriture.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._verrou:
+                self.nb_perdus += 1
+                self.perdus_par_niveau[record.levelname] = (
+                    self.perdus_par_niveau.get(record.levelname, 0) + 1
+                )
+        else:
+            with self._verrou:
+                self.nb_emis += 1
+
+    def metriques(self) -> dict:
+        """
+        Indicateurs de la file.
+
+        Returns
+        -------
+        dict
+            ``nb_emis``, ``nb_perdus``, ``perdus_par_niveau``, ``en_attente``
+            et ``capacite``.
+        """
+        with self._verrou:
+            return {
+                "nb_emis": self.nb_emis,
+                "nb_perdus": self.nb_perdus,
+                "perdus_par_niveau": dict(self.perdus_par_niveau),
+                "en_attente": self.queue.qsize(),
+                "capacite": self.queue.maxsize,
+            }
+
+
+_handler_file: HandlerFileBornee | None = None
+_ecouteur: logging.handlers.QueueListener | None = None
+
+
+def installer_file(
+    logger: logging.Logger | None = None, taille: int = TAILLE_FILE, format_json: bool = False
+) -> HandlerFileBornee:
+    """
+    Déporte l'écriture des logs dans un thread.
+
+    Les handlers de `logger` sont confiés à un QueueListener ; le logger ne
+    garde qu'un `HandlerFileBornee`, qui se contente de déposer les
+    enregistrements dans la file.
+
+    Parameters
+    ----------
+    logger : logging.Logger | None, optional
+        Logger à équiper, by default None (logger racine).
+    taille : int, optional
+        Capacité de la file.
+    format_json : bool, optional
+        Remplace le format des handlers par une ligne JSON par enregistrement.
+
+    Returns
+    -------
+    HandlerFileBornee
+        Le handler installé (voir `metriques`).
+    """
+    global _handler_file, _ecouteur
+    arreter_file()
+    logger = logger or logging.getLogger()
+    handlers = logger.handlers[:]
+    if format_json:
+        for handler in handlers:
+            handler.setFormatter(FormateurJSON())
+
+    file = queue.Queue(maxsize=taille)
+    _handler_file = HandlerFileBornee(file)
+    _ecouteur = logging.handlers.QueueListener(file, *handlers, respect_handler_level=True)
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(_handler_file)
+    _ecouteur.start()
+    return _handler_file
+
+
+def arreter_file() -> None:
+    """Écrit les enregistrements en attente et arrête le thread d'écriture."""
+    global _ecouteur
+    if _ecouteur is None:
+        return
+    ecouteur, _ecouteur = _ecouteur, None
+    ecouteur.stop()
+    metriques = _handler_file.metriques()
+    if metriques["nb_perdus"]:
+        # Thread arrêté : l'avertissement est confié directement aux handlers
+        record = logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": "%s enregistrement(s) de log perdu(s) (file pleine) : %s",
+                "args": (metriques["nb_perdus"], metriques["perdus_par_niveau"]),
+            }
+        )
+        for handler in ecouteur.handlers:
+            handler.handle(record)
+
+
+def metriques_logs() -> dict | None:
+    """Indicateurs de la file de logs, ou None si l'écriture est synchrone."""
+    return None if _handler_file is None else _handler_file.metriques()
+
 
 def initialiser_logs(nom):
-    """Initialiser les logs à partir du fichier de config"""
+    """
+    Initialiser les logs à partir du fichier de config.
+
+    Par défaut, l'écriture est faite par un thread (voir `installer_file`) ;
+    paramètres : ``LOGS_ASYNCHRONES`` (0 pour écrire directement),
+    ``LOGS_TAILLE_FILE`` et ``LOGS_JSON`` (1 pour des lignes JSON).
+    """
 
     # print current working directory
     # print(os.getcwd())
@@ -18,6 +186,15 @@ def initialiser_logs(nom):
     config = yaml.load(stream, Loader=yaml.FullLoader)
     logging.config.dictConfig(config)
 
+    parametres = obtenir_parametres()
+    format_json = parametres.logs_json
+    if parametres.logs_asynchrones:
+        installer_file(taille=parametres.logs_taille_file, format_json=format_json)
+        atexit.register(arreter_file)
+    elif format_json:
+        for handler in logging.getLogger().handlers:
+            handler.setFormatter(FormateurJSON())
+
     logging.info("-" * 50)
     logging.info(f"Lancement {nom}                           ")
     logging.info("-" * 50)
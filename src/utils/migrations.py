@@ -0,0 +1,397 @@
+"""
+Migrations versionnées du schéma (répertoire data/migrations).
+
+Chaque fichier ``NNNN_description.sql`` est appliqué une seule fois, dans
+l'ordre des versions ; les versions appliquées sont enregistrées dans la
+table ``schema_migrations``. Une directive en tête de fichier choisit le mode
+d'exécution :
+
+- (aucune) : tout le fichier en une transaction, avec l'enregistrement de la
+  version ;
+- ``-- migration: sans-transaction`` : une instruction à la fois, hors
+  transaction (obligatoire pour ``CREATE INDEX CONCURRENTLY``, qui construit
+  l'index sans bloquer les écritures ; un tel index est ignoré sur une table
+  partitionnée) ;
+- ``-- migration: par-lots`` : une seule instruction, paramétrée par
+  ``%(taille_lot)s``, répétée jusqu'à ne plus modifier de ligne, avec une
+  validation et une pause entre deux lots (remplissage de colonnes sur une
+  base en service).
+
+Un fichier ``NNNN_description.py`` est une migration par lots dont le calcul
+se fait en Python (mêmes règles d'extraction que l'application, par exemple) :
+il définit ``lot(cursor, taille_lot, position) -> (nb, position)``, appelée
+avec ``position=None`` puis avec la position renvoyée, jusqu'à ce que ``nb``
+soit nul. Une reprise après échec repart du début : le lot doit pouvoir être
+rejoué.
+
+Les migrations des deux derniers modes doivent pouvoir être rejouées
+(``IF NOT EXISTS``, conditions de remplissage) : si l'une échoue en cours de
+route, elle est reprise au lancement suivant.
+
+Usage :
+    python -m src.utils.migrations
+    python -m src.utils.migrations --lister
+    python -m src.utils.migrations --taille-lot 500 --pause-ms 200
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+import re
+import time
+
+from src.dao.db_connection import DBConnection
+
+REPERTOIRE_MIGRATIONS = "data/migrations"
+
+# Taille et pause par défaut des migrations par lots
+TAILLE_LOT = 1000
+PAUSE_LOT_S = 0.1
+
+# Attente maximale d'un verrou par une migration transactionnelle : mieux vaut
+# échouer (et relancer) que bloquer les requêtes de l'application derrière soi
+DELAI_VERROU = "5s"
+
+MODE_TRANSACTION = "transaction"
+MODE_SANS_TRANSACTION = "sans-transaction"
+MODE_PAR_LOTS = "par-lots"
+_MODES = (MODE_TRANSACTION, MODE_SANS_TRANSACTION, MODE_PAR_LOTS)
+
+_NOM_FICHIER = re.compile(r"^(\d+)_(\w+)\.(sql|py)$")
+_DIRECTIVE = re.compile(r"^--\s*migration:\s*([\w-]+)\s*$", re.MULTILINE)
+
+# Table visée par un CREATE INDEX CONCURRENTLY (impossible sur une table partitionnée)
+_INDEX_CONCURRENT = re.compile(
+    r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\b.*?\sON\s+(?:ONLY\s+)?([\w.]+)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Clé du verrou consultatif empêchant deux exécutions simultanées
+_CLE_VERROU = 74190
+
+_DDL_SCHEMA_MIGRATIONS = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+  version     INT PRIMARY KEY,
+  nom         TEXT NOT NULL,
+  applique_le TIMESTAMPTZ NOT NULL DEFAULT now(),
+  duree_ms    INT NULL
+);
+"""
+
+
+class Migration:
+    """
+    Fichier de migration : version, nom, mode et instructions SQL.
+
+    `lot` est la fonction d'une migration Python (mode par lots), None pour
+    un fichier SQL.
+    """
+
+    def __init__(self, version: int, nom: str, sql: str, lot=None):
+        self.version = version
+        self.nom = nom
+        self.sql = sql
+        self.lot = lot
+        if lot is not None:
+            self.mode = MODE_PAR_LOTS
+            return
+        directive = _DIRECTIVE.search(sql)
+        self.mode = directive.group(1) if directive else MODE_TRANSACTION
+        if self.mode not in _MODES:
+            raise ValueError(f"Migration {version} : mode inconnu {self.mode!r}")
+
+    def __repr__(self):
+        return f"Migration({self.version}, {self.nom!r}, mode={self.mode})"
+
+    def instructions(self) -> list[str]:
+        """
+        Instructions du fichier, pour une exécution hors transaction.
+
+        Le découpage se fait sur les ``;`` de fin de ligne : les corps de
+        fonctions (``$$ ... $$``) sont réservés aux migrations transactionnelles.
+        """
+        lignes = [ligne for ligne in self.sql.splitlines() if not ligne.lstrip().startswith("--")]
+        morceaux = re.split(r";\s*$", "\n".join(lignes), flags=re.MULTILINE)
+        return [m.strip() for m in morceaux if m.strip()]
+
+
+def lister_migrations(repertoire: str = REPERTOIRE_MIGRATIONS) -> list[Migration]:
+    """
+    Lit les migrations d'un répertoire, triées par version.
+
+    Raises
+    ------
+    ValueError
+        Si deux fichiers portent la même version.
+    """
+    migrations = {}
+    for fichier in sorted(os.listdir(repertoire)):
+        correspondance = _NOM_FICHIER.match(fichier)
+        if not correspondance:
+            continue
+        version, nom, extension = correspondance.groups()
+        version = int(version)
+        if version in migrations:
+            raise ValueError(f"Version de migration en double : {version} ({fichier})")
+        chemin = os.path.join(repertoire, fichier)
+        with open(chemin, encoding="utf-8") as f:
+            source = f.read()
+        lot = _charger_lot(chemin, version) if extension == "py" else None
+        migrations[version] = Migration(version, nom, source, lot)
+    return [migrations[v] for v in sorted(migrations)]
+
+
+def _charger_lot(chemin: str, version: int):
+    """Charge une migration Python et retourne sa fonction `lot`."""
+    spec = importlib.util.spec_from_file_location(f"migration_{version:04d}", chemin)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    lot = getattr(module, "lot", None)
+    if not callable(lot):
+        raise ValueError(
+            f"Migration {version} : fonction lot(cursor, taille_lot, position) absente"
+        )
+    return lot
+
+
+class Migrations:
+    """
+    Application des migrations sur une connexion dédiée.
+
+    Un verrou consultatif PostgreSQL garantit qu'une seule exécution a lieu à
+    la fois, même lancée depuis plusieurs machines.
+    """
+
+    @staticmethod
+    def versions_appliquees(cursor) -> set[int]:
+        """Versions enregistrées dans ``schema_migrations`` (créée si besoin)."""
+        cursor.execute(_DDL_SCHEMA_MIGRATIONS)
+        cursor.execute("SELECT version FROM schema_migrations;")
+        return {r["version"] for r in cursor.fetchall()}
+
+    @staticmethod
+    def _enregistrer(cursor, migration: Migration, duree_ms: int | None) -> None:
+        cursor.execute(
+            """
+            INSERT INTO schema_migrations (version, nom, duree_ms)
+            VALUES (%(version)s, %(nom)s, %(duree_ms)s)
+            ON CONFLICT (version) DO NOTHING;
+            """,
+            {"version": migration.version, "nom": migration.nom, "duree_ms": duree_ms},
+        )
+
+    @staticmethod
+    def _supprimer_index_invalides(connexion, migration: Migration) -> None:
+        """
+        Supprime les index invalides de la migration, laissés par un
+        ``CREATE INDEX CONCURRENTLY`` interrompu (``IF NOT EXISTS`` ne
+        reconstruirait pas un index invalide).
+        """
+        with connexion.cursor() as cur:
+            cur.execute(
+                """
+                SELECT c.relname AS nom
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE NOT i.indisvalid
+                  AND c.relnamespace = current_schema()::regnamespace;
+                """
+            )
+            noms = [r["nom"] for r in cur.fetchall()]
+            for nom in noms:
+                if not re.search(rf"\b{re.escape(nom)}\b", migration.sql):
+                    continue
+                logging.warning("[Migrations] Index invalide supprimé : %s", nom)
+                cur.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{nom}";')
+
+    @staticmethod
+    def _table_partitionnee(cursor, instruction: str) -> str | None:
+        """
+        Table d'un ``CREATE INDEX CONCURRENTLY`` si elle est partitionnée.
+
+        PostgreSQL refuse CONCURRENTLY sur une table partitionnée ; ses index
+        sont créés au partitionnement (voir `PartitionsMessages`).
+
+        Returns
+        -------
+        str | None
+            Nom de la table, ou None si l'instruction peut être exécutée.
+        """
+        correspondance = _INDEX_CONCURRENT.match(instruction)
+        if not correspondance:
+            return None
+        table = correspondance.group(1)
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(%(table)s);", {"table": table}
+        )
+        ligne = cursor.fetchone()
+        return table if ligne is not None and ligne["relkind"] == "p" else None
+
+    @staticmethod
+    def _appliquer_une(
+        connexion, migration: Migration, taille_lot: int, pause_s: float
+    ) -> None:
+        debut = time.perf_counter()
+        if migration.mode == MODE_TRANSACTION:
+            with connexion.cursor() as cur:
+                cur.execute("SET LOCAL lock_timeout = %(delai)s;", {"delai": DELAI_VERROU})
+                cur.execute(migration.sql)
+                Migrations._enregistrer(
+                    cur, migration, int((time.perf_counter() - debut) * 1000)
+                )
+            connexion.commit()
+            return
+
+        if migration.mode == MODE_SANS_TRANSACTION:
+            connexion.autocommit = True
+            try:
+                Migrations._supprimer_index_invalides(connexion, migration)
+                with connexion.cursor() as cur:
+                    for instruction in migration.instructions():
+                        table = Migrations._table_partitionnee(cur, instruction)
+                        if table is not None:
+                            logging.warning(
+                                "[Migrations] %s : index ignoré, %s est partitionnée",
+                                migration.nom,
+                                table,
+                            )
+                            continue
+                        cur.execute(instruction)
+            finally:
+                connexion.autocommit = False
+        else:
+            nb_lots = nb_lignes = 0
+            position = None
+            while True:
+                with connexion.cursor() as cur:
+                    if migration.lot is None:
+                        cur.execute(migration.sql, {"taille_lot": taille_lot})
+                        nb = cur.rowcount
+                    else:
+                        nb, position = migration.lot(cur, taille_lot, position)
+                connexion.commit()
+                if nb <= 0:
+                    break
+                nb_lots += 1
+                nb_lignes += nb
+                time.sleep(pause_s)
+            logging.info(
+                "[Migrations] %s : %s ligne(s) en %s lot(s)", migration.nom, nb_lignes, nb_lots
+            )
+
+        with connexion.cursor() as cur:
+            Migrations._enregistrer(cur, migration, int((time.perf_counter() - debut) * 1000))
+        connexion.commit()
+
+    @staticmethod
+    def appliquer(
+        repertoire: str = REPERTOIRE_MIGRATIONS,
+        jusqu_a: int | None = None,
+        taille_lot: int = TAILLE_LOT,
+        pause_s: float = PAUSE_LOT_S,
+        connexion=None,
+    ) -> list[int]:
+        """
+        Applique, dans l'ordre, les migrations pas encore appliquées.
+
+        Parameters
+        ----------
+        repertoire : str, optional
+            Répertoire des fichiers de migration.
+        jusqu_a : int | None, optional
+            Dernière version à appliquer, by default None (toutes).
+        taille_lot : int, optional
+            Lignes traitées par lot dans les migrations par lots.
+        pause_s : float, optional
+            Pause entre deux lots, pour laisser passer le trafic applicatif.
+        connexion : optional
+            Connexion à utiliser (non partagée : elle passe en autocommit
+            pour les migrations sans transaction), by default None (une
+            connexion est ouverte puis fermée).
+
+        Returns
+        -------
+        list[int]
+            Versions appliquées.
+        """
+        migrations = lister_migrations(repertoire)
+        connexion_propre = connexion is None
+        if connexion_propre:
+            connexion = DBConnection.ouvrir_connexion()
+        appliquees = []
+        try:
+            with connexion.cursor() as cur:
+                cur.execute("SELECT pg_advisory_lock(%(cle)s);", {"cle": _CLE_VERROU})
+                deja = Migrations.versions_appliquees(cur)
+            connexion.commit()
+            try:
+                for migration in migrations:
+                    if migration.version in deja:
+                        continue
+                    if jusqu_a is not None and migration.version > jusqu_a:
+                        break
+                    logging.info("[Migrations] Application de %r", migration)
+                    try:
+                        Migrations._appliquer_une(connexion, migration, taille_lot, pause_s)
+                    except Exception:
+                        connexion.rollback()
+                        logging.exception("[Migrations] Échec de %r", migration)
+                        raise
+                    appliquees.append(migration.version)
+            finally:
+                with connexion.cursor() as cur:
+                    cur.execute("SELECT pg_advisory_unlock(%(cle)s);", {"cle": _CLE_VERROU})
+                connexion.commit()
+        finally:
+            if connexion_propre:
+                connexion.close()
+        logging.info("[Migrations] Version(s) appliquée(s) : %s", appliquees)
+        return appliquees
+
+    @staticmethod
+    def marquer_appliquees(cursor, repertoire: str = REPERTOIRE_MIGRATIONS) -> None:
+        """
+        Enregistre toutes les migrations comme appliquées, sans les exécuter.
+
+        Pour une base créée par data/init_db.sql, qui décrit déjà le schéma
+        à jour.
+        """
+        Migrations.versions_appliquees(cursor)
+        for migration in lister_migrations(repertoire):
+            Migrations._enregistrer(cursor, migration, None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrations versionnées du schéma")
+    parser.add_argument("--repertoire", default=REPERTOIRE_MIGRATIONS)
+    parser.add_argument("--jusqu-a", type=int, default=None, help="dernière version à appliquer")
+    parser.add_argument("--taille-lot", type=int, default=TAILLE_LOT)
+    parser.add_argument("--pause-ms", type=float, default=PAUSE_LOT_S * 1000)
+    parser.add_argument(
+        "--lister", action="store_true", help="affiche les migrations et leur état"
+    )
+    args = parser.parse_args(argv)
+
+    if args.lister:
+        connexion = DBConnection.ouvrir_connexion()
+        try:
+            with connexion.cursor() as cur:
+                deja = Migrations.versions_appliquees(cur)
+            connexion.commit()
+        finally:
+            connexion.close()
+        for migration in lister_migrations(args.repertoire):
+            etat = "appliquée" if migration.version in deja else "en attente"
+            print(f"{migration.version:04d} {migration.nom:<40} {migration.mode:<17} {etat}")
+        return 0
+
+    Migrations.appliquer(
+        args.repertoire, args.jusqu_a, args.taille_lot, args.pause_ms / 1000
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    raise SystemExit(main())
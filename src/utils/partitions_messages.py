@@ -0,0 +1,295 @@
+import datetime
+import logging
+
+from psycopg2 import sql
+
+from src.dao.db_connection import DBConnection
+
+# Partitionnement (optionnel) de la table `messages` par mois de `cree_le`.
+#
+# La table partitionnée a la même structure que la table d'origine, à ceci
+# près que sa clé primaire est (id, cree_le) : PostgreSQL impose que la clé
+# de partitionnement fasse partie de la clé primaire. Les identifiants
+# restent tirés de la même séquence et donc uniques.
+
+# Nombre de mois créés à l'avance au-delà du mois courant
+NB_MOIS_AVANCE = 3
+
+_PARTITION_DEFAUT = "messages_defaut"
+
+# Index secondaires de `messages` (voir data/init_db.sql), recréés sur la
+# table partitionnée
+_INDEX_MESSAGES = {
+    "idx_messages_conv_cree": ("conversation_id", "cree_le"),
+    "idx_messages_utilisateur_cree": ("utilisateur_id", "cree_le"),
+}
+
+_DDL_MESSAGES_PARTITIONNEE = """
+CREATE TABLE messages (
+  id                INT NOT NULL DEFAULT nextval('messages_id_seq'),
+  conversation_id   INT NOT NULL,
+  utilisateur_id    INT NULL,
+  emetteur          TEXT NOT NULL,
+  contenu           TEXT NOT NULL,
+  cree_le           TIMESTAMPTZ NOT NULL DEFAULT now(),
+
+  PRIMARY KEY (id, cree_le),
+
+  FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE CASCADE,
+  FOREIGN KEY (utilisateur_id) REFERENCES utilisateurs(id) ON DELETE CASCADE,
+
+  CONSTRAINT emetteur_check CHECK (emetteur IN ('utilisateur','ia')),
+  CONSTRAINT emetteur_utilisateur_match CHECK (
+    (emetteur = 'ia' AND utilisateur_id IS NULL) OR
+    (emetteur = 'utilisateur' AND utilisateur_id IS NOT NULL)
+  ),
+
+  FOREIGN KEY (conversation_id, utilisateur_id)
+    REFERENCES conversations_participants(conversation_id, utilisateur_id)
+    ON DELETE CASCADE
+    DEFERRABLE INITIALLY DEFERRED
+) PARTITION BY RANGE (cree_le);
+"""
+
+
+# Les triggers de l'ancienne table disparaissent avec elle ; celui-ci est
+# recréé sur la table partitionnée (et hérité par ses partitions)
+_DDL_TRIGGER_ACTIVITE = """
+CREATE TRIGGER trg_messages_activite
+  AFTER INSERT ON messages
+  FOR EACH ROW EXECUTE FUNCTION maj_derniere_activite();
+"""
+
+
+def debut_mois(jour: datetime.date) -> datetime.date:
+    """Premier jour du mois de `jour`."""
+    return datetime.date(jour.year, jour.month, 1)
+
+
+def mois_suivant(mois: datetime.date) -> datetime.date:
+    """Premier jour du mois suivant."""
+    return datetime.date(mois.year + mois.month // 12, mois.month % 12 + 1, 1)
+
+
+def mois_couverts(debut: datetime.date, fin: datetime.date) -> list[datetime.date]:
+    """
+    Mois (premiers jours) couvrant l'intervalle [debut, fin].
+
+    Parameters
+    ----------
+    debut : datetime.date
+    fin : datetime.date
+
+    Returns
+    -------
+    list[datetime.date]
+        Vide si `debut` est postérieur à `fin`.
+    """
+    mois, dernier = debut_mois(debut), debut_mois(fin)
+    res = []
+    while mois <= dernier:
+        res.append(mois)
+        mois = mois_suivant(mois)
+    return res
+
+
+def nom_partition(mois: datetime.date) -> str:
+    """Nom de la partition d'un mois, par exemple ``messages_2025_07``."""
+    return f"messages_{mois.year:04d}_{mois.month:02d}"
+
+
+def bornes_partition(mois: datetime.date) -> tuple[datetime.datetime, datetime.datetime]:
+    """Bornes [début, fin[ d'une partition mensuelle, en UTC."""
+    utc = datetime.timezone.utc
+    return (
+        datetime.datetime(mois.year, mois.month, 1, tzinfo=utc),
+        datetime.datetime.combine(mois_suivant(mois), datetime.time(), tzinfo=utc),
+    )
+
+
+class PartitionsMessages:
+    """
+    Outils de partitionnement mensuel de la table `messages`.
+
+    - `partitionner()` convertit la table existante (données conservées) ;
+    - `creer_partitions()` crée les partitions manquantes (à lancer
+      régulièrement, par exemple chaque mois) ;
+    - une partition par défaut reçoit les messages hors des mois créés ; leurs
+      lignes sont déplacées dans la bonne partition lorsqu'elle est créée.
+
+    Les recherches par date de `ConversationDAO` filtrent `cree_le` par
+    intervalle, ce qui permet au planificateur d'écarter les autres partitions.
+    """
+
+    @staticmethod
+    def est_partitionnee(cursor) -> bool:
+        """True si `messages` est une table partitionnée."""
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = 'messages'::regclass;")
+        return cursor.fetchone()["relkind"] == "p"
+
+    @staticmethod
+    def _creer_partition(cursor, mois: datetime.date) -> bool:
+        """
+        Crée la partition d'un mois si elle n'existe pas, en y déplaçant les
+        lignes correspondantes de la partition par défaut.
+
+        Returns
+        -------
+        bool
+            True si la partition a été créée.
+        """
+        nom = nom_partition(mois)
+        cursor.execute("SELECT to_regclass(%(nom)s) IS NOT NULL AS existe;", {"nom": nom})
+        if cursor.fetchone()["existe"]:
+            return False
+
+        debut, fin = bornes_partition(mois)
+        bornes = {"debut": debut, "fin": fin}
+        defaut = sql.Identifier(_PARTITION_DEFAUT)
+        cursor.execute(
+            sql.SQL(
+                "SELECT EXISTS (SELECT 1 FROM {} WHERE cree_le >= %(debut)s AND cree_le < %(fin)s)"
+                " AS a_deplacer;"
+            ).format(defaut),
+            bornes,
+        )
+        a_deplacer = cursor.fetchone()["a_deplacer"]
+
+        creation = sql.SQL(
+            "CREATE TABLE {} PARTITION OF messages FOR VALUES FROM (%(debut)s) TO (%(fin)s);"
+        ).format(sql.Identifier(nom))
+        if not a_deplacer:
+            cursor.execute(creation, bornes)
+            return True
+
+        # La partition par défaut contient des lignes du mois : il faut la
+        # détacher le temps de créer la partition et d'y déplacer ces lignes.
+        cursor.execute(sql.SQL("ALTER TABLE messages DETACH PARTITION {};").format(defaut))
+        cursor.execute(creation, bornes)
+        cursor.execute(
+            sql.SQL(
+                "WITH deplaces AS ("
+                " DELETE FROM {} WHERE cree_le >= %(debut)s AND cree_le < %(fin)s RETURNING *)"
+                " INSERT INTO messages SELECT * FROM deplaces;"
+            ).format(defaut),
+            bornes,
+        )
+        logging.info("[PartitionsMessages] %s ligne(s) déplacée(s) vers %s", cursor.rowcount, nom)
+        cursor.execute(sql.SQL("ALTER TABLE messages ATTACH PARTITION {} DEFAULT;").format(defaut))
+        return True
+
+    @staticmethod
+    def creer_partitions(
+        debut: datetime.date | None = None, nb_mois_avance: int = NB_MOIS_AVANCE
+    ) -> list[str]:
+        """
+        Crée les partitions mensuelles manquantes, de `debut` jusqu'à
+        `nb_mois_avance` mois après le mois courant.
+
+        Parameters
+        ----------
+        debut : datetime.date | None, optional
+            Premier mois à couvrir, by default None (mois courant).
+        nb_mois_avance : int, optional
+            Nombre de mois créés à l'avance.
+
+        Returns
+        -------
+        list[str]
+            Noms des partitions créées.
+
+        Raises
+        ------
+        ValueError
+            Si la table `messages` n'est pas partitionnée.
+        """
+        aujourd_hui = datetime.date.today()
+        fin = debut_mois(aujourd_hui)
+        for _ in range(nb_mois_avance):
+            fin = mois_suivant(fin)
+        crees = []
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                if not PartitionsMessages.est_partitionnee(cursor):
+                    raise ValueError("La table messages n'est pas partitionnée")
+                for mois in mois_couverts(debut or aujourd_hui, fin):
+                    if PartitionsMessages._creer_partition(cursor, mois):
+                        crees.append(nom_partition(mois))
+        logging.info("[PartitionsMessages] Partitions créées : %s", crees)
+        return crees
+
+    @staticmethod
+    def partitionner(nb_mois_avance: int = NB_MOIS_AVANCE) -> bool:
+        """
+        Convertit `messages` en table partitionnée par mois, en une transaction.
+
+        La table d'origine est renommée, une table partitionnée est créée avec
+        une partition par mois de données (plus `nb_mois_avance` mois à venir)
+        et une partition par défaut, puis les lignes sont copiées et
+        l'ancienne table supprimée.
+
+        Parameters
+        ----------
+        nb_mois_avance : int, optional
+            Nombre de mois créés à l'avance au-delà du mois courant.
+
+        Returns
+        -------
+        bool
+            True si la table a été convertie, False si elle l'était déjà.
+        """
+        with DBConnection().connection as conn:
+            with conn.cursor() as cursor:
+                if PartitionsMessages.est_partitionnee(cursor):
+                    logging.info("[PartitionsMessages] messages est déjà partitionnée")
+                    return False
+
+                cursor.execute("SELECT min(cree_le)::date AS premier FROM messages;")
+                premier = cursor.fetchone()["premier"] or datetime.date.today()
+
+                cursor.execute("ALTER TABLE messages RENAME TO messages_non_partitionnee;")
+                cursor.execute(
+                    "ALTER TABLE messages_non_partitionnee "
+                    "RENAME CONSTRAINT messages_pkey TO messages_non_partitionnee_pkey;"
+                )
+                for index in _INDEX_MESSAGES:
+                    cursor.execute(
+                        sql.SQL("ALTER INDEX IF EXISTS {} RENAME TO {};").format(
+                            sql.Identifier(index), sql.Identifier(f"{index}_non_partitionnee")
+                        )
+                    )
+                cursor.execute(_DDL_MESSAGES_PARTITIONNEE)
+                cursor.execute(
+                    sql.SQL("CREATE TABLE {} PARTITION OF messages DEFAULT;").format(
+                        sql.Identifier(_PARTITION_DEFAUT)
+                    )
+                )
+
+                fin = debut_mois(datetime.date.today())
+                for _ in range(nb_mois_avance):
+                    fin = mois_suivant(fin)
+                for mois in mois_couverts(premier, fin):
+                    PartitionsMessages._creer_partition(cursor, mois)
+
+                cursor.execute(
+                    """
+                    INSERT INTO messages
+                        (id, conversation_id, utilisateur_id, emetteur, contenu, cree_le)
+                    SELECT id, conversation_id, utilisateur_id, emetteur, contenu, cree_le
+                    FROM messages_non_partitionnee;
+                    """
+                )
+                nb = cursor.rowcount
+                cursor.execute("ALTER SEQUENCE messages_id_seq OWNED BY messages.id;")
+                cursor.execute("DROP TABLE messages_non_partitionnee;")
+                cursor.execute(_DDL_TRIGGER_ACTIVITE)
+                for index, colonnes in _INDEX_MESSAGES.items():
+                    cursor.execute(
+                        sql.SQL("CREATE INDEX {} ON messages ({});").format(
+                            sql.Identifier(index),
+                            sql.SQL(", ").join(map(sql.Identifier, colonnes)),
+                        )
+                    )
+
+        logging.info("[PartitionsMessages] messages partitionnée (%s ligne(s) copiée(s))", nb)
+        return True
@@ -1,10 +1,12 @@
 import logging
-import os
-
-import dotenv
 
+from src.dao.conversation_dao import ConversationDAO
 from src.dao.db_connection import DBConnection
+from src.dao.prompt_dao import PromptDAO
+from src.utils.config import obtenir_parametres
 from src.utils.log_decorator import log
+from src.utils.migrations import Migrations
+from src.utils.partitions_messages import PartitionsMessages
 from src.utils.singleton import Singleton
 
 
@@ -14,11 +16,27 @@ class ResetDatabase(metaclass=Singleton):
     """
 
     @log
-    def lancer(self, test_dao: bool = False) -> bool:
-        dotenv.load_dotenv()
+    def lancer(self, test_dao: bool = False, partitionner_messages: bool | None = None) -> bool:
+        """
+        Recrée le schéma et le peuple.
+
+        Efface toutes les données : une base en service se met à jour avec
+        les migrations (``python -m src.utils.migrations``).
+
+        Parameters
+        ----------
+        test_dao : bool
+            Schéma et données des tests DAO.
+        partitionner_messages : bool | None
+            Partitionne la table `messages` par mois après peuplement ; par
+            défaut, selon le paramètre MESSAGES_PARTITIONNES.
+        """
+        parametres = obtenir_parametres()
+        if partitionner_messages is None:
+            partitionner_messages = parametres.messages_partitionnes
 
         # Schéma cible + script de population
-        schema = "projet_test_dao" if test_dao else os.environ["POSTGRES_SCHEMA"]
+        schema = "projet_test_dao" if test_dao else parametres.postgres_schema
         pop_path = "data/pop_db_test.sql" if test_dao else "data/pop_db.sql"
 
         # DDL schéma
@@ -42,6 +60,18 @@ class ResetDatabase(metaclass=Singleton):
                 cur.execute(init_sql)
                 cur.execute(pop_sql)
 
+                # init_db.sql décrit le schéma à jour : aucune migration à appliquer
+                Migrations.marquer_appliquees(cur)
+
+        if partitionner_messages:
+            PartitionsMessages.partitionner()
+
+        # Les identifiants des prompts ont pu changer
+        PromptDAO.invalider_cache()
+
+        # Les scripts de peuplement n'alimentent pas l'index des sujets
+        ConversationDAO.reconstruire_sujets()
+
         logging.info("[ResetDB] Terminé")
         return True
 
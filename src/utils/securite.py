@@ -1,8 +1,363 @@
+import asyncio
+import base64
 import hashlib
+import hmac
+import logging
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from src.utils.config import obtenir_parametres
+
+try:  # dépendance optionnelle : argon2-cffi
+    from argon2 import PasswordHasher as _Argon2PasswordHasher
+    from argon2 import exceptions as _argon2_exceptions
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    _Argon2PasswordHasher = None
+    _argon2_exceptions = None
 
 
 def hash_password(password, sel=""):
-    """Hachage du mot de passe"""
+    """
+    Ancien hachage du mot de passe : SHA-256 de `password + sel` (sel = pseudo).
+
+    Conservé uniquement pour vérifier les hashs hérités (format hexadécimal
+    sans préfixe `$`), qui sont ré-hachés avec la KDF à la connexion suivante.
+    """
     password_bytes = password.encode("utf-8") + sel.encode("utf-8")
     hash_object = hashlib.sha256(password_bytes)
     return hash_object.hexdigest()
+
+
+def _b64(donnees: bytes) -> str:
+    return base64.b64encode(donnees).decode("ascii").rstrip("=")
+
+
+def _b64_decoder(texte: str) -> bytes:
+    return base64.b64decode(texte + "=" * (-len(texte) % 4))
+
+
+class HacheurScrypt:
+    """
+    Hachage des mots de passe avec scrypt (bibliothèque standard).
+
+    Format encodé : ``$scrypt$ln=<log2 N>,r=<r>,p=<p>$<sel b64>$<hash b64>``.
+    Les paramètres de coût font partie du hash : un hash calculé avec un coût
+    inférieur au coût courant reste vérifiable, et `doit_rehacher` le signale.
+
+    Parameters
+    ----------
+    ln : int
+        log2 du facteur de coût N (mémoire et temps ≈ 128 * r * 2**ln octets).
+    r : int
+        Taille de bloc.
+    p : int
+        Facteur de parallélisme.
+    """
+
+    ALGORITHME = "scrypt"
+    TAILLE_SEL = 16
+    TAILLE_HASH = 32
+
+    def __init__(self, ln: int = 15, r: int = 8, p: int = 1):
+        if ln < 1 or r < 1 or p < 1:
+            raise ValueError(f"Paramètres scrypt invalides : ln={ln}, r={r}, p={p}")
+        self.ln = ln
+        self.r = r
+        self.p = p
+
+    def __repr__(self):
+        return f"HacheurScrypt(ln={self.ln}, r={self.r}, p={self.p})"
+
+    @staticmethod
+    def _deriver(mot_de_passe: str, sel: bytes, ln: int, r: int, p: int, taille: int) -> bytes:
+        n = 2**ln
+        return hashlib.scrypt(
+            mot_de_passe.encode("utf-8"),
+            salt=sel,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=2 * 128 * r * n * p + 2**20,
+            dklen=taille,
+        )
+
+    def hacher(self, mot_de_passe: str) -> str:
+        """Hache un mot de passe avec un sel aléatoire et le coût courant."""
+        sel = secrets.token_bytes(self.TAILLE_SEL)
+        cle = self._deriver(mot_de_passe, sel, self.ln, self.r, self.p, self.TAILLE_HASH)
+        return f"$scrypt$ln={self.ln},r={self.r},p={self.p}${_b64(sel)}${_b64(cle)}"
+
+    @staticmethod
+    def _decoder(hash_stocke: str) -> tuple[dict[str, int], bytes, bytes]:
+        _, algo, params, sel, cle = hash_stocke.split("$")
+        if algo != HacheurScrypt.ALGORITHME:
+            raise ValueError(f"Algorithme inattendu : {algo!r}")
+        valeurs = {k: int(v) for k, v in (champ.split("=") for champ in params.split(","))}
+        return valeurs, _b64_decoder(sel), _b64_decoder(cle)
+
+    def verifier(self, mot_de_passe: str, hash_stocke: str) -> bool:
+        """Vérifie un mot de passe avec les paramètres enregistrés dans le hash."""
+        try:
+            params, sel, attendu = self._decoder(hash_stocke)
+            cle = self._deriver(
+                mot_de_passe, sel, params["ln"], params["r"], params["p"], len(attendu)
+            )
+        except (ValueError, KeyError):
+            logging.warning("[securite] Hash scrypt mal formé")
+            return False
+        return hmac.compare_digest(cle, attendu)
+
+    def doit_rehacher(self, hash_stocke: str) -> bool:
+        """True si le hash a été calculé avec d'autres paramètres que le coût courant."""
+        try:
+            params, _, _ = self._decoder(hash_stocke)
+        except (ValueError, KeyError):
+            return True
+        return (params.get("ln"), params.get("r"), params.get("p")) != (self.ln, self.r, self.p)
+
+
+class HacheurArgon2:
+    """
+    Hachage des mots de passe avec argon2id (nécessite le paquet `argon2-cffi`).
+
+    Le hash produit est au format PHC standard (``$argon2id$v=19$m=...,t=...,p=...$...``).
+
+    Parameters
+    ----------
+    cout_temps : int
+        Nombre d'itérations.
+    cout_memoire_kio : int
+        Mémoire utilisée, en kibioctets.
+    parallelisme : int
+        Nombre de voies.
+    """
+
+    ALGORITHME = "argon2id"
+
+    def __init__(self, cout_temps: int = 3, cout_memoire_kio: int = 65536, parallelisme: int = 1):
+        if _Argon2PasswordHasher is None:
+            raise RuntimeError("argon2id indisponible : installer le paquet argon2-cffi")
+        self.cout_temps = cout_temps
+        self.cout_memoire_kio = cout_memoire_kio
+        self.parallelisme = parallelisme
+        self._ph = _Argon2PasswordHasher(
+            time_cost=cout_temps, memory_cost=cout_memoire_kio, parallelism=parallelisme
+        )
+
+    def __repr__(self):
+        return (
+            f"HacheurArgon2(cout_temps={self.cout_temps}, "
+            f"cout_memoire_kio={self.cout_memoire_kio}, parallelisme={self.parallelisme})"
+        )
+
+    def hacher(self, mot_de_passe: str) -> str:
+        """Hache un mot de passe avec le coût courant."""
+        return self._ph.hash(mot_de_passe)
+
+    def verifier(self, mot_de_passe: str, hash_stocke: str) -> bool:
+        """Vérifie un mot de passe avec les paramètres enregistrés dans le hash."""
+        try:
+            return self._ph.verify(hash_stocke, mot_de_passe)
+        except _argon2_exceptions.VerificationError:
+            return False
+        except _argon2_exceptions.InvalidHashError:
+            logging.warning("[securite] Hash argon2 mal formé")
+            return False
+
+    def doit_rehacher(self, hash_stocke: str) -> bool:
+        """True si le hash a été calculé avec d'autres paramètres que le coût courant."""
+        try:
+            return self._ph.check_needs_rehash(hash_stocke)
+        except _argon2_exceptions.InvalidHashError:
+            return True
+
+
+def creer_hacheur(algorithme: str | None = None):
+    """
+    Construit le hacheur configuré.
+
+    La configuration est lue dans les paramètres (`src.utils.config`, .env) :
+    - ``MDP_ALGORITHME`` : ``scrypt`` (défaut) ou ``argon2id`` ;
+    - ``MDP_SCRYPT_LN``, ``MDP_SCRYPT_R``, ``MDP_SCRYPT_P`` : coût scrypt ;
+    - ``MDP_ARGON2_TEMPS``, ``MDP_ARGON2_MEMOIRE_KIO`` : coût argon2id.
+
+    Parameters
+    ----------
+    algorithme : str | None, optional
+        Force l'algorithme, by default None (valeur de ``MDP_ALGORITHME``).
+
+    Returns
+    -------
+    HacheurScrypt | HacheurArgon2
+
+    Raises
+    ------
+    ValueError
+        Si l'algorithme est inconnu.
+    """
+    parametres = obtenir_parametres()
+    algorithme = (algorithme or parametres.mdp_algorithme).lower()
+    if algorithme == HacheurScrypt.ALGORITHME:
+        return HacheurScrypt(
+            ln=parametres.mdp_scrypt_ln, r=parametres.mdp_scrypt_r, p=parametres.mdp_scrypt_p
+        )
+    if algorithme == HacheurArgon2.ALGORITHME:
+        return HacheurArgon2(
+            cout_temps=parametres.mdp_argon2_temps,
+            cout_memoire_kio=parametres.mdp_argon2_memoire_kio,
+        )
+    raise ValueError(f"Algorithme de hachage inconnu : {algorithme!r}")
+
+
+_hacheur = None
+
+
+def obtenir_hacheur():
+    """Retourne le hacheur courant (créé à la première utilisation)."""
+    global _hacheur
+    if _hacheur is None:
+        _hacheur = creer_hacheur()
+        logging.info("[securite] Hacheur de mots de passe : %r", _hacheur)
+    return _hacheur
+
+
+def configurer_hacheur(hacheur) -> None:
+    """
+    Remplace le hacheur courant (changement de coût, tests...).
+
+    Parameters
+    ----------
+    hacheur : HacheurScrypt | HacheurArgon2 | None
+        Nouveau hacheur ; None pour revenir à la configuration de l'environnement.
+    """
+    global _hacheur
+    _hacheur = hacheur
+
+
+def _est_hash_herite(hash_stocke: str) -> bool:
+    """Les hashs SHA-256 hérités sont en hexadécimal, sans préfixe `$`."""
+    return not hash_stocke.startswith("$")
+
+
+def hacher_mot_de_passe(mot_de_passe: str) -> str:
+    """
+    Hache un mot de passe avec le hacheur courant.
+
+    Parameters
+    ----------
+    mot_de_passe : str
+        Mot de passe en clair.
+
+    Returns
+    -------
+    str
+        Hash encodé (algorithme, paramètres de coût, sel et hash).
+    """
+    return obtenir_hacheur().hacher(mot_de_passe)
+
+
+def verifier_mot_de_passe(mot_de_passe: str, hash_stocke: str | None, sel: str = "") -> bool:
+    """
+    Vérifie un mot de passe contre un hash stocké, quel que soit son format.
+
+    Parameters
+    ----------
+    mot_de_passe : str
+        Mot de passe en clair.
+    hash_stocke : str | None
+        Hash enregistré (KDF encodée, ou SHA-256 hérité).
+    sel : str, optional
+        Sel des hashs hérités (le pseudo), by default "".
+
+    Returns
+    -------
+    bool
+        True si le mot de passe correspond.
+    """
+    if not hash_stocke:
+        return False
+    if _est_hash_herite(hash_stocke):
+        return hmac.compare_digest(hash_stocke, hash_password(mot_de_passe, sel))
+    if hash_stocke.startswith(f"${HacheurScrypt.ALGORITHME}$"):
+        hacheur = obtenir_hacheur()
+        if not isinstance(hacheur, HacheurScrypt):
+            hacheur = HacheurScrypt()
+        return hacheur.verifier(mot_de_passe, hash_stocke)
+    if hash_stocke.startswith(f"${HacheurArgon2.ALGORITHME}$"):
+        hacheur = obtenir_hacheur()
+        if not isinstance(hacheur, HacheurArgon2):
+            hacheur = HacheurArgon2()
+        return hacheur.verifier(mot_de_passe, hash_stocke)
+    logging.warning("[securite] Format de hash inconnu")
+    return False
+
+
+def doit_rehacher(hash_stocke: str | None) -> bool:
+    """
+    Indique si un hash doit être recalculé avec le hacheur courant.
+
+    C'est le cas des hashs SHA-256 hérités, des hashs d'un autre algorithme et
+    des hashs calculés avec un coût différent du coût courant.
+
+    Parameters
+    ----------
+    hash_stocke : str | None
+
+    Returns
+    -------
+    bool
+    """
+    if not hash_stocke or _est_hash_herite(hash_stocke):
+        return True
+    hacheur = obtenir_hacheur()
+    if not hash_stocke.startswith(f"${hacheur.ALGORITHME}$"):
+        return True
+    return hacheur.doit_rehacher(hash_stocke)
+
+
+# --------- Vérification hors du fil appelant ---------
+
+# scrypt et argon2 relâchent le GIL pendant le calcul : des threads suffisent
+# pour vérifier plusieurs connexions simultanées en parallèle.
+NB_THREADS_VERIFICATION = min(8, os.cpu_count() or 1)
+
+_pool_verification: ThreadPoolExecutor | None = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _pool_verification
+    if _pool_verification is None:
+        _pool_verification = ThreadPoolExecutor(
+            max_workers=NB_THREADS_VERIFICATION, thread_name_prefix="verif-mdp"
+        )
+    return _pool_verification
+
+
+def verifier_en_parallele(demandes: Iterable[tuple[str, str | None, str]]) -> list[bool]:
+    """
+    Vérifie plusieurs mots de passe en parallèle (rafale de connexions).
+
+    Parameters
+    ----------
+    demandes : Iterable[tuple[str, str | None, str]]
+        Triplets (mot de passe, hash stocké, sel hérité).
+
+    Returns
+    -------
+    list[bool]
+        Résultats, dans l'ordre des demandes.
+    """
+    return list(_pool().map(lambda d: verifier_mot_de_passe(*d), demandes))
+
+
+async def verifier_mot_de_passe_async(
+    mot_de_passe: str, hash_stocke: str | None, sel: str = ""
+) -> bool:
+    """
+    Variante asynchrone de `verifier_mot_de_passe` : le calcul est fait dans
+    le pool de threads, sans bloquer la boucle d'événements.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool(), verifier_mot_de_passe, mot_de_passe, hash_stocke, sel)
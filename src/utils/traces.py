@@ -0,0 +1,263 @@
+"""
+Traçage léger des latences (spans), par exemple pour un tour de chat.
+
+Un span mesure une étape ; les spans ouverts pendant une étape en sont les
+enfants (ContextVar : chaque thread a sa propre pile). Quand le span racine se
+termine, toute la trace est écrite dans un fichier JSON Lines, un span par
+ligne, avec les champs d'OpenTelemetry (trace_id, span_id, parent_span_id,
+name, start_time_unix_nano, end_time_unix_nano, attributes, status).
+
+Le traçage est actif si ``TRACES_FICHIER`` est renseignée ; sinon `span`
+renvoie un objet inerte et ne coûte presque rien.
+
+Usage :
+    python -m src.utils.traces logs/traces.jsonl -n 5
+"""
+
+import argparse
+import json
+import logging
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+
+from src.utils.config import obtenir_parametres
+
+_span_courant: ContextVar["Span | None"] = ContextVar("span_courant", default=None)
+
+
+class Span:
+    """Étape chronométrée d'une trace."""
+
+    __slots__ = (
+        "nom",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "debut_ns",
+        "fin_ns",
+        "attributs",
+        "erreur",
+        "_debut_perf",
+        "_jeton",
+    )
+
+    def __init__(self, nom: str, parent: "Span | None", attributs: dict):
+        self.nom = nom
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributs = attributs
+        self.erreur = None
+        self.debut_ns = self.fin_ns = 0
+        self._debut_perf = 0
+        self._jeton = None
+
+    def ajouter(self, **attributs) -> None:
+        """Ajoute des attributs (taille de l'historique, nombre de lignes...)."""
+        self.attributs.update(attributs)
+
+    def __enter__(self):
+        self.debut_ns = time.time_ns()
+        self._debut_perf = time.perf_counter_ns()
+        self._jeton = _span_courant.set(self)
+        return self
+
+    def __exit__(self, type_exc, exc, tb):
+        self.fin_ns = self.debut_ns + time.perf_counter_ns() - self._debut_perf
+        _span_courant.reset(self._jeton)
+        if exc is not None:
+            self.erreur = f"{type_exc.__name__}: {exc}"
+        _terminer(self)
+        return False
+
+    def en_dict(self) -> dict:
+        """Représentation exportée (noms de champs d'OpenTelemetry)."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.nom,
+            "start_time_unix_nano": self.debut_ns,
+            "end_time_unix_nano": self.fin_ns,
+            "attributes": self.attributs,
+            "status": {"code": "ERROR", "message": self.erreur} if self.erreur else {"code": "OK"},
+        }
+
+
+class _SpanInerte:
+    """Span renvoyé quand le traçage est inactif."""
+
+    __slots__ = ()
+
+    def ajouter(self, **attributs) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_exc, exc, tb):
+        return False
+
+
+_SPAN_INERTE = _SpanInerte()
+
+
+class ExportateurJSONL:
+    """Écrit les traces terminées dans un fichier JSON Lines (ajout en fin)."""
+
+    def __init__(self, chemin: str):
+        self.chemin = chemin
+        self._verrou = threading.Lock()
+
+    def exporter(self, spans: list[Span]) -> None:
+        lignes = "".join(
+            json.dumps(s.en_dict(), ensure_ascii=False, default=str) + "\n" for s in spans
+        )
+        try:
+            with self._verrou, open(self.chemin, "a", encoding="utf-8") as f:
+                f.write(lignes)
+        except OSError:
+            logging.exception("[traces] Échec de l'écriture dans %s", self.chemin)
+
+
+_exportateur: ExportateurJSONL | None = (
+    ExportateurJSONL(obtenir_parametres().traces_fichier)
+    if obtenir_parametres().traces_fichier
+    else None
+)
+
+# Spans terminés des traces en cours : trace_id -> spans
+_en_cours: dict[str, list[Span]] = {}
+_verrou = threading.Lock()
+
+
+def configurer_exportateur(exportateur: ExportateurJSONL | None) -> None:
+    """
+    Active (ou, avec None, désactive) le traçage.
+
+    Parameters
+    ----------
+    exportateur : ExportateurJSONL | None
+    """
+    global _exportateur
+    _exportateur = exportateur
+    with _verrou:
+        _en_cours.clear()
+
+
+def traces_actives() -> bool:
+    return _exportateur is not None
+
+
+def span(nom: str, **attributs):
+    """
+    Ouvre un span, à utiliser avec ``with``.
+
+    Examples
+    --------
+    >>> with span("llm.generate", nb_messages=12) as s:
+    ...     s.ajouter(statut_http=200)
+    """
+    if _exportateur is None:
+        return _SPAN_INERTE
+    return Span(nom, _span_courant.get(), attributs)
+
+
+def enregistrer_span(nom: str, duree_s: float, **attributs) -> None:
+    """
+    Ajoute un span déjà mesuré (qui vient de se terminer) sous le span courant.
+
+    Sans effet hors d'une trace : une requête SQL isolée n'en crée pas.
+    """
+    if _exportateur is None:
+        return
+    parent = _span_courant.get()
+    if parent is None:
+        return
+    s = Span(nom, parent, attributs)
+    s.fin_ns = time.time_ns()
+    s.debut_ns = s.fin_ns - int(duree_s * 1e9)
+    _terminer(s)
+
+
+def _terminer(s: Span) -> None:
+    exportateur = _exportateur
+    if exportateur is None:
+        return
+    with _verrou:
+        spans = _en_cours.setdefault(s.trace_id, [])
+        spans.append(s)
+        if s.parent_id is not None:
+            return
+        del _en_cours[s.trace_id]
+    exportateur.exporter(spans)
+
+
+def lire_traces(chemin: str, nb: int) -> list[list[dict]]:
+    """
+    Les `nb` dernières traces d'un fichier, spans triés par début.
+
+    Returns
+    -------
+    list[list[dict]]
+        Une liste de spans par trace, de la plus ancienne à la plus récente.
+    """
+    traces: dict[str, list[dict]] = {}
+    with open(chemin, encoding="utf-8") as f:
+        for ligne in f:
+            if ligne.strip():
+                s = json.loads(ligne)
+                traces.setdefault(s["trace_id"], []).append(s)
+    dernieres = list(traces.values())[-nb:] if nb > 0 else []
+    return [sorted(t, key=lambda s: s["start_time_unix_nano"]) for t in dernieres]
+
+
+def cascade(spans: list[dict], largeur: int = 40) -> str:
+    """
+    Diagramme en cascade d'une trace : un span par ligne, indenté selon sa
+    profondeur, avec son décalage, sa durée et une barre à l'échelle.
+    """
+    par_id = {s["span_id"]: s for s in spans}
+    racine = next((s for s in spans if s["parent_span_id"] is None), spans[0])
+    debut = racine["start_time_unix_nano"]
+    total = max(racine["end_time_unix_nano"] - debut, 1)
+
+    def profondeur(s):
+        p = 0
+        while s["parent_span_id"] in par_id:
+            s = par_id[s["parent_span_id"]]
+            p += 1
+        return p
+
+    lignes = [f"trace {racine['trace_id']}  {total / 1e6:.1f} ms"]
+    for s in spans:
+        decalage = s["start_time_unix_nano"] - debut
+        duree = s["end_time_unix_nano"] - s["start_time_unix_nano"]
+        gauche = min(largeur - 1, int(decalage * largeur / total))
+        barre = " " * gauche + "█" * max(1, min(largeur - gauche, round(duree * largeur / total)))
+        nom = "  " * profondeur(s) + s["name"]
+        erreur = " !" if s["status"]["code"] == "ERROR" else ""
+        lignes.append(
+            f"  {nom:<32} {decalage / 1e6:9.1f} {duree / 1e6:9.1f} ms |{barre:<{largeur}}|{erreur}"
+        )
+    return "\n".join(lignes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cascade des dernières traces")
+    parser.add_argument("fichier", nargs="?", default=obtenir_parametres().traces_fichier)
+    parser.add_argument("-n", type=int, default=5, help="nombre de traces affichées")
+    args = parser.parse_args(argv)
+    if not args.fichier:
+        parser.error("fichier de traces manquant (argument ou TRACES_FICHIER)")
+
+    for trace in lire_traces(args.fichier, args.n):
+        print(cascade(trace))
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,9 +2,6 @@ import logging
 
 from InquirerPy import inquirer
 
-from src.utils.reset_database import ResetDatabase
-from src.view.accueil.connexion_vue import ConnexionVue
-from src.view.accueil.inscription_vue import InscriptionVue
 from src.view.session import Session
 from src.view.vue_abstraite import VueAbstraite
 
@@ -43,6 +40,8 @@ class AccueilVue(VueAbstraite):
 
             case "Se connecter":
                 try:
+                    from src.view.accueil.connexion_vue import ConnexionVue
+
                     logging.info("Navigation vers ConnexionVue.")
                     return ConnexionVue("Connexion à l'application")
                 except Exception as e:
@@ -55,6 +54,8 @@ class AccueilVue(VueAbstraite):
                     return AccueilVue(f"Échec d'ouverture de la page de connexion : {e}")
 
             case "Créer un compte":
+                from src.view.accueil.inscription_vue import InscriptionVue
+
                 logging.info("Navigation vers InscriptionVue.")
                 return InscriptionVue("Création de compte")
 
@@ -63,6 +64,8 @@ class AccueilVue(VueAbstraite):
                 return AccueilVue(Session().afficher())
 
             case "Ré-initialiser la base de données":
+                from src.utils.reset_database import ResetDatabase
+
                 logging.warning("Demande de ré-initialisation de la base de données.")
                 succes = ResetDatabase().lancer()
                 message = (
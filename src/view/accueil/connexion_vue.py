@@ -4,7 +4,6 @@ from InquirerPy import inquirer
 
 from src.dao.utilisateur_dao import UtilisateurDao
 from src.service.auth_service import Auth_Service
-from src.service.utilisateur_service import UtilisateurService
 from src.view.session import Session
 from src.view.vue_abstraite import VueAbstraite
 
@@ -30,8 +29,8 @@ class ConnexionVue(VueAbstraite):
         auth_service = Auth_Service(UtilisateurDao())
 
         try:
-            # 2) Authentification + token JWT
-            token = auth_service.se_connecter(pseudo, mdp)
+            # 2) Authentification + token JWT + ouverture de la session en base
+            utilisateur, token, session_id = auth_service.connecter(pseudo, mdp)
             logging.info("Authentification réussie pour pseudo=%r (token généré)", pseudo)
         except ValueError as e:
             logging.warning("[ConnexionVue] Erreur d'authentification : %s", e)
@@ -39,26 +38,13 @@ class ConnexionVue(VueAbstraite):
 
             return AccueilVue("Erreur de connexion (pseudo ou mot de passe invalide)")
 
-        # 3) Récupérer l'objet Utilisateur pour la session CLI
-        utilisateur = UtilisateurService().trouver_par_pseudo(pseudo)
-
-        if not utilisateur:
-            logging.error(
-                "[ConnexionVue] Utilisateur authentifié mais non trouvé par UtilisateurService "
-                "(pseudo=%r)",
-                pseudo,
-            )
-            from src.view.accueil.accueil_vue import AccueilVue
-
-            return AccueilVue("Erreur interne : utilisateur authentifié mais non trouvé.")
-
-        # 4) On ouvre la session locale + BDD
+        # 3) On ouvre la session locale (la ligne en base est déjà créée)
         logging.debug(
             "Ouverture de session pour utilisateur id=%s, pseudo=%r",
             utilisateur.id,
             utilisateur.pseudo,
         )
-        Session().connexion(utilisateur, token=token)
+        Session().connexion(utilisateur, token=token, session_db_id=session_id)
 
         message = f"Vous êtes connecté sous le pseudo {utilisateur.pseudo}"
         logging.info(
@@ -10,8 +10,12 @@ from src.view.vue_abstraite import VueAbstraite
 class ConversationsVue(VueAbstraite):
     """Vue listant les conversations de l'utilisateur et actions associées."""
 
-    def __init__(self, message: str = ""):
+    # Conversations affichées par page
+    TAILLE_PAGE = 15
+
+    def __init__(self, message: str = "", page: int = 0):
         self.message = message
+        self.page = max(page, 0)
 
     def choisir_menu(self):
         logging.debug("Entrée dans ConversationsVue (message=%r)", self.message)
@@ -34,22 +38,22 @@ class ConversationsVue(VueAbstraite):
         if self.message:
             print(self.message + "\n")
 
-        # 3) Charger la liste des conversations
+        # 3) Charger une page de conversations (aperçus calculés en une requête)
         try:
             logging.debug(
-                "[ConversationsVue] Chargement des conversations pour user_id=%s",
+                "[ConversationsVue] Chargement de la page %s des conversations pour user_id=%s",
+                self.page,
                 utilisateur.id,
             )
-            conversations = (
-                ConversationService.lister_conversations(
-                    id_utilisateur=utilisateur.id,
-                    limite=None,
-                )
-                or []
+            apercus, nb_total = ConversationService.page_conversations(
+                id_utilisateur=utilisateur.id,
+                limite=self.TAILLE_PAGE,
+                decalage=self.page * self.TAILLE_PAGE,
             )
             logging.info(
-                "[ConversationsVue] %s conversation(s) récupérée(s) pour user_id=%s",
-                len(conversations),
+                "[ConversationsVue] %s conversation(s) récupérée(s) sur %s pour user_id=%s",
+                len(apercus),
+                nb_total,
                 utilisateur.id,
             )
         except Exception as e:
@@ -58,7 +62,11 @@ class ConversationsVue(VueAbstraite):
 
             return MenuUtilisateurVue("Impossible de charger vos conversations pour le moment.")
 
-        if not conversations:
+        if not apercus and self.page > 0:
+            # Page vidée entre-temps (suppression) : on revient au début
+            return ConversationsVue(self.message)
+
+        if not apercus:
             # Aucun résultat -> proposer de créer une conversation ou revenir
             logging.info(
                 "[ConversationsVue] Aucune conversation trouvée pour user_id=%s",
@@ -90,18 +98,23 @@ class ConversationsVue(VueAbstraite):
             return MenuUtilisateurVue()
 
         # 4) Construire la liste des choix
+        nb_pages = -(-nb_total // self.TAILLE_PAGE)
         mapping = {}
         items = []
-        for conv in conversations:
-            label = f"[{conv.id}] {conv.nom}"
+        for apercu in apercus:
+            label = apercu.afficher_apercu()
             items.append(label)
-            mapping[label] = conv
+            mapping[label] = apercu.conversation
 
+        if self.page > 0:
+            items.append("← Page précédente")
+        if self.page + 1 < nb_pages:
+            items.append("→ Page suivante")
         items.append("↩︎ Retour au menu")
 
         try:
             selection = inquirer.select(
-                message="Sélectionnez une conversation :",
+                message=f"Sélectionnez une conversation (page {self.page + 1}/{nb_pages}) :",
                 choices=items,
                 cycle=True,
             ).execute()
@@ -115,6 +128,10 @@ class ConversationsVue(VueAbstraite):
                     "[ConversationsVue] L'utilisateur a choisi de revenir au menu utilisateur."
                 )
                 return MenuUtilisateurVue()
+            if selection == "← Page précédente":
+                return ConversationsVue(page=self.page - 1)
+            if selection == "→ Page suivante":
+                return ConversationsVue(page=self.page + 1)
 
             conv = mapping[selection]
             logging.debug(
@@ -200,7 +217,7 @@ class ConversationsVue(VueAbstraite):
                         confirm,
                     )
                     if not confirm:
-                        return ConversationsVue()
+                        return ConversationsVue(page=self.page)
 
                     try:
                         ConversationService.supprimer_conversation(
@@ -255,7 +272,7 @@ class ConversationsVue(VueAbstraite):
                         "[ConversationsVue] Retour à la liste des conversations pour user_id=%s",
                         utilisateur.id,
                     )
-                    return ConversationsVue()
+                    return ConversationsVue(page=self.page)
 
                 case "Exporter (.json)":
                     logging.info(
@@ -5,6 +5,7 @@ from InquirerPy import inquirer
 from src.dao.prompt_dao import PromptDAO
 from src.dao.utilisateur_dao import UtilisateurDao
 from src.service.conversation_service import ConversationService, ErreurValidation
+from src.service.stats_service import Statistiques_Service
 from src.view.session import Session
 from src.view.vue_abstraite import VueAbstraite
 
@@ -108,6 +109,42 @@ class ReprendreConversationVue(VueAbstraite):
         inquirer.text(message="Appuyez sur Entrée pour revenir au menu...", default="").execute()
         return ReprendreConversationVue(self.conv)
 
+    def _afficher_statistiques(self):
+        logging.debug(
+            "[ReprendreConversationVue] Statistiques demandées pour conv_id=%s",
+            getattr(self.conv, "id", None),
+        )
+        try:
+            stats = Statistiques_Service().stats_conversation(self.conv.id)
+            logging.info(
+                "[ReprendreConversationVue] Statistiques de conv_id=%s (%s message(s))",
+                self.conv.id,
+                stats["nb_messages"],
+            )
+        except Exception as e:
+            logging.error(f"[ReprendreConversationVue] Erreur stats conv={self.conv.id} : {e}")
+            print("\n(Impossible de calculer les statistiques pour l’instant)\n")
+            return
+
+        print("\n" + "-" * 60)
+        print(f"Conversation « {self.conv.nom} » — statistiques")
+        print("-" * 60 + "\n")
+
+        if not stats["nb_messages"]:
+            print("(Aucun message pour l’instant)\n")
+            return
+
+        debut, fin = stats["periode"]
+        print(f" • Messages : {stats['nb_messages']}")
+        for emetteur, nb in sorted(stats["par_emetteur"].items(), key=lambda p: -p[1]):
+            print(f"     - {emetteur} : {nb}")
+        print(f" • Longueur moyenne : {stats['longueur_moyenne']:.0f} caractère(s)")
+        print(f" • Période : du {debut:%d/%m/%Y %H:%M} au {fin:%d/%m/%Y %H:%M}")
+        jour, nb_max = max(stats["par_jour"], key=lambda p: p[1])
+        print(f" • Jours actifs : {len(stats['par_jour'])}")
+        print(f" • Jour le plus chargé : {jour:%d/%m/%Y} ({nb_max} message(s))")
+        print("")
+
     def _envoyer_message(self):
         logging.debug(
             "[ReprendreConversationVue] Demande d'envoi de message pour conv_id=%s",
@@ -134,6 +171,7 @@ class ReprendreConversationVue(VueAbstraite):
                 options=None,
                 id_conversation=self.conv.id,
                 id_user=(user.id if user else None),
+                pseudo=(user.pseudo if user else None),
             )
         except ErreurValidation as e:
             logging.warning(
@@ -491,6 +529,7 @@ class ReprendreConversationVue(VueAbstraite):
             choices=[
                 "Envoyer un message",
                 "Voir tous les messages",
+                "Statistiques de la conversation",
                 "Changer la personnalisation",
                 "Ajouter un participant",
                 "Retirer un participant",
@@ -513,6 +552,12 @@ class ReprendreConversationVue(VueAbstraite):
             case "Voir tous les messages":
                 self._afficher_tous_les_messages()
                 return ReprendreConversationVue(self.conv)
+            case "Statistiques de la conversation":
+                self._afficher_statistiques()
+                inquirer.text(
+                    message="Appuyez sur Entrée pour revenir au menu...", default=""
+                ).execute()
+                return ReprendreConversationVue(self.conv)
             case "Changer la personnalisation":
                 return self._changer_personnalisation()
             case "Ajouter un participant":
@@ -1,12 +1,16 @@
 import logging
 from datetime import datetime
 
-from src.dao.session_dao import SessionDAO
 from src.utils.singleton import Singleton
 
 
 class Session(metaclass=Singleton):
-    """Stocke l'état local + journalise en base via SessionDAO."""
+    """
+    Stocke l'état local + journalise en base via SessionDAO.
+
+    SessionDAO et SurveillanceSessions (donc psycopg2) ne sont importés qu'à
+    la première connexion : l'accueil s'affiche sans eux.
+    """
 
     def __init__(self):
         self.utilisateur = None
@@ -14,24 +18,49 @@ class Session(metaclass=Singleton):
         self.session_db_id = None
         self.token = None
 
-    def connexion(self, utilisateur, token: str | None = None):
-        """Enregistre la session et crée la ligne en base."""
+    def connexion(self, utilisateur, token: str | None = None, session_db_id: int | None = None):
+        """
+        Enregistre la session et crée la ligne en base.
+
+        Si `session_db_id` est fourni, la ligne a déjà été créée par
+        `Auth_Service.connecter` et aucune requête n'est faite.
+        """
+        from src.dao.session_dao import SessionDAO
+        from src.service.surveillance_sessions import SurveillanceSessions
+
         logging.debug(f"[Session] connexion() utilisateur={getattr(utilisateur, 'id', None)}")
         self.utilisateur = utilisateur
         self.debut_connexion = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        try:
-            self.session_db_id = SessionDAO().ouvrir(utilisateur.id)
-            logging.info(f"[Session] Session ouverte en BDD (id={self.session_db_id})")
-        except Exception as e:
-            logging.error(f"[Session] ERREUR lors de l'ouverture de session BDD : {e}")
-            self.session_db_id = None
         self.token = token
+        if session_db_id is not None:
+            self.session_db_id = session_db_id
+        else:
+            try:
+                self.session_db_id = SessionDAO().ouvrir(utilisateur.id)
+                logging.info(f"[Session] Session ouverte en BDD (id={self.session_db_id})")
+            except Exception as e:
+                logging.error(f"[Session] ERREUR lors de l'ouverture de session BDD : {e}")
+                self.session_db_id = None
+        if self.session_db_id is not None:
+            # Signes de vie de la session + fermeture des sessions abandonnées
+            surveillance = SurveillanceSessions()
+            surveillance.demarrer()
+            surveillance.suivre(self.session_db_id)
 
     def deconnexion(self):
         """Ferme la session locale + met à jour la BDD si possible."""
         logging.debug("[Session] deconnexion() appelée")
+        if self.session_db_id is None and not self.utilisateur:
+            return
+        from src.dao.session_dao import SessionDAO
+        from src.service.surveillance_sessions import SurveillanceSessions
+
         try:
-            if self.utilisateur:
+            if self.session_db_id is not None:
+                SurveillanceSessions().oublier(self.session_db_id)
+                SessionDAO().fermer([self.session_db_id])
+                logging.info("[Session] Session BDD fermée avec succès")
+            elif self.utilisateur:
                 SessionDAO().fermer_derniere_ouverte(self.utilisateur.id)
                 logging.info("[Session] Session BDD fermée avec succès")
         except Exception as e: